@@ -4,10 +4,12 @@ from sqlalchemy import func
 from typing import List
 from datetime import datetime, timedelta
 from app.core.database import get_db
+from app.core.auth_cache import auth_cache
 from app.models.user import User
 from app.models.filter import Filter
 from app.models.listing import Listing
 from app.api.dependencies import get_current_user
+from app.services.bulk_delete import bulk_delete_service
 from pydantic import BaseModel
 from typing import Optional
 
@@ -152,6 +154,7 @@ async def update_user(
         user.is_admin = update_data.is_admin
     
     db.commit()
+    auth_cache.invalidate_user(user.id)
     db.refresh(user)
     
     return {"message": "Kullanıcı güncellendi", "user_id": user.id}
@@ -171,10 +174,13 @@ async def delete_user(
     if user.id == current_admin.id:
         raise HTTPException(status_code=400, detail="Kendi hesabınızı silemezsiniz")
     
-    db.delete(user)
-    db.commit()
+    # Okuma transaction'ını bitir; silme ayrı (async) session'larda parça parça yapılır
+    db.close()
+    # İlanlar korunur, kullanıcı/filtre bağlantıları kaldırılır
+    stats = await bulk_delete_service.delete_user(user_id)
+    auth_cache.invalidate_user(user_id)
     
-    return {"message": "Kullanıcı silindi"}
+    return {"message": "Kullanıcı silindi", **stats}
 
 @router.get("/stats", response_model=SystemStatsResponse)
 async def get_system_stats(
@@ -4,7 +4,10 @@ from pydantic import BaseModel, EmailStr
 from datetime import datetime, timedelta
 import secrets
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    verify_password_async, get_password_hash_async, password_needs_rehash, create_access_token
+)
+from app.core.auth_cache import auth_cache
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token, LoginRequest
 from app.api.dependencies import get_current_user
@@ -31,7 +34,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Yeni kullanıcı oluştur
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         password_hash=hashed_password
@@ -54,7 +57,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Şifreyi doğrula
-    if not verify_password(login_data.password, user.password_hash):
+    if not await verify_password_async(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email veya şifre hatalı",
@@ -67,9 +70,14 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             detail="Hesabınız aktif değil"
         )
     
+    # Hash cost'u değiştiyse şifreyi yeni cost ile yeniden hash'le
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash_async(login_data.password)
+    
     # Son giriş zamanını güncelle
     user.last_login = datetime.utcnow()
     db.commit()
+    auth_cache.invalidate_user(user.id)
     
     # Token oluştur
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -104,6 +112,7 @@ async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(
     user.reset_token = reset_token
     user.reset_token_expires = datetime.utcnow() + timedelta(hours=1)
     db.commit()
+    auth_cache.invalidate_user(user.id)
     
     # NOT: Gerçek uygulamada burada email gönderilir
     # Şimdilik token'ı döndürüyoruz (development için)
@@ -138,10 +147,11 @@ async def reset_password(request: ResetPasswordRequest, db: Session = Depends(ge
         )
     
     # Şifreyi güncelle
-    user.password_hash = get_password_hash(request.new_password)
+    user.password_hash = await get_password_hash_async(request.new_password)
     user.reset_token = None
     user.reset_token_expires = None
     db.commit()
+    auth_cache.invalidate_user(user.id)
     
     return {
         "message": "Şifreniz başarıyla güncellendi",
@@ -180,7 +190,7 @@ async def create_admin_temp(db: Session = Depends(get_db)):
         return {"message": "Admin kullanıcı zaten mevcut", "email": "admin@autosniper.com"}
     
     # Admin oluştur
-    hashed_password = get_password_hash("admin123")
+    hashed_password = await get_password_hash_async("admin123")
     admin_user = User(
         email="admin@autosniper.com",
         password_hash=hashed_password,
@@ -1,17 +1,20 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import date
-from app.core.database import get_db
-from app.core.security import decode_access_token
+from app.core.database import get_async_db
+from app.core.auth_cache import auth_cache
 from app.models.user import User
 from app.models.filter import Filter
+from app.services.rate_limiter import consume_search_quota_async
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -19,7 +22,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_access_token(token)
+    payload = auth_cache.decode_token(token)
     if payload is None:
         raise credentials_exception
     
@@ -27,60 +30,72 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Önbellekte varsa users tablosuna sorgu atılmaz
+    user = await auth_cache.get_user(db, int(user_id))
     if user is None:
         raise credentials_exception
     
     return user
 
 
-async def check_rate_limit(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> User:
+async def consume_search_quota(current_user: User, db: AsyncSession):
     """
-    Günlük arama limitini kontrol eder.
+    Günlük arama hakkından bir tane düşer.
     Limit aşılırsa 429 hatası döner.
+    
+    Sayaç artırma ve gün dönümü sıfırlaması tek bir atomik UPDATE ile yapılır;
+    429 yanıtındaki değerler (önbellekteki nesne değil) veritabanından gelir.
     """
-    # Günlük reset kontrolü
-    if current_user.last_reset_date < date.today():
-        current_user.daily_search_count = 0
-        current_user.last_reset_date = date.today()
-        db.commit()
-        db.refresh(current_user)
+    allowed, count, limit = await consume_search_quota_async(db, current_user.id)
     
     # Limit kontrolü
-    if current_user.daily_search_count >= current_user.daily_search_limit:
+    if not allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
                 "message": "Günlük arama limitiniz doldu",
-                "current": current_user.daily_search_count,
-                "limit": current_user.daily_search_limit,
+                "current": count,
+                "limit": limit,
                 "reset_time": "Gece 00:00",
                 "upgrade_url": "/pricing"
             }
         )
     
-    # Sayacı artır
-    current_user.daily_search_count += 1
-    db.commit()
-    db.refresh(current_user)
-    
+    # Yeni değerleri nesneye ve önbelleğe yaz (ek sorgu/refresh olmadan)
+    values = {
+        "daily_search_count": count,
+        "daily_search_limit": limit,
+        "last_reset_date": date.today()
+    }
+    for key, value in values.items():
+        set_committed_value(current_user, key, value)
+    auth_cache.patch_user(current_user.id, values)
+
+
+async def check_rate_limit(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Günlük arama limitini kontrol eder (her istekte bir hak tüketir).
+    Arka plan işi başlatan endpoint'ler kotayı yalnızca yeni iş açılırken
+    consume_search_quota ile tüketir.
+    """
+    await consume_search_quota(current_user, db)
     return current_user
 
 
 async def check_filter_limit(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Maksimum filtre sayısını kontrol eder.
     Limit aşılırsa 403 hatası döner.
     """
-    filter_count = db.query(Filter).filter(
-        Filter.user_id == current_user.id
-    ).count()
+    filter_count = await db.scalar(
+        select(func.count(Filter.id)).where(Filter.user_id == current_user.id)
+    )
     
     if filter_count >= current_user.max_filters:
         raise HTTPException(
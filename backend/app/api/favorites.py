@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.api.dependencies import get_current_user
 from app.models.user import User
 from app.models.listing import Listing
@@ -82,14 +83,19 @@ def calculate_price_change(original_price: float, current_price: float) -> Price
 @router.get("", response_model=List[ListingResponse])
 async def get_favorites(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Kullanıcının favori ilanlarını getir (fiyat değişimleriyle)"""
-    favorites = db.query(Favorite).filter(Favorite.user_id == current_user.id).all()
+    # İlanlar favorilerle tek sorguda çekilir (silinmiş ilanlar join ile elenir)
+    result = await db.execute(
+        select(Favorite, Listing)
+        .join(Listing, Listing.id == Favorite.listing_id)
+        .where(Favorite.user_id == current_user.id)
+        .order_by(Favorite.id)
+    )
     
     listings = []
-    for fav in favorites:
-        listing = db.query(Listing).filter(Listing.id == fav.listing_id).first()
+    for fav, listing in result.all():
         if listing:
             # Fiyat değişimini hesapla
             price_change = None
@@ -120,11 +126,11 @@ async def get_favorites(
 async def add_favorite(
     listing_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """İlanı favorilere ekle (fiyat kaydedilir)"""
     # İlan var mı kontrol et
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
+    listing = await db.get(Listing, listing_id)
     if not listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -132,10 +138,10 @@ async def add_favorite(
         )
     
     # Zaten favoride mi kontrol et
-    existing = db.query(Favorite).filter(
+    existing = await db.scalar(select(Favorite).where(
         Favorite.user_id == current_user.id,
         Favorite.listing_id == listing_id
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -155,7 +161,7 @@ async def add_favorite(
         last_checked_at=datetime.utcnow()
     )
     db.add(favorite)
-    db.commit()
+    await db.commit()
     
     return {
         "message": "İlan favorilere eklendi", 
@@ -168,13 +174,13 @@ async def add_favorite(
 async def remove_favorite(
     listing_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """İlanı favorilerden çıkar"""
-    favorite = db.query(Favorite).filter(
+    favorite = await db.scalar(select(Favorite).where(
         Favorite.user_id == current_user.id,
         Favorite.listing_id == listing_id
-    ).first()
+    ))
     
     if not favorite:
         raise HTTPException(
@@ -182,8 +188,8 @@ async def remove_favorite(
             detail="Bu ilan favorilerinizde değil"
         )
     
-    db.delete(favorite)
-    db.commit()
+    await db.delete(favorite)
+    await db.commit()
     
     return None
 
@@ -192,13 +198,13 @@ async def remove_favorite(
 async def check_favorite(
     listing_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """İlanın favoride olup olmadığını kontrol et"""
-    favorite = db.query(Favorite).filter(
+    favorite = await db.scalar(select(Favorite).where(
         Favorite.user_id == current_user.id,
         Favorite.listing_id == listing_id
-    ).first()
+    ))
     
     return {"is_favorite": favorite is not None}
 
@@ -1,31 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any
 from datetime import datetime, timedelta
-from app.core.database import get_db
-from app.api.dependencies import get_current_user, check_rate_limit, check_filter_limit
+from app.core.database import get_async_db, SessionLocal, run_in_db_thread
+from app.core.metrics import NEW_LISTINGS, SCAN_PHASE_SECONDS
+from app.core.response_cache import FILTERS, LISTINGS, response_cache
+from app.api.dependencies import get_current_user, check_filter_limit, consume_search_quota
 from app.models.user import User
 from app.models.filter import Filter
 from app.models.listing import Listing
 from app.schemas.filter import FilterCreate, FilterUpdate, FilterResponse, SchedulerToggle, SchedulerStatus
+from app.services.dedupe import repost_detector
+from app.services.pricing import price_model
 from app.services.scraper.scraper import ArabaComScraper
+from app.services.scraper.extraction import damage_features, listing_key
+from app.services.jobs import Job, job_manager
+from app.services.scheduler import scheduler_service
 import asyncio
+import time
 
 router = APIRouter()
 
 @router.get("", response_model=List[FilterResponse])
 async def get_filters(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    filters = db.query(Filter).filter(Filter.user_id == current_user.id).all()
-    return filters
+    result = await db.scalars(select(Filter).where(Filter.user_id == current_user.id))
+    return result.all()
 
 @router.post("", response_model=FilterResponse, status_code=status.HTTP_201_CREATED)
 async def create_filter(
     filter_data: FilterCreate,
     current_user: User = Depends(check_filter_limit),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     next_scan = None
     if filter_data.auto_scan_enabled:
@@ -38,11 +47,14 @@ async def create_filter(
         is_active=filter_data.is_active,
         auto_scan_enabled=filter_data.auto_scan_enabled,
         scan_interval=filter_data.scan_interval,
+        adaptive_scan_enabled=filter_data.adaptive_scan_enabled,
         next_scan_at=next_scan
     )
     db.add(new_filter)
-    db.commit()
-    db.refresh(new_filter)
+    await db.commit()
+    response_cache.bump(FILTERS)
+    await db.refresh(new_filter)
+    scheduler_service.sync_filter(new_filter)
     return new_filter
 
 @router.put("/{filter_id}", response_model=FilterResponse)
@@ -50,12 +62,12 @@ async def update_filter(
     filter_id: int,
     filter_data: FilterUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    filter_obj = db.query(Filter).filter(
+    filter_obj = await db.scalar(select(Filter).where(
         Filter.id == filter_id,
         Filter.user_id == current_user.id
-    ).first()
+    ))
     
     if not filter_obj:
         raise HTTPException(
@@ -77,21 +89,27 @@ async def update_filter(
         filter_obj.scan_interval = filter_data.scan_interval
         if filter_obj.auto_scan_enabled:
             filter_obj.next_scan_at = datetime.utcnow() + timedelta(minutes=filter_data.scan_interval)
+    if filter_data.adaptive_scan_enabled is not None:
+        filter_obj.adaptive_scan_enabled = filter_data.adaptive_scan_enabled
+        if not filter_data.adaptive_scan_enabled:
+            filter_obj.effective_scan_interval = None
     
-    db.commit()
-    db.refresh(filter_obj)
+    await db.commit()
+    response_cache.bump(FILTERS)
+    await db.refresh(filter_obj)
+    scheduler_service.sync_filter(filter_obj)
     return filter_obj
 
 @router.delete("/{filter_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_filter(
     filter_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    filter_obj = db.query(Filter).filter(
+    filter_obj = await db.scalar(select(Filter).where(
         Filter.id == filter_id,
         Filter.user_id == current_user.id
-    ).first()
+    ))
     
     if not filter_obj:
         raise HTTPException(
@@ -99,58 +117,77 @@ async def delete_filter(
             detail="Filtre bulunamadı"
         )
     
-    db.delete(filter_obj)
-    db.commit()
+    await db.delete(filter_obj)
+    await db.commit()
+    # İlanların filter_id'si de boşaltıldı
+    response_cache.bump(FILTERS, LISTINGS)
+    scheduler_service.unschedule_filter(filter_id)
     return None
 
 
-@router.post("/{filter_id}/search")
-async def search_with_filter(
-    filter_id: int,
-    current_user: User = Depends(check_rate_limit),
-    db: Session = Depends(get_db)
-):
-    """Belirtilen filtreye göre arama yap ve ilanları çek"""
-    
-    # Filtreyi bul
-    filter_obj = db.query(Filter).filter(
-        Filter.id == filter_id,
-        Filter.user_id == current_user.id
-    ).first()
-    
-    if not filter_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Filtre bulunamadı"
-        )
-    
-    # Scraper'ı başlat
+async def _run_filter_search(job: Job, filter_id: int, user_id: int) -> Dict[str, Any]:
+    """Filtre aramasını arka planda çalıştır (kendi DB session'ı ile; DB işleri thread pool'da)"""
+    db = SessionLocal(expire_on_commit=False)
     scraper = ArabaComScraper(db)
-    
     try:
+        filter_obj = await run_in_db_thread(lambda: db.query(Filter).filter(Filter.id == filter_id).first())
+        if not filter_obj:
+            raise ValueError("Filtre bulunamadı")
+        
+        await job.update(10, "Tarayıcı başlatılıyor")
         await scraper.init_browser()
         
         # Filtre kriterlerine göre arama yap
+        await job.update(30, "İlanlar çekiliyor")
         listings_data = await scraper.scrape_listings(search_params=filter_obj.criteria)
         
         # İlanları kaydet
-        new_count = 0
+        await job.update(80, "İlanlar kaydediliyor")
+        save_started = time.perf_counter()
+        # Aynı ilan var mı - tek sorguda, ilan ID'si üzerinden
+        known_keys = await run_in_db_thread(scraper.find_known_keys, [l["source_url"] for l in listings_data])
+        fresh_listings = []
         for listing_data in listings_data:
-            # Aynı URL'li ilan var mı kontrol et
-            existing = db.query(Listing).filter(
-                Listing.source_url == listing_data["source_url"]
-            ).first()
-            
-            if not existing:
+            key = listing_key(listing_data["source_url"])
+            if key not in known_keys:
+                known_keys.add(key)
+                fresh_listings.append(listing_data)
+        
+        # Repost tespiti için ilk resimlerin pHash'i (kendi aşaması olarak ölçülür)
+        phash_started = time.perf_counter()
+        await repost_detector.annotate(fresh_listings)
+        save_started += time.perf_counter() - phash_started
+        reposts = repost_detector.batch()
+        
+        def add_listings() -> List[Listing]:
+            new_listings = []
+            for listing_data in fresh_listings:
                 new_listing = Listing(
-                    user_id=current_user.id,
+                    user_id=user_id,
                     filter_id=filter_obj.id,
-                    **listing_data
+                    **listing_data,
+                    **damage_features(listing_data.get("damage_info"))
                 )
+                price_model.apply(new_listing)
                 db.add(new_listing)
-                new_count += 1
+                new_listings.append(new_listing)
+            # Tek flush ile ID'ler alınır (repost bağlama ID ister)
+            db.flush()
+            return new_listings
         
-        db.commit()
+        new_count = len(fresh_listings)
+        try:
+            for new_listing in await run_in_db_thread(add_listings):
+                reposts.link(new_listing)
+            await run_in_db_thread(db.commit)
+        except Exception:
+            reposts.rollback()
+            await run_in_db_thread(db.rollback)
+            raise
+        reposts.commit()
+        SCAN_PHASE_SECONDS.observe(time.perf_counter() - save_started, phase="save")
+        NEW_LISTINGS.inc(new_count, filter_id=filter_obj.id)
+        response_cache.bump(LISTINGS)
         
         return {
             "success": True,
@@ -159,14 +196,54 @@ async def search_with_filter(
             "new_saved": new_count,
             "filter_criteria": filter_obj.criteria
         }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Arama sırasında hata: {str(e)}"
-        )
     finally:
         await scraper.close_browser()
+        await run_in_db_thread(db.close)
+
+
+@router.post("/{filter_id}/search", status_code=status.HTTP_202_ACCEPTED)
+async def search_with_filter(
+    filter_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Belirtilen filtreye göre arama başlat
+
+    Arama arka planda çalışır; dönen job_id ile GET /api/jobs/{id}
+    veya WebSocket (job_progress / job_done) üzerinden takip edilir.
+    """
+    
+    # Filtreyi bul
+    filter_obj = await db.scalar(select(Filter).where(
+        Filter.id == filter_id,
+        Filter.user_id == current_user.id
+    ))
+    
+    if not filter_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Filtre bulunamadı"
+        )
+    
+    user_id = current_user.id
+    dedupe_key = f"filter_search:{filter_id}"
+    # Tekrar tıklama çalışan işe bağlanır; kota yalnızca yeni iş açılırken,
+    # çalışan iş kontrolüyle aynı kritik bölümde tüketilir
+    job = await job_manager.submit_guarded(
+        kind="filter_search",
+        user_id=user_id,
+        dedupe_key=dedupe_key,
+        runner=lambda job: _run_filter_search(job, filter_id, user_id),
+        before_start=lambda: consume_search_quota(current_user, db)
+    )
+    
+    return {
+        "success": True,
+        "message": f"{filter_obj.name} filtresi ile arama başlatıldı",
+        "job_id": job.id,
+        "status": job.status
+    }
 
 
 @router.post("/{filter_id}/scheduler")
@@ -174,13 +251,13 @@ async def toggle_scheduler(
     filter_id: int,
     scheduler_data: SchedulerToggle,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Filtrenin otomatik tarama özelliğini aç/kapat"""
-    filter_obj = db.query(Filter).filter(
+    filter_obj = await db.scalar(select(Filter).where(
         Filter.id == filter_id,
         Filter.user_id == current_user.id
-    ).first()
+    ))
     
     if not filter_obj:
         raise HTTPException(
@@ -190,14 +267,20 @@ async def toggle_scheduler(
     
     filter_obj.auto_scan_enabled = scheduler_data.enabled
     filter_obj.scan_interval = scheduler_data.interval
+    if scheduler_data.adaptive is not None:
+        filter_obj.adaptive_scan_enabled = scheduler_data.adaptive
+        if not scheduler_data.adaptive:
+            filter_obj.effective_scan_interval = None
     
     if scheduler_data.enabled:
         filter_obj.next_scan_at = datetime.utcnow() + timedelta(minutes=scheduler_data.interval)
     else:
         filter_obj.next_scan_at = None
     
-    db.commit()
-    db.refresh(filter_obj)
+    await db.commit()
+    response_cache.bump(FILTERS)
+    await db.refresh(filter_obj)
+    scheduler_service.sync_filter(filter_obj)
     
     status_text = "aktif" if scheduler_data.enabled else "pasif"
     return {
@@ -205,6 +288,7 @@ async def toggle_scheduler(
         "message": f"Otomatik tarama {status_text} edildi",
         "auto_scan_enabled": filter_obj.auto_scan_enabled,
         "scan_interval": filter_obj.scan_interval,
+        "adaptive_scan_enabled": filter_obj.adaptive_scan_enabled,
         "next_scan_at": filter_obj.next_scan_at
     }
 
@@ -212,13 +296,13 @@ async def toggle_scheduler(
 @router.get("/scheduler/status", response_model=List[SchedulerStatus])
 async def get_scheduler_status(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Tüm filtrelerin scheduler durumunu getir"""
-    filters = db.query(Filter).filter(
+    filters = (await db.scalars(select(Filter).where(
         Filter.user_id == current_user.id,
         Filter.auto_scan_enabled == True
-    ).all()
+    ))).all()
     
     return [
         SchedulerStatus(
@@ -229,7 +313,11 @@ async def get_scheduler_status(
             last_scan_at=f.last_scan_at,
             next_scan_at=f.next_scan_at,
             total_scans=f.total_scans or 0,
-            new_listings_found=f.new_listings_found or 0
+            new_listings_found=f.new_listings_found or 0,
+            adaptive_scan_enabled=bool(f.adaptive_scan_enabled),
+            effective_scan_interval=f.effective_scan_interval,
+            predicted_yield=f.predicted_yield,
+            last_scan_new_count=f.last_scan_new_count
         )
         for f in filters
     ]
@@ -237,11 +325,20 @@ async def get_scheduler_status(
 
 @router.get("/scheduler/all-status")
 async def get_all_scheduler_status(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Tüm filtrelerin genel istatistiklerini getir"""
-    filters = db.query(Filter).filter(Filter.user_id == current_user.id).all()
+    """Tüm filtrelerin genel istatistiklerini getir (filtre sürümü değişene kadar önbellekten)"""
+    user_id = current_user.id
+    return await response_cache.respond(
+        request, "scheduler_all_status", [FILTERS], lambda: _compute_scheduler_summary(db, user_id),
+        scope=user_id
+    )
+
+
+async def _compute_scheduler_summary(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    filters = (await db.scalars(select(Filter).where(Filter.user_id == user_id))).all()
     
     active_count = sum(1 for f in filters if f.auto_scan_enabled)
     total_scans = sum(f.total_scans or 0 for f in filters)
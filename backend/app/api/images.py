@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.models.listing import Listing
+from app.services.images import CACHE_CONTROL, IMAGE_SIZES, ImageError, image_service
+
+router = APIRouter()
+
+
+@router.get("/{listing_id}")
+async def get_listing_image(
+    listing_id: int,
+    request: Request,
+    index: int = Query(0, ge=0, le=9),
+    size: str = Query("thumb", description="thumb, medium"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    İlan resmi proxy'si - küçültülmüş resim disk önbelleğinden sunulur
+
+    <img> etiketleri Authorization header'ı gönderemediği için token istenmez;
+    yalnızca kayıtlı ilanların resimleri, izin verilen CDN'lerden sunulur.
+    """
+    if size not in IMAGE_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Geçersiz boyut: {size} ({', '.join(IMAGE_SIZES)})"
+        )
+    
+    images = await db.scalar(select(Listing.images).where(Listing.id == listing_id))
+    if not images or index >= len(images):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resim bulunamadı")
+    
+    url = images[index]
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": image_service.etag(url, size)}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    try:
+        body, media_type = await image_service.get_image(url, size)
+    except ImageError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.api.dependencies import get_current_user
+from app.models.user import User
+from app.services.jobs import job_manager
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_jobs(current_user: User = Depends(get_current_user)):
+    """Kullanıcının arka plan işlerini listele"""
+    jobs = sorted(
+        job_manager.list_for_user(current_user.id),
+        key=lambda j: j.created_at,
+        reverse=True
+    )
+    return [j.to_dict() for j in jobs]
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Arka plan işinin durumunu ve sonucunu getir"""
+    job = job_manager.get(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="İş bulunamadı"
+        )
+    return job.to_dict()
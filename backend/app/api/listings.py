@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, func, select, delete
+from typing import Any, Dict, Optional, List
 from datetime import datetime, timedelta
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.response_cache import LISTINGS, response_cache
 from app.api.dependencies import get_current_user
 from app.models.user import User
 from app.models.listing import Listing
+from app.models.vehicle import VehicleBrand
 from app.schemas.listing import ListingResponse, ListingListResponse
+from app.services.bulk_delete import bulk_delete_service
+from app.services.dedupe import repost_detector
+from app.services.export import EXPORT_FORMATS, ExportFormatError, build_listing_criteria, get_encoder, stream_listings
+from app.services.jobs import Job, job_manager
 
 router = APIRouter()
 
 @router.get("", response_model=ListingListResponse)
 async def get_listings(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     brand: Optional[str] = None,
@@ -20,106 +29,114 @@ async def get_listings(
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     is_new: Optional[bool] = None,
+    min_discount: Optional[float] = Query(None, ge=0, le=100, description="Piyasanın en az yüzde kaç altında"),
+    min_mileage: Optional[int] = Query(None, ge=0),
+    max_mileage: Optional[int] = Query(None, ge=0),
+    max_changed_parts: Optional[int] = Query(None, ge=0, description="En fazla değişen parça"),
+    max_painted_parts: Optional[int] = Query(None, ge=0, description="En fazla boyalı (lokal dahil) parça"),
+    max_tramer: Optional[int] = Query(None, ge=0, description="En fazla tramer tutarı (TL)"),
     source: Optional[str] = Query(None, description="all, quick, filtered"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Listing)
-    
-    # Kaynak filtreleme (hızlı tarama vs özel filtre)
-    if source == "quick":
-        query = query.filter(Listing.filter_id == None)
-    elif source == "filtered":
-        query = query.filter(Listing.filter_id != None)
-    # source == "all" veya None ise filtre yok, hepsini getir
-    
-    # Filtreleme
-    if brand:
-        query = query.filter(Listing.brand.ilike(f"%{brand}%"))
-    if city:
-        query = query.filter(Listing.city.ilike(f"%{city}%"))
-    if min_price is not None:
-        query = query.filter(Listing.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Listing.price <= max_price)
-    if is_new is not None:
-        query = query.filter(Listing.is_new == is_new)
-    
-    # Toplam sayı
-    total = query.count()
-    
-    # Sayfalama
-    items = query.order_by(Listing.scraped_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    """İlan listesi - aynı sorgu ve ilan sürümü için önbellekten (ETag/304) döner"""
+    async def build():
+        query = select(Listing).where(*build_listing_criteria(
+            source, brand, city, min_price, max_price, is_new, min_discount,
+            min_mileage, max_mileage, max_changed_parts, max_painted_parts, max_tramer
+        ))
+        
+        # Toplam sayı
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        
+        # Sayfalama
+        result = await db.execute(
+            query.order_by(Listing.scraped_at.desc()).offset((page - 1) * page_size).limit(page_size)
+        )
+        items = result.scalars().all()
+        
+        return ListingListResponse(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size
+        )
     
-    return ListingListResponse(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return await response_cache.respond(request, "listings", [LISTINGS], build)
 
 @router.get("/statistics")
 async def get_statistics(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Piyasa istatistiklerini getir"""
-    
+    """Piyasa istatistiklerini getir (ilan sürümü değişene veya TTL dolana kadar önbellekten)"""
+    return await response_cache.respond(
+        request, "statistics", [LISTINGS], lambda: _compute_statistics(db),
+        ttl=settings.STATISTICS_CACHE_TTL_SECONDS
+    )
+
+
+async def _compute_statistics(db: AsyncSession) -> Dict[str, Any]:
     # Temel istatistikler
-    total_listings = db.query(func.count(Listing.id)).scalar() or 0
-    avg_price = db.query(func.avg(Listing.price)).scalar() or 0
-    min_price = db.query(func.min(Listing.price)).scalar() or 0
-    max_price = db.query(func.max(Listing.price)).scalar() or 0
-    avg_mileage = db.query(func.avg(Listing.mileage)).filter(Listing.mileage != None).scalar() or 0
-    avg_year = db.query(func.avg(Listing.year)).filter(Listing.year != None).scalar() or 0
+    total_listings = await db.scalar(select(func.count(Listing.id))) or 0
+    avg_price = await db.scalar(select(func.avg(Listing.price))) or 0
+    min_price = await db.scalar(select(func.min(Listing.price))) or 0
+    max_price = await db.scalar(select(func.max(Listing.price))) or 0
+    avg_mileage = await db.scalar(select(func.avg(Listing.mileage)).where(Listing.mileage != None)) or 0
+    avg_year = await db.scalar(select(func.avg(Listing.year)).where(Listing.year != None)) or 0
     
     # Son 24 saatte eklenen ilanlar
     yesterday = datetime.utcnow() - timedelta(days=1)
-    new_listings_24h = db.query(func.count(Listing.id)).filter(
+    new_listings_24h = await db.scalar(select(func.count(Listing.id)).where(
         Listing.scraped_at >= yesterday
-    ).scalar() or 0
+    )) or 0
     
     # 7 günlük fiyat değişimi (basit hesaplama)
     week_ago = datetime.utcnow() - timedelta(days=7)
-    old_avg = db.query(func.avg(Listing.price)).filter(
+    old_avg = await db.scalar(select(func.avg(Listing.price)).where(
         Listing.scraped_at < week_ago
-    ).scalar() or avg_price
+    )) or avg_price
+    
+    # Piyasanın en az %15 altındaki ilanlar (ingest'te hesaplanan deal_score index'i üzerinden)
+    deals_15 = await db.scalar(select(func.count(Listing.id)).where(Listing.deal_score >= 0.15)) or 0
     
     if old_avg and old_avg > 0:
         price_change_7d = ((avg_price - old_avg) / old_avg) * 100
     else:
         price_change_7d = 0
     
-    # Marka dağılımı
+    # Marka dağılımı (katalog ID'si üzerinden gruplama)
     brand_stats = []
     if total_listings > 0:
-        brands = db.query(
-            Listing.brand,
+        brands = (await db.execute(select(
+            VehicleBrand.name.label('brand'),
             func.count(Listing.id).label('count'),
             func.avg(Listing.price).label('avg_price')
-        ).filter(Listing.brand != None).group_by(Listing.brand).order_by(
+        ).join(VehicleBrand, Listing.brand_id == VehicleBrand.id).group_by(
+            Listing.brand_id, VehicleBrand.name
+        ).order_by(
             func.count(Listing.id).desc()
-        ).limit(15).all()
+        ).limit(15))).all()
         
         for brand in brands:
-            if brand.brand:
-                brand_stats.append({
-                    "brand": brand.brand,
-                    "count": brand.count,
-                    "avg_price": float(brand.avg_price or 0),
-                    "percentage": (brand.count / total_listings) * 100
-                })
+            brand_stats.append({
+                "brand": brand.brand,
+                "count": brand.count,
+                "avg_price": float(brand.avg_price or 0),
+                "percentage": (brand.count / total_listings) * 100
+            })
     
     # Şehir dağılımı
     city_stats = []
     if total_listings > 0:
-        cities = db.query(
+        cities = (await db.execute(select(
             Listing.city,
             func.count(Listing.id).label('count'),
             func.avg(Listing.price).label('avg_price')
-        ).filter(Listing.city != None).group_by(Listing.city).order_by(
+        ).where(Listing.city != None).group_by(Listing.city).order_by(
             func.count(Listing.id).desc()
-        ).limit(15).all()
+        ).limit(15))).all()
         
         for city in cities:
             if city.city:
@@ -144,14 +161,14 @@ async def get_statistics(
     
     for min_p, max_p, label in ranges:
         if max_p == float('inf'):
-            count = db.query(func.count(Listing.id)).filter(
+            count = await db.scalar(select(func.count(Listing.id)).where(
                 Listing.price >= min_p
-            ).scalar() or 0
+            )) or 0
         else:
-            count = db.query(func.count(Listing.id)).filter(
+            count = await db.scalar(select(func.count(Listing.id)).where(
                 Listing.price >= min_p,
                 Listing.price < max_p
-            ).scalar() or 0
+            )) or 0
         
         percentage = (count / total_listings * 100) if total_listings > 0 else 0
         price_ranges.append({
@@ -169,7 +186,8 @@ async def get_statistics(
             "avg_mileage": float(avg_mileage),
             "avg_year": float(avg_year),
             "price_change_7d": float(price_change_7d),
-            "new_listings_24h": new_listings_24h
+            "new_listings_24h": new_listings_24h,
+            "deals_15": deals_15
         },
         "brands": brand_stats,
         "cities": city_stats,
@@ -177,15 +195,56 @@ async def get_statistics(
     }
 
 
+@router.get("/export")
+async def export_listings(
+    format: str = Query("csv", description="csv, ndjson, parquet"),
+    brand: Optional[str] = None,
+    city: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_new: Optional[bool] = None,
+    min_discount: Optional[float] = Query(None, ge=0, le=100, description="Piyasanın en az yüzde kaç altında"),
+    min_mileage: Optional[int] = Query(None, ge=0),
+    max_mileage: Optional[int] = Query(None, ge=0),
+    max_changed_parts: Optional[int] = Query(None, ge=0, description="En fazla değişen parça"),
+    max_painted_parts: Optional[int] = Query(None, ge=0, description="En fazla boyalı (lokal dahil) parça"),
+    max_tramer: Optional[int] = Query(None, ge=0, description="En fazla tramer tutarı (TL)"),
+    source: Optional[str] = Query(None, description="all, quick, filtered"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    İlanları analiz için dışa aktar (GET /api/listings ile aynı filtreler)
+
+    Sonuçlar sunucu tarafı cursor ile parça parça okunup akış olarak gönderilir;
+    sayfalama (count + OFFSET) yapılmaz ve bellek kullanımı sabittir.
+    """
+    try:
+        encoder = get_encoder(format)
+    except ExportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"ilanlar_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    criteria = build_listing_criteria(
+        source, brand, city, min_price, max_price, is_new, min_discount,
+        min_mileage, max_mileage, max_changed_parts, max_painted_parts, max_tramer
+    )
+    
+    return StreamingResponse(
+        stream_listings(criteria, encoder),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/{listing_id}", response_model=ListingResponse)
 async def get_listing(
     listing_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
+    listing = await db.get(Listing, listing_id)
     if not listing:
-        from fastapi import HTTPException, status
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="İlan bulunamadı"
@@ -197,13 +256,12 @@ async def get_listing(
 async def delete_listing(
     listing_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Tek bir ilanı sil"""
-    from fastapi import HTTPException, status
     from app.models.favorite import Favorite
     
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
+    listing = await db.get(Listing, listing_id)
     if not listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -211,46 +269,62 @@ async def delete_listing(
         )
     
     # Önce bu ilana ait favorileri sil
-    db.query(Favorite).filter(Favorite.listing_id == listing_id).delete()
+    await db.execute(delete(Favorite).where(Favorite.listing_id == listing_id))
     
-    db.delete(listing)
-    db.commit()
+    await db.delete(listing)
+    await db.commit()
+    repost_detector.remove([listing_id])
+    response_cache.bump(LISTINGS)
     
     return {"message": "İlan başarıyla silindi", "id": listing_id}
 
 
 @router.delete("")
 async def delete_all_listings(
+    response: Response,
     source: Optional[str] = Query(None, description="all, quick, filtered - hangi kaynaktan silinecek"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
-    """Kaynağa göre ilanları sil"""
-    from app.models.favorite import Favorite
-    
-    # Silinecek ilanları belirle
-    listing_query = db.query(Listing)
-    
+    """
+    Kaynağa göre ilanları sil
+
+    Silme parça parça yapılır (BULK_DELETE_CHUNK_SIZE). BULK_DELETE_SYNC_LIMIT'ten
+    fazla ilan varsa 202 ile job_id döner; ilerleme GET /api/jobs/{id} üzerinden izlenir.
+    """
+    criteria = []
     if source == "quick":
         # Sadece hızlı tarama (filter_id = None)
-        listing_query = listing_query.filter(Listing.filter_id == None)
+        criteria.append(Listing.filter_id == None)
     elif source == "filtered":
         # Sadece filtrelerden gelen (filter_id != None)
-        listing_query = listing_query.filter(Listing.filter_id != None)
+        criteria.append(Listing.filter_id != None)
     # source == "all" veya None ise hepsini sil
     
-    # Silinecek ilan ID'lerini al
-    listing_ids = [l.id for l in listing_query.all()]
+    total = await bulk_delete_service.count_listings(*criteria)
+    
+    if total <= settings.BULK_DELETE_SYNC_LIMIT:
+        stats = await bulk_delete_service.delete_listings(*criteria)
+        count = stats["listings"]
+        return {"message": f"{count} ilan silindi", "count": count}
     
-    if listing_ids:
-        # Bu ilanlara ait favorileri sil
-        db.query(Favorite).filter(Favorite.listing_id.in_(listing_ids)).delete(synchronize_session=False)
+    async def run_delete(job: Job) -> Dict[str, Any]:
+        async def report(processed: int, expected: Optional[int]):
+            await job.update(int(processed * 100 / max(expected or processed, 1)), f"{processed}/{expected} ilan silindi")
         
-        # İlanları sil
-        count = listing_query.delete(synchronize_session=False)
-        db.commit()
-    else:
-        count = 0
+        stats = await bulk_delete_service.delete_listings(*criteria, on_progress=report, total=total)
+        count = stats["listings"]
+        return {"message": f"{count} ilan silindi", "count": count}
     
-    return {"message": f"{count} ilan silindi", "count": count}
-
+    job = job_manager.submit(
+        kind="delete_listings",
+        user_id=current_user.id,
+        dedupe_key=f"delete_listings:{current_user.id}:{source or 'all'}",
+        runner=run_delete
+    )
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {
+        "message": f"{total} ilan arka planda siliniyor",
+        "count": total,
+        "job_id": job.id,
+        "status": job.status
+    }
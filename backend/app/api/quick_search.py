@@ -1,38 +1,32 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from app.core.database import get_db
-from app.api.dependencies import get_current_user, check_rate_limit
+from fastapi import APIRouter, Depends, status
+from typing import Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import SessionLocal, get_async_db, run_in_db_thread
+from app.api.dependencies import consume_search_quota, get_current_user
 from app.models.user import User
-from app.models.listing import Listing
 # from app.services.scraper.arabam_api import ArabamAPIClient # SAHTE API KAPALI
 from app.services.scraper.scraper import ArabaComScraper # GERÇEK SCRAPER AÇIK
-from datetime import datetime
+from app.services.jobs import Job, job_manager
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/quick-search")
-async def quick_search(
-    current_user: User = Depends(check_rate_limit),
-    db: Session = Depends(get_db)
-):
-    """
-    Hızlı tarama - GERÇEK SİTE (Scraper) kullanarak en yeni ilanları çek
-    """
+
+async def _run_quick_search(job: Job) -> Dict[str, Any]:
+    """Hızlı tarama işini arka planda çalıştır (kendi DB session'ı ile; DB işleri thread pool'da)"""
+    db = SessionLocal(expire_on_commit=False)
     scraper = None
     try:
-        logger.info(f"Gerçek tarama başlatıldı (Scraper Modu) - Kullanıcı: {current_user.email}")
-
         # Gerçek Scraper'ı başlat
         scraper = ArabaComScraper(db)
 
-        # Tarayıcıyı aç (Scraper.py içinde headless=False yaptık, yani pencere açılacak)
+        await job.update(10, "Tarayıcı başlatılıyor")
         await scraper.init_browser()
 
         # İlanları çek
+        await job.update(30, "İlanlar çekiliyor")
         listings = await scraper.scrape_listings()
 
         if not listings:
@@ -44,6 +38,7 @@ async def quick_search(
             }
 
         # İlanları kaydet
+        await job.update(80, "İlanlar kaydediliyor")
         saved_count = await scraper.save_new_listings(listings)
 
         logger.info(f"Tarama tamamlandı - {saved_count} yeni ilan kaydedildi")
@@ -54,15 +49,43 @@ async def quick_search(
             "count": saved_count,
             "total_fetched": len(listings)
         }
-
-    except Exception as e:
-        logger.error(f"Gerçek tarama hatası: {e}")
-        return {
-            "success": False,
-            "message": f"Hata: {str(e)}",
-            "count": 0
-        }
     finally:
         # İşlem bitince tarayıcıyı kapat
         if scraper:
             await scraper.close_browser()
+        await run_in_db_thread(db.close)
+
+
+@router.post("/quick-search", status_code=status.HTTP_202_ACCEPTED)
+async def quick_search(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Hızlı tarama - GERÇEK SİTE (Scraper) kullanarak en yeni ilanları çek
+
+    Tarama arka planda çalışır; dönen job_id ile GET /api/jobs/{id}
+    veya WebSocket (job_progress / job_done) üzerinden takip edilir.
+    """
+    dedupe_key = f"quick_search:{current_user.id}"
+
+    async def start():
+        await consume_search_quota(current_user, db)
+        logger.info(f"Gerçek tarama başlatıldı (Scraper Modu) - Kullanıcı: {current_user.email}")
+
+    # Tekrar tıklama çalışan işe bağlanır; kota yalnızca yeni iş açılırken,
+    # çalışan iş kontrolüyle aynı kritik bölümde tüketilir
+    job = await job_manager.submit_guarded(
+        kind="quick_search",
+        user_id=current_user.id,
+        dedupe_key=dedupe_key,
+        runner=_run_quick_search,
+        before_start=start
+    )
+
+    return {
+        "success": True,
+        "message": "Tarama başlatıldı",
+        "job_id": job.id,
+        "status": job.status
+    }
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 from app.core.database import get_db
+from app.core.auth_cache import auth_cache
 from app.models.user import User
 from app.api.dependencies import get_current_user
 from app.services.telegram import telegram_service
@@ -52,23 +53,26 @@ async def update_telegram_settings(
     db: Session = Depends(get_db)
 ):
     """Telegram bildirim ayarlarını güncelle"""
+    # current_user async auth session'ına bağlı - değişiklik bu session'daki kopyaya yazılır
+    user = db.query(User).filter(User.id == current_user.id).first()
     
     if settings.telegram_chat_id:
         chat_id = settings.telegram_chat_id.strip()
-        current_user.telegram_chat_id = chat_id
+        user.telegram_chat_id = chat_id
     else:
-        current_user.telegram_chat_id = None
+        user.telegram_chat_id = None
         settings.telegram_enabled = False  # Chat ID yoksa bildirimi kapat
     
-    current_user.telegram_enabled = settings.telegram_enabled
+    user.telegram_enabled = settings.telegram_enabled
     db.commit()
-    db.refresh(current_user)
+    auth_cache.invalidate_user(user.id)
+    db.refresh(user)
     
     bot_info = await telegram_service.get_bot_info() if telegram_service.is_configured else None
     
     return TelegramSettingsResponse(
-        telegram_chat_id=current_user.telegram_chat_id,
-        telegram_enabled=current_user.telegram_enabled,
+        telegram_chat_id=user.telegram_chat_id,
+        telegram_enabled=user.telegram_enabled,
         bot_configured=telegram_service.is_configured,
         bot_username=bot_info.get("username") if bot_info else None
     )
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from app.core.database import get_db, SessionLocal
+from app.core.response_cache import LISTINGS, response_cache
 from app.api.dependencies import get_current_user, check_rate_limit
 from app.models.user import User
 from app.models.listing import Listing
 from app.models.filter import Filter
 from app.services.filter_matcher import FilterMatcher
+from app.services.vehicle_catalog import vehicle_catalog
 from app.services.websocket.manager import manager
 from app.services.scraper.scraper import ArabaComScraper
 from datetime import datetime
@@ -29,8 +31,7 @@ async def add_test_listing(
         title="Test Araç - Audi A3 2018 Dizel Otomatik",
         price=850000.0,
         year=2018,
-        brand="Audi",
-        model="A3",
+        **vehicle_catalog.identify("Audi A3"),
         fuel_type="dizel",
         transmission="otomatik",
         city="Ankara",
@@ -79,6 +80,7 @@ async def add_test_listing(
                 logger.error(f"Bildirim gönderilirken hata: {e}")
     
     db.commit()
+    response_cache.bump(LISTINGS)
     
     return {
         "message": "Test ilanı eklendi",
@@ -123,8 +125,7 @@ async def add_custom_test_listing(
         title=title,
         price=price,
         year=year,
-        brand=brand,
-        model=model,
+        **vehicle_catalog.identify(f"{brand} {model}", brand, model),
         fuel_type=fuel_type,
         transmission=transmission,
         city=city,
@@ -163,6 +164,7 @@ async def add_custom_test_listing(
                 logger.error(f"Bildirim hatası: {e}")
     
     db.commit()
+    response_cache.bump(LISTINGS)
     
     return {
         "message": "Özel test ilanı eklendi",
@@ -22,8 +22,8 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(None)):
             return
         
         # Token'dan kullanıcıyı doğrula
-        from app.core.security import decode_access_token
-        payload = decode_access_token(token)
+        from app.core.auth_cache import auth_cache
+        payload = auth_cache.decode_token(token)
         if not payload:
             logger.warning("WebSocket bağlantısı geçersiz token ile reddedildi")
             await websocket.close(code=1008, reason="Geçersiz token")
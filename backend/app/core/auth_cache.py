@@ -0,0 +1,108 @@
+"""
+Kimlik doğrulama önbelleği
+
+Her API isteğinde JWT çözme ve users tablosu sorgusu yapılmasını önler:
+- Çözülmüş token'lar için LRU (token -> payload, exp kontrolüyle)
+- Kullanıcı ID'si başına kısa ömürlü (TTL) kullanıcı snapshot'ı
+
+Kullanıcıyı değiştiren her yer (admin güncelleme, arama sayacı, ayarlar,
+şifre sıfırlama) invalidate_user() çağırmalıdır. Çoklu process kurulumlarında
+diğer process'lerdeki değişiklikler en fazla TTL kadar gecikmeyle görünür.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.models.user import User
+
+
+class AuthCache:
+    """Token ve kullanıcı önbelleği (process içi, thread-safe)"""
+
+    def __init__(self, user_ttl: float, token_cache_size: int):
+        self.user_ttl = user_ttl
+        self.token_cache_size = token_cache_size
+        self._tokens: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._users: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._user_columns = [attr.key for attr in inspect(User).column_attrs]
+
+    def decode_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """JWT'yi çöz - daha önce çözülmüş ve süresi dolmamışsa önbellekten döndür"""
+        now = time.time()
+        with self._lock:
+            payload = self._tokens.get(token)
+            if payload is not None:
+                if payload.get("exp", 0) > now:
+                    self._tokens.move_to_end(token)
+                    return payload
+                del self._tokens[token]
+
+        payload = decode_access_token(token)
+        if payload is None:
+            return None
+
+        with self._lock:
+            self._tokens[token] = payload
+            self._tokens.move_to_end(token)
+            while len(self._tokens) > self.token_cache_size:
+                self._tokens.popitem(last=False)
+        return payload
+
+    async def get_user(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        """
+        Kullanıcıyı getir - önbellekte varsa sorgu yapmadan session'a bağla
+
+        Dönen nesne isteğin session'ına bağlıdır; üzerinde yapılan değişiklikler
+        normal şekilde commit edilebilir (commit sonrası invalidate_user çağrılmalı).
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry and entry[0] > now:
+                values = entry[1]
+            else:
+                values = None
+
+        if values is not None:
+            user = User(**values)
+            make_transient_to_detached(user)
+            return await db.merge(user, load=False)
+
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            snapshot = {key: getattr(user, key) for key in self._user_columns}
+            with self._lock:
+                self._users[user_id] = (now + self.user_ttl, snapshot)
+        return user
+
+    def patch_user(self, user_id: int, values: Dict[str, Any]):
+        """Önbellekteki kullanıcı snapshot'ının bazı alanlarını güncelle (varsa)"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry:
+                entry[1].update(values)
+
+    def invalidate_user(self, user_id: int):
+        """Kullanıcının önbellek kaydını sil"""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+
+
+auth_cache = AuthCache(
+    user_ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    token_cache_size=settings.AUTH_TOKEN_CACHE_SIZE
+)
@@ -4,16 +4,41 @@ from typing import List
 class Settings(BaseSettings):
     # Database - SQLite for desktop, PostgreSQL for server
     DATABASE_URL: str = "sqlite:///./autosniper.db"
+    ASYNC_DATABASE_URL: str = ""  # Boşsa DATABASE_URL'den türetilir (aiosqlite / asyncpg)
+    
+    # SQLite tuning (masaüstü sürümü) - her bağlantıda PRAGMA olarak uygulanır
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL: okuyucular yazarı beklemez
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL ile güvenli, FULL'a göre çok daha az fsync
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Kilitli DB'de hata vermeden önce bekleme süresi
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # Bellek eşlemeli okuma (byte)
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # Bağlantı başına sayfa önbelleği
+    SQLITE_AUTO_MIGRATE: bool = True  # Masaüstünde eksik migration'ları başlangıçta uygula
+    
+    # PostgreSQL bağlantı havuzu
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # Havuzdan bağlantı bekleme süresi (saniye)
+    DB_POOL_RECYCLE: int = 1800  # Bağlantıları bu süreden sonra yenile (saniye)
+    DB_POOL_PRE_PING: bool = True  # Kopmuş bağlantıları kullanmadan önce tespit et
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 gün
+    BCRYPT_ROUNDS: int = 12  # Şifre hash cost'u (değişirse girişte otomatik yeniden hash'lenir)
+    PASSWORD_HASH_WORKERS: int = 4  # bcrypt için thread pool boyutu
+    AUTH_CACHE_TTL_SECONDS: int = 30  # Kullanıcı önbelleği ömrü
+    AUTH_TOKEN_CACHE_SIZE: int = 1024  # Çözülmüş token LRU boyutu
     
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     LOG_LEVEL: str = "DEBUG"
+    LOG_SAMPLE_EVERY: int = 20  # Kart/ilan başına log satırlarında her N satırdan biri yazılır
+    
+    # Metrikler (Prometheus)
+    METRICS_ENABLED: bool = True  # /metrics endpoint'i
+    METRICS_TOKEN: str = ""  # Boş değilse /metrics "Authorization: Bearer <token>" ister
     
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
@@ -37,10 +62,59 @@ class Settings(BaseSettings):
     
     # Scraper
     SCRAPER_INTERVAL_SECONDS: int = 30
+    SCRAPER_BASE_URL: str = "https://www.arabam.com"  # Replay/test için yerel stub sunucuya yönlendirilebilir
     SCRAPER_USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     SCRAPER_HEADLESS: bool = False
     SCRAPER_TIMEOUT: int = 30000
+    SCRAPER_INCREMENTAL: bool = True  # Otomatik taramalarda sadece watermark'tan yeni ilanları işle
+    SCRAPER_MAX_PAGES: int = 5  # Artımlı/derin taramada arama URL'si başına max sonuç sayfası
+    SCRAPER_PAGE_CONCURRENCY: int = 2  # Derin taramada paralel açılan sekme sayısı
+    SCRAPER_SCAN_TIME_BUDGET: int = 180  # Tek taramada sayfa okuma için süre bütçesi (saniye)
+    
+    # Toplu silme
+    BULK_DELETE_CHUNK_SIZE: int = 1000  # Transaction başına silinen satır
+    BULK_DELETE_SYNC_LIMIT: int = 5000  # Bundan fazla ilan silinecekse istek job olarak çalışır
+    
+    # İlan saklama (retention)
+    LISTING_RETENTION_DAYS: int = 30  # Bu süreden eski ilanlar temizlenir
+    RETENTION_ARCHIVE_DIR: str = ""  # Boş değilse ilanlar silinmeden önce buraya arşivlenir
+    RETENTION_ARCHIVE_FORMAT: str = "jsonl"  # jsonl (gzip) veya parquet (pyarrow gerekir)
     
+    # Export
+    EXPORT_CHUNK_SIZE: int = 1000  # Cursor'dan parça başına okunan ilan (yield_per)
+
+    # Yanıt önbelleği (ETag)
+    CACHE_MAX_ENTRIES: int = 512  # Process içi LRU'da tutulan yanıt sayısı
+    CACHE_ENTRY_TTL_SECONDS: int = 600  # Redis'teki yanıtların ömrü
+    CACHE_REDIS_URL: str = ""  # Boş değilse önbellek Redis'te tutulur (redis paketi gerekir)
+    STATISTICS_CACHE_TTL_SECONDS: int = 60  # İstatistiklerdeki "son 24 saat" gibi değerlerin max gecikmesi
+
+    # İlan resimleri
+    IMAGE_CDN_VARIANT: str = "800x600"  # İngest'te CDN resim URL'leri bu boyut varyantına çevrilir (boşsa dokunulmaz)
+    IMAGE_CACHE_DIR: str = "image_cache"  # /api/images küçük resimlerinin disk önbelleği
+    IMAGE_CACHE_MAX_MB: int = 512  # Disk önbelleği üst sınırı (en az kullanılanlar silinir)
+    IMAGE_WORKERS: int = 2  # Pillow küçültme ve disk G/Ç için thread pool boyutu
+    IMAGE_JPEG_QUALITY: int = 80
+    IMAGE_MAX_SOURCE_BYTES: int = 10 * 1024 * 1024  # CDN'den indirilecek en büyük resim
+    IMAGE_PROXY_HOSTS: str = "mncdn.com,arabam.com"  # Proxy'nin resim çekebileceği alan adları (virgülle)
+
+    # Repost tespiti (aynı aracın yeni ilan ID'si ile tekrar yayınlanması)
+    DEDUPE_ENABLED: bool = True
+    DEDUPE_PHASH_ENABLED: bool = True  # Yeni ilanların ilk resmi indirilip pHash hesaplanır (Pillow gerekir)
+    DEDUPE_PHASH_DISTANCE: int = 6  # Bu Hamming mesafesine kadar resimler aynı sayılır (LSH için < 8 olmalı)
+    DEDUPE_TITLE_DISTANCE: int = 8  # Resimsiz eşleşmede başlık SimHash mesafesi
+    DEDUPE_PRICE_TOLERANCE: float = 0.15  # Repost'ta fiyat bu oranda değişmiş olabilir
+    DEDUPE_WINDOW_DAYS: int = 30  # Bu süre içindeki ilanlar repost indeksinde tutulur
+    DEDUPE_CONCURRENCY: int = 8  # Eşzamanlı pHash için resim indirme
+
+    # Piyasa fiyatı tahmini ve fırsat skoru
+    PRICING_ENABLED: bool = True
+    PRICING_YEAR_BUCKET: int = 2  # Yıl kovası genişliği (ör. 2: 2018-2019 aynı kova)
+    PRICING_MIN_SAMPLES: int = 8  # Kovada istatistik hesaplamak için en az ilan
+    PRICING_WINDOW_DAYS: int = 30  # Son bu kadar günün ilanlarından hesaplanır (retention'dan uzunu anlamsız)
+    PRICING_OUTLIER_Z: float = 6.0  # Robust z-skoru bunu aşan fiyatlar (hatalı/kiralık ilan) skorlanmaz
+    PRICING_REFRESH_MINUTES: int = 15  # Yeni ilan gelen kovaların yeniden hesaplanma aralığı
+
     # Telegram
     TELEGRAM_BOT_TOKEN: str = ""
     
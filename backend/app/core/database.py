@@ -1,16 +1,92 @@
-from sqlalchemy import create_engine
+import asyncio
+import functools
+import logging
+from typing import Callable, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
-# SQLite için özel ayar gerekli
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+
+def get_engine_options() -> dict:
+    """Veritabanı türüne göre engine/havuz ayarları (Settings'ten)"""
+    if IS_SQLITE:
+        # SQLite için özel ayar gerekli; havuz boyutu tek dosyalı DB'de fayda getirmez
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Her yeni SQLite bağlantısında tuning PRAGMA'larını uygula (WAL, busy_timeout, önbellek)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        # Negatif değer KiB cinsinden boyut demektir
+        cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+    finally:
+        cursor.close()
+
+
+def tune_engine(target: Engine):
+    """SQLite engine'lerine PRAGMA listener'ını bağla"""
+    if target.dialect.name == "sqlite":
+        event.listen(target, "connect", apply_sqlite_pragmas)
+
+
+engine = create_engine(settings.DATABASE_URL, **get_engine_options())
+tune_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+def get_async_database_url(url: str) -> str:
+    """Senkron DATABASE_URL'i async sürücüye çevir (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+# Async katman - sıcak endpoint'ler ve scheduler işleri event loop'u bloklamadan sorgu atar
+async_engine = create_async_engine(get_async_database_url(settings.DATABASE_URL), **get_engine_options())
+tune_engine(async_engine.sync_engine)
+# expire_on_commit=False: commit sonrası attribute erişimi async ortamda lazy yükleme tetiklemesin
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def optimize_database():
+    """Kapanışta SQLite sorgu planlayıcı istatistiklerini güncelle (PRAGMA optimize)"""
+    if engine.dialect.name != "sqlite":
+        return
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+    except Exception as e:
+        logger.warning(f"PRAGMA optimize çalıştırılamadı: {e}")
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -18,3 +94,21 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+T = TypeVar("T")
+
+
+async def run_in_db_thread(fn: Callable[..., T], *args) -> T:
+    """
+    Senkron Session işini thread pool'da çalıştır (event loop bloklanmaz)
+
+    Scraper'ın senkron Session'ını kullanan tarama yolları (scheduler, filtre
+    araması, hızlı tarama) DB bölümlerini bununla çalıştırır. Session aynı anda
+    tek thread'den kullanılır; adımlar sırayla await edilir.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
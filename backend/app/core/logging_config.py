@@ -0,0 +1,45 @@
+"""
+Uygulama loglaması
+
+- configure_logging: "app" logger'ını LOG_LEVEL ile stderr'e bağlar (root'a
+  dokunmaz; SQLAlchemy/uvicorn seviyeleri değişmez)
+- log_sampled / should_sample: tarama döngüsünde kart ya da ilan başına yazılan
+  satırlar için aynı anahtarda her LOG_SAMPLE_EVERY çağrıdan yalnızca birini
+  geçirir. Seviye kapalıysa mesaj hiç biçimlendirilmez.
+"""
+import logging
+import sys
+import threading
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+_sample_counts: Dict[str, int] = {}
+_sample_lock = threading.Lock()
+
+
+def configure_logging():
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    if not app_logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        app_logger.addHandler(handler)
+        app_logger.propagate = False
+
+
+def should_sample(logger: logging.Logger, level: int, key: str, every: Optional[int] = None) -> bool:
+    """Bu çağrı loglanmalı mı? (seviye açık ve anahtarın N'inci çağrısı)"""
+    if not logger.isEnabledFor(level):
+        return False
+    every = every or settings.LOG_SAMPLE_EVERY
+    with _sample_lock:
+        count = _sample_counts.get(key, 0)
+        _sample_counts[key] = count + 1
+    return count % every == 0
+
+
+def log_sampled(logger: logging.Logger, level: int, key: str, msg: str, *args, every: Optional[int] = None):
+    """logger.log'un örneklenmiş hali; args %-biçimlendirmesi sadece yazılırsa yapılır"""
+    if should_sample(logger, level, key, every):
+        logger.log(level, msg, *args)
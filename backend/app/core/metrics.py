@@ -0,0 +1,253 @@
+"""
+Prometheus metrikleri
+
+prometheus_client bağımlılığı olmadan küçük, thread-safe bir kayıt defteri:
+- Counter / Gauge / Histogram, isteğe bağlı etiketlerle (labels)
+- Gauge değeri set_function ile okuma anında hesaplanabilir (kuyruk derinliği gibi)
+- REGISTRY.render() text exposition format (0.0.4) üretir; /metrics endpoint'i döndürür
+
+Tarama metrikleri (aşama süreleri, sayfa/kart/detay sayaçları, 503'ler, tarayıcı
+sekmeleri) bu modülde tanımlıdır; ölçüm noktaları scraper ve scheduler'dadır.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """Kayıtlı metrikleri Prometheus text formatında yazar"""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric"):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[MetricsRegistry] = REGISTRY
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames) or any(name not in labels for name in self.labelnames):
+            raise ValueError(f"{self.name} etiketleri {self.labelnames} olmalı, gelen: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        # Etiketsiz metrikler hiç güncellenmemiş olsa da 0 ile görünür
+        if not items and not self.labelnames:
+            return [((), 0)]
+        return items
+
+    def collect(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Sadece artan sayaç (isim _total ile biter)"""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counter azaltılamaz")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> Iterator[str]:
+        for key, value in self._items():
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Anlık değer; set_function verilirse her okumada hesaplanır (etiketsiz)"""
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> Iterator[str]:
+        if self._function is not None:
+            try:
+                yield f"{self.name} {_format_value(self._function())}"
+            except Exception:
+                pass
+            return
+        for key, value in self._items():
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Kümülatif bucket'lı dağılım (_bucket / _sum / _count)"""
+    type_name = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with bloğunun süresini saniye olarak kaydet (hata olsa da)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def stats(self, **labels) -> Tuple[int, float]:
+        """(gözlem sayısı, toplam) - benchmark'larda aşama ortalamaları için"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return (state[2], state[1]) if state else (0, 0.0)
+
+    def collect(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in sorted(self._values.items())]
+        for key, bucket_counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{self._labels(key, [('le', _format_value(bound))])} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(key)} {count}"
+
+
+# Tarama metrikleri
+SCAN_PHASE_SECONDS = Histogram(
+    "autosniper_scan_phase_seconds",
+    "Tarama aşaması süreleri (goto, ready, extract, detail, phash, save)",
+    ["phase"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+SCAN_PAGES = Counter(
+    "autosniper_scan_pages_total", "Yüklenen arama sonuç sayfaları", ["result"]
+)
+SCAN_CARDS = Counter(
+    "autosniper_scan_cards_total", "Sonuç sayfalarında görülen ilan kartları", ["result"]
+)
+SCAN_BLOCKED = Counter(
+    "autosniper_scan_blocked_total", "503 / bot koruması ile karşılaşılan sayfa yüklemeleri"
+)
+DETAIL_FETCHES = Counter(
+    "autosniper_detail_fetches_total", "İlan detay sayfası istekleri", ["result"]
+)
+NEW_LISTINGS = Counter(
+    "autosniper_new_listings_total", "Kaydedilen yeni ilanlar (filtre bazında)", ["filter_id"]
+)
+REPOSTS = Counter(
+    "autosniper_reposts_total", "Daha önce görülen bir aracın yeniden yayını olarak bağlanan ilanlar"
+)
+CACHE_REQUESTS = Counter(
+    "autosniper_response_cache_requests_total", "Yanıt önbelleği istekleri", ["cache", "result"]
+)
+BROWSER_PAGES = Gauge(
+    "autosniper_browser_pages", "Açık tarayıcı sekmeleri (tüm scraper'lar)"
+)
+BROWSERS = Gauge(
+    "autosniper_browsers", "Çalışan tarayıcı süreçleri"
+)
+SCAN_QUEUE_DEPTH = Gauge(
+    "autosniper_scan_queue_depth", "Tarama kuyruğunda zamanlanmış filtreler"
+)
+SCAN_QUEUE_OVERDUE = Gauge(
+    "autosniper_scan_queue_overdue", "Zamanı geçmiş, taranmayı bekleyen filtreler"
+)
@@ -0,0 +1,138 @@
+"""
+Şema migration yardımcıları (Alembic)
+
+- Başlangıçta sadece şema revizyonu doğrulanır (create_all / tablo yansıtma yok)
+- SQLite masaüstü sürümünde operatör olmadığı için eksik migration'lar otomatik
+  uygulanır (SQLITE_AUTO_MIGRATE); sunucuda `alembic upgrade head` çalıştırılmalıdır
+- Migration script'leri için idempotent yardımcılar: create_all ile oluşturulmuş
+  eski veritabanları da sorunsuz yükseltilir
+
+Kullanım (backend dizininden):
+    alembic upgrade head
+    alembic revision -m "açıklama"
+"""
+import logging
+import os
+from typing import List, Optional, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import command, op
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """Veritabanı şeması kodun beklediği revizyonda değil"""
+
+
+def get_alembic_config() -> Config:
+    """alembic.ini'ye ihtiyaç duymadan (ör. PyInstaller paketi) Alembic ayarlarını oluştur"""
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    return config
+
+
+def get_head_revision() -> Optional[str]:
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+
+def get_current_revision() -> Optional[str]:
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def upgrade_schema(revision: str = "head"):
+    command.upgrade(get_alembic_config(), revision)
+
+
+def verify_schema_revision():
+    """
+    Başlangıç kontrolü - DB revizyonu head değilse SQLite'ta yükselt, diğerlerinde hata ver
+
+    Tek sorgu (alembic_version) yapar; tabloları yansıtmaz.
+    """
+    head = get_head_revision()
+    current = get_current_revision()
+    if current == head:
+        logger.info(f"Veritabanı şeması güncel (revizyon {head})")
+        return
+
+    if engine.dialect.name == "sqlite" and settings.SQLITE_AUTO_MIGRATE:
+        logger.info(f"Veritabanı şeması yükseltiliyor: {current} -> {head}")
+        upgrade_schema()
+        return
+
+    raise SchemaOutOfDateError(
+        f"Veritabanı şeması güncel değil (mevcut: {current}, beklenen: {head}). "
+        f"Backend dizininde 'alembic upgrade head' çalıştırın."
+    )
+
+
+# ----------------------------------------------------------------------------
+# Migration script'leri için yardımcılar
+# ----------------------------------------------------------------------------
+
+def is_offline() -> bool:
+    """--sql (offline) modunda DB'ye bağlantı yok; boş bir veritabanı varsayılır"""
+    return op.get_context().as_sql
+
+
+def has_table(table: str) -> bool:
+    if is_offline():
+        return False
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    if is_offline():
+        return False
+    return any(col["name"] == column for col in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def add_column_if_missing(table: str, column: sa.Column):
+    if not has_column(table, column.name):
+        op.add_column(table, column)
+
+
+def create_index_online(
+    name: str,
+    table: str,
+    columns: Sequence[Union[str, sa.sql.elements.TextClause]],
+    unique: bool = False
+):
+    """
+    Index'i tabloyu kilitlemeden oluştur
+
+    PostgreSQL'de CREATE INDEX CONCURRENTLY transaction dışında çalışmalıdır
+    (autocommit_block). Index zaten varsa (create_all ile oluşmuş DB) atlanır.
+    """
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                name, table, list(columns), unique=unique,
+                if_not_exists=True, postgresql_concurrently=True
+            )
+    else:
+        op.create_index(name, table, list(columns), unique=unique, if_not_exists=True)
+
+
+def drop_index_online(name: str, table: str):
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def create_column_indexes(table: str, columns: List[str], unique: List[str] = ()):
+    """index=True ile tanımlı kolonların create_all ile aynı isimli (ix_<tablo>_<kolon>) index'leri"""
+    for column in columns:
+        create_index_online(f"ix_{table}_{column}", table, [column], unique=column in unique)
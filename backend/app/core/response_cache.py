@@ -0,0 +1,196 @@
+"""
+Yanıt önbelleği (ETag + LRU)
+
+Dashboard'un sık sorguladığı endpoint'ler (ilan listesi, istatistikler,
+tarama durumu) için:
+- Önbellek anahtarı: endpoint + sorgu parametreleri + kapsam (ör. kullanıcı)
+  + bağlı olduğu sürüm sayaçları (+ isteğe bağlı zaman dilimi)
+- Sürüm sayaçları ("listings", "filters") veri değiştiğinde (ilan kaydetme,
+  tarama, silme, filtre güncelleme) commit sonrası bump() ile artırılır;
+  eski anahtarlar bir daha eşleşmez, LRU'dan zamanla düşer
+- ETag anahtardan türetilir; If-None-Match eşleşirse DB'ye hiç gidilmeden 304 döner
+
+Varsayılan backend process içi LRU'dur. CACHE_REDIS_URL verilirse sürüm
+sayaçları ve yanıtlar Redis'te tutulur (çoklu process/worker kurulumları).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+LISTINGS = "listings"
+FILTERS = "filters"
+
+
+class MemoryCacheBackend:
+    """Process içi sürüm sayaçları ve LRU yanıt önbelleği (thread-safe)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_versions(self, names: Sequence[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(name, 0) for name in names)
+
+    def bump(self, name: str):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, ttl: Optional[int]):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Redis'te sürüm sayaçları (INCR) ve yanıtlar (SETEX)
+
+    Komutlar O(1) ve kısa timeout'ludur; senkron kod yollarından (scraper,
+    scheduler) da bump() çağrılabilsin diye senkron istemci kullanılır.
+    """
+
+    PREFIX = "autosniper:cache:"
+
+    def __init__(self, url: str, entry_ttl: int):
+        import redis
+
+        self.entry_ttl = entry_ttl
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get_versions(self, names: Sequence[str]) -> Tuple[int, ...]:
+        values = self._client.mget([f"{self.PREFIX}version:{name}" for name in names])
+        return tuple(int(value or 0) for value in values)
+
+    def bump(self, name: str):
+        self._client.incr(f"{self.PREFIX}version:{name}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(f"{self.PREFIX}entry:{key}")
+
+    def set(self, key: str, body: bytes, ttl: Optional[int]):
+        self._client.setex(f"{self.PREFIX}entry:{key}", ttl or self.entry_ttl, body)
+
+    def clear(self):
+        for key in self._client.scan_iter(f"{self.PREFIX}*"):
+            self._client.delete(key)
+
+
+class ResponseCache:
+    """Sürüm sayaçlı, ETag destekli JSON yanıt önbelleği"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def bump(self, *names: str):
+        """Veri değişti - bu sürümlere bağlı önbellek kayıtlarını geçersiz kıl (commit sonrası çağrılır)"""
+        for name in names:
+            try:
+                self.backend.bump(name)
+            except Exception as e:
+                logger.warning(f"Önbellek sürümü artırılamadı ({name}): {e}")
+
+    async def respond(
+        self,
+        request: Request,
+        name: str,
+        depends_on: Sequence[str],
+        builder: Callable[[], Awaitable[Any]],
+        scope: Any = None,
+        ttl: Optional[int] = None
+    ) -> Response:
+        """
+        Önbellekten (veya 304 ile) yanıt ver, yoksa builder ile üretip sakla
+
+        Args:
+            name: Endpoint adı (anahtar ön eki)
+            depends_on: Yanıtın bağlı olduğu sürüm sayaçları
+            builder: Yanıt verisini üreten coroutine (DB işi burada yapılır)
+            scope: Kullanıcıya özel yanıtlar için kapsam (ör. user_id)
+            ttl: Verilirse anahtar her ttl saniyede değişir (zamana bağlı
+                 hesaplar, ör. "son 24 saat", için üst sınır)
+        """
+        try:
+            key = self._make_key(request, name, depends_on, scope, ttl)
+        except Exception as e:
+            logger.warning(f"Önbellek anahtarı oluşturulamadı, doğrudan yanıtlanıyor: {e}")
+            return Response(content=self._encode(await builder()), media_type="application/json")
+
+        etag = f'W/"{key}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            CACHE_REQUESTS.inc(cache=name, result="not_modified")
+            return Response(status_code=304, headers=headers)
+
+        body = self._safe_get(key)
+        CACHE_REQUESTS.inc(cache=name, result="miss" if body is None else "hit")
+        if body is None:
+            body = self._encode(await builder())
+            try:
+                self.backend.set(key, body, ttl)
+            except Exception as e:
+                logger.warning(f"Yanıt önbelleğe yazılamadı: {e}")
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def clear(self):
+        self.backend.clear()
+
+    def _make_key(self, request: Request, name: str, depends_on: Sequence[str], scope: Any, ttl: Optional[int]) -> str:
+        versions = self.backend.get_versions(depends_on)
+        params = sorted(request.query_params.multi_items())
+        bucket = int(time.time() // ttl) if ttl else None
+        raw = json.dumps([name, params, scope, versions, bucket], default=str)
+        return f"{name}-{hashlib.sha1(raw.encode()).hexdigest()[:20]}"
+
+    def _safe_get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Önbellekten okunamadı: {e}")
+            return None
+
+    def _encode(self, data: Any) -> bytes:
+        return json.dumps(jsonable_encoder(data), ensure_ascii=False).encode("utf-8")
+
+
+def _create_backend():
+    if settings.CACHE_REDIS_URL:
+        try:
+            return RedisCacheBackend(settings.CACHE_REDIS_URL, settings.CACHE_ENTRY_TTL_SECONDS)
+        except ImportError:
+            logger.warning("redis paketi kurulu değil, process içi önbellek kullanılacak")
+    return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_create_backend())
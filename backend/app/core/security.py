@@ -1,19 +1,45 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from app.core.config import settings
 
+# bcrypt çağrıları CPU yoğun (~100-300ms) - event loop'u bloklamamaları için
+# sınırlı bir thread pool'da çalıştırılır (bcrypt hesaplama sırasında GIL'i bırakır)
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Şifreyi doğrula"""
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
     """Şifreyi hash'le"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Hash'in cost değeri ayarlanan BCRYPT_ROUNDS'tan farklı mı? ($2b$12$...)"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Şifreyi thread pool'da doğrula (async handler'lar için)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Şifreyi thread pool'da hash'le (async handler'lar için)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -1,24 +1,37 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import hmac
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api import auth, filters, listings, websocket, test, favorites, admin, quick_search, license as license_api
+from app.api import auth, filters, listings, websocket, test, favorites, admin, quick_search, jobs, images, license as license_api
 from app.api import settings as settings_api
-from app.core.database import engine, Base
+from app.core.database import async_engine, optimize_database
+from app.core.logging_config import configure_logging
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS_REGISTRY
+from app.core.migrations import verify_schema_revision
+from app.services.dedupe import repost_detector
+from app.services.images import image_service
+from app.services.pricing import price_model
 from app.services.scheduler import scheduler_service
+from app.services.vehicle_catalog import vehicle_catalog
 import logging
 
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Veritabanı tablolarını oluştur
-Base.metadata.create_all(bind=engine)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Uygulama yaşam döngüsü yönetimi"""
     # Başlangıç
     logger.info("AutoSniper başlatılıyor...")
+    # Şema revizyonunu doğrula (tablolar Alembic migration'ları ile oluşturulur)
+    verify_schema_revision()
+    # Araç kataloğunu senkronize et ve trie'leri belleğe al
+    vehicle_catalog.ensure_loaded()
+    # Repost indeksi ve fiyat tablosu thread pool'da yüklenir (ingest'te bloklamasın)
+    await repost_detector.ensure_loaded_async()
+    await price_model.ensure_loaded_async()
     await scheduler_service.start()
     logger.info("Scheduler başlatıldı ✅")
     
@@ -28,6 +41,9 @@ async def lifespan(app: FastAPI):
     logger.info("AutoSniper kapatılıyor...")
     await scheduler_service.stop()
     logger.info("Scheduler durduruldu ✅")
+    await image_service.close()
+    await async_engine.dispose()
+    optimize_database()
 
 
 app = FastAPI(
@@ -56,6 +72,8 @@ app.include_router(listings.router, prefix="/api/listings", tags=["listings"])
 app.include_router(websocket.router, prefix="/api", tags=["websocket"])
 app.include_router(test.router, prefix="/api/test", tags=["test"])
 app.include_router(quick_search.router, prefix="/api", tags=["quick-search"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(images.router, prefix="/api/images", tags=["images"])
 app.include_router(license_api.router, prefix="/api/license", tags=["license"])
 app.include_router(favorites.router, tags=["favorites"])
 app.include_router(settings_api.router, prefix="/api/settings", tags=["settings"])
@@ -76,3 +94,13 @@ async def health():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus metrikleri (text exposition format)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404)
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+        if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected):
+            raise HTTPException(status_code=401, detail="Geçersiz metrik token'ı")
+    return Response(content=METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
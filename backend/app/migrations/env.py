@@ -0,0 +1,47 @@
+"""
+Alembic ortamı - bağlantı ayarları uygulamanın Settings/engine'inden alınır
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import Base, engine
+import app.models  # noqa: F401 - tüm modeller metadata'ya kaydolsun
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """SQL script üret (alembic upgrade head --sql)"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite ALTER TABLE kısıtları için batch (tablo kopyalama) modu
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,139 @@
+"""baseline şema (create_all dönemindeki tablolar)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+create_all ile oluşturulmuş mevcut veritabanlarında tablolar zaten vardır;
+bu yüzden her tablo/index yalnızca eksikse oluşturulur.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import create_column_indexes, has_table
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("password_hash", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("last_login", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("is_admin", sa.Boolean()),
+            sa.Column("reset_token", sa.String(), nullable=True),
+            sa.Column("reset_token_expires", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("telegram_chat_id", sa.String(), nullable=True),
+            sa.Column("telegram_enabled", sa.Boolean()),
+            sa.Column("subscription_tier", sa.String()),
+            sa.Column("daily_search_limit", sa.Integer()),
+            sa.Column("max_filters", sa.Integer()),
+            sa.Column("daily_search_count", sa.Integer()),
+            sa.Column("last_reset_date", sa.Date()),
+        )
+    create_column_indexes(
+        "users", ["id", "email", "is_admin", "reset_token", "subscription_tier"], unique=["email"]
+    )
+
+    if not has_table("filters"):
+        op.create_table(
+            "filters",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("criteria", sa.JSON(), nullable=False),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("auto_scan_enabled", sa.Boolean()),
+            sa.Column("scan_interval", sa.Integer()),
+            sa.Column("last_scan_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("next_scan_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("total_scans", sa.Integer()),
+            sa.Column("new_listings_found", sa.Integer()),
+        )
+    create_column_indexes("filters", ["id"])
+
+    if not has_table("listings"):
+        op.create_table(
+            "listings",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("filter_id", sa.Integer(), sa.ForeignKey("filters.id"), nullable=True),
+            sa.Column("source_url", sa.String(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("year", sa.Integer()),
+            sa.Column("brand", sa.String()),
+            sa.Column("model", sa.String()),
+            sa.Column("fuel_type", sa.String()),
+            sa.Column("transmission", sa.String()),
+            sa.Column("mileage", sa.Integer(), nullable=True),
+            sa.Column("city", sa.String()),
+            sa.Column("description", sa.String()),
+            sa.Column("images", sa.JSON()),
+            sa.Column("damage_info", sa.JSON(), nullable=True),
+            sa.Column("is_new", sa.Boolean()),
+            sa.Column("scraped_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    create_column_indexes(
+        "listings",
+        ["id", "source_url", "price", "year", "brand", "model", "fuel_type",
+         "transmission", "mileage", "city", "is_new", "scraped_at"],
+        unique=["source_url"]
+    )
+
+    if not has_table("notifications"):
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("listing_id", sa.Integer(), sa.ForeignKey("listings.id"), nullable=False),
+            sa.Column("filter_id", sa.Integer(), sa.ForeignKey("filters.id"), nullable=False),
+            sa.Column("read_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    create_column_indexes("notifications", ["id"])
+
+    if not has_table("favorites"):
+        op.create_table(
+            "favorites",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("listing_id", sa.Integer(), sa.ForeignKey("listings.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("price_when_added", sa.Float(), nullable=True),
+            sa.Column("price_history", sa.JSON()),
+            sa.Column("last_checked_at", sa.DateTime(timezone=True), nullable=True),
+            sa.UniqueConstraint("user_id", "listing_id", name="unique_user_listing"),
+        )
+    create_column_indexes("favorites", ["id"])
+
+    if not has_table("licenses"):
+        op.create_table(
+            "licenses",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("license_key", sa.String(), nullable=False),
+            sa.Column("hardware_id", sa.String(), nullable=False),
+            sa.Column("package_type", sa.String(), nullable=False),
+            sa.Column("issued_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("activated_at", sa.DateTime()),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+    create_column_indexes("licenses", ["id", "license_key"], unique=["license_key"])
+
+
+def downgrade():
+    for table in ("licenses", "favorites", "notifications", "listings", "filters", "users"):
+        op.drop_table(table)
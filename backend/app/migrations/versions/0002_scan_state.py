@@ -0,0 +1,46 @@
+"""artımlı/adaptif tarama durumu: scan_watermarks tablosu ve filtre kolonları
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing, create_column_indexes, has_table
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_table("scan_watermarks"):
+        op.create_table(
+            "scan_watermarks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("search_url", sa.String(), nullable=False),
+            sa.Column("last_ilan_id", sa.BigInteger(), nullable=False),
+            sa.Column("arrival_rate", sa.Float()),
+            sa.Column("rate_updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    else:
+        add_column_if_missing("scan_watermarks", sa.Column("arrival_rate", sa.Float()))
+        add_column_if_missing("scan_watermarks", sa.Column("rate_updated_at", sa.DateTime(timezone=True), nullable=True))
+    create_column_indexes("scan_watermarks", ["id", "search_url"], unique=["search_url"])
+
+    add_column_if_missing("filters", sa.Column("adaptive_scan_enabled", sa.Boolean()))
+    add_column_if_missing("filters", sa.Column("effective_scan_interval", sa.Integer(), nullable=True))
+    add_column_if_missing("filters", sa.Column("predicted_yield", sa.Float(), nullable=True))
+    add_column_if_missing("filters", sa.Column("last_scan_new_count", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("filters") as batch_op:
+        batch_op.drop_column("last_scan_new_count")
+        batch_op.drop_column("predicted_yield")
+        batch_op.drop_column("effective_scan_interval")
+        batch_op.drop_column("adaptive_scan_enabled")
+    op.drop_table("scan_watermarks")
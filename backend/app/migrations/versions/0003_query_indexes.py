@@ -0,0 +1,38 @@
+"""sorgu index'leri: tarama kuyruğu, favoriler ve ilan composite index'leri
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+create_all sadece eksik tabloları oluşturduğu için bu index'ler mevcut
+veritabanlarına hiç ulaşmamıştı. PostgreSQL'de CONCURRENTLY ile oluşturulur.
+"""
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_online, drop_index_online
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("idx_filters_autoscan_due", "filters", ["auto_scan_enabled", "is_active", "next_scan_at"]),
+    ("idx_favorites_user_created", "favorites", ["user_id", "created_at"]),
+    ("idx_favorites_listing_id", "favorites", ["listing_id"]),
+    ("idx_listings_brand_price", "listings", ["brand", "price"]),
+    ("idx_listings_city_price", "listings", ["city", "price"]),
+    # filter_id tek başına sorguları da bu index'in ön ekiyle karşılanır
+    ("idx_listings_filter_id_scraped", "listings", ["filter_id", "scraped_at"]),
+    ("idx_listings_scraped_at_desc", "listings", [sa.text("scraped_at DESC")]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
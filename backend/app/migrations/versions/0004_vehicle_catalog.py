@@ -0,0 +1,75 @@
+"""araç kataloğu: vehicle_brands / vehicle_models ve ilanlarda brand_id / model_id
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Katalog tabloları catalog.json'dan doldurulur ve mevcut ilanlar başlıklarından
+parça parça normalize edilir (brand_id boş olanlar). Backfill tek migration
+transaction'ı içinde çalışır; çok büyük PostgreSQL tablolarında bakım
+penceresinde uygulanmalıdır.
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import (
+    add_column_if_missing, create_column_indexes, create_index_online, drop_index_online, has_table, is_offline
+)
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade():
+    if not has_table("vehicle_brands"):
+        op.create_table(
+            "vehicle_brands",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("slug", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+        )
+    create_column_indexes("vehicle_brands", ["id", "slug"], unique=["slug"])
+
+    if not has_table("vehicle_models"):
+        op.create_table(
+            "vehicle_models",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("brand_id", sa.Integer(), sa.ForeignKey("vehicle_brands.id"), nullable=False),
+            sa.Column("slug", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.UniqueConstraint("brand_id", "slug", name="uq_vehicle_models_brand_slug"),
+        )
+    create_column_indexes("vehicle_models", ["id", "brand_id"])
+
+    # SQLite ALTER TABLE ile sonradan FK kısıtı eklenemez; ilişki ORM seviyesinde kalır
+    is_postgres = op.get_context().dialect.name == "postgresql"
+    for column, target in (("brand_id", "vehicle_brands.id"), ("model_id", "vehicle_models.id")):
+        args = [sa.ForeignKey(target)] if is_postgres else []
+        add_column_if_missing("listings", sa.Column(column, sa.Integer(), *args, nullable=True))
+    create_column_indexes("listings", ["brand_id", "model_id"])
+    create_index_online("idx_listings_brand_id_price", "listings", ["brand_id", "price"])
+
+    if is_offline():
+        return
+
+    from app.services.vehicle_catalog import VehicleCatalog
+
+    updated = VehicleCatalog().backfill_listings(op.get_bind())
+    logger.info(f"Araç kataloğu: {updated} ilan normalize edildi")
+
+
+def downgrade():
+    drop_index_online("idx_listings_brand_id_price", "listings")
+    drop_index_online("ix_listings_model_id", "listings")
+    drop_index_online("ix_listings_brand_id", "listings")
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.drop_column("model_id")
+        batch_op.drop_column("brand_id")
+    op.drop_table("vehicle_models")
+    op.drop_table("vehicle_brands")
@@ -0,0 +1,91 @@
+"""ilanlarda tamsayı external_id (arabam ilan ID'si) tekrar kontrolü anahtarı
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Mevcut ilanlar source_url'lerinden id sırasıyla parça parça doldurulur. Aynı
+ilan farklı slug'larla birden fazla kez kaydedilmişse ID en eski kayda verilir,
+diğerleri NULL kalır (unique index'i bozmamak için); sayıları loglanır.
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing, create_index_online, drop_index_online, is_offline
+from app.services.scraper.extraction import extract_ilan_id
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+CHUNK_SIZE = 1000
+
+listings = sa.table(
+    "listings",
+    sa.column("id", sa.Integer),
+    sa.column("source_url", sa.String),
+    sa.column("external_id", sa.BigInteger),
+)
+
+
+def backfill_external_ids(connection) -> tuple:
+    seen = {
+        row[0] for row in connection.execute(
+            sa.select(listings.c.external_id).where(listings.c.external_id != None)
+        )
+    }
+    last_id = 0
+    updated = duplicates = 0
+    while True:
+        rows = connection.execute(
+            sa.select(listings.c.id, listings.c.source_url)
+            .where(listings.c.external_id == None, listings.c.id > last_id)
+            .order_by(listings.c.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        values = []
+        for listing_id, source_url in rows:
+            external_id = extract_ilan_id(source_url)
+            if external_id is None:
+                continue
+            if external_id in seen:
+                duplicates += 1
+                continue
+            seen.add(external_id)
+            values.append({"row_id": listing_id, "external_id": external_id})
+        if values:
+            connection.execute(
+                listings.update()
+                .where(listings.c.id == sa.bindparam("row_id"))
+                .values(external_id=sa.bindparam("external_id")),
+                values,
+            )
+            updated += len(values)
+        last_id = rows[-1][0]
+
+    return updated, duplicates
+
+
+def upgrade():
+    add_column_if_missing("listings", sa.Column("external_id", sa.BigInteger(), nullable=True))
+
+    # Index doldurmadan sonra oluşturulur: hem daha hızlı hem de unique kontrolü tek seferde
+    if not is_offline():
+        updated, duplicates = backfill_external_ids(op.get_bind())
+        logger.info(f"external_id: {updated} ilan dolduruldu, {duplicates} tekrar kayıt NULL bırakıldı")
+
+    create_index_online("ix_listings_external_id", "listings", ["external_id"], unique=True)
+
+
+def downgrade():
+    drop_index_online("ix_listings_external_id", "listings")
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.drop_column("external_id")
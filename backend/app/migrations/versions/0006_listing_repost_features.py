@@ -0,0 +1,31 @@
+"""ilanlarda repost tespiti: image_phash ve canonical_id
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Mevcut ilanlar için pHash hesaplanmaz (resimlerin indirilmesi gerekir); bu
+ilanlar repost indeksine yalnızca başlık/km/fiyat özellikleriyle girer.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing, create_index_online, drop_index_online
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing("listings", sa.Column("image_phash", sa.BigInteger(), nullable=True))
+    add_column_if_missing("listings", sa.Column("canonical_id", sa.Integer(), nullable=True))
+    create_index_online("ix_listings_canonical_id", "listings", ["canonical_id"])
+
+
+def downgrade():
+    drop_index_online("ix_listings_canonical_id", "listings")
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.drop_column("canonical_id")
+        batch_op.drop_column("image_phash")
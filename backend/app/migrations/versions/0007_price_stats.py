@@ -0,0 +1,54 @@
+"""fırsat skoru: price_stats tablosu, ilanlarda market_price ve deal_score
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+Migration yalnızca şemayı ekler. Tablo, migration'dan sonraki ilk açılışta
+scheduler tarafından kurulur ve mevcut ilanlar skorlanır (PriceModel.bootstrap).
+Canlı model koduna bağlı backfill migration'da tutulmaz; model sonradan
+değişse de eski revizyonlar aynı şekilde çalışır.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import (
+    add_column_if_missing, create_column_indexes, create_index_online, drop_index_online, has_table
+)
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_table("price_stats"):
+        op.create_table(
+            "price_stats",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("brand_id", sa.Integer(), nullable=False),
+            sa.Column("model_id", sa.Integer(), nullable=False),
+            sa.Column("year_bucket", sa.Integer(), nullable=False),
+            sa.Column("sample_count", sa.Integer(), nullable=False),
+            sa.Column("log_center", sa.Float(), nullable=False),
+            sa.Column("log_mad", sa.Float(), nullable=False),
+            sa.Column("median_mileage", sa.Integer(), nullable=True),
+            sa.Column("mileage_slope", sa.Float(), nullable=False),
+            sa.Column("median_price", sa.Float(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("brand_id", "model_id", "year_bucket", name="uq_price_stats_key"),
+        )
+    create_column_indexes("price_stats", ["id"])
+
+    add_column_if_missing("listings", sa.Column("market_price", sa.Float(), nullable=True))
+    add_column_if_missing("listings", sa.Column("deal_score", sa.Float(), nullable=True))
+    create_index_online("ix_listings_deal_score", "listings", ["deal_score"])
+
+
+def downgrade():
+    drop_index_online("ix_listings_deal_score", "listings")
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.drop_column("deal_score")
+        batch_op.drop_column("market_price")
+    op.drop_table("price_stats")
@@ -0,0 +1,85 @@
+"""ilanlarda hasar filtre kolonları: changed_part_count, painted_part_count, tramer_amount
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+damage_info JSON'undan türetilir (damage_features ile, ingest'teki aynı kural).
+Mevcut ilanlar id sırasıyla parça parça doldurulur; index'ler doldurmadan
+sonra oluşturulur.
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing, create_index_online, drop_index_online, is_offline
+from app.services.scraper.extraction import damage_features
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+CHUNK_SIZE = 1000
+COLUMNS = ["changed_part_count", "painted_part_count", "tramer_amount"]
+
+listings = sa.table(
+    "listings",
+    sa.column("id", sa.Integer),
+    sa.column("damage_info", sa.JSON),
+    *[sa.column(name, sa.Integer) for name in COLUMNS],
+)
+
+
+def backfill_damage_columns(connection) -> int:
+    last_id = 0
+    updated = 0
+    while True:
+        rows = connection.execute(
+            sa.select(listings.c.id, listings.c.damage_info)
+            .where(listings.c.damage_info != None, listings.c.id > last_id)
+            .order_by(listings.c.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        values = []
+        for listing_id, damage_info in rows:
+            features = damage_features(damage_info if isinstance(damage_info, dict) else None)
+            if any(value is not None for value in features.values()):
+                values.append({"row_id": listing_id, **features})
+        if values:
+            connection.execute(
+                listings.update()
+                .where(listings.c.id == sa.bindparam("row_id"))
+                .values({name: sa.bindparam(name) for name in COLUMNS}),
+                values,
+            )
+            updated += len(values)
+        last_id = rows[-1][0]
+
+    return updated
+
+
+def upgrade():
+    for name in COLUMNS:
+        add_column_if_missing("listings", sa.Column(name, sa.Integer(), nullable=True))
+
+    if not is_offline():
+        updated = backfill_damage_columns(op.get_bind())
+        logger.info(f"Hasar kolonları: {updated} ilan dolduruldu")
+
+    for name in COLUMNS:
+        create_index_online(f"ix_listings_{name}", "listings", [name])
+
+
+def downgrade():
+    for name in COLUMNS:
+        drop_index_online(f"ix_listings_{name}", "listings")
+    with op.batch_alter_table("listings") as batch_op:
+        for name in reversed(COLUMNS):
+            batch_op.drop_column(name)
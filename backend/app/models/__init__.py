@@ -4,5 +4,8 @@ from app.models.listing import Listing
 from app.models.notification import Notification
 from app.models.favorite import Favorite
 from app.models.license import License
+from app.models.scan_watermark import ScanWatermark
+from app.models.vehicle import VehicleBrand, VehicleModel
+from app.models.price_stat import PriceStat
 
-__all__ = ["User", "Filter", "Listing", "Notification", "Favorite", "License"]
+__all__ = ["User", "Filter", "Listing", "Notification", "Favorite", "License", "ScanWatermark", "VehicleBrand", "VehicleModel", "PriceStat"]
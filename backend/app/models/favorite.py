@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Float, JSON
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Float, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -17,8 +17,12 @@ class Favorite(Base):
     price_history = Column(JSON, default=list)  # [{"price": 100000, "date": "2024-01-01"}, ...]
     last_checked_at = Column(DateTime(timezone=True), nullable=True)
 
-    # Her kullanıcı bir ilanı sadece bir kez favoriye ekleyebilir
-    __table_args__ = (UniqueConstraint('user_id', 'listing_id', name='unique_user_listing'),)
+    __table_args__ = (
+        # Her kullanıcı bir ilanı sadece bir kez favoriye ekleyebilir
+        UniqueConstraint('user_id', 'listing_id', name='unique_user_listing'),
+        Index('idx_favorites_user_created', 'user_id', 'created_at'),  # Kullanıcının favori listesi
+        Index('idx_favorites_listing_id', 'listing_id'),  # İlan silme/temizlikte favori silme
+    )
 
     user = relationship("User", back_populates="favorites")
     listing = relationship("Listing", back_populates="favorites")
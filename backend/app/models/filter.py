@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -20,6 +20,16 @@ class Filter(Base):
     next_scan_at = Column(DateTime(timezone=True), nullable=True)
     total_scans = Column(Integer, default=0)
     new_listings_found = Column(Integer, default=0)
+    
+    # Adaptif tarama - aralık, aramanın yeni ilan geliş hızına göre paket sınırları içinde ayarlanır
+    adaptive_scan_enabled = Column(Boolean, default=False)
+    effective_scan_interval = Column(Integer, nullable=True)  # Adaptif modda hesaplanan aralık (dakika)
+    predicted_yield = Column(Float, nullable=True)  # Son tarama için, tarama öncesi hızla beklenen yeni ilan sayısı
+    last_scan_new_count = Column(Integer, nullable=True)  # Son taramada bulunan yeni ilan sayısı
+
+    __table_args__ = (
+        Index('idx_filters_autoscan_due', 'auto_scan_enabled', 'is_active', 'next_scan_at'),  # Tarama kuyruğu yüklemesi
+    )
 
     # İlişkiler
     user = relationship("User", back_populates="filters")
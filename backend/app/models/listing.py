@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Float, ForeignKey, Text, Index
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, JSON, Float, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -10,11 +10,16 @@ class Listing(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Hangi kullanıcı için çekildi
     filter_id = Column(Integer, ForeignKey("filters.id"), nullable=True)  # Hangi filtre ile çekildi
     source_url = Column(String, unique=True, nullable=False, index=True)
+    # arabam ilan ID'si - aynı ilan farklı slug'larla gelebildiği için tekrar kontrolü bunun üzerinden
+    external_id = Column(BigInteger, unique=True, nullable=True, index=True)
     title = Column(String, nullable=False)
     price = Column(Float, nullable=False, index=True)  # Fiyat sıralaması için index
     year = Column(Integer, index=True)  # Yıl filtreleme için index
     brand = Column(String, index=True)
     model = Column(String, index=True)
+    # Katalogdan normalize edilmiş marka/model (eşleştirme ve istatistikler tamsayı üzerinden)
+    brand_id = Column(Integer, ForeignKey("vehicle_brands.id"), nullable=True, index=True)
+    model_id = Column(Integer, ForeignKey("vehicle_models.id"), nullable=True, index=True)
     fuel_type = Column(String, index=True)  # Yakıt tipi filtreleme için
     transmission = Column(String, index=True)  # Vites filtreleme için
     mileage = Column(Integer, nullable=True, index=True)  # Kilometre filtreleme için
@@ -24,6 +29,18 @@ class Listing(Base):
     
     # Boya-Değişen ve Tramer bilgisi
     damage_info = Column(JSON, nullable=True)  # {"original": [...], "painted": [...], "changed": [...], "tramer_amount": "..."}
+    # damage_info'dan ingest'te türetilen filtre kolonları (bilinmiyorsa NULL)
+    changed_part_count = Column(Integer, nullable=True, index=True)
+    painted_part_count = Column(Integer, nullable=True, index=True)  # Boyalı + lokal boyalı
+    tramer_amount = Column(Integer, nullable=True, index=True)  # TL
+    
+    # Repost tespiti: ilk resmin pHash'i (işaretli 64 bit) ve aynı aracın ilk görülen ilanı
+    image_phash = Column(BigInteger, nullable=True)
+    canonical_id = Column(Integer, nullable=True, index=True)  # Repost değilse NULL
+    
+    # Fırsat skoru: ingest anındaki piyasa fiyatı tahmini ve 1 - fiyat / piyasa (0.15 = %15 ucuz)
+    market_price = Column(Float, nullable=True)
+    deal_score = Column(Float, nullable=True, index=True)
     
     is_new = Column(Boolean, default=True, index=True)  # Yeni ilan filtresi için
     scraped_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Tarih sıralaması için
@@ -31,6 +48,7 @@ class Listing(Base):
     # Composite indeksler - sık kullanılan sorgu kombinasyonları için
     __table_args__ = (
         Index('idx_listings_brand_price', 'brand', 'price'),  # Marka + fiyat araması
+        Index('idx_listings_brand_id_price', 'brand_id', 'price'),  # Katalog markası + fiyat
         Index('idx_listings_city_price', 'city', 'price'),    # Şehir + fiyat araması
         Index('idx_listings_filter_id_scraped', 'filter_id', 'scraped_at'),  # Filtre ilanları
         Index('idx_listings_scraped_at_desc', scraped_at.desc()),  # En yeni ilanlar
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, Float, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PriceStat(Base):
+    """(marka, model, yıl kovası) başına piyasa fiyatı istatistiği (pricing servisi tarafından hesaplanır)"""
+    __tablename__ = "price_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    brand_id = Column(Integer, nullable=False)
+    model_id = Column(Integer, nullable=False)
+    year_bucket = Column(Integer, nullable=False)  # Kovanın ilk yılı (PRICING_YEAR_BUCKET genişliğinde)
+    sample_count = Column(Integer, nullable=False)
+    
+    # log(fiyat) üzerinden robust istatistikler: medyan km'deki merkez, artıkların MAD'i
+    # ve km eğimi (10.000 km başına log fiyat değişimi, Theil-Sen)
+    log_center = Column(Float, nullable=False)
+    log_mad = Column(Float, nullable=False)
+    median_mileage = Column(Integer, nullable=True)
+    mileage_slope = Column(Float, nullable=False, default=0.0)
+    median_price = Column(Float, nullable=False)  # exp(log_center), gösterim için
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('brand_id', 'model_id', 'year_bucket', name='uq_price_stats_key'),
+    )
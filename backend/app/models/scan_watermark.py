@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Float
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ScanWatermark(Base):
+    """Arama URL'si başına tarama durumu: en yeni ilan ID'si (artımlı tarama) ve ilan geliş hızı (adaptif tarama)"""
+    __tablename__ = "scan_watermarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    search_url = Column(String, unique=True, nullable=False, index=True)  # Kanonik arama URL'si (sayfa parametresi olmadan)
+    last_ilan_id = Column(BigInteger, nullable=False, default=0)  # En yeni görülen arabam ilan ID'si
+    
+    # Adaptif tarama: yeni ilan geliş hızı (ilan/saat, zaman ağırlıklı EWMA)
+    arrival_rate = Column(Float, nullable=True)  # İkinci gözleme kadar None (tahmin yok)
+    rate_updated_at = Column(DateTime(timezone=True), nullable=True)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
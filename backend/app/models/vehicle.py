@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class VehicleBrand(Base):
+    """Araç kataloğu - marka (vehicle_catalog/catalog.json'dan senkronize edilir)"""
+    __tablename__ = "vehicle_brands"
+
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, nullable=False, index=True)  # Katlanmış ad, ör. "mercedes-benz"
+    name = Column(String, nullable=False)
+
+    models = relationship("VehicleModel", back_populates="brand")
+
+
+class VehicleModel(Base):
+    """Araç kataloğu - model"""
+    __tablename__ = "vehicle_models"
+
+    id = Column(Integer, primary_key=True, index=True)
+    brand_id = Column(Integer, ForeignKey("vehicle_brands.id"), nullable=False, index=True)
+    slug = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('brand_id', 'slug', name='uq_vehicle_models_brand_slug'),
+    )
+
+    brand = relationship("VehicleBrand", back_populates="models")
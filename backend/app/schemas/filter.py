@@ -1,6 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, Dict, Any
 from datetime import datetime
+from app.services.filter_matcher import NUMERIC_CRITERIA, parse_number
+
+def validate_criteria(criteria: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Sayısal kriterler boş ya da sayı olmalı (kayıtlı filtre taramada float'a çevrilir)"""
+    for key in NUMERIC_CRITERIA:
+        value = (criteria or {}).get(key)
+        if value not in (None, "") and parse_number(value) is None:
+            raise ValueError(f"'{key}' kriteri sayı olmalı")
+    return criteria
 
 class FilterCreate(BaseModel):
     name: str
@@ -8,6 +17,12 @@ class FilterCreate(BaseModel):
     is_active: bool = True
     auto_scan_enabled: bool = False
     scan_interval: int = 30  # Dakika
+    adaptive_scan_enabled: bool = False  # Aralığı ilan geliş hızına göre otomatik ayarla
+
+    @field_validator("criteria")
+    @classmethod
+    def check_criteria(cls, criteria):
+        return validate_criteria(criteria)
 
 class FilterUpdate(BaseModel):
     name: Optional[str] = None
@@ -15,6 +30,12 @@ class FilterUpdate(BaseModel):
     is_active: Optional[bool] = None
     auto_scan_enabled: Optional[bool] = None
     scan_interval: Optional[int] = None
+    adaptive_scan_enabled: Optional[bool] = None
+
+    @field_validator("criteria")
+    @classmethod
+    def check_criteria(cls, criteria):
+        return validate_criteria(criteria)
 
 class FilterResponse(BaseModel):
     id: int
@@ -29,6 +50,10 @@ class FilterResponse(BaseModel):
     next_scan_at: Optional[datetime] = None
     total_scans: int = 0
     new_listings_found: int = 0
+    adaptive_scan_enabled: bool = False
+    effective_scan_interval: Optional[int] = None
+    predicted_yield: Optional[float] = None
+    last_scan_new_count: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -36,6 +61,7 @@ class FilterResponse(BaseModel):
 class SchedulerToggle(BaseModel):
     enabled: bool
     interval: int = 30  # 15, 30, 60, 120, 360, 720, 1440
+    adaptive: Optional[bool] = None  # None ise mevcut adaptif ayarı korunur
 
 class SchedulerStatus(BaseModel):
     filter_id: int
@@ -46,4 +72,7 @@ class SchedulerStatus(BaseModel):
     next_scan_at: Optional[datetime] = None
     total_scans: int = 0
     new_listings_found: int = 0
-
+    adaptive_scan_enabled: bool = False
+    effective_scan_interval: Optional[int] = None
+    predicted_yield: Optional[float] = None  # Son taramada beklenen yeni ilan (tarama öncesi tahmin)
+    last_scan_new_count: Optional[int] = None  # Son taramada gerçekleşen yeni ilan
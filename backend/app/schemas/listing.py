@@ -14,11 +14,15 @@ class DamageInfo(BaseModel):
 class ListingResponse(BaseModel):
     id: int
     source_url: str
+    external_id: Optional[int] = None  # arabam ilan ID'si
+    canonical_id: Optional[int] = None  # Repost ise aynı aracın ilk ilanı
     title: str
     price: float
     year: Optional[int]
     brand: Optional[str]
     model: Optional[str]
+    brand_id: Optional[int] = None
+    model_id: Optional[int] = None
     fuel_type: Optional[str]
     transmission: Optional[str]
     mileage: Optional[int] = None  # Kilometre
@@ -26,6 +30,11 @@ class ListingResponse(BaseModel):
     description: Optional[str]
     images: Optional[List[str]]
     damage_info: Optional[Dict[str, Any]] = None  # Boya-Değişen bilgisi
+    changed_part_count: Optional[int] = None  # damage_info'dan: değişen parça sayısı
+    painted_part_count: Optional[int] = None  # Boyalı + lokal boyalı parça sayısı
+    tramer_amount: Optional[int] = None  # Tramer tutarı (TL)
+    market_price: Optional[float] = None  # Ingest anındaki piyasa fiyatı tahmini
+    deal_score: Optional[float] = None  # 1 - fiyat / piyasa (0.15 = piyasanın %15 altında)
     is_new: bool
     scraped_at: datetime
 
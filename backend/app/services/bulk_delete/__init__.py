@@ -0,0 +1,3 @@
+from .bulk_delete_service import BulkDeleteService, bulk_delete_service
+
+__all__ = ["BulkDeleteService", "bulk_delete_service"]
@@ -0,0 +1,199 @@
+"""
+Toplu silme servisi
+
+Büyük silmeler (tüm ilanlar, eski ilanlar, kullanıcı verisi) tek bir dev
+IN listesi ve tek transaction yerine id sırasıyla (keyset) N satırlık
+parçalar halinde yapılır:
+- ID'ler hiçbir zaman toplu olarak belleğe alınmaz, SQLite değişken limitine takılmaz
+- Her parça kendi kısa transaction'ında commit edilir (uzun tablo kilidi yok)
+- İlerleme callback'i ile job/WebSocket üzerinden raporlanabilir
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.response_cache import FILTERS, LISTINGS, response_cache
+from app.models.favorite import Favorite
+from app.models.filter import Filter
+from app.models.license import License
+from app.models.listing import Listing
+from app.models.notification import Notification
+from app.models.user import User
+from app.services.dedupe import repost_detector
+
+logger = logging.getLogger(__name__)
+
+# (işlenen, toplam) - toplam bilinmiyorsa None
+ProgressCallback = Callable[[int, Optional[int]], Awaitable[None]]
+# Parça silinmeden hemen önce aynı transaction içinde çağrılır (ör. arşivleme)
+ChunkHook = Callable[[AsyncSession, List[int]], Awaitable[None]]
+# Parça commit edildikten sonra çağrılır (ör. bellekteki indekslerden düşme)
+CommittedHook = Callable[[List[int]], None]
+
+
+class BulkDeleteService:
+    """Keyset parçalı silme/güncelleme işlemleri"""
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+
+    async def count_listings(self, *criteria) -> int:
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(func.count(Listing.id)).where(*criteria)) or 0
+
+    async def delete_listings(
+        self,
+        *criteria,
+        on_progress: Optional[ProgressCallback] = None,
+        before_delete: Optional[ChunkHook] = None,
+        total: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Kriterlere uyan ilanları favori ve bildirimleriyle birlikte parça parça sil
+
+        Returns:
+            {"listings": silinen ilan, "favorites": silinen favori, "chunks": transaction sayısı}
+        """
+        stats = {"listings": 0, "favorites": 0, "chunks": 0}
+
+        async def delete_chunk(db: AsyncSession, ids: List[int]):
+            if before_delete:
+                await before_delete(db, ids)
+            fav_result = await db.execute(
+                delete(Favorite).where(Favorite.listing_id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                delete(Notification).where(Notification.listing_id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            listing_result = await db.execute(
+                delete(Listing).where(Listing.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            stats["listings"] += listing_result.rowcount
+            stats["favorites"] += fav_result.rowcount
+
+        try:
+            # Silinen ilanlar repost indeksinde kanonik aday olarak kalmasın
+            stats["chunks"] = await self._process_in_chunks(
+                Listing, criteria, delete_chunk, on_progress=on_progress, total=total,
+                after_commit=repost_detector.remove
+            )
+        finally:
+            # Yarıda kalsa da commit edilmiş parçalar önbellekten düşmeli
+            response_cache.bump(LISTINGS)
+        return stats
+
+    async def delete_user(self, user_id: int, on_progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+        """
+        Kullanıcıyı ve kullanıcıya ait verileri sil
+
+        İlanlar ortak piyasa verisidir; silinmez, kullanıcı/filtre bağlantısı
+        kaldırılır (ORM cascade'in yaptığı gibi, ama nesneler yüklenmeden).
+        """
+        stats = {"listings_detached": 0, "favorites": 0, "notifications": 0, "filters": 0}
+
+        async def detach_listings(db: AsyncSession, ids: List[int]):
+            result = await db.execute(
+                update(Listing).where(Listing.id.in_(ids))
+                .values(user_id=None, filter_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            stats["listings_detached"] += result.rowcount
+
+        try:
+            user_filters = select(Filter.id).where(Filter.user_id == user_id).scalar_subquery()
+            await self._process_in_chunks(
+                Listing,
+                [(Listing.user_id == user_id) | Listing.filter_id.in_(user_filters)],
+                detach_listings,
+                on_progress=on_progress
+            )
+
+            for model, key in ((Favorite, "favorites"), (Notification, "notifications")):
+                stats[key] = await self._delete_where(model, model.user_id == user_id)
+
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    delete(License).where(License.user_id == user_id).execution_options(synchronize_session=False)
+                )
+                result = await db.execute(
+                    delete(Filter).where(Filter.user_id == user_id).execution_options(synchronize_session=False)
+                )
+                stats["filters"] = result.rowcount
+                await db.execute(
+                    delete(User).where(User.id == user_id).execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        finally:
+            response_cache.bump(LISTINGS, FILTERS)
+
+        return stats
+
+    async def _delete_where(self, model, *criteria) -> int:
+        deleted = 0
+
+        async def delete_chunk(db: AsyncSession, ids: List[int]):
+            nonlocal deleted
+            result = await db.execute(
+                delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount
+
+        await self._process_in_chunks(model, criteria, delete_chunk)
+        return deleted
+
+    async def _process_in_chunks(
+        self,
+        model,
+        criteria,
+        handler: ChunkHook,
+        on_progress: Optional[ProgressCallback] = None,
+        total: Optional[int] = None,
+        after_commit: Optional[CommittedHook] = None
+    ) -> int:
+        """
+        model.id sırasıyla kriterlere uyan satırları parça parça işle
+
+        Her parça ayrı session/transaction'dır; id > last_id ile silinmiş
+        satırlar tekrar taranmaz. İşlenen parça sayısını döner.
+        """
+        last_id = 0
+        processed = 0
+        chunks = 0
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                ids = (await db.scalars(
+                    select(model.id)
+                    .where(*criteria, model.id > last_id)
+                    .order_by(model.id)
+                    .limit(self.chunk_size)
+                )).all()
+                if not ids:
+                    break
+
+                await handler(db, ids)
+                await db.commit()
+            if after_commit:
+                after_commit(ids)
+
+            chunks += 1
+            processed += len(ids)
+            last_id = ids[-1]
+
+            if on_progress:
+                await on_progress(processed, total)
+            # Parçalar arasında diğer isteklere sıra ver
+            await asyncio.sleep(0)
+
+        return chunks
+
+
+bulk_delete_service = BulkDeleteService(chunk_size=settings.BULK_DELETE_CHUNK_SIZE)
@@ -0,0 +1,3 @@
+from .repost_detector import RepostBatch, RepostDetector, hamming, repost_detector, title_simhash, to_signed
+
+__all__ = ["RepostBatch", "RepostDetector", "hamming", "repost_detector", "title_simhash", "to_signed"]
@@ -0,0 +1,339 @@
+"""
+Repost (aynı aracın yeni ilan ID'si ile tekrar yayınlanması) tespiti
+
+Galeriler aynı aracı farklı ilan ID'leriyle yeniden yayınlar; external_id
+tekrar kontrolü bunları yakalayamaz. Her yeni ilan için kompakt özellikler:
+- ilk resmin 64 bit pHash'i (image_phash kolonu, ingest'te hesaplanır)
+- başlık kelimelerinin 64 bit SimHash'i
+- fiyat / yıl / km / şehir
+
+Bellekteki indeks (son DEDUPE_WINDOW_DAYS günün ilanları) iki yoldan aday üretir:
+- pHash LSH: 64 bit 8 banda bölünür, (yıl, bant no, bant değeri) kovası;
+  mesafe < 8 ise en az bir bant birebir aynıdır (güvercin yuvası)
+- metin bloğu: (marka, model, yıl) kovası; yalnızca km'si bilinen ilanlar
+
+Adaylar fiyat/km/şehir toleransıyla doğrulanır; eşleşen ilanın kanonik ID'si
+yeni ilanın canonical_id'si olur ve yeni ilan bildirimleri bastırılır.
+İndeks süreç başınadır; uygulama açılışında (thread pool'da) veritabanından yüklenir.
+Silinen ilanlar (tekli/toplu silme, retention) remove() ile, pencereden çıkan
+ilanlar her batch başında indeksten düşülür; silinmiş bir satır kanonik olamaz.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.metrics import REPOSTS, SCAN_PHASE_SECONDS
+from app.models.listing import Listing
+from app.services.images import image_service
+from app.services.scraper.extraction import fold_turkish
+from app.services.vehicle_catalog import tokenize
+
+logger = logging.getLogger(__name__)
+
+MASK = (1 << 64) - 1
+BANDS = 8
+BAND_BITS = 64 // BANDS
+TEXT_MILEAGE_TOLERANCE = 500  # km
+
+
+def to_signed(value: Optional[int]) -> Optional[int]:
+    """64 bit işaretsiz hash -> BigInteger kolonuna sığan işaretli değer"""
+    if value is None:
+        return None
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & MASK).count("1")
+
+
+# Kelime -> 64 elemanlı ±1 vektörü (başlık kelime dağarcığı küçük, yükleme hızı için önbellekli)
+_token_vectors: Dict[str, Tuple[int, ...]] = {}
+
+
+def _token_vector(token: str) -> Tuple[int, ...]:
+    vector = _token_vectors.get(token)
+    if vector is None:
+        digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        vector = tuple(1 if digest >> bit & 1 else -1 for bit in range(64))
+        if len(_token_vectors) > 50000:
+            _token_vectors.clear()
+        _token_vectors[token] = vector
+    return vector
+
+
+def title_simhash(title: Optional[str]) -> Optional[int]:
+    """Başlık kelimelerinin SimHash'i; kelime sırası ve tek kelimelik farklar mesafeyi az değiştirir"""
+    tokens = set(tokenize(title or ""))
+    if not tokens:
+        return None
+    weights = map(sum, zip(*[_token_vector(token) for token in tokens]))
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class _Entry:
+    """İndekslenen ilanın eşleştirme özellikleri"""
+    __slots__ = ("id", "key", "seen_at", "canonical_id", "phash", "title_hash", "block", "year", "price",
+                 "mileage", "city")
+
+    def __init__(self, listing_id, key, seen_at, canonical_id, phash, title, brand, model, brand_id, model_id,
+                 year, price, mileage, city):
+        self.id = listing_id
+        # Kaynaktaki kalıcı kimlik (ilan ID'si, yoksa URL); silinen satırın id'si yeniden kullanılabilir
+        self.key: Union[int, str] = key
+        self.seen_at: Optional[datetime] = seen_at.replace(tzinfo=None) if seen_at else None
+        self.canonical_id = canonical_id
+        self.phash = phash & MASK if phash is not None else None
+        self.title_hash = title_simhash(title)
+        self.year = year
+        self.price = price or None
+        self.mileage = mileage or None
+        self.city = fold_turkish(city) if city else None
+        brand_key = brand_id or (fold_turkish(brand) if brand else None)
+        model_key = model_id or (fold_turkish(model) if model else None)
+        self.block = (brand_key, model_key, year) if brand_key and year else None
+
+    @property
+    def root(self) -> int:
+        return self.canonical_id or self.id
+
+    def bands(self) -> List[Tuple[Any, int, int]]:
+        if self.phash is None:
+            return []
+        mask = (1 << BAND_BITS) - 1
+        return [(self.year, band, self.phash >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+
+def _same_listing(a: _Entry, b: _Entry) -> bool:
+    """Aynı ilan mı? Kimlik anahtarı varsa o karşılaştırılır, id yalnızca yedek"""
+    if a.key is not None and b.key is not None:
+        return a.key == b.key
+    return a.id == b.id
+
+
+def _attributes_match(a: _Entry, b: _Entry) -> bool:
+    """Repost'ta değişmeyen (yıl, şehir, km) ve az değişen (fiyat) alanlar uyumlu mu?"""
+    if a.year and b.year and a.year != b.year:
+        return False
+    if a.city and b.city and a.city != b.city:
+        return False
+    if a.mileage and b.mileage and abs(a.mileage - b.mileage) > max(2000, 0.03 * max(a.mileage, b.mileage)):
+        return False
+    if a.price and b.price and abs(a.price - b.price) > settings.DEDUPE_PRICE_TOLERANCE * max(a.price, b.price):
+        return False
+    return True
+
+
+def _remove_id(index: Dict[Any, List[int]], key: Any, listing_id: int):
+    ids = index.get(key)
+    if ids is None:
+        return
+    try:
+        ids.remove(listing_id)
+    except ValueError:
+        return
+    if not ids:
+        del index[key]
+
+
+class RepostBatch:
+    """
+    Bir kayıt transaction'ı boyunca bağlanan ilanlar
+
+    İndekse yalnızca commit() ile eklenir; rollback olursa batch atılır ve indekste
+    veritabanında olmayan ilan kalmaz. Aynı batch içindeki repost'lar da bulunur.
+    """
+
+    def __init__(self, detector: "RepostDetector"):
+        self.detector = detector
+        self.pending: List[_Entry] = []
+
+    def link(self, listing: Listing) -> Optional[int]:
+        """flush edilmiş yeni ilanı kanonik araca bağla; repost ise kanonik ID'yi döndür"""
+        if not settings.DEDUPE_ENABLED:
+            return None
+        entry = self.detector.entry_for(listing)
+        canonical_id = self.detector.find_canonical(entry, self.pending)
+        entry.canonical_id = canonical_id
+        listing.canonical_id = canonical_id
+        self.pending.append(entry)
+        return canonical_id
+
+    def rollback(self):
+        self.pending.clear()
+
+    def commit(self):
+        reposts = 0
+        for entry in self.pending:
+            self.detector.add(entry)
+            reposts += entry.canonical_id is not None
+        if reposts:
+            REPOSTS.inc(reposts)
+            logger.info(f"{reposts} ilan repost olarak bağlandı")
+        self.pending.clear()
+
+
+class RepostDetector:
+    """pHash LSH + metin bloğu indeksi"""
+
+    def __init__(self):
+        self.loaded = False
+        self._load_lock = threading.Lock()
+        self._entries: Dict[int, _Entry] = {}
+        self._bands: Dict[Tuple[Any, int, int], List[int]] = {}
+        self._blocks: Dict[Tuple[Any, Any, int], List[int]] = {}
+        # Ekleme (≈ scraped_at) sırası; pencereden çıkanlar baştan düşülür
+        self._order: Deque[_Entry] = deque()
+
+    def entry_for(self, listing: Listing) -> _Entry:
+        return _Entry(
+            listing.id, listing.external_id or listing.source_url, datetime.utcnow(),
+            None, listing.image_phash, listing.title, listing.brand, listing.model,
+            listing.brand_id, listing.model_id, listing.year, listing.price, listing.mileage, listing.city,
+        )
+
+    def add(self, entry: _Entry):
+        if entry.id in self._entries:
+            self._discard(self._entries[entry.id])
+        self._entries[entry.id] = entry
+        self._order.append(entry)
+        for key in entry.bands():
+            self._bands.setdefault(key, []).append(entry.id)
+        if entry.block and entry.mileage:
+            self._blocks.setdefault(entry.block, []).append(entry.id)
+
+    def _discard(self, entry: _Entry):
+        del self._entries[entry.id]
+        for key in entry.bands():
+            _remove_id(self._bands, key, entry.id)
+        if entry.block and entry.mileage:
+            _remove_id(self._blocks, entry.block, entry.id)
+
+    def remove(self, ids: Iterable[int]):
+        """Silinen ilanları indeksten çıkar (silme commit edildikten sonra çağrılır)"""
+        for listing_id in ids:
+            entry = self._entries.get(listing_id)
+            if entry is not None:
+                self._discard(entry)
+
+    def evict_expired(self, now: Optional[datetime] = None) -> int:
+        """DEDUPE_WINDOW_DAYS'ten eski ilanları indeksten düş; düşülen sayısını döndür"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=settings.DEDUPE_WINDOW_DAYS)
+        evicted = 0
+        while self._order and (self._order[0].seen_at is None or self._order[0].seen_at < cutoff):
+            entry = self._order.popleft()
+            # remove() ile çıkarılmış ya da aynı id ile yeniden eklenmiş kayıt atlanır
+            if self._entries.get(entry.id) is entry:
+                self._discard(entry)
+                evicted += 1
+        return evicted
+
+    def _score(self, entry: _Entry, candidate: _Entry) -> Optional[int]:
+        """Eşleşme mesafesi (küçük daha iyi); eşleşmiyorsa None"""
+        if _same_listing(entry, candidate) or not _attributes_match(entry, candidate):
+            return None
+        if entry.phash is not None and candidate.phash is not None:
+            distance = hamming(entry.phash, candidate.phash)
+            if distance <= settings.DEDUPE_PHASH_DISTANCE:
+                return distance
+        # Resimsiz eşleşme: aynı blok + neredeyse aynı km + benzer başlık (repost'ta km değişmez;
+        # filo araçları gibi benzer km'li farklı araçlar için tolerans dar tutulur)
+        if (entry.block and entry.block == candidate.block and entry.mileage and candidate.mileage
+                and abs(entry.mileage - candidate.mileage) <= TEXT_MILEAGE_TOLERANCE
+                and entry.title_hash is not None and candidate.title_hash is not None):
+            distance = hamming(entry.title_hash, candidate.title_hash)
+            if distance <= settings.DEDUPE_TITLE_DISTANCE:
+                return 64 + distance  # Resim eşleşmesi her zaman önce gelir
+        return None
+
+    def find_canonical(self, entry: _Entry, pending: List[_Entry] = ()) -> Optional[int]:
+        candidate_ids = set()
+        for key in entry.bands():
+            candidate_ids.update(self._bands.get(key, ()))
+        if entry.block and entry.mileage:
+            candidate_ids.update(self._blocks.get(entry.block, ()))
+
+        best: Optional[Tuple[int, int]] = None
+        candidates = [self._entries[i] for i in candidate_ids] + list(pending)
+        for candidate in candidates:
+            score = self._score(entry, candidate)
+            if score is not None and (best is None or score < best[0]):
+                # Kanonik ilan silinmiş/pencereden çıkmışsa eşleşen ilan yeni kök olur
+                root = candidate.root if candidate.root in self._entries else candidate.id
+                best = (score, root)
+        return best[1] if best else None
+
+    def load(self, connection: Connection):
+        """Son DEDUPE_WINDOW_DAYS günün ilanlarını indeksle"""
+        self._entries.clear()
+        self._bands.clear()
+        self._blocks.clear()
+        self._order.clear()
+        cutoff = datetime.utcnow() - timedelta(days=settings.DEDUPE_WINDOW_DAYS)
+        result = connection.execution_options(stream_results=True, yield_per=5000).execute(
+            select(
+                Listing.id, Listing.external_id, Listing.source_url, Listing.scraped_at,
+                Listing.canonical_id, Listing.image_phash, Listing.title, Listing.brand,
+                Listing.model, Listing.brand_id, Listing.model_id, Listing.year, Listing.price,
+                Listing.mileage, Listing.city,
+            ).where(Listing.scraped_at >= cutoff).order_by(Listing.id)
+        )
+        for listing_id, external_id, source_url, *features in result:
+            self.add(_Entry(listing_id, external_id or source_url, *features))
+        self.loaded = True
+        logger.info(f"Repost indeksi yüklendi: {len(self._entries)} ilan")
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        from app.core.database import engine
+
+        with self._load_lock:
+            if self.loaded:
+                return
+            try:
+                with engine.connect() as connection:
+                    self.load(connection)
+            except Exception as e:
+                logger.warning(f"Repost indeksi yüklenemedi, yalnızca yeni ilanlar indekslenecek: {e}")
+                self.loaded = True
+
+    async def ensure_loaded_async(self):
+        """İndeksi event loop'u bloklamadan yükle (tüm tabloyu tarar)"""
+        if settings.DEDUPE_ENABLED and not self.loaded:
+            await asyncio.get_running_loop().run_in_executor(None, self.ensure_loaded)
+
+    def batch(self) -> RepostBatch:
+        if settings.DEDUPE_ENABLED:
+            self.ensure_loaded()
+            self.evict_expired()
+        return RepostBatch(self)
+
+    async def annotate(self, listings: List[Dict[str, Any]]):
+        """Yeni ilan sözlüklerine ilk resmin pHash'ini ekle (image_phash, işaretli 64 bit)"""
+        # batch() öncesi async yollarda çağrılır; indeks burada yüklenirse batch() bloklamaz
+        await self.ensure_loaded_async()
+        if not (settings.DEDUPE_ENABLED and settings.DEDUPE_PHASH_ENABLED):
+            return
+        pending = [l for l in listings if l.get("images") and l.get("image_phash") is None]
+        if not pending:
+            return
+        semaphore = asyncio.Semaphore(settings.DEDUPE_CONCURRENCY)
+
+        async def annotate_one(listing_data: Dict[str, Any]):
+            async with semaphore:
+                listing_data["image_phash"] = to_signed(await image_service.phash(listing_data["images"][0]))
+
+        with SCAN_PHASE_SECONDS.time(phase="phash"):
+            await asyncio.gather(*[annotate_one(listing_data) for listing_data in pending])
+
+
+repost_detector = RepostDetector()
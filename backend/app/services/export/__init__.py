@@ -0,0 +1,19 @@
+from .listing_export import (
+    EXPORT_FORMATS,
+    ExportFormatError,
+    build_listing_criteria,
+    get_encoder,
+    iter_listing_rows,
+    listing_parquet_schema,
+    stream_listings,
+)
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "ExportFormatError",
+    "build_listing_criteria",
+    "get_encoder",
+    "iter_listing_rows",
+    "listing_parquet_schema",
+    "stream_listings",
+]
@@ -0,0 +1,261 @@
+"""
+İlan dışa aktarma (export) servisi
+
+İlanlar sunucu tarafı cursor ile (stream + yield_per) parça parça okunur ve
+CSV, NDJSON veya Parquet olarak parça parça kodlanır. Bellek kullanımı ilan
+sayısından bağımsızdır; parçalar arasında event loop'a sıra verilir.
+Hem GET /api/listings/export hem de export_listings.py CLI'ı kullanır.
+"""
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.listing import Listing
+from app.services.vehicle_catalog import vehicle_catalog
+
+EXPORT_COLUMNS = [
+    "id", "source_url", "external_id", "title", "price", "year", "brand", "model", "fuel_type",
+    "transmission", "mileage", "city", "market_price", "deal_score", "changed_part_count", "painted_part_count",
+    "tramer_amount", "is_new", "filter_id", "scraped_at",
+    "images", "damage_info", "description",
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportFormatError(ValueError):
+    """Desteklenmeyen veya bağımlılığı eksik export formatı"""
+
+
+def listing_parquet_schema(columns: List[str]):
+    """
+    Listing kolonları için sabit Parquet şeması (tipler modelden, JSON kolonları metin)
+
+    Şema parçadan çıkarılmaz: ilk parçada tamamen NULL olan kolon null tipine
+    düşer ve değer içeren sonraki parçalar aynı dosyaya yazılamaz.
+    """
+    import pyarrow as pa
+
+    def arrow_type(column):
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    return pa.schema([(name, arrow_type(Listing.__table__.c[name])) for name in columns])
+
+
+def build_listing_criteria(
+    source: Optional[str] = None,
+    brand: Optional[str] = None,
+    city: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_new: Optional[bool] = None,
+    min_discount: Optional[float] = None,
+    min_mileage: Optional[int] = None,
+    max_mileage: Optional[int] = None,
+    max_changed_parts: Optional[int] = None,
+    max_painted_parts: Optional[int] = None,
+    max_tramer: Optional[int] = None
+) -> list:
+    """GET /api/listings ile aynı filtre koşulları"""
+    criteria = []
+
+    # Kaynak filtreleme (hızlı tarama vs özel filtre)
+    if source == "quick":
+        criteria.append(Listing.filter_id == None)
+    elif source == "filtered":
+        criteria.append(Listing.filter_id != None)
+    # source == "all" veya None ise filtre yok, hepsini getir
+
+    if brand:
+        # Katalogdaki markalar tamsayı index'iyle, diğerleri metin araması ile
+        brand_id, _ = vehicle_catalog.resolve(brand)
+        if brand_id is not None:
+            criteria.append(Listing.brand_id == brand_id)
+        else:
+            criteria.append(Listing.brand.ilike(f"%{brand}%"))
+    if city:
+        criteria.append(Listing.city.ilike(f"%{city}%"))
+    if min_price is not None:
+        criteria.append(Listing.price >= min_price)
+    if max_price is not None:
+        criteria.append(Listing.price <= max_price)
+    if is_new is not None:
+        criteria.append(Listing.is_new == is_new)
+    if min_discount is not None:
+        # Fırsat eşiği (yüzde): ingest'te hesaplanmış deal_score index'i üzerinden
+        criteria.append(Listing.deal_score >= min_discount / 100)
+    if min_mileage is not None:
+        criteria.append(Listing.mileage >= min_mileage)
+    if max_mileage is not None:
+        criteria.append(Listing.mileage <= max_mileage)
+    # Hasar: damage_info'dan ingest'te türetilen indeksli kolonlar; bilgisi olmayan ilan elenir
+    if max_changed_parts is not None:
+        criteria.append(Listing.changed_part_count <= max_changed_parts)
+    if max_painted_parts is not None:
+        criteria.append(Listing.painted_part_count <= max_painted_parts)
+    if max_tramer is not None:
+        criteria.append(Listing.tramer_amount <= max_tramer)
+    return criteria
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(value)}")
+
+
+async def iter_listing_rows(criteria: list, chunk_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Kriterlere uyan ilanları en yeniden eskiye, chunk_size'lık dict listeleri halinde üret"""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    columns = [getattr(Listing, name) for name in EXPORT_COLUMNS]
+    query = (
+        select(*columns)
+        .where(*criteria)
+        .order_by(Listing.scraped_at.desc(), Listing.id.desc())
+        .execution_options(yield_per=chunk_size)
+    )
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            yield [dict(zip(EXPORT_COLUMNS, row)) for row in partition]
+            await asyncio.sleep(0)
+
+
+class CsvEncoder:
+    def header(self) -> bytes:
+        # Excel'in UTF-8'i tanıması için BOM
+        return ("\ufeff" + ",".join(EXPORT_COLUMNS) + "\r\n").encode("utf-8")
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                json.dumps(row[name], ensure_ascii=False) if isinstance(row[name], (dict, list)) else row[name]
+                for name in EXPORT_COLUMNS
+            ])
+        return buffer.getvalue().encode("utf-8")
+
+    def close(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder:
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        return "".join(
+            json.dumps(row, ensure_ascii=False, default=_json_default) + "\n" for row in rows
+        ).encode("utf-8")
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _ByteSink(io.RawIOBase):
+    """ParquetWriter'ın yazdığı byte'ları toplayıp parça parça teslim eder"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    """Her parça bir row group olarak yazılır; footer close() ile gönderilir"""
+
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportFormatError("Parquet export için pyarrow kurulu olmalı")
+        self._pa = pa
+        self._pq = pq
+        self._schema = listing_parquet_schema(EXPORT_COLUMNS)
+        self._sink = _ByteSink()
+        self._writer = None
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        # JSON kolonları (images, damage_info) metin olarak saklanır
+        records = [
+            {
+                key: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                for key, value in row.items()
+            }
+            for row in rows
+        ]
+        table = self._pa.Table.from_pylist(records, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._sink, table.schema, compression="zstd")
+        self._writer.write_table(table)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+        self._writer.close()
+        return self._sink.drain()
+
+
+def get_encoder(fmt: str):
+    if fmt == "csv":
+        return CsvEncoder()
+    if fmt == "ndjson":
+        return NdjsonEncoder()
+    if fmt == "parquet":
+        return ParquetEncoder()
+    raise ExportFormatError(f"Desteklenmeyen format: {fmt} (csv, ndjson, parquet)")
+
+
+async def stream_listings(criteria: list, encoder, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    İlanları encoder'ın formatında byte parçaları olarak üret
+
+    Encoder önceden get_encoder ile oluşturulur; böylece format hataları
+    yanıt akışı başlamadan yakalanır.
+    """
+    header = encoder.header()
+    if header:
+        yield header
+    async for rows in iter_listing_rows(criteria, chunk_size):
+        data = encoder.encode(rows)
+        if data:
+            yield data
+    tail = encoder.close()
+    if tail:
+        yield tail
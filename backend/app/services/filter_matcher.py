@@ -1,80 +1,209 @@
-from typing import Dict, Any, List
+import math
+from typing import Dict, Any, List, Optional, Tuple
 from app.models.listing import Listing
 from app.models.filter import Filter
+from app.services.scraper.extraction import fold_turkish
+from app.services.vehicle_catalog import vehicle_catalog
+
+# Sayısal aralık kriterleri: (kriter anahtarı, ilan alanı, alt sınır mı)
+RANGE_CRITERIA = [
+    ("min_year", "year", True),
+    ("max_year", "year", False),
+    ("min_price", "price", True),
+    ("max_price", "price", False),
+    ("min_mileage", "mileage", True),
+    ("max_mileage", "mileage", False),
+    # Hasar kriterleri: damage_info'dan ingest'te türetilen kolonlar
+    ("max_changed_parts", "changed_part_count", False),
+    ("max_painted_parts", "painted_part_count", False),
+    ("max_tramer", "tramer_amount", False),
+]
+# Bu alanlarda 0 "bilinmiyor" demektir (ör. fiyatı okunamamış ilan); hasar kolonlarında 0 gerçek değerdir
+ZERO_IS_UNKNOWN = {"year", "price"}
+# Sayısal kriterler; yıl/fiyat/km sınırında 0 "sınır yok" demektir, hasar sınırında 0 geçerlidir
+NUMERIC_CRITERIA = [key for key, _, _ in RANGE_CRITERIA] + ["min_discount"]
+ZERO_IS_UNSET = {"min_year", "max_year", "min_price", "max_price", "min_mileage", "max_mileage", "min_discount"}
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Sayısal kriter değeri; boş ya da sayıya çevrilemeyen değer (liste, "abc") için None"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def criteria_number(criteria: Dict[str, Any], key: str) -> Optional[float]:
+    """Kriterin sayısal sınırı; tanımsız, geçersiz ya da "sınır yok" anlamındaki 0 için None"""
+    number = parse_number(criteria.get(key))
+    if number == 0 and key in ZERO_IS_UNSET:
+        return None
+    return number
+
+
+def criteria_values(criteria: Dict[str, Any], key: str) -> List[str]:
+    """Tek değer ("BMW") ya da liste (["BMW", "Audi"]) olabilen kriteri listeye çevir"""
+    value = criteria.get(key)
+    if not value:
+        return []
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return [str(v).strip() for v in values if v and str(v).strip()]
+
+
+class CompiledFilter:
+    """
+    Filtre kriterlerinin eşleştirmeye hazır hali
+
+    Katalog çözümlemesi ve metin katlama her filtre için bir kez yapılır;
+    ilan başına yalnızca karşılaştırmalar kalır.
+    """
+    __slots__ = ("filter", "brands", "model", "model_id", "cities", "fuel_type", "transmission", "ranges", "min_discount")
+
+    def __init__(self, filter_obj: Filter):
+        criteria = filter_obj.criteria or {}
+        self.filter = filter_obj
+        brands = criteria_values(criteria, "brand")
+        model = criteria.get("model")
+        # Model tek markayla anlamlı; çok markalı filtrede yalnızca metin olarak aranır
+        self.model_id = None
+        self.brands: List[Tuple[str, Optional[int]]] = []
+        for brand in brands:
+            brand_id, model_id = vehicle_catalog.resolve(brand, model if len(brands) == 1 else None)
+            self.brands.append((brand.lower(), brand_id))
+            if len(brands) == 1:
+                self.model_id = model_id
+        self.model = model.lower() if model else None
+        self.cities = [fold_turkish(city) for city in criteria_values(criteria, "city")]
+        self.fuel_type = criteria["fuel_type"].lower() if criteria.get("fuel_type") else None
+        self.transmission = criteria["transmission"].lower() if criteria.get("transmission") else None
+        # Geçersiz sayısal değer (eski kayıtlar) taramayı düşürmez, o kriter yok sayılır
+        self.ranges = [
+            (field, bound, lower)
+            for key, field, lower in RANGE_CRITERIA
+            for bound in [criteria_number(criteria, key)]
+            if bound is not None
+        ]
+        self.min_discount = criteria_number(criteria, "min_discount")
+
+    @property
+    def brand_ids(self) -> Optional[List[int]]:
+        """Marka index'i için katalog ID'leri; markasız ya da çözülemeyen markalı filtrede None"""
+        if not self.brands or any(brand_id is None for _, brand_id in self.brands):
+            return None
+        return [brand_id for _, brand_id in self.brands]
+
+    def matches(self, listing: Listing) -> bool:
+        # Marka: değerlerden herhangi biri; ikisi de katalogda çözülebiliyorsa tamsayı karşılaştırması
+        if self.brands and not any(
+            listing.brand_id == brand_id if brand_id is not None and listing.brand_id is not None
+            else not listing.brand or text in listing.brand.lower()
+            for text, brand_id in self.brands
+        ):
+            return False
+
+        # Model kontrolü
+        if self.model_id is not None and listing.model_id is not None:
+            if listing.model_id != self.model_id:
+                return False
+        elif self.model and listing.model:
+            # Katalogda olmayan model metni ("320") başlıkta da aranır
+            if self.model not in listing.model.lower() and self.model not in (listing.title or "").lower():
+                return False
+
+        # Aralıklar (yıl, fiyat, km, hasar); ilanda bilinmeyen değer elenmez
+        for field, bound, lower in self.ranges:
+            value = getattr(listing, field)
+            if value is None or (not value and field in ZERO_IS_UNKNOWN):
+                continue
+            if (value < bound) if lower else (value > bound):
+                return False
+
+        # Şehir: değerlerden herhangi biri
+        if self.cities and listing.city:
+            city = fold_turkish(listing.city)
+            if not any(wanted in city for wanted in self.cities):
+                return False
+
+        # Yakıt tipi kontrolü
+        if self.fuel_type and listing.fuel_type:
+            if self.fuel_type != listing.fuel_type.lower():
+                return False
+
+        # Şanzıman kontrolü
+        if self.transmission and listing.transmission:
+            if self.transmission != listing.transmission.lower():
+                return False
+
+        # Fırsat eşiği: piyasa tahmini olmayan (skorlanamamış) ilanlar eşiği geçmiş sayılmaz
+        if self.min_discount:
+            return listing.deal_score is not None and listing.deal_score * 100 >= self.min_discount
+        return True
+
+
+class FilterIndex:
+    """
+    Aktif filtrelerin marka ID'sine göre index'i
+
+    Yeni ilan yalnızca kendi markasının filtreleri ve markası katalogla
+    çözülemeyen / markasız filtrelerle karşılaştırılır. Markası bilinmeyen
+    ilan (metin eşleşmesi gerekebilir) tüm filtrelerle karşılaştırılır.
+    """
+
+    def __init__(self, filters: List[Filter]):
+        self.compiled = [CompiledFilter(f) for f in filters if f.is_active]
+        self._by_brand: Dict[int, List[CompiledFilter]] = {}
+        self._unindexed: List[CompiledFilter] = []
+        for compiled in self.compiled:
+            brand_ids = compiled.brand_ids
+            if brand_ids is None:
+                self._unindexed.append(compiled)
+                continue
+            for brand_id in set(brand_ids):
+                self._by_brand.setdefault(brand_id, []).append(compiled)
+
+    def candidates(self, listing: Listing) -> List[CompiledFilter]:
+        if listing.brand_id is None:
+            return self.compiled
+        return self._by_brand.get(listing.brand_id, []) + self._unindexed
+
+    def find_matching_filters(self, listing: Listing) -> List[Filter]:
+        return [c.filter for c in self.candidates(listing) if c.matches(listing)]
+
 
 class FilterMatcher:
     """Filtre kriterlerine göre ilanları eşleştir"""
-    
+
     @staticmethod
     def matches(listing: Listing, filter_obj: Filter) -> bool:
         """
         İlanın filtre kriterlerine uyup uymadığını kontrol et
-        
+
         Args:
             listing: Kontrol edilecek ilan
             filter_obj: Filtre objesi
-        
+
         Returns:
             True eğer ilan filtreye uyuyorsa
         """
-        criteria = filter_obj.criteria
-        
-        # Marka kontrolü
-        if criteria.get("brand") and listing.brand:
-            if criteria["brand"].lower() not in listing.brand.lower():
-                return False
-        
-        # Model kontrolü
-        if criteria.get("model") and listing.model:
-            if criteria["model"].lower() not in listing.model.lower():
-                return False
-        
-        # Yıl kontrolü
-        if listing.year:
-            if criteria.get("min_year") and listing.year < criteria["min_year"]:
-                return False
-            if criteria.get("max_year") and listing.year > criteria["max_year"]:
-                return False
-        
-        # Fiyat kontrolü
-        if listing.price:
-            if criteria.get("min_price") and listing.price < criteria["min_price"]:
-                return False
-            if criteria.get("max_price") and listing.price > criteria["max_price"]:
-                return False
-        
-        # Şehir kontrolü
-        if criteria.get("city") and listing.city:
-            if criteria["city"].lower() not in listing.city.lower():
-                return False
-        
-        # Yakıt tipi kontrolü
-        if criteria.get("fuel_type") and listing.fuel_type:
-            if criteria["fuel_type"].lower() != listing.fuel_type.lower():
-                return False
-        
-        # Şanzıman kontrolü
-        if criteria.get("transmission") and listing.transmission:
-            if criteria["transmission"].lower() != listing.transmission.lower():
-                return False
-        
-        return True
-    
+        return CompiledFilter(filter_obj).matches(listing)
+
     @staticmethod
     def find_matching_filters(listing: Listing, filters: List[Filter]) -> List[Filter]:
         """
         Bir ilana uyan tüm filtreleri bul
-        
+
         Args:
             listing: İlan
             filters: Kontrol edilecek filtreler
-        
+
         Returns:
             Uyan filtrelerin listesi
         """
-        matching = []
-        for filter_obj in filters:
-            if filter_obj.is_active and FilterMatcher.matches(listing, filter_obj):
-                matching.append(filter_obj)
-        return matching
-
+        return FilterIndex(filters).find_matching_filters(listing)
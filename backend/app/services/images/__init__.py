@@ -0,0 +1,23 @@
+from .image_service import (
+    CACHE_CONTROL,
+    IMAGE_SIZES,
+    DiskLRUCache,
+    ImageError,
+    ImageService,
+    image_phash,
+    image_service,
+    normalize_image_url,
+    normalize_images,
+)
+
+__all__ = [
+    "CACHE_CONTROL",
+    "IMAGE_SIZES",
+    "DiskLRUCache",
+    "ImageError",
+    "ImageService",
+    "image_phash",
+    "image_service",
+    "normalize_image_url",
+    "normalize_images",
+]
@@ -0,0 +1,318 @@
+"""
+İlan resimleri: URL normalizasyonu ve küçük resim proxy'si
+
+- normalize_image_url / normalize_images: ingest sırasında arabam CDN URL'lerini
+  kanonik hale getirir (https, sorgu parametresiz, IMAGE_CDN_VARIANT boyut
+  varyantı). Aynı fotoğrafın farklı boyutları tek URL'ye iner ve tekilleşir.
+- ImageService: /api/images/{listing_id} için resmi CDN'den bir kez çeker,
+  Pillow ile thread pool'da küçültür ve boyutu sınırlı bir disk LRU önbelleğine
+  yazar. Aynı resme eşzamanlı istekler tek bir indirmeyi bekler.
+- image_phash / ImageService.phash: repost tespiti için algısal hash
+
+Pillow requirements.txt'tedir; eksik kurulumda resimler küçültülmeden önbelleğe
+alınır ve pHash (repost tespitinin resim yolu) devre dışı kalır - açılışta hata loglanır.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import math
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Proxy boyutları: en uzun kenar (piksel)
+IMAGE_SIZES = {"thumb": 320, "medium": 800}
+CACHE_CONTROL = "public, max-age=604800"  # 7 gün; değişiklik ETag ile yakalanır
+
+_CDN_HOST_KEYWORDS = ("arbstorage", "mncdn")
+# ..._240x180.jpg -> ..._{variant}.jpg
+_SIZE_SUFFIX = re.compile(r"_\d{2,4}x\d{2,4}(?=\.(?:jpe?g|png|webp)$)", re.IGNORECASE)
+
+
+_PHASH_SIZE = 32
+_DCT = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * _PHASH_SIZE)) for x in range(_PHASH_SIZE)]
+    for u in range(8)
+]
+
+
+class ImageError(Exception):
+    """Resim çekilemedi ya da proxy'ye izin verilmeyen bir adres"""
+
+
+def normalize_image_url(url: Optional[str], variant: Optional[str] = None) -> Optional[str]:
+    """CDN resim URL'sini kanonik hale getir; geçersizse None"""
+    if not url:
+        return None
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+
+    host = parts.netloc.lower()
+    if not any(keyword in host for keyword in _CDN_HOST_KEYWORDS):
+        return urlunsplit((parts.scheme, host, parts.path, parts.query, ""))
+    variant = settings.IMAGE_CDN_VARIANT if variant is None else variant
+    path = _SIZE_SUFFIX.sub(f"_{variant}", parts.path) if variant else parts.path
+    return urlunsplit(("https", host, path, "", ""))
+
+
+def normalize_images(urls: Iterable[Optional[str]], limit: Optional[int] = None) -> List[str]:
+    """URL listesini normalize et, tekilleştir (sıra korunur) ve limit kadarını döndür"""
+    images: List[str] = []
+    for url in urls:
+        normalized = normalize_image_url(url)
+        if normalized and normalized not in images:
+            images.append(normalized)
+            if limit and len(images) >= limit:
+                break
+    return images
+
+
+def _resize(data: bytes, max_side: int, quality: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEG'de decode sırasında ölçekle (tam boyutlu bitmap oluşmaz)
+        image.draft("RGB", (max_side, max_side))
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side))
+        output = io.BytesIO()
+        image.save(output, "JPEG", quality=quality, optimize=True, progressive=True)
+        return output.getvalue()
+
+
+def image_phash(data: bytes) -> int:
+    """
+    64 bit algısal hash (pHash): 32x32 gri tonlamanın DCT'sinde sol üst 8x8
+    katsayının medyandan büyük olup olmadığı. Yeniden boyutlandırma, sıkıştırma
+    ve küçük renk değişikliklerinde bitlerin çoğu aynı kalır.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("L", (64, 64))
+        gray = image.convert("L").resize((_PHASH_SIZE, _PHASH_SIZE), Image.LANCZOS)
+        pixels = list(gray.getdata())
+
+    rows = [pixels[y * _PHASH_SIZE:(y + 1) * _PHASH_SIZE] for y in range(_PHASH_SIZE)]
+    # Ayrılabilir DCT-II: önce satırlar, sonra sütunlar; yalnızca düşük frekanslar
+    row_dct = [[sum(p * c for p, c in zip(row, _DCT[u])) for u in range(8)] for row in rows]
+    coefficients = [
+        sum(row_dct[y][u] * _DCT[v][y] for y in range(_PHASH_SIZE))
+        for v in range(8) for u in range(8)
+    ]
+    # DC katsayısı (ortalama parlaklık) medyana katılmaz
+    median = sorted(coefficients[1:])[len(coefficients[1:]) // 2]
+    value = 0
+    for coefficient in coefficients:
+        value = (value << 1) | (coefficient > median)
+    return value
+
+
+class DiskLRUCache:
+    """Toplam boyutu sınırlı dosya önbelleği; en uzun süre okunmayan dosyalar silinir"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load(self):
+        """Mevcut dosyaları mtime sırasıyla LRU'ya al (ilk erişimde)"""
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self.total_bytes += size
+        self._loaded = True
+        self._evict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            # mtime yeniden başlatmada LRU sırasını korur
+            os.utime(self._path(key))
+            return data
+        except OSError:
+            with self._lock:
+                self.total_bytes -= self._entries.pop(key, 0)
+            return None
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+        temp_path = self._path(f"{key}.{threading.get_ident()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, self._path(key))
+        with self._lock:
+            self.total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+
+class ImageService:
+    """Küçültülmüş ilan resimlerini disk önbelleğinden sunar"""
+
+    def __init__(self):
+        self.cache = DiskLRUCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_MB * 1024 * 1024)
+        self.allowed_hosts = [h.strip().lower() for h in settings.IMAGE_PROXY_HOSTS.split(",") if h.strip()]
+        self._executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="image")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        try:
+            import PIL  # noqa: F401
+            self.can_resize = True
+        except ImportError:
+            logger.error(
+                "Pillow kurulu değil (pip install -r requirements.txt): resimler küçültülmeden "
+                "önbelleğe alınacak, repost tespiti yalnızca metinle yapılacak"
+            )
+            self.can_resize = False
+
+    def cache_key(self, url: str, size: str) -> str:
+        variant = size if self.can_resize else "original"
+        return hashlib.sha1(f"{variant}:{url}".encode("utf-8")).hexdigest()
+
+    def etag(self, url: str, size: str) -> str:
+        return f'"{self.cache_key(url, size)[:20]}"'
+
+    def content_type(self, url: str) -> str:
+        if self.can_resize:
+            return "image/jpeg"
+        return mimetypes.guess_type(urlsplit(url).path)[0] or "image/jpeg"
+
+    def is_allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        return parts.scheme in ("http", "https") and any(
+            host == allowed or host.endswith("." + allowed) for allowed in self.allowed_hosts
+        )
+
+    async def get_image(self, url: str, size: str) -> Tuple[bytes, str]:
+        """(gövde, content-type) - önbellekte yoksa çek, küçült ve yaz"""
+        if size not in IMAGE_SIZES:
+            raise ImageError(f"Geçersiz boyut: {size}")
+        if not self.is_allowed(url):
+            raise ImageError("Bu adresten resim sunulmuyor")
+
+        key = self.cache_key(url, size)
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self._executor, self.cache.get, key)
+        if data is not None:
+            CACHE_REQUESTS.inc(cache="images", result="hit")
+            return data, self.content_type(url)
+        CACHE_REQUESTS.inc(cache="images", result="miss")
+
+        # Aynı resim için eşzamanlı istekler tek indirme/küçültme işini bekler;
+        # iş ayrı task'ta yürür, isteyen istemci koparsa diğerleri etkilenmez
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(url, size, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), self.content_type(url)
+
+    async def phash(self, url: str) -> Optional[int]:
+        """Resmin pHash'i (repost tespiti için); Pillow yoksa ya da çekilemezse None"""
+        if not self.can_resize or not self.is_allowed(url):
+            return None
+        try:
+            source = await self.download(url)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, image_phash, source)
+        except Exception as e:
+            # Sessiz kalırsa repost tespiti fark edilmeden yalnızca başlık SimHash'ine düşer
+            logger.warning(f"pHash hesaplanamadı ({url}): {e}")
+            return None
+
+    async def _fetch_and_store(self, url: str, size: str, key: str) -> bytes:
+        source = await self.download(url)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._process, source, size, key)
+
+    def _process(self, source: bytes, size: str, key: str) -> bytes:
+        data = source
+        if self.can_resize:
+            try:
+                data = _resize(source, IMAGE_SIZES[size], settings.IMAGE_JPEG_QUALITY)
+            except Exception as e:
+                raise ImageError(f"Resim işlenemedi: {e}")
+        self.cache.put(key, data)
+        return data
+
+    async def download(self, url: str) -> bytes:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15, connect=5),
+                headers={"User-Agent": settings.SCRAPER_USER_AGENT},
+            )
+        try:
+            # Yönlendirme izin listesi dışındaki bir adrese götürebilir; takip edilmez
+            async with self._session.get(url, allow_redirects=False) as response:
+                if response.status != 200:
+                    raise ImageError(f"CDN yanıtı: HTTP {response.status}")
+                if (response.content_length or 0) > settings.IMAGE_MAX_SOURCE_BYTES:
+                    raise ImageError("Resim çok büyük")
+                # content.read(n) yalnızca tampondakini döndürür; gövde parça parça, boyut sınırıyla okunur
+                chunks = []
+                size = 0
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    size += len(chunk)
+                    if size > settings.IMAGE_MAX_SOURCE_BYTES:
+                        raise ImageError("Resim çok büyük")
+                    chunks.append(chunk)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ImageError(f"Resim indirilemedi: {e}")
+        return b"".join(chunks)
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._executor.shutdown(wait=False)
+
+
+image_service = ImageService()
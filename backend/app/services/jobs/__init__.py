@@ -0,0 +1,3 @@
+from .job_service import Job, JobManager, job_manager
+
+__all__ = ["Job", "JobManager", "job_manager"]
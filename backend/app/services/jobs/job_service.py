@@ -0,0 +1,190 @@
+"""
+Arka plan iş (job) servisi
+
+Uzun süren tarama isteklerini (hızlı tarama, filtre araması) HTTP isteğinden
+ayırır. POST endpoint'leri hemen bir job ID döner, ilerleme ve sonuç
+GET /api/jobs/{id} ve /api/ws üzerinden takip edilir.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """Tek bir arka plan işinin durumu"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, kind: str, user_id: int, dedupe_key: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.user_id = user_id
+        self.dedupe_key = dedupe_key
+        self.status = self.PENDING
+        self.progress = 0
+        self.message = "Sıraya alındı"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    async def update(self, progress: int, message: str):
+        """İlerlemeyi güncelle ve kullanıcıya WebSocket ile bildir"""
+        self.status = self.RUNNING
+        self.progress = max(0, min(100, progress))
+        self.message = message
+        await self._push("job_progress")
+
+    async def _push(self, message_type: str):
+        try:
+            await manager.send_personal_message(
+                {"type": message_type, "job": self.to_dict()},
+                self.user_id
+            )
+        except Exception as e:
+            logger.debug(f"Job bildirimi gönderilemedi ({self.id}): {e}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+JobRunner = Callable[[Job], Awaitable[Dict[str, Any]]]
+# Yeni iş açılmadan hemen önce çağrılır (ör. kota tüketimi); hata fırlatırsa iş açılmaz
+StartHook = Callable[[], Awaitable[None]]
+
+
+class JobManager:
+    """In-memory job kaydı - aynı anahtarlı çalışan işleri tekrar kullanır"""
+
+    # Bitmiş işlerin bellekte tutulma süresi
+    FINISHED_JOB_TTL = timedelta(hours=1)
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        # dedupe_key -> çalışan job ID
+        self._running: Dict[str, str] = {}
+        # dedupe_key -> [kilit, bekleyen sayısı] (submit_guarded kritik bölümü)
+        self._start_locks: Dict[str, List[Any]] = {}
+
+    def submit(self, kind: str, user_id: int, dedupe_key: str, runner: JobRunner) -> Job:
+        """
+        Yeni iş başlat veya aynı anahtarla çalışan işi döndür
+
+        Args:
+            kind: İş tipi (quick_search, filter_search)
+            user_id: İşin sahibi
+            dedupe_key: Tekrarlanan tıklamaları birleştirmek için anahtar
+            runner: job'u alıp sonuç sözlüğü döndüren coroutine
+
+        Returns:
+            Job nesnesi (yeni veya mevcut)
+        """
+        self._prune()
+
+        running = self.find_running(dedupe_key)
+        if running:
+            logger.info(f"Çalışan iş tekrar kullanılıyor: {dedupe_key} -> {running.id}")
+            return running
+
+        job = Job(kind, user_id, dedupe_key)
+        self.jobs[job.id] = job
+        self._running[dedupe_key] = job.id
+        job.task = asyncio.create_task(self._run(job, runner))
+        return job
+
+    async def submit_guarded(
+        self,
+        kind: str,
+        user_id: int,
+        dedupe_key: str,
+        runner: JobRunner,
+        before_start: StartHook
+    ) -> Job:
+        """
+        submit ile aynı, ama before_start yalnızca yeni iş açılırken çağrılır
+
+        Çalışan iş kontrolü, before_start ve submit aynı anahtar için tek bir
+        kritik bölümdedir: eşzamanlı tekrar tıklamalar tek iş açar ve
+        before_start (kota) bir kez çalışır.
+        """
+        entry = self._start_locks.setdefault(dedupe_key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                running = self.find_running(dedupe_key)
+                if running:
+                    logger.info(f"Çalışan iş tekrar kullanılıyor: {dedupe_key} -> {running.id}")
+                    return running
+                await before_start()
+                return self.submit(kind, user_id, dedupe_key, runner)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._start_locks[dedupe_key]
+
+    def find_running(self, dedupe_key: str) -> Optional[Job]:
+        """Aynı anahtarla çalışan iş (kota tüketmeden önce tekrar tıklamayı ayırt etmek için)"""
+        running_id = self._running.get(dedupe_key)
+        return self.jobs.get(running_id) if running_id else None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def list_for_user(self, user_id: int) -> list:
+        return [j for j in self.jobs.values() if j.user_id == user_id]
+
+    async def _run(self, job: Job, runner: JobRunner):
+        try:
+            await job.update(1, "Başlatılıyor")
+            job.result = await runner(job)
+            job.status = Job.COMPLETED
+            job.progress = 100
+            job.message = (job.result or {}).get("message", "Tamamlandı")
+        except Exception as e:
+            logger.error(f"Job hatası ({job.kind} {job.id}): {e}", exc_info=True)
+            job.status = Job.FAILED
+            job.error = str(e)
+            job.message = f"Hata: {str(e)}"
+        finally:
+            job.finished_at = datetime.utcnow()
+            if self._running.get(job.dedupe_key) == job.id:
+                del self._running[job.dedupe_key]
+            await job._push("job_done")
+
+    def _prune(self):
+        """Süresi dolan bitmiş işleri temizle"""
+        cutoff = datetime.utcnow() - self.FINISHED_JOB_TTL
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.is_finished and job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+# Singleton instance
+job_manager = JobManager()
@@ -0,0 +1,3 @@
+from .price_model import PriceModel, fit_bucket, price_model, year_bucket
+
+__all__ = ["PriceModel", "fit_bucket", "price_model", "year_bucket"]
@@ -0,0 +1,338 @@
+"""
+Piyasa fiyatı tahmini ve fırsat skoru (deal score)
+
+Her (marka, model, yıl kovası) için son PRICING_WINDOW_DAYS günün ilanlarından
+log(fiyat) üzerinde robust istatistikler price_stats tablosunda tutulur:
+- km eğimi: 10.000 km başına log fiyat değişimi (Theil-Sen; en fazla
+  SLOPE_SAMPLE ilanlık km'ye göre eşit aralıklı örnek üzerinden)
+- merkez: km'ye göre düzeltilmiş log fiyatların medyanı (kovanın medyan km'sinde)
+- yayılım: artıkların MAD'i (aykırı fiyatları ayıklamak için)
+
+Tablo bellekte sözlük olarak tutulur; ingest'te her ilan tek sözlük erişimiyle
+(O(1)) skorlanır: market_price = exp(merkez + eğim * Δkm), deal_score =
+1 - fiyat / market_price. Skorlanan ilanın kovası "kirli" işaretlenir ve
+scheduler her PRICING_REFRESH_MINUTES'ta yalnızca kirli kovaları yeniden
+hesaplar; günde bir kez tüm tablo baştan kurulur. Repost'lar (canonical_id)
+istatistiklere katılmaz, aynı araç iki kez sayılmasın.
+"""
+import asyncio
+import logging
+import math
+import threading
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, delete, select
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.models.listing import Listing
+from app.models.price_stat import PriceStat
+
+logger = logging.getLogger(__name__)
+
+MILEAGE_UNIT = 10000  # Eğim birimi (km)
+MIN_MILEAGE_GAP = 1000  # Theil-Sen'de bundan yakın km çiftleri atlanır
+MIN_SLOPE = -0.1  # 10.000 km başına en fazla %10 değer kaybı; km arttıkça fiyat artmaz
+SLOPE_SAMPLE = 60  # Theil-Sen çift sayısı O(n²), kova başına örnek sınırı
+MAD_SCALE = 1.4826  # MAD -> normal dağılımda standart sapma
+MIN_SPREAD = 0.02  # z-skorunda sıfıra bölmeyi önler (aynı fiyatlı ilanlardan oluşan kova)
+
+Key = Tuple[int, int, int]
+
+
+def year_bucket(year: int) -> int:
+    return year - year % settings.PRICING_YEAR_BUCKET
+
+
+def _median(values: List[float]) -> float:
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def fit_bucket(samples: Iterable[Tuple[float, Optional[int]]]) -> Optional[Dict[str, Any]]:
+    """(fiyat, km) örneklerinden kova istatistikleri; örnek yetersizse None"""
+    points = [(math.log(price), mileage or None) for price, mileage in samples if price and price > 0]
+    if len(points) < settings.PRICING_MIN_SAMPLES:
+        return None
+
+    slope = 0.0
+    median_mileage = None
+    with_mileage = sorted((mileage, log_price) for log_price, mileage in points if mileage)
+    if len(with_mileage) >= settings.PRICING_MIN_SAMPLES:
+        median_mileage = with_mileage[len(with_mileage) // 2][0]
+        sample = with_mileage[::max(1, len(with_mileage) // SLOPE_SAMPLE)]
+        slopes = [
+            (y2 - y1) / ((x2 - x1) / MILEAGE_UNIT)
+            for i, (x1, y1) in enumerate(sample)
+            for x2, y2 in sample[i + 1:]
+            if x2 - x1 >= MIN_MILEAGE_GAP
+        ]
+        if slopes:
+            slope = min(0.0, max(MIN_SLOPE, _median(slopes)))
+
+    residuals = [
+        log_price - slope * (mileage - median_mileage) / MILEAGE_UNIT if mileage and median_mileage else log_price
+        for log_price, mileage in points
+    ]
+    center = _median(residuals)
+    return {
+        "sample_count": len(points),
+        "log_center": center,
+        "log_mad": _median([abs(r - center) for r in residuals]),
+        "median_mileage": median_mileage,
+        "mileage_slope": slope,
+        "median_price": round(math.exp(center), 2),
+    }
+
+
+class PriceModel:
+    """price_stats tablosunun bellekteki kopyası ve ingest skorlaması"""
+
+    def __init__(self):
+        self.loaded = False
+        self._stats: Dict[Key, Dict[str, Any]] = {}
+        self._dirty: Set[Key] = set()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def key_for(brand_id: Optional[int], model_id: Optional[int], year: Optional[int]) -> Optional[Key]:
+        # Marka geneli istatistik tutulmaz: aynı markanın farklı modelleri sahte fırsat üretir
+        if not brand_id or not model_id or not year:
+            return None
+        return brand_id, model_id, year_bucket(year)
+
+    def estimate(
+        self,
+        brand_id: Optional[int],
+        model_id: Optional[int],
+        year: Optional[int],
+        mileage: Optional[int] = None
+    ) -> Optional[Tuple[float, float]]:
+        """(piyasa log fiyatı, ölçeklenmiş yayılım); kovada istatistik yoksa None"""
+        key = self.key_for(brand_id, model_id, year)
+        stat = self._stats.get(key) if key else None
+        if stat is None:
+            return None
+        log_price = stat["log_center"]
+        if mileage and stat["median_mileage"]:
+            log_price += stat["mileage_slope"] * (mileage - stat["median_mileage"]) / MILEAGE_UNIT
+        return log_price, max(stat["log_mad"] * MAD_SCALE, MIN_SPREAD)
+
+    def score(
+        self,
+        price: Optional[float],
+        brand_id: Optional[int],
+        model_id: Optional[int],
+        year: Optional[int],
+        mileage: Optional[int] = None
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """(market_price, deal_score); aykırı fiyatta deal_score None"""
+        if not price or price <= 0:
+            return None, None
+        estimate = self.estimate(brand_id, model_id, year, mileage)
+        if estimate is None:
+            return None, None
+        log_market, spread = estimate
+        market_price = round(math.exp(log_market), -2)
+        if abs(math.log(price) - log_market) / spread > settings.PRICING_OUTLIER_Z:
+            return market_price, None
+        return market_price, round(1 - price / math.exp(log_market), 4)
+
+    def apply(self, listing: Listing):
+        """Yeni ilanın market_price / deal_score'unu doldur, kovasını yenilenecek olarak işaretle"""
+        if not settings.PRICING_ENABLED:
+            return
+        self.ensure_loaded()
+        listing.market_price, listing.deal_score = self.score(
+            listing.price, listing.brand_id, listing.model_id, listing.year, listing.mileage
+        )
+        key = self.key_for(listing.brand_id, listing.model_id, listing.year)
+        if key:
+            with self._lock:
+                self._dirty.add(key)
+
+    def _samples_query(self):
+        cutoff = datetime.utcnow() - timedelta(days=settings.PRICING_WINDOW_DAYS)
+        return select(Listing.price, Listing.mileage).where(
+            Listing.scraped_at >= cutoff,
+            Listing.canonical_id == None,
+            Listing.price > 0,
+        )
+
+    def _store(self, connection: Connection, stats: Dict[Key, Dict[str, Any]]):
+        rows = [
+            {"brand_id": brand_id, "model_id": model_id, "year_bucket": bucket, **stat}
+            for (brand_id, model_id, bucket), stat in stats.items()
+        ]
+        for start in range(0, len(rows), 1000):
+            connection.execute(PriceStat.__table__.insert(), rows[start:start + 1000])
+
+    def rebuild(self, connection: Connection) -> int:
+        """Tüm kovaları baştan hesapla (tek tarama, kovalar sıralı akar); kova sayısını döndür"""
+        cutoff = datetime.utcnow() - timedelta(days=settings.PRICING_WINDOW_DAYS)
+        result = connection.execution_options(stream_results=True, yield_per=5000).execute(
+            select(Listing.brand_id, Listing.model_id, Listing.year, Listing.price, Listing.mileage)
+            .where(
+                Listing.scraped_at >= cutoff,
+                Listing.canonical_id == None,
+                Listing.price > 0,
+                Listing.brand_id != None,
+                Listing.model_id != None,
+                Listing.year != None,
+            )
+            .order_by(Listing.brand_id, Listing.model_id, Listing.year)
+        )
+        stats: Dict[Key, Dict[str, Any]] = {}
+        for key, rows in groupby(result, key=lambda row: (row[0], row[1], year_bucket(row[2]))):
+            stat = fit_bucket((row[3], row[4]) for row in rows)
+            if stat:
+                stats[key] = stat
+
+        connection.execute(delete(PriceStat))
+        self._store(connection, stats)
+        self._stats = stats
+        self.loaded = True
+        return len(stats)
+
+    def refresh(self, connection: Connection, keys: Iterable[Key]) -> int:
+        """Yalnızca verilen kovaları yeniden hesapla; güncellenen kova sayısını döndür"""
+        updated: Dict[Key, Dict[str, Any]] = {}
+        removed: List[Key] = []
+        for key in keys:
+            brand_id, model_id, bucket = key
+            rows = connection.execute(
+                self._samples_query().where(
+                    Listing.brand_id == brand_id,
+                    Listing.model_id == model_id,
+                    Listing.year >= bucket,
+                    Listing.year < bucket + settings.PRICING_YEAR_BUCKET,
+                )
+            ).all()
+            stat = fit_bucket(rows)
+            connection.execute(delete(PriceStat).where(
+                PriceStat.brand_id == brand_id,
+                PriceStat.model_id == model_id,
+                PriceStat.year_bucket == bucket,
+            ))
+            if stat:
+                updated[key] = stat
+            else:
+                removed.append(key)
+
+        self._store(connection, updated)
+        for key in removed:
+            self._stats.pop(key, None)
+        self._stats.update(updated)
+        return len(updated)
+
+    def rescore_listings(self, connection: Connection, chunk_size: int = 1000) -> int:
+        """Mevcut ilanların skorlarını güncel tabloyla yeniden hesapla (id sırasıyla parça parça)"""
+        listings = Listing.__table__
+        statement = (
+            listings.update()
+            .where(listings.c.id == bindparam("row_id"))
+            .values(market_price=bindparam("market"), deal_score=bindparam("deal"))
+        )
+        last_id = 0
+        updated = 0
+        while True:
+            rows = connection.execute(
+                select(Listing.id, Listing.price, Listing.brand_id, Listing.model_id, Listing.year, Listing.mileage)
+                .where(Listing.id > last_id, Listing.model_id != None, Listing.year != None)
+                .order_by(Listing.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            values = []
+            for listing_id, *features in rows:
+                market, deal = self.score(*features)
+                values.append({"row_id": listing_id, "market": market, "deal": deal})
+            connection.execute(statement, values)
+            updated += sum(1 for v in values if v["market"] is not None)
+            last_id = rows[-1][0]
+        return updated
+
+    def load(self, connection: Connection):
+        self._stats = {
+            (row.brand_id, row.model_id, row.year_bucket): {
+                "sample_count": row.sample_count,
+                "log_center": row.log_center,
+                "log_mad": row.log_mad,
+                "median_mileage": row.median_mileage,
+                "mileage_slope": row.mileage_slope,
+                "median_price": row.median_price,
+            }
+            for row in connection.execute(select(PriceStat.__table__))
+        }
+        self.loaded = True
+        logger.info(f"Fiyat modeli yüklendi: {len(self._stats)} kova")
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        from app.core.database import engine
+
+        with self._load_lock:
+            if self.loaded:
+                return
+            try:
+                with engine.connect() as connection:
+                    self.load(connection)
+            except Exception as e:
+                logger.warning(f"Fiyat modeli yüklenemedi, ilanlar skorlanmayacak: {e}")
+                self.loaded = True
+
+    async def ensure_loaded_async(self):
+        """Tabloyu event loop'u bloklamadan yükle; apply() ingest döngüsünde senkron çalışır"""
+        if settings.PRICING_ENABLED and not self.loaded:
+            await asyncio.get_running_loop().run_in_executor(None, self.ensure_loaded)
+
+    def refresh_dirty(self) -> int:
+        """Kirli kovaları yenile (scheduler'dan thread pool'da çağrılır)"""
+        from app.core.database import engine
+
+        self.ensure_loaded()
+        with self._lock:
+            keys, self._dirty = self._dirty, set()
+        if not keys:
+            return 0
+        try:
+            with engine.begin() as connection:
+                return self.refresh(connection, keys)
+        except Exception:
+            with self._lock:
+                self._dirty |= keys
+            raise
+
+    def bootstrap(self) -> Tuple[int, int]:
+        """
+        price_stats boşsa (ör. 0007 migration'ından sonraki ilk açılış) tabloyu
+        kur ve mevcut ilanları skorla; (kova, skorlanan ilan) döndürür
+        """
+        from app.core.database import engine
+
+        self.ensure_loaded()
+        if self._stats:
+            return 0, 0
+        with self._lock:
+            self._dirty.clear()
+        with engine.begin() as connection:
+            buckets = self.rebuild(connection)
+            scored = self.rescore_listings(connection) if buckets else 0
+        return buckets, scored
+
+    def rebuild_all(self) -> int:
+        from app.core.database import engine
+
+        with self._lock:
+            self._dirty.clear()
+        with engine.begin() as connection:
+            return self.rebuild(connection)
+
+
+price_model = PriceModel()
@@ -0,0 +1,105 @@
+"""
+Günlük arama limiti sayacı
+
+Sayaç artırma, limit kontrolü ve gün dönümü sıfırlaması tek bir atomik
+UPDATE ... RETURNING ifadesiyle yapılır. Okuma-değiştirme-yazma yarışı
+olmaz ve arama başına tek bir yazma transaction'ı yeterlidir.
+(RETURNING: PostgreSQL ve SQLite 3.35+)
+"""
+from datetime import date
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+def _needs_reset(today: date):
+    return or_(User.last_reset_date.is_(None), User.last_reset_date < today)
+
+
+def _quota_statement(user_id: int, today: date):
+    """Sayaç artırma + gün dönümü sıfırlama + limit kontrolü yapan tek UPDATE"""
+    needs_reset = _needs_reset(today)
+    current_count = func.coalesce(User.daily_search_count, 0)
+
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .where(or_(
+            and_(needs_reset, User.daily_search_limit > 0),
+            current_count < User.daily_search_limit
+        ))
+        .values(
+            daily_search_count=case((needs_reset, 1), else_=current_count + 1),
+            last_reset_date=today
+        )
+        .returning(User.daily_search_count, User.daily_search_limit)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _quota_state_statement(user_id: int, today: date):
+    """Reddedilen UPDATE sonrası veritabanındaki güncel sayaç ve limit (gün dönümü dahil)"""
+    return select(
+        case((_needs_reset(today), 0), else_=func.coalesce(User.daily_search_count, 0)),
+        User.daily_search_limit
+    ).where(User.id == user_id)
+
+
+def _quota_result(row, allowed: bool) -> Tuple[bool, Optional[int], Optional[int]]:
+    if row is None:
+        return allowed, None, None
+    return allowed, row[0], row[1]
+
+
+def consume_search_quota(
+    db: Session,
+    user_id: int,
+    today: Optional[date] = None
+) -> Tuple[bool, Optional[int], Optional[int]]:
+    """
+    Kullanıcının günlük arama hakkından bir tane düş
+
+    Args:
+        db: Veritabanı session'ı (commit burada yapılır)
+        user_id: Kullanıcı ID
+        today: Test/benchmark için gün (varsayılan: bugün)
+
+    Returns:
+        (izin_verildi, güncel_sayaç, limit) - limit dolmuşsa veritabanındaki
+        güncel sayaç ve limit ile (False, sayaç, limit)
+    """
+    today = today or date.today()
+    row = db.execute(_quota_statement(user_id, today)).first()
+    allowed = row is not None
+    if not allowed:
+        row = db.execute(_quota_state_statement(user_id, today)).first()
+
+    # Session'daki nesneler (ör. current_user) commit sonrası expire edilmesin -
+    # aksi halde ilk attribute erişimi ek bir SELECT (refresh) tetikler
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+    return _quota_result(row, allowed)
+
+
+async def consume_search_quota_async(
+    db: AsyncSession,
+    user_id: int,
+    today: Optional[date] = None
+) -> Tuple[bool, Optional[int], Optional[int]]:
+    """consume_search_quota'nın AsyncSession sürümü (AsyncSessionLocal expire_on_commit=False)"""
+    today = today or date.today()
+    row = (await db.execute(_quota_statement(user_id, today))).first()
+    allowed = row is not None
+    if not allowed:
+        row = (await db.execute(_quota_state_statement(user_id, today))).first()
+    await db.commit()
+    return _quota_result(row, allowed)
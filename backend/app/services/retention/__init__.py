@@ -0,0 +1,3 @@
+from .retention_service import ListingArchiveWriter, RetentionService, retention_service
+
+__all__ = ["ListingArchiveWriter", "RetentionService", "retention_service"]
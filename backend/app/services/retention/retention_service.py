@@ -0,0 +1,146 @@
+"""
+İlan saklama (retention) servisi
+
+Eski ilanlar sabit bellekle ve kısa transaction'larla silinir:
+- scraped_at < cutoff olan ilanlar toplu silme servisiyle (keyset parçalar)
+  favori/bildirimleriyle birlikte silinir
+- İsteğe bağlı olarak silinmeden önce arşive yazılır (gzip JSONL veya Parquet)
+
+Böylece tablo uzun süre kilitlenmez ve ID listesi belleğe hiç yüklenmez.
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.listing import Listing
+from app.services.bulk_delete import BulkDeleteService, bulk_delete_service
+from app.services.export import listing_parquet_schema
+
+logger = logging.getLogger(__name__)
+
+LISTING_COLUMNS = [attr.key for attr in inspect(Listing).column_attrs]
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(value)}")
+
+
+class ListingArchiveWriter:
+    """Silinecek ilanları parça parça arşiv dosyasına yazar (sabit bellek)"""
+
+    def __init__(self, directory: str, fmt: str = "jsonl"):
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        self.format = fmt
+        self.count = 0
+        self._parquet_writer = None
+        self._file = None
+
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                logger.warning("pyarrow kurulu değil, arşiv JSONL olarak yazılacak")
+                self.format = "jsonl"
+
+        extension = "parquet" if self.format == "parquet" else "jsonl.gz"
+        self.path = os.path.join(directory, f"listings_archive_{stamp}.{extension}")
+        if self.format == "jsonl":
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+
+    def write(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        if self.format == "parquet":
+            self._write_parquet(rows)
+        else:
+            for row in rows:
+                self._file.write(json.dumps(row, ensure_ascii=False, default=_json_default) + "\n")
+        self.count += len(rows)
+
+    def _write_parquet(self, rows: List[Dict[str, Any]]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # JSON kolonları (images, damage_info) Parquet'te metin olarak saklanır
+        records = [
+            {
+                key: json.dumps(value, ensure_ascii=False, default=_json_default)
+                if isinstance(value, (dict, list)) else value
+                for key, value in row.items()
+            }
+            for row in rows
+        ]
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(
+                self.path, listing_parquet_schema(LISTING_COLUMNS), compression="zstd"
+            )
+        self._parquet_writer.write_table(pa.Table.from_pylist(records, schema=self._parquet_writer.schema))
+
+    def close(self):
+        if self._file:
+            self._file.close()
+        if self._parquet_writer:
+            self._parquet_writer.close()
+        if self.count == 0 and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class RetentionService:
+    """Eski ilanları toplu silme servisi ile parça parça temizler"""
+
+    def __init__(
+        self,
+        retention_days: int,
+        archive_dir: str = "",
+        archive_format: str = "jsonl",
+        deleter: BulkDeleteService = bulk_delete_service
+    ):
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.archive_format = archive_format
+        self.deleter = deleter
+
+    async def purge_old_listings(self, cutoff: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        cutoff'tan eski ilanları sil
+
+        Returns:
+            {"listings": silinen ilan, "favorites": silinen favori, "chunks": transaction sayısı,
+             "archive": arşiv dosyası yolu veya None}
+        """
+        cutoff = cutoff or datetime.utcnow() - timedelta(days=self.retention_days)
+        archive = ListingArchiveWriter(self.archive_dir, self.archive_format) if self.archive_dir else None
+
+        async def archive_chunk(db: AsyncSession, ids: List[int]):
+            # Arşiv silmeden önce yazılır; yazma hatasında parça silinmez
+            listings = (await db.scalars(select(Listing).where(Listing.id.in_(ids)).order_by(Listing.id))).all()
+            archive.write([{key: getattr(listing, key) for key in LISTING_COLUMNS} for listing in listings])
+
+        try:
+            stats = await self.deleter.delete_listings(
+                Listing.scraped_at < cutoff,
+                before_delete=archive_chunk if archive else None
+            )
+        finally:
+            if archive:
+                archive.close()
+
+        stats["archive"] = archive.path if archive and archive.count else None
+        return stats
+
+
+retention_service = RetentionService(
+    retention_days=settings.LISTING_RETENTION_DAYS,
+    archive_dir=settings.RETENTION_ARCHIVE_DIR,
+    archive_format=settings.RETENTION_ARCHIVE_FORMAT
+)
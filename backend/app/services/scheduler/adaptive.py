@@ -0,0 +1,102 @@
+"""
+Adaptif tarama aralığı hesaplama
+
+Her kanonik arama URL'si için yeni ilan geliş hızı (ilan/saat) zaman ağırlıklı
+EWMA ile tahmin edilir. Adaptif moddaki filtrelerin tarama aralığı bu hıza göre
+paket (tier) sınırları içinde kısaltılır veya uzatılır: sıcak aramalar daha sık,
+ölü aramalar daha seyrek taranır.
+"""
+import math
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.filter import Filter
+from app.models.scan_watermark import ScanWatermark
+
+# Paket başına (min, max) tarama aralığı - dakika
+TIER_INTERVAL_BOUNDS = {
+    "free": (30, 1440),
+    "basic": (15, 720),
+    "pro": (5, 360),
+}
+
+# EWMA zaman sabiti (saat) - eski gözlemlerin ağırlığı bu sürede ~1/e'ye düşer
+RATE_TIME_CONSTANT_HOURS = 6.0
+
+# Hedef: tarama başına ortalama bu kadar yeni ilan
+TARGET_NEW_PER_SCAN = 1.0
+
+
+def get_interval_bounds(tier: Optional[str]) -> Tuple[int, int]:
+    """Paket için (min, max) tarama aralığını döndür"""
+    return TIER_INTERVAL_BOUNDS.get(tier or "free", TIER_INTERVAL_BOUNDS["free"])
+
+
+def current_interval(filter_obj: Filter) -> int:
+    """Filtrenin bir sonraki tarama için kullanacağı aralık (dakika)"""
+    if filter_obj.adaptive_scan_enabled and filter_obj.effective_scan_interval:
+        return filter_obj.effective_scan_interval
+    return filter_obj.scan_interval or 30
+
+
+def update_arrival_rate(
+    db: Session,
+    search_url: str,
+    new_count: int,
+    now: Optional[datetime] = None
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Arama URL'si için yeni ilan geliş hızını (ilan/saat) güncelle
+
+    Zaman ağırlıklı EWMA: alpha = 1 - exp(-geçen_süre / tau). Aynı aramayı
+    paylaşan filtreler art arda tarandığında kısa aralıklı gözlemler tahmini
+    bozmaz. Commit çağırana bırakılır.
+
+    Returns:
+        (bu gözlemden önceki hız, güncel hız); tahmin henüz yoksa None.
+        İlk gözlemde geçen süre bilinmediğinden ikisi de None'dır.
+    """
+    now = now or datetime.utcnow()
+    state = db.query(ScanWatermark).filter(ScanWatermark.search_url == search_url).first()
+    if state is None:
+        state = ScanWatermark(search_url=search_url, last_ilan_id=0)
+        db.add(state)
+
+    if state.rate_updated_at is None:
+        # İlk gözlem - geçen süre bilinmiyor, sadece zaman damgası koy
+        state.rate_updated_at = now
+        return None, None
+
+    previous = state.arrival_rate
+    last = state.rate_updated_at.replace(tzinfo=None)
+    elapsed_hours = max((now - last).total_seconds() / 3600.0, 1e-6)
+    instant_rate = new_count / elapsed_hours
+    if previous is None:
+        # İkinci gözlem: ilk ölçülen aralıktaki hızla başla (0'dan EWMA tahmini aşağı çeker)
+        state.arrival_rate = instant_rate
+    else:
+        alpha = 1.0 - math.exp(-elapsed_hours / RATE_TIME_CONSTANT_HOURS)
+        state.arrival_rate = alpha * instant_rate + (1.0 - alpha) * previous
+    state.rate_updated_at = now
+    return previous, state.arrival_rate
+
+
+def compute_interval(arrival_rate: float, tier: Optional[str]) -> int:
+    """
+    Geliş hızından tarama aralığını hesapla (dakika)
+
+    Tarama başına TARGET_NEW_PER_SCAN yeni ilan düşecek şekilde aralık seçilir
+    ve paket sınırlarına kırpılır.
+    """
+    min_interval, max_interval = get_interval_bounds(tier)
+    if arrival_rate <= 0:
+        return max_interval
+    interval = int(round(TARGET_NEW_PER_SCAN / arrival_rate * 60))
+    return max(min_interval, min(max_interval, interval))
+
+
+def predict_yield(arrival_rate: float, interval_minutes: float) -> float:
+    """Verilen aralıkta beklenen yeni ilan sayısı"""
+    return round((arrival_rate or 0.0) * interval_minutes / 60.0, 2)
@@ -2,29 +2,63 @@
 Otomatik tarama scheduler servisi
 """
 import asyncio
+import heapq
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal, run_in_db_thread
+from app.core.metrics import NEW_LISTINGS, SCAN_PHASE_SECONDS, SCAN_QUEUE_DEPTH, SCAN_QUEUE_OVERDUE
+from app.core.response_cache import FILTERS, LISTINGS, response_cache
 from app.models.filter import Filter
 from app.models.listing import Listing
 from app.models.user import User
+from app.services.dedupe import repost_detector
+from app.services.filter_matcher import CompiledFilter
+from app.services.pricing import price_model
 from app.services.scraper.scraper import ArabaComScraper
+from app.services.scraper.extraction import damage_features, listing_key
 from app.services.telegram import telegram_service
+from app.services.scheduler import adaptive
+from app.services.retention import retention_service
 
 logger = logging.getLogger(__name__)
 
+
+def _as_naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """DB'den gelen tarihleri (SQLite naive / PostgreSQL aware) naive UTC'ye çevir"""
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
 class SchedulerService:
     _instance: Optional['SchedulerService'] = None
     
+    # Bellekteki kuyruğun DB ile güvenlik amaçlı yeniden senkronize edilme aralığı
+    QUEUE_RELOAD_MINUTES = 15
+    
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
         self.is_running = False
         
+        # Tarama kuyruğu: (next_scan_at, filter_id) min-heap
+        # _scheduled her filtrenin geçerli zamanını tutar; heap'teki eski kayıtlar
+        # pop edilirken atlanır (lazy deletion)
+        self._queue: List[Tuple[datetime, int]] = []
+        self._scheduled: Dict[int, datetime] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        
+        SCAN_QUEUE_DEPTH.set_function(lambda: len(self._scheduled))
+        SCAN_QUEUE_OVERDUE.set_function(self._count_overdue)
+        
     @classmethod
     def get_instance(cls) -> 'SchedulerService':
         if cls._instance is None:
@@ -39,11 +73,16 @@ class SchedulerService:
             
         logger.info("Scheduler başlatılıyor...")
         
-        # Her dakika aktif filtreleri kontrol et
+        # Tarama kuyruğunu DB'den yükle ve bir sonraki taramaya kadar uyuyan döngüyü başlat
+        self._wakeup = asyncio.Event()
+        await self._reload_queue()
+        self._loop_task = asyncio.create_task(self._scan_loop())
+        
+        # Kuyruğu periyodik olarak DB ile senkronize et (başka process'lerden gelen değişiklikler için)
         self.scheduler.add_job(
-            self._check_and_run_scans,
-            IntervalTrigger(minutes=1),
-            id='check_scans',
+            self._reload_queue,
+            IntervalTrigger(minutes=self.QUEUE_RELOAD_MINUTES),
+            id='reload_scan_queue',
             replace_existing=True
         )
         
@@ -63,6 +102,29 @@ class SchedulerService:
             replace_existing=True
         )
         
+        # Yeni ilan gelen fiyat kovalarını artımlı, tüm tabloyu günde bir kez yeniden hesapla
+        self.scheduler.add_job(
+            self._refresh_price_model,
+            IntervalTrigger(minutes=settings.PRICING_REFRESH_MINUTES),
+            id='refresh_price_model',
+            replace_existing=True
+        )
+        self.scheduler.add_job(
+            self._refresh_price_model,
+            IntervalTrigger(hours=24),
+            kwargs={"full": True},
+            id='rebuild_price_model',
+            replace_existing=True
+        )
+        
+        # Fiyat tablosu boşsa (0007 migration'ı sonrası) kur ve mevcut ilanları skorla
+        self.scheduler.add_job(
+            self._bootstrap_price_model,
+            'date',
+            run_date=datetime.utcnow() + timedelta(seconds=5),
+            id='bootstrap_price_model'
+        )
+        
         # Başlangıçta bir kez temizlik yap
         self.scheduler.add_job(
             self._cleanup_old_listings,
@@ -77,83 +139,139 @@ class SchedulerService:
         
     async def stop(self):
         """Scheduler'ı durdur"""
+        if self._loop_task:
+            self._loop_task.cancel()
+            self._loop_task = None
         if self.scheduler.running:
             self.scheduler.shutdown(wait=False)
             self.is_running = False
             logger.info("Scheduler durduruldu")
     
-    async def _cleanup_old_listings(self):
-        """30 günden eski ilanları temizle"""
-        db = SessionLocal()
+    def schedule_filter(self, filter_id: int, next_scan_at: Optional[datetime]):
+        """Filtreyi kuyruğa ekle veya zamanını güncelle"""
+        due = _as_naive_utc(next_scan_at) or datetime.utcnow()
+        self._scheduled[filter_id] = due
+        heapq.heappush(self._queue, (due, filter_id))
+        if self._wakeup:
+            self._wakeup.set()
+    
+    def unschedule_filter(self, filter_id: int):
+        """Filtreyi kuyruktan çıkar (heap kaydı pop edilirken atlanır)"""
+        self._scheduled.pop(filter_id, None)
+    
+    def sync_filter(self, filter_obj: Filter):
+        """Filtre oluşturma/güncelleme/toggle sonrası kuyruğu filtre durumuyla eşitle"""
+        if filter_obj.auto_scan_enabled and filter_obj.is_active:
+            self.schedule_filter(filter_obj.id, filter_obj.next_scan_at)
+        else:
+            self.unschedule_filter(filter_obj.id)
+    
+    async def _reload_queue(self):
+        """Kuyruğu DB'den yeniden oluştur (idx_filters_autoscan_due index'i kullanılır)"""
         try:
-            from app.models.favorite import Favorite
-            
-            # 30 günden eski ilanları bul
-            cutoff_date = datetime.utcnow() - timedelta(days=30)
-            
-            # Önce bu ilanlara ait favorileri sil
-            old_listing_ids = db.query(Listing.id).filter(
-                Listing.scraped_at < cutoff_date
-            ).all()
-            old_ids = [lid[0] for lid in old_listing_ids]
-            
-            if old_ids:
-                # Favorileri sil
-                fav_deleted = db.query(Favorite).filter(
-                    Favorite.listing_id.in_(old_ids)
-                ).delete(synchronize_session=False)
-                
-                # Eski ilanları sil
-                deleted_count = db.query(Listing).filter(
-                    Listing.id.in_(old_ids)
-                ).delete(synchronize_session=False)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(Filter.id, Filter.next_scan_at).where(
+                    Filter.auto_scan_enabled == True,
+                    Filter.is_active == True
+                ))
+                rows = result.all()
+            now = datetime.utcnow()
+            self._scheduled = {fid: _as_naive_utc(next_at) or now for fid, next_at in rows}
+            self._queue = [(due, fid) for fid, due in self._scheduled.items()]
+            heapq.heapify(self._queue)
+            logger.info(f"Tarama kuyruğu yüklendi: {len(self._queue)} filtre")
+        except Exception as e:
+            logger.error(f"Tarama kuyruğu yüklenemedi: {e}")
+        if self._wakeup:
+            self._wakeup.set()
+    
+    def _count_overdue(self) -> int:
+        now = datetime.utcnow()
+        return sum(1 for due in list(self._scheduled.values()) if due <= now)
+    
+    def _peek_due(self) -> Optional[Tuple[datetime, int]]:
+        """Kuyruğun başındaki geçerli kaydı döndür (eski kayıtları at)"""
+        while self._queue:
+            due, filter_id = self._queue[0]
+            if self._scheduled.get(filter_id) == due:
+                return due, filter_id
+            heapq.heappop(self._queue)
+        return None
+    
+    async def _scan_loop(self):
+        """Bir sonraki taramanın zamanına kadar uyu, zamanı gelince çalıştır"""
+        while True:
+            try:
+                self._wakeup.clear()
+                head = self._peek_due()
+                if head is None:
+                    await self._wakeup.wait()
+                    continue
                 
-                db.commit()
-                logger.info(f"Temizlik: {deleted_count} eski ilan silindi (30+ gün), {fav_deleted} favori temizlendi")
-            else:
-                logger.info("Temizlenecek eski ilan bulunamadı")
+                due, filter_id = head
+                delay = (due - datetime.utcnow()).total_seconds()
+                if delay > 0:
+                    # Kuyruk değişirse (yeni/erken filtre) erken uyan
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-        except Exception as e:
-            logger.error(f"Eski ilan temizleme hatası: {e}")
-            db.rollback()
-        finally:
-            db.close()
-            
-    async def _check_and_run_scans(self):
-        """Zamanı gelen taramaları çalıştır"""
-        db = SessionLocal()
+                heapq.heappop(self._queue)
+                del self._scheduled[filter_id]
+                await self._run_due_scan(filter_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Tarama döngüsü hatası: {e}")
+                await asyncio.sleep(1)
+    
+    async def _run_due_scan(self, filter_id: int):
+        """Zamanı gelen filtreyi tara ve yeni zamanıyla kuyruğa geri koy"""
+        # Senkron DB bölümleri thread pool'da; commit sonrası okumalar event loop'ta lazy yükleme yapmasın
+        db = SessionLocal(expire_on_commit=False)
         try:
-            now = datetime.utcnow()
-            
-            # Otomatik tarama aktif ve zamanı gelmiş filtreleri bul
-            filters_to_scan = db.query(Filter).filter(
-                Filter.auto_scan_enabled == True,
-                Filter.is_active == True,
-                (Filter.next_scan_at == None) | (Filter.next_scan_at <= now)
-            ).all()
-            
-            if not filters_to_scan:
+            filter_obj = await run_in_db_thread(lambda: db.query(Filter).filter(Filter.id == filter_id).first())
+            # Kuyruk ile DB arasında kaçırılmış bir değişiklik olabilir
+            if not filter_obj or not filter_obj.auto_scan_enabled or not filter_obj.is_active:
                 return
-                
-            logger.info(f"Taranacak {len(filters_to_scan)} filtre bulundu")
             
-            for filter_obj in filters_to_scan:
-                try:
-                    await self._run_scan_for_filter(db, filter_obj)
-                except Exception as e:
-                    logger.error(f"Filtre {filter_obj.id} taranırken hata: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Tarama kontrolü sırasında hata: {e}")
+            try:
+                await self._run_scan_for_filter(db, filter_obj)
+            except Exception as e:
+                logger.error(f"Filtre {filter_obj.id} taranırken hata: {e}")
+            self.sync_filter(filter_obj)
         finally:
-            db.close()
+            await run_in_db_thread(db.close)
+    
+    async def _cleanup_old_listings(self):
+        """Saklama süresinden (LISTING_RETENTION_DAYS) eski ilanları parça parça temizle"""
+        try:
+            stats = await retention_service.purge_old_listings()
+            if stats["listings"]:
+                logger.info(
+                    f"Temizlik: {stats['listings']} eski ilan silindi ({stats['chunks']} parça), "
+                    f"{stats['favorites']} favori temizlendi"
+                    + (f", arşiv: {stats['archive']}" if stats["archive"] else "")
+                )
+            else:
+                logger.info("Temizlenecek eski ilan bulunamadı")
+        except Exception as e:
+            logger.error(f"Eski ilan temizleme hatası: {e}")
             
     async def _run_scan_for_filter(self, db: Session, filter_obj: Filter):
-        """Belirli bir filtre için tarama yap"""
+        """
+        Belirli bir filtre için tarama yap
+
+        Senkron Session işleri (sorgu, flush, commit) run_in_db_thread ile thread
+        pool'da çalışır; repost indeksi yalnızca event loop'ta değiştirilir.
+        """
         logger.info(f"Filtre taranıyor: {filter_obj.name} (ID: {filter_obj.id})")
         
         # Her tarama için yeni scraper oluştur
         scraper = ArabaComScraper(db)
+        reposts = None
         
         try:
             # Scraper'ı başlat
@@ -163,60 +281,149 @@ class SchedulerService:
             search_params = filter_obj.criteria or {}
             
             # Tarama yap
-            listings = await scraper.scrape_listings(search_params)
+            listings = await scraper.scrape_listings(
+                search_params,
+                incremental=settings.SCRAPER_INCREMENTAL
+            )
             
             # Yeni ilanları kaydet
-            new_count = 0
+            save_started = time.perf_counter()
+            # Aynı ilan var mı - tek sorguda, ilan ID'si üzerinden
+            known_keys = await run_in_db_thread(
+                scraper.find_known_keys, [l.get("source_url", "") for l in listings]
+            )
+            fresh_listings = []
             for listing_data in listings:
-                # Aynı URL'den ilan var mı kontrol et
-                existing = db.query(Listing).filter(
-                    Listing.source_url == listing_data.get("source_url")
-                ).first()
-                
-                if not existing:
-                    new_listing = Listing(
-                        title=listing_data.get("title", ""),
-                        price=listing_data.get("price", 0),
-                        source_url=listing_data.get("source_url", ""),
-                        images=listing_data.get("images", []),
-                        year=listing_data.get("year"),
-                        brand=listing_data.get("brand"),
-                        model=listing_data.get("model"),
-                        city=listing_data.get("city"),
-                        fuel_type=listing_data.get("fuel_type"),
-                        transmission=listing_data.get("transmission"),
-                        mileage=listing_data.get("mileage"),
-                        damage_info=listing_data.get("damage_info"),
-                        is_new=True,
-                        user_id=filter_obj.user_id,
-                        filter_id=filter_obj.id
-                    )
-                    db.add(new_listing)
-                    new_count += 1
+                key = listing_key(listing_data.get("source_url", ""))
+                if key not in known_keys:
+                    known_keys.add(key)
+                    fresh_listings.append(listing_data)
             
-            # Filtre istatistiklerini güncelle
-            now = datetime.utcnow()
-            filter_obj.last_scan_at = now
-            filter_obj.next_scan_at = now + timedelta(minutes=filter_obj.scan_interval)
-            filter_obj.total_scans = (filter_obj.total_scans or 0) + 1
-            filter_obj.new_listings_found = (filter_obj.new_listings_found or 0) + new_count
+            # Repost tespiti için ilk resimlerin pHash'i (kendi aşaması olarak ölçülür)
+            phash_started = time.perf_counter()
+            await repost_detector.annotate(fresh_listings)
+            save_started += time.perf_counter() - phash_started
+            reposts = repost_detector.batch()
+            # URL'ye konamayan kriterler (hasar, fırsat eşiği, ek markalar) bildirimden önce uygulanır
+            compiled_filter = CompiledFilter(filter_obj)
             
-            db.commit()
+            new_count = len(fresh_listings)
+            new_listings = await run_in_db_thread(self._add_listings, db, filter_obj, fresh_listings)
+            
+            notify_listings = []
+            for new_listing, listing_data in new_listings:
+                # Aynı aracın yeniden yayını ya da filtreye tam uymayan ilan kaydedilir ama bildirilmez
+                if reposts.link(new_listing) is None and compiled_filter.matches(new_listing):
+                    notify_listings.append(listing_data)
+            
+            await run_in_db_thread(self._finish_scan, db, scraper, filter_obj, new_count, datetime.utcnow())
+            reposts.commit()
+            SCAN_PHASE_SECONDS.observe(time.perf_counter() - save_started, phase="save")
+            NEW_LISTINGS.inc(new_count, filter_id=filter_obj.id)
+            response_cache.bump(FILTERS)
+            if new_count:
+                response_cache.bump(LISTINGS)
             
             logger.info(f"Filtre {filter_obj.name}: {len(listings)} ilan bulundu, {new_count} yeni ilan kaydedildi")
             
             # Telegram bildirimi gönder
-            if new_count > 0:
-                await self._send_telegram_notification(db, filter_obj, new_count, listings[:5])
+            if notify_listings:
+                await self._send_telegram_notification(
+                    db, filter_obj, len(notify_listings), notify_listings[:5]
+                )
             
         except Exception as e:
             logger.error(f"Tarama hatası: {e}")
-            # Yine de next_scan_at'ı güncelle ki sürekli hata vermesin
-            filter_obj.next_scan_at = datetime.utcnow() + timedelta(minutes=filter_obj.scan_interval)
-            db.commit()
+            if reposts is not None:
+                reposts.rollback()
+            await run_in_db_thread(self._record_failed_scan, db, filter_obj)
+            response_cache.bump(FILTERS)
         finally:
             await scraper.close_browser()
+    
+    def _add_listings(self, db: Session, filter_obj: Filter, fresh_listings: list) -> list:
+        """Yeni ilanları ekle, tek flush ile ID'lerini al (thread pool'da); (ilan, veri) çiftleri döner"""
+        new_listings = []
+        for listing_data in fresh_listings:
+            new_listing = Listing(
+                title=listing_data.get("title", ""),
+                price=listing_data.get("price", 0),
+                source_url=listing_data.get("source_url", ""),
+                external_id=listing_data.get("external_id"),
+                images=listing_data.get("images", []),
+                year=listing_data.get("year"),
+                brand=listing_data.get("brand"),
+                model=listing_data.get("model"),
+                brand_id=listing_data.get("brand_id"),
+                model_id=listing_data.get("model_id"),
+                city=listing_data.get("city"),
+                fuel_type=listing_data.get("fuel_type"),
+                transmission=listing_data.get("transmission"),
+                mileage=listing_data.get("mileage"),
+                damage_info=listing_data.get("damage_info"),
+                **damage_features(listing_data.get("damage_info")),
+                image_phash=listing_data.get("image_phash"),
+                is_new=True,
+                user_id=filter_obj.user_id,
+                filter_id=filter_obj.id
+            )
+            price_model.apply(new_listing)
+            db.add(new_listing)
+            new_listings.append((new_listing, listing_data))
+        # Tek flush ile ID'ler alınır (repost bağlama ID ister)
+        db.flush()
+        return new_listings
+    
+    def _finish_scan(self, db: Session, scraper: ArabaComScraper, filter_obj: Filter, new_count: int, now: datetime):
+        """Watermark ve filtre istatistiklerini ilanlarla aynı commit'te yaz (thread pool'da)"""
+        scraper.stage_watermarks()
+        self._update_scan_rate(db, scraper, filter_obj, new_count, now)
+        filter_obj.last_scan_at = now
+        filter_obj.next_scan_at = now + timedelta(minutes=adaptive.current_interval(filter_obj))
+        filter_obj.total_scans = (filter_obj.total_scans or 0) + 1
+        filter_obj.new_listings_found = (filter_obj.new_listings_found or 0) + new_count
+        db.commit()
+    
+    def _record_failed_scan(self, db: Session, filter_obj: Filter):
+        """Hatalı taramayı geri al, filtreyi yine de ileri bir zamana planla (thread pool'da)"""
+        # Yarım kalan kayıt (ör. flush'ta IntegrityError) geri alınmadan session kullanılamaz
+        db.rollback()
+        # Yine de next_scan_at'ı güncelle ki sürekli hata vermesin
+        filter_obj.next_scan_at = datetime.utcnow() + timedelta(minutes=adaptive.current_interval(filter_obj))
+        db.commit()
             
+    def _update_scan_rate(
+        self,
+        db: Session,
+        scraper: ArabaComScraper,
+        filter_obj: Filter,
+        new_count: int,
+        now: datetime
+    ):
+        """Aramanın ilan geliş hızını güncelle, adaptif aralığı ve bu tarama için beklenen verimi hesapla"""
+        search_url = scraper.build_search_url(filter_obj.criteria or {})
+        previous_rate, rate = adaptive.update_arrival_rate(db, search_url, new_count, now)
+        
+        # Beklenen verim bu taramanın gerçekleşen sayısıyla karşılaştırılır:
+        # tarama öncesi hız x son taramadan bu yana geçen süre
+        predicted = None
+        if previous_rate is not None and filter_obj.last_scan_at:
+            elapsed = (now - filter_obj.last_scan_at.replace(tzinfo=None)).total_seconds() / 60.0
+            predicted = adaptive.predict_yield(previous_rate, elapsed)
+        filter_obj.last_scan_new_count = new_count
+        filter_obj.predicted_yield = predicted
+        
+        # Hız tahmini henüz yoksa (aramanın ilk gözlemi) mevcut aralık korunur
+        if filter_obj.adaptive_scan_enabled and rate is not None:
+            tier = filter_obj.user.subscription_tier if filter_obj.user else None
+            interval = adaptive.compute_interval(rate, tier)
+            if interval != filter_obj.effective_scan_interval:
+                logger.info(
+                    f"Filtre {filter_obj.id} adaptif aralık: {filter_obj.effective_scan_interval} -> "
+                    f"{interval} dk ({rate:.2f} ilan/saat)"
+                )
+            filter_obj.effective_scan_interval = interval
+    
     async def _send_telegram_notification(
         self, 
         db: Session, 
@@ -227,7 +434,7 @@ class SchedulerService:
         """Yeni ilanlar için Telegram bildirimi gönder"""
         try:
             # Kullanıcıyı al
-            user = db.query(User).filter(User.id == filter_obj.user_id).first()
+            user = await run_in_db_thread(db.get, User, filter_obj.user_id)
             if not user:
                 return
             
@@ -253,19 +460,54 @@ class SchedulerService:
 
     async def trigger_manual_scan(self, filter_id: int) -> dict:
         """Manuel tarama tetikle"""
-        db = SessionLocal()
+        db = SessionLocal(expire_on_commit=False)
         try:
-            filter_obj = db.query(Filter).filter(Filter.id == filter_id).first()
+            filter_obj = await run_in_db_thread(lambda: db.query(Filter).filter(Filter.id == filter_id).first())
             if not filter_obj:
                 return {"success": False, "message": "Filtre bulunamadı"}
                 
             await self._run_scan_for_filter(db, filter_obj)
+            self.sync_filter(filter_obj)
             return {"success": True, "message": "Tarama tamamlandı"}
         except Exception as e:
             logger.error(f"Manuel tarama hatası: {e}")
             return {"success": False, "message": str(e)}
         finally:
-            db.close()
+            await run_in_db_thread(db.close)
+    
+    async def _refresh_price_model(self, full: bool = False):
+        """Fiyat istatistiklerini yenile (senkron DB işi thread pool'da)"""
+        if not settings.PRICING_ENABLED:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            if full:
+                buckets = await loop.run_in_executor(None, price_model.rebuild_all)
+            else:
+                buckets = await loop.run_in_executor(None, price_model.refresh_dirty)
+            if buckets:
+                logger.info(
+                    f"Fiyat modeli {'yeniden kuruldu' if full else 'güncellendi'}: "
+                    f"{buckets} kova ({time.perf_counter() - started:.1f}s)"
+                )
+        except Exception as e:
+            logger.error(f"Fiyat modeli güncelleme hatası: {e}")
+    
+    async def _bootstrap_price_model(self):
+        """Fiyat tablosu boşsa baştan kur ve mevcut ilanları skorla (thread pool'da)"""
+        if not settings.PRICING_ENABLED:
+            return
+        try:
+            started = time.perf_counter()
+            buckets, scored = await asyncio.get_running_loop().run_in_executor(None, price_model.bootstrap)
+            if buckets:
+                logger.info(
+                    f"Fiyat modeli kuruldu: {buckets} kova, {scored} ilan skorlandı "
+                    f"({time.perf_counter() - started:.1f}s)"
+                )
+        except Exception as e:
+            logger.error(f"Fiyat modeli kurulum hatası: {e}")
     
     async def _check_favorite_prices(self):
         """Favori ilanların fiyat değişimini kontrol et"""
@@ -274,10 +516,12 @@ class SchedulerService:
         from bs4 import BeautifulSoup
         import re
         
-        db = SessionLocal()
+        db = AsyncSessionLocal()
         try:
-            # Tüm favorileri al
-            favorites = db.query(Favorite).all()
+            # Tüm favorileri ilanlarıyla birlikte al
+            favorites = (await db.execute(
+                select(Favorite, Listing).join(Listing, Listing.id == Favorite.listing_id)
+            )).all()
             
             if not favorites:
                 return
@@ -287,10 +531,9 @@ class SchedulerService:
             updated_count = 0
             
             async with aiohttp.ClientSession() as session:
-                for fav in favorites:
+                for fav, listing in favorites:
                     try:
-                        listing = db.query(Listing).filter(Listing.id == fav.listing_id).first()
-                        if not listing or not listing.source_url:
+                        if not listing.source_url:
                             continue
                         
                         # Siteden güncel fiyatı çek
@@ -336,7 +579,7 @@ class SchedulerService:
                                 
                                 # Fiyat düştüyse Telegram bildirimi gönder
                                 if new_price < old_price:
-                                    user = db.query(User).filter(User.id == fav.user_id).first()
+                                    user = await db.get(User, fav.user_id)
                                     if user and user.telegram_enabled and user.telegram_chat_id:
                                         try:
                                             await telegram_service.send_price_drop_notification(
@@ -353,14 +596,16 @@ class SchedulerService:
                         logger.debug(f"Fiyat kontrol hatası: {e}")
                         continue
             
-            db.commit()
+            await db.commit()
+            if updated_count:
+                response_cache.bump(LISTINGS)
             logger.info(f"Fiyat kontrolü tamamlandı: {updated_count} güncelleme")
             
         except Exception as e:
             logger.error(f"Favori fiyat kontrolü hatası: {e}")
-            db.rollback()
+            await db.rollback()
         finally:
-            db.close()
+            await db.close()
 
 
 # Global scheduler instance
@@ -0,0 +1,336 @@
+"""
+İlan metninden alan çıkarma motoru
+
+Başlık/kart metninden yıl, marka, şehir, yakıt ve vites tek geçişte çıkarılır:
+- Sözlükler (marka, şehir, yakıt, vites) modül yüklenirken trie'ye, trie de
+  ortak önekleri paylaşan tek bir derlenmiş regex'e dönüştürülür
+- Tüm alanlar tek bir birleşik regex ile metin üzerinde bir kez taranır
+- Türkçe harf katlama (İ/I/ı -> i, ş -> s, ğ -> g ...) ile "ESKİŞEHİR",
+  "eskisehir" ve "Eskişehir" aynı şekilde eşleşir
+- Birden fazla aday varsa sözlükteki sıra önceliklidir (eski davranış)
+
+Fiyat, URL başlığı ve ilan ID'si yardımcıları da modül seviyesinde derlenmiş
+regex'ler kullanır. damage_features, detay sayfasından gelen damage_info'yu
+filtrelenebilir sayısal kolonlara indirger.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Küçük harfe çevrildikten sonra ASCII karşılığına katlanan Türkçe karakterler
+_FOLD_REPLACEMENTS = [("ı", "i"), ("ş", "s"), ("ğ", "g"), ("ü", "u"), ("ö", "o"), ("ç", "c"), ("â", "a"), ("î", "i"), ("û", "u")]
+
+
+def fold_turkish(text: str) -> str:
+    """Büyük/küçük harf ve Türkçe karakter farkını yok say (İ/I/ı -> i, ş -> s ...)"""
+    if text.isascii():
+        return text.lower()
+    # "İ".lower() birleşik nokta ekler ("i̇"); önce düz i'ye çevrilir
+    text = text.replace("İ", "i").lower()
+    for char, replacement in _FOLD_REPLACEMENTS:
+        if char in text:
+            text = text.replace(char, replacement)
+    if not text.isascii():
+        # Diğer aksanlı harfler (Škoda, Citroën, Renault Mégane): NFKD ile harf + işarete ayrılıp işaret atılır
+        text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return text
+
+
+# Sözlükler: (kanonik değer, eş anlamlılar) - sıra öncelik belirler
+BRANDS: List[Tuple[str, Sequence[str]]] = [
+    (brand, [brand]) for brand in [
+        "Audi", "BMW", "Mercedes", "Volkswagen", "Ford", "Opel",
+        "Renault", "Peugeot", "Fiat", "Toyota", "Honda", "Hyundai",
+        "Volvo", "Skoda", "Seat", "Citroen", "Dacia", "Nissan",
+        "Kia", "Mazda", "Mitsubishi", "Suzuki", "Chevrolet", "Jeep"
+    ]
+]
+
+CITIES: List[Tuple[str, Sequence[str]]] = [
+    (city, [city]) for city in [
+        "İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Adana",
+        "Gaziantep", "Konya", "Kayseri", "Mersin", "Eskişehir", "Samsun",
+        "Tekirdağ", "Kastamonu", "Denizli", "Manisa", "Kocaeli", "Sakarya",
+        "Trabzon", "Diyarbakır", "Şanlıurfa", "Malatya", "Erzurum", "Aydın",
+        "Balıkesir", "Hatay", "Van", "Kahramanmaraş", "Ordu", "Afyonkarahisar",
+        "Muğla", "Elazığ", "Mardin", "Aksaray", "Edirne", "Çanakkale",
+        "Zonguldak", "Tokat", "Kırıkkale", "Çorum", "Sivas", "Yozgat"
+    ]
+]
+
+FUEL_TYPES: List[Tuple[str, Sequence[str]]] = [
+    ("dizel", ["dizel", "diesel"]),
+    ("benzin", ["benzin", "petrol"]),
+    ("elektrik", ["elektrik", "electric"]),
+    ("hibrit", ["hibrit", "hybrid"]),
+    ("lpg", ["lpg"]),
+]
+
+TRANSMISSIONS: List[Tuple[str, Sequence[str]]] = [
+    ("otomatik", ["otomatik", "automatic"]),
+    ("manuel", ["manuel", "manual", "düz vites"]),
+]
+
+MIN_YEAR = 1980
+MAX_YEAR = 2025
+
+
+def build_trie(words: Iterable[str]) -> Dict[str, Any]:
+    """Kelimelerden karakter trie'si ("" anahtarı kelime sonunu işaretler)"""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return trie
+
+
+def trie_to_pattern(node: Dict[str, Any]) -> str:
+    """
+    Trie'yi ortak önekleri paylaşan regex'e çevir
+
+    ["bmw", "bursa", "balikesir"] -> b(?:alikesir|mw|ursa)
+    Regex motoru her konumda tek bir dal izler; kelime sayısı kadar deneme yapmaz.
+    """
+    terminal = "" in node
+    branches = [re.escape(char) + trie_to_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    # Kelime sonu da geçerliyse devamı opsiyonel (greedy: en uzun eşleşme)
+    return group + "?" if terminal else group
+
+
+_VOCABULARIES = {
+    "brand": BRANDS,
+    "city": CITIES,
+    "fuel_type": FUEL_TYPES,
+    "transmission": TRANSMISSIONS,
+}
+
+# Marka ve şehir kelime başında eşleşmeli ("Caravan" içindeki "van" şehir değildir);
+# yakıt/vites eskisi gibi alt metin olarak aranır ("turbodizel")
+_WORD_START_FIELDS = frozenset(["brand", "city"])
+
+# Katlanmış eş anlamlı -> (alan, öncelik, kanonik değer)
+_ALIASES: Dict[str, Tuple[str, int, str]] = {}
+for _field, _entries in _VOCABULARIES.items():
+    for _priority, (_canonical, _aliases) in enumerate(_entries):
+        for _alias in _aliases:
+            _ALIASES.setdefault(fold_turkish(_alias), (_field, _priority, _canonical))
+
+# Tüm sözlükler tek trie -> tek regex; yıl adayları da aynı geçişte bulunur.
+# Grupsuz düz alternasyon, regex motorunun ilk karakter ön filtresini korur.
+_FIELDS_PATTERN = re.compile(trie_to_pattern(build_trie(_ALIASES)) + r"|19[89]\d|20[0-2]\d")
+
+
+def _is_word_char(text: str, index: int) -> bool:
+    return 0 <= index < len(text) and (text[index].isalnum() or text[index] == "_")
+
+
+def extract_fields(text: Optional[str]) -> Dict[str, Any]:
+    """
+    Metinden yıl, marka, şehir, yakıt ve vitesi tek geçişte çıkar
+
+    Returns:
+        {"year", "brand", "city", "fuel_type", "transmission"} - bulunamayanlar None
+    """
+    fields: Dict[str, Any] = {"year": None, "brand": None, "city": None, "fuel_type": None, "transmission": None}
+    if not text:
+        return fields
+
+    folded = fold_turkish(text)
+    best: Dict[str, int] = {}
+    year_seen = False
+    for match in _FIELDS_PATTERN.finditer(folded):
+        token = match.group()
+        start = match.start()
+
+        if token[0].isdigit():
+            # Sadece ilk bağımsız yıl adayı dikkate alınır (\b...\b)
+            if year_seen or _is_word_char(folded, start - 1) or _is_word_char(folded, match.end()):
+                continue
+            year_seen = True
+            year = int(token)
+            if MIN_YEAR <= year <= MAX_YEAR:
+                fields["year"] = year
+            continue
+
+        field, priority, canonical = _ALIASES[token]
+        if field in _WORD_START_FIELDS and start > 0 and folded[start - 1].isalnum():
+            continue
+        if field not in best or priority < best[field]:
+            best[field] = priority
+            fields[field] = canonical
+
+    return fields
+
+
+# ----------------------------------------------------------------------------
+# Fiyat
+# ----------------------------------------------------------------------------
+
+_HTML_PRICE_PATTERNS = [
+    re.compile(r'class="[^"]*price[^"]*"[^>]*>([^<]+)', re.IGNORECASE),
+    re.compile(r'class="[^"]*fiyat[^"]*"[^>]*>([^<]+)', re.IGNORECASE),
+    re.compile(r'data-price="([\d.,]+)"', re.IGNORECASE),
+]
+
+# Türk formatı: 1.500.000 TL veya 1,500,000 TL
+_TEXT_PRICE_PATTERNS = [
+    re.compile(r'([\d]{1,3}(?:\.[\d]{3}){2,})\s*(?:TL|₺)', re.IGNORECASE),  # 1.500.000 TL
+    re.compile(r'([\d]{1,3}(?:,[\d]{3}){2,})\s*(?:TL|₺)', re.IGNORECASE),  # 1,500,000 TL
+    re.compile(r'([\d]{6,})\s*(?:TL|₺)', re.IGNORECASE),  # 1500000 TL
+    re.compile(r'(?:TL|₺)\s*([\d]{1,3}(?:\.[\d]{3}){2,})', re.IGNORECASE),  # TL 1.500.000
+]
+
+_GROUPED_NUMBER = re.compile(r'[\d]{1,3}(?:\.[\d]{3}){1,}')
+_NON_PRICE_CHARS = re.compile(r'[^\d.]')
+
+
+def parse_price(price_text: str) -> float:
+    """Fiyat metnini sayıya çevir"""
+    try:
+        if not price_text:
+            return 0.0
+
+        # TL, ₺ gibi sembolleri temizle
+        price_text = price_text.replace("TL", "").replace("₺", "").replace("tl", "").strip()
+
+        # Nokta ve virgülü kontrol et
+        dots = price_text.count(".")
+        commas = price_text.count(",")
+
+        if dots >= 2 or (dots == 1 and len(price_text.split(".")[-1]) == 3):
+            # Nokta binlik ayracı (1.500.000 veya 1.500)
+            price_text = price_text.replace(".", "")
+        elif commas >= 2 or (commas == 1 and len(price_text.split(",")[-1]) == 3):
+            # Virgül binlik ayracı (1,500,000 veya 1,500)
+            price_text = price_text.replace(",", "")
+        elif commas == 1:
+            # Virgül ondalık ayracı olabilir (1,5)
+            price_text = price_text.replace(",", ".")
+
+        # Sadece sayıları al
+        price_text = _NON_PRICE_CHARS.sub('', price_text)
+
+        if not price_text:
+            return 0.0
+
+        return float(price_text)
+    except ValueError:
+        return 0.0
+
+
+_KURUS = re.compile(r',\d{1,2}(?!\d)')
+_NON_DIGITS = re.compile(r'\D')
+
+
+def damage_features(damage_info: Optional[Dict[str, Any]]) -> Dict[str, Optional[int]]:
+    """
+    damage_info -> indeksli kolonlar: değişen parça, boyalı (lokal dahil) parça
+    sayısı ve tramer tutarı (TL). Bilgi yoksa (detay çekilemedi, "Belirtilmemiş")
+    ilgili değer None kalır; filtreler bilinmeyen değeri elemez.
+    """
+    if not damage_info:
+        return {"changed_part_count": None, "painted_part_count": None, "tramer_amount": None}
+
+    parts = ("original", "painted", "local_painted", "changed")
+    has_parts = any(damage_info.get(key) for key in parts)
+    # "12.500 TL", "1.250,50 TL": kuruş atılır, kalan rakamlar birleştirilir
+    digits = _NON_DIGITS.sub("", _KURUS.sub("", damage_info.get("tramer_amount") or ""))
+    tramer_amount = int(digits) if digits else None
+    return {
+        "changed_part_count": len(damage_info.get("changed") or []) if has_parts else None,
+        "painted_part_count": (
+            len(damage_info.get("painted") or []) + len(damage_info.get("local_painted") or [])
+            if has_parts else None
+        ),
+        "tramer_amount": tramer_amount,
+    }
+
+
+def extract_price_from_text(text: str, html: str = "") -> float:
+    """Metinden fiyat çıkar (önce HTML fiyat class'ları, sonra TL'li sayılar)"""
+    if html:
+        for pattern in _HTML_PRICE_PATTERNS:
+            match = pattern.search(html)
+            if match:
+                price = parse_price(match.group(1))
+                if price > 10000:  # Makul bir fiyat
+                    return price
+
+    if not text:
+        return 0.0
+
+    for pattern in _TEXT_PRICE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            price = parse_price(match.group(1))
+            if price > 10000:
+                return price
+
+    # Son çare: Büyük sayıları ara
+    for num_str in _GROUPED_NUMBER.findall(text):
+        price = parse_price(num_str)
+        if 50000 < price < 50000000:  # Makul fiyat aralığı
+            return price
+
+    return 0.0
+
+
+# ----------------------------------------------------------------------------
+# URL başlığı
+# ----------------------------------------------------------------------------
+
+_SLUG_SKIP_WORDS = frozenset(["galeriden", "sahibinden", "satilik", "kiralik", "takas", "model", "detay"])
+_SLUG_CITIES = frozenset([
+    "istanbul", "ankara", "izmir", "bursa", "adana", "antalya", "konya", "gaziantep", "kayseri",
+    "mersin", "eskisehir", "diyarbakir", "samsun", "denizli", "sanliurfa", "malatya", "trabzon", "erzurum"
+])
+_SLUG_YEAR = re.compile(r'(?:19|20)\d{2}')
+
+
+def extract_title_from_url(url: str) -> str:
+    """URL'den araç başlığı çıkar"""
+    # URL örneği: /ilan/galeriden-satilik-renault-symbol-1-5-dci-joy/galeriden-renault-symbol-1-5-dci-joy-2018-model-bursa/33861099
+    # Son parça: ID (33861099), ondan önceki parça: gerçek başlık
+    parts = [p for p in url.split("/") if p and not p.isdigit() and p != "ilan"]
+    if not parts:
+        return ""
+
+    unique_words: List[str] = []
+    for word in parts[-1].split("-"):
+        lowered = word.lower()
+        # Şehir isimlerini, yılları ve skip listesindeki kelimeleri atla
+        if lowered in _SLUG_CITIES or lowered in _SLUG_SKIP_WORDS or _SLUG_YEAR.fullmatch(word):
+            continue
+        # Çok kısa kelimeleri atla (1, 5 gibi motor hacmi hariç)
+        if len(word) < 2:
+            continue
+        # Tekrarlı kelimeleri kaldır (ardışık)
+        if unique_words and unique_words[-1].lower() == lowered:
+            continue
+        unique_words.append(word.capitalize())
+
+    return " ".join(unique_words[:7])
+
+
+# arabam ilan URL'lerinin sonundaki sayısal ilan ID'si
+ILAN_ID_PATTERN = re.compile(r'/(\d{7,10})(?:/|$|\?)')
+
+
+def extract_ilan_id(url: str) -> Optional[int]:
+    """İlan URL'sinden sayısal arabam ilan ID'sini çıkar"""
+    if not url:
+        return None
+    match = ILAN_ID_PATTERN.search(url)
+    return int(match.group(1)) if match else None
+
+
+def listing_key(url: str) -> Union[int, str]:
+    """Tekrar kontrolü anahtarı: ilan ID'si, ID'siz URL'lerde URL'nin kendisi"""
+    return extract_ilan_id(url) or url
@@ -0,0 +1,154 @@
+"""
+Tarama kayıt / replay
+
+arabam.com'a canlı gitmeden scraper'ı ölçmek ve regresyon kontrolü yapmak için:
+- ScrapeRecorder: ArabaComScraper(recorder=...) ile gerçek bir taramada yüklenen
+  sonuç sayfalarını (render edilmiş DOM) ve detay HTML'lerini, ayrıca Playwright
+  HAR dosyasını bir dizine kaydeder (manifest.json + html/)
+- ReplayServer: kaydı yerel bir aiohttp stub sunucusundan, isteğe bağlı gecikme
+  (latency + jitter) ile sunar. Kayıttaki mutlak site adresleri stub adresine
+  çevrilir; scraper base_url=server.base_url ile hem Playwright hem de
+  fetch_detail_info yoluyla aynı sunucuya gider.
+
+Kayıt anahtarı URL'nin path + query kısmıdır (scraper URL'leri deterministiktir).
+Kullanım için bkz. scrape_replay.py ve benchmarks/bench_scrape_replay.py.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+def recording_key(url: str) -> str:
+    """Kayıt anahtarı: path + query (host'tan bağımsız)"""
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def load_manifest(directory: str) -> Dict:
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ScrapeRecorder:
+    """Tarama sırasında yüklenen sayfaları kayıt dizinine yazar"""
+
+    def __init__(self, directory: str, base_url: str):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(os.path.join(directory, "html"), exist_ok=True)
+        self.entries: Dict[str, Dict[str, str]] = {}
+        if os.path.exists(os.path.join(directory, MANIFEST)):
+            self.entries = load_manifest(directory)["entries"]
+
+    @property
+    def har_path(self) -> str:
+        return os.path.join(self.directory, "scan.har")
+
+    def save(self, url: str, html: str, kind: str):
+        key = recording_key(url)
+        name = f"{kind}-{hashlib.sha1(key.encode()).hexdigest()[:16]}.html"
+        with open(os.path.join(self.directory, "html", name), "w", encoding="utf-8") as f:
+            f.write(html)
+        self.entries[key] = {"kind": kind, "file": name}
+
+    def close(self):
+        """Manifest'i yaz (kayıt bitince çağrılmalı)"""
+        manifest = {
+            "base_url": self.base_url,
+            "recorded_at": datetime.utcnow().isoformat(),
+            "entries": self.entries,
+        }
+        with open(os.path.join(self.directory, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+class ReplayServer:
+    """Kaydı yerel HTTP sunucusundan sunar (kayıtta olmayan istekler 404)"""
+
+    def __init__(
+        self,
+        directory: str,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        manifest = load_manifest(directory)
+        self.directory = directory
+        self.recorded_base_url = manifest["base_url"]
+        self.entries: Dict[str, Dict[str, str]] = manifest["entries"]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.host = host
+        self.port = port
+        self.base_url = ""
+        self.hits = 0
+        self.misses = 0
+        self._bodies: Dict[str, bytes] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> str:
+        """Sunucuyu başlat ve stub base_url'ini döndür"""
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{self.host}:{port}"
+        # Mutlak linkler stub'a dönsün diye gövdeler bir kez okunup yeniden yazılır
+        for key, entry in self.entries.items():
+            with open(os.path.join(self.directory, "html", entry["file"]), encoding="utf-8") as f:
+                html = f.read()
+            self._bodies[key] = html.replace(self.recorded_base_url, self.base_url).encode("utf-8")
+        logger.info(f"Replay sunucusu: {self.base_url} ({len(self.entries)} sayfa)")
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "ReplayServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def attach(self, scraper):
+        """
+        Scraper'ın tarayıcısında stub dışındaki istekleri (resim, CDN, analytics) engelle
+
+        init_browser'dan sonra çağrılmalı; aksi halde replay'de de dış ağa gidilir.
+        """
+        async def route(route):
+            if route.request.url.startswith(self.base_url):
+                await route.continue_()
+            else:
+                await route.abort()
+
+        await scraper.context.route("**/*", route)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        if self.latency_ms or self.jitter_ms:
+            await asyncio.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+        body = self._bodies.get(recording_key(str(request.rel_url)))
+        if body is None:
+            self.misses += 1
+            return web.Response(status=404, text="Kayıtta yok")
+        self.hits += 1
+        return web.Response(body=body, content_type="text/html", charset="utf-8")
@@ -1,32 +1,96 @@
 import asyncio
 import re
-import sys
+import time
 import aiohttp
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from playwright.async_api import async_playwright, Browser, Page
 from sqlalchemy.orm import Session
 from bs4 import BeautifulSoup
 from app.models.listing import Listing
+from app.models.scan_watermark import ScanWatermark
 from app.core.config import settings
+from app.core.database import run_in_db_thread
+from app.core.logging_config import log_sampled, should_sample
+from app.core.metrics import (
+    BROWSER_PAGES, BROWSERS, DETAIL_FETCHES, NEW_LISTINGS, SCAN_BLOCKED, SCAN_CARDS, SCAN_PAGES, SCAN_PHASE_SECONDS
+)
+from app.core.response_cache import LISTINGS, response_cache
+from app.services.scraper.replay import ScrapeRecorder
+from app.services.scraper.extraction import (
+    damage_features, extract_fields, extract_ilan_id, extract_price_from_text, extract_title_from_url, fold_turkish,
+    listing_key, parse_price
+)
+from app.services.dedupe import repost_detector
+from app.services.filter_matcher import criteria_number, criteria_values
+from app.services.pricing import price_model
+from app.services.images import normalize_image_url, normalize_images
+from app.services.vehicle_catalog import vehicle_catalog
 import logging
 
 logger = logging.getLogger(__name__)
 
+# arabam.com şehir kodları (plaka kodları), Türkçe katlanmış ad ile
+CITY_CODES = {
+    fold_turkish(name): code for name, code in {
+        "adana": "1", "adıyaman": "2", "afyonkarahisar": "3", "ağrı": "4",
+        "amasya": "5", "ankara": "6", "antalya": "7", "artvin": "8",
+        "aydın": "9", "balıkesir": "10", "bilecik": "11", "bingöl": "12",
+        "bitlis": "13", "bolu": "14", "burdur": "15", "bursa": "16",
+        "çanakkale": "17", "çankırı": "18", "çorum": "19", "denizli": "20",
+        "diyarbakır": "21", "edirne": "22", "elazığ": "23", "erzincan": "24",
+        "erzurum": "25", "eskişehir": "26", "gaziantep": "27", "giresun": "28",
+        "gümüşhane": "29", "hakkari": "30", "hatay": "31", "ısparta": "32",
+        "mersin": "33", "istanbul": "34", "izmir": "35", "kars": "36",
+        "kastamonu": "37", "kayseri": "38", "kırklareli": "39", "kırşehir": "40",
+        "kocaeli": "41", "konya": "42", "kütahya": "43", "malatya": "44",
+        "manisa": "45", "kahramanmaraş": "46", "mardin": "47", "muğla": "48",
+        "muş": "49", "nevşehir": "50", "niğde": "51", "ordu": "52",
+        "rize": "53", "sakarya": "54", "samsun": "55", "siirt": "56",
+        "sinop": "57", "sivas": "58", "tekirdağ": "59", "tokat": "60",
+        "trabzon": "61", "tunceli": "62", "şanlıurfa": "63", "uşak": "64",
+        "van": "65", "yozgat": "66", "zonguldak": "67", "aksaray": "68",
+        "bayburt": "69", "karaman": "70", "kırıkkale": "71", "batman": "72",
+        "şırnak": "73", "bartın": "74", "ardahan": "75", "iğdır": "76",
+        "yalova": "77", "karabük": "78", "kilis": "79", "osmaniye": "80",
+        "düzce": "81"
+    }.items()
+}
+
+
 class ArabaComScraper:
     # Browser timeout (saniye)
     BROWSER_TIMEOUT = 60000  # 60 saniye
     PAGE_TIMEOUT = 30000     # 30 saniye
     MAX_CONCURRENT_REQUESTS = 5  # Aynı anda max istek sayısı
+    MAX_CARDS_PER_PAGE = 50  # Sayfa başına işlenecek max ilan kartı
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        base_url: Optional[str] = None,
+        recorder: Optional[ScrapeRecorder] = None,
+        settle_scale: float = 1.0
+    ):
+        """
+        Args:
+            base_url: Hedef site (varsayılan SCRAPER_BASE_URL); replay'de yerel stub sunucu
+            recorder: Verilirse yüklenen sonuç/detay sayfaları ve HAR kaydedilir (bkz. replay)
+            settle_scale: Bot koruması bekleme sürelerinin çarpanı (replay/benchmark için 0)
+        """
         self.db = db
-        self.base_url = "https://www.arabam.com"
+        self.base_url = (base_url or settings.SCRAPER_BASE_URL).rstrip("/")
+        self.recorder = recorder
+        self.settle_scale = settle_scale
         self.browser: Browser = None
         self.page: Page = None
         self.playwright = None
         self.context = None
         self._http_session = None
         self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        self._extra_pages: List[Page] = []  # Derin tarama için ek sekmeler
+        # Son artımlı taramada watermark'ı geçen URL'ler -> en yeni ilan ID'si;
+        # ilanları kaydeden çağıran stage_watermarks ile aynı transaction'da yazar
+        self.newest_ids: Dict[str, int] = {}
     
     async def init_browser(self):
         """Tarayıcıyı başlat - timeout korumalı"""
@@ -49,7 +113,9 @@ class ArabaComScraper:
                 ],
                 timeout=self.BROWSER_TIMEOUT
             )
+            BROWSERS.inc()
             self.context = await self.browser.new_context(
+                record_har_path=self.recorder.har_path if self.recorder else None,
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 viewport={'width': 1920, 'height': 1080},
                 locale='tr-TR',
@@ -71,10 +137,9 @@ class ArabaComScraper:
             self.context.set_default_timeout(self.PAGE_TIMEOUT)
             self.context.set_default_navigation_timeout(self.PAGE_TIMEOUT)
             
-            self.page = await self.context.new_page()
-            
             # Bot tespitini aşmak için JavaScript'i override et
-            await self.page.add_init_script("""
+            # (context seviyesinde - derin taramada açılan ek sekmeler de kapsanır)
+            await self.context.add_init_script("""
                 Object.defineProperty(navigator, 'webdriver', {
                     get: () => undefined
                 });
@@ -85,6 +150,9 @@ class ArabaComScraper:
                     get: () => [1, 2, 3, 4, 5]
                 });
             """)
+            
+            self.page = await self.context.new_page()
+            BROWSER_PAGES.inc()
             logger.info("Tarayıcı başarıyla başlatıldı")
         except Exception as e:
             logger.error(f"Tarayıcı başlatma hatası: {e}")
@@ -97,11 +165,20 @@ class ArabaComScraper:
             # HTTP session'ı kapat
             await self.close_http_session()
             
+            for extra_page in self._extra_pages:
+                try:
+                    await extra_page.close()
+                except:
+                    pass
+                BROWSER_PAGES.dec()
+            self._extra_pages = []
+            
             if self.page:
                 try:
                     await self.page.close()
                 except:
                     pass
+                BROWSER_PAGES.dec()
                 self.page = None
             
             if self.context:
@@ -116,6 +193,7 @@ class ArabaComScraper:
                     await self.browser.close()
                 except:
                     pass
+                BROWSERS.dec()
                 self.browser = None
             
             if self.playwright:
@@ -129,558 +207,715 @@ class ArabaComScraper:
         except Exception as e:
             logger.error(f"Tarayıcı kapatma hatası: {e}")
     
-    async def scrape_listings(self, search_params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    def build_search_urls(self, search_params: Dict[str, Any] = None) -> List[str]:
+        """
+        Filtre kriterlerinden kanonik arama URL'leri oluştur (sayfa parametresi olmadan)
+        
+        Marka URL path'inde olduğu için çok markalı filtrelerde marka başına bir
+        URL üretilir; çoklu şehir tekrarlanan city parametresiyle tek URL'dedir.
+        URL'ye konamayan kriterler (hasar, fırsat eşiği) FilterMatcher'da uygulanır.
+        """
+        search_params = search_params or {}
+        
+        # Query parametreleri
+        query_params = []
+        
+        for key, param in [
+            ("min_year", "minYear"), ("max_year", "maxYear"),
+            ("min_price", "minPrice"), ("max_price", "maxPrice"),
+            ("min_mileage", "minkm"), ("max_mileage", "maxkm"),
+        ]:
+            value = criteria_number(search_params, key)
+            if value is not None:
+                query_params.append(f"{param}={int(value)}")
+        # arabam.com şehir kodları (plaka kodları); bilinmeyen şehirler atlanır
+        city_codes = sorted({
+            CITY_CODES[fold_turkish(city)] for city in criteria_values(search_params, "city")
+            if fold_turkish(city) in CITY_CODES
+        }, key=int)
+        query_params.extend(f"city={code}" for code in city_codes)
+        if search_params.get("fuel_type"):
+            fuel_map = {"dizel": "2", "benzin": "1", "elektrik": "6", "hibrit": "4", "lpg": "3"}
+            fuel_code = fuel_map.get(search_params["fuel_type"].lower(), "")
+            if fuel_code:
+                query_params.append(f"fuel={fuel_code}")
+        if search_params.get("transmission"):
+            trans_map = {"otomatik": "2", "manuel": "1", "yarı otomatik": "3"}
+            trans_code = trans_map.get(search_params["transmission"].lower(), "")
+            if trans_code:
+                query_params.append(f"gear={trans_code}")
+        query = "".join(f"&{param}" for param in query_params)
+        
+        # arabam.com marka formatı: marka-model şeklinde URL path'e eklenir
+        # (model yalnızca tek markalı filtrede anlamlı)
+        brands = criteria_values(search_params, "brand")
+        if not brands:
+            # sort=1 = En yeni ilanlar (tarih - yeniden eskiye)
+            return [f"{self.base_url}/ikinci-el?sort=1{query}"]
+        model = search_params.get("model") if len(brands) == 1 else None
+        urls = []
+        for brand in brands:
+            path = brand.lower().replace(" ", "-")
+            if model:
+                path += "-" + model.lower().replace(" ", "-")
+            url = f"{self.base_url}/ikinci-el/{path}?sort=1{query}"
+            if url not in urls:
+                urls.append(url)
+        return urls
+    
+    def build_search_url(self, search_params: Dict[str, Any] = None) -> str:
+        """Filtrenin birincil arama URL'si (adaptif tarama hızı bu URL altında tutulur)"""
+        return self.build_search_urls(search_params)[0]
+    
+    def _get_watermark(self, search_url: str) -> int:
+        """Arama URL'si için en son görülen ilan ID'sini getir"""
+        watermark = self.db.query(ScanWatermark).filter(
+            ScanWatermark.search_url == search_url
+        ).first()
+        return watermark.last_ilan_id if watermark else 0
+    
+    def stage_watermarks(self):
+        """
+        Son taramanın watermark'larını session'a yaz (geri gitmez)
+
+        Commit çağırana bırakılır: watermark, ilanlar kaydedilmeden ilerlerse
+        kaydedilemeyen ilanlar bir sonraki artımlı taramada atlanır.
+        """
+        for search_url, ilan_id in self.newest_ids.items():
+            watermark = self.db.query(ScanWatermark).filter(
+                ScanWatermark.search_url == search_url
+            ).first()
+            if watermark is None:
+                self.db.add(ScanWatermark(search_url=search_url, last_ilan_id=ilan_id))
+            elif ilan_id > (watermark.last_ilan_id or 0):
+                watermark.last_ilan_id = ilan_id
+        # Aynı transaction'daki sonraki ScanWatermark sorguları (geliş hızı) yeni satırı görsün
+        self.db.flush()
+        self.newest_ids = {}
+    
+    async def scrape_listings(
+        self,
+        search_params: Dict[str, Any] = None,
+        incremental: bool = False,
+        max_pages: Optional[int] = None,
+        time_budget: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
         """
         Arabam.com'dan ilanları çek
+        
+        Args:
+            search_params: Filtre kriterleri
+            incremental: True ise sadece watermark'tan yeni ve DB'de olmayan ilanlar
+                işlenir; bilinen ilanlar için kart parse ve detay isteği yapılmaz.
+                Yeni watermark'lar newest_ids'te döner, yazılmaz (bkz. stage_watermarks).
+            max_pages: Taranacak max sonuç sayfası. None ise artımlı modda
+                SCRAPER_MAX_PAGES, normal modda 1.
+            time_budget: Sayfa taraması için saniye cinsinden süre bütçesi.
+                None ise SCRAPER_SCAN_TIME_BUDGET.
+        
+        Derin tarama: ilk sayfa okunduktan sonra kalan sayfalar
+        SCRAPER_PAGE_CONCURRENCY kadar sekmede paralel çekilir. Bilinen bir
+        ilana ulaşıldığında, boş sayfada veya bütçe dolduğunda durulur.
         """
         if not self.page:
             await self.init_browser()
         
         try:
-            # sort=1 = En yeni ilanlar (tarih - yeniden eskiye)
-            url = f"{self.base_url}/ikinci-el?sort=1"
+            urls = self.build_search_urls(search_params)
+            logger.debug(f"Oluşturulan URL'ler: {urls}")
             
-            if search_params:
-                # Filtre kriterlerine göre URL parametreleri ekle
-                if search_params.get("brand"):
-                    # arabam.com marka formatı: marka-model şeklinde URL path'e eklenir
-                    brand = search_params["brand"].lower().replace(" ", "-")
-                    url = f"{self.base_url}/ikinci-el/{brand}?sort=1"
-                
-                if search_params.get("model"):
-                    model = search_params["model"].lower().replace(" ", "-")
-                    # Eğer marka varsa, model de ekle
-                    if search_params.get("brand"):
-                        brand = search_params["brand"].lower().replace(" ", "-")
-                        url = f"{self.base_url}/ikinci-el/{brand}-{model}?sort=1"
-                
-                # Query parametreleri
-                query_params = []
-                
-                if search_params.get("min_year"):
-                    query_params.append(f"minYear={search_params['min_year']}")
-                if search_params.get("max_year"):
-                    query_params.append(f"maxYear={search_params['max_year']}")
-                if search_params.get("min_price"):
-                    query_params.append(f"minPrice={int(search_params['min_price'])}")
-                if search_params.get("max_price"):
-                    query_params.append(f"maxPrice={int(search_params['max_price'])}")
-                if search_params.get("city"):
-                    # arabam.com şehir kodları (plaka kodları)
-                    city_codes = {
-                        "adana": "1", "adıyaman": "2", "afyonkarahisar": "3", "ağrı": "4", 
-                        "amasya": "5", "ankara": "6", "antalya": "7", "artvin": "8",
-                        "aydın": "9", "balıkesir": "10", "bilecik": "11", "bingöl": "12",
-                        "bitlis": "13", "bolu": "14", "burdur": "15", "bursa": "16",
-                        "çanakkale": "17", "çankırı": "18", "çorum": "19", "denizli": "20",
-                        "diyarbakır": "21", "edirne": "22", "elazığ": "23", "erzincan": "24",
-                        "erzurum": "25", "eskişehir": "26", "gaziantep": "27", "giresun": "28",
-                        "gümüşhane": "29", "hakkari": "30", "hatay": "31", "ısparta": "32",
-                        "mersin": "33", "istanbul": "34", "izmir": "35", "kars": "36",
-                        "kastamonu": "37", "kayseri": "38", "kırklareli": "39", "kırşehir": "40",
-                        "kocaeli": "41", "konya": "42", "kütahya": "43", "malatya": "44",
-                        "manisa": "45", "kahramanmaraş": "46", "mardin": "47", "muğla": "48",
-                        "muş": "49", "nevşehir": "50", "niğde": "51", "ordu": "52",
-                        "rize": "53", "sakarya": "54", "samsun": "55", "siirt": "56",
-                        "sinop": "57", "sivas": "58", "tekirdağ": "59", "tokat": "60",
-                        "trabzon": "61", "tunceli": "62", "şanlıurfa": "63", "uşak": "64",
-                        "van": "65", "yozgat": "66", "zonguldak": "67", "aksaray": "68",
-                        "bayburt": "69", "karaman": "70", "kırıkkale": "71", "batman": "72",
-                        "şırnak": "73", "bartın": "74", "ardahan": "75", "iğdır": "76",
-                        "yalova": "77", "karabük": "78", "kilis": "79", "osmaniye": "80",
-                        "düzce": "81", "İstanbul": "34", "İzmir": "35"
-                    }
-                    city_name = search_params["city"].lower()
-                    city_code = city_codes.get(city_name, "")
-                    if city_code:
-                        query_params.append(f"city={city_code}")
-                if search_params.get("fuel_type"):
-                    fuel_map = {"dizel": "2", "benzin": "1", "elektrik": "6", "hibrit": "4", "lpg": "3"}
-                    fuel_code = fuel_map.get(search_params["fuel_type"].lower(), "")
-                    if fuel_code:
-                        query_params.append(f"fuel={fuel_code}")
-                if search_params.get("transmission"):
-                    trans_map = {"otomatik": "2", "manuel": "1", "yarı otomatik": "3"}
-                    trans_code = trans_map.get(search_params["transmission"].lower(), "")
-                    if trans_code:
-                        query_params.append(f"gear={trans_code}")
-                
-                if query_params:
-                    url += "&" + "&".join(query_params)
+            if max_pages is None:
+                max_pages = settings.SCRAPER_MAX_PAGES if incremental else 1
+            if time_budget is None:
+                time_budget = settings.SCRAPER_SCAN_TIME_BUDGET
+            deadline = time.monotonic() + time_budget
+            
+            # Çok markalı filtrelerde her URL sırayla ve kendi watermark'ı ile taranır
+            listings = []
+            seen_keys = set()
+            self.newest_ids = {}
+            for url in urls:
+                watermark = await run_in_db_thread(self._get_watermark, url) if incremental else None
+                url_listings, newest_id = await self._scrape_search_url(url, watermark, max_pages, deadline, time_budget)
+                if incremental and newest_id > (watermark or 0):
+                    self.newest_ids[url] = newest_id
+                for listing in url_listings:
+                    key = listing["external_id"] or listing["source_url"]
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        listings.append(listing)
+            
+            with SCAN_PHASE_SECONDS.time(phase="detail"):
+                await self._enrich_with_details(listings)
+            
+            logger.info(f"Toplam {len(listings)} ilan çıkarıldı")
+            return listings
+            
+        except Exception as e:
+            logger.error(f"Scraping hatası: {e}", exc_info=True)
+            self.newest_ids = {}
+            return []
+    
+    async def _scrape_search_url(
+        self,
+        url: str,
+        watermark: Optional[int],
+        max_pages: int,
+        deadline: float,
+        time_budget: float
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Tek arama URL'sinin sonuç sayfalarını tara; (kart ilanları, en yeni ilan ID'si)"""
+        listings = []
+        seen_keys = set()
+        newest_id = 0
+        
+        def collect(page_listings: List[Dict[str, Any]], page_stats: Dict[str, int]):
+            nonlocal newest_id
+            newest_id = max(newest_id, page_stats["newest_id"])
+            # Tarama sırasında ilanlar sayfa kaydırabilir - tekrarları at
+            for listing in page_listings:
+                key = listing["external_id"] or listing["source_url"]
+                if key not in seen_keys:
+                    seen_keys.add(key)
+                    listings.append(listing)
+        
+        def should_stop(page_stats: Dict[str, int]) -> bool:
+            # Bilinen bir ilana ulaşıldıysa veya sayfa boşsa daha derine inme
+            return page_stats["known"] > 0 or page_stats["total"] == 0
+        
+        # 1. sayfa ana sekmede
+        if not await self._load_results_page(url):
+            return [], 0
+        with SCAN_PHASE_SECONDS.time(phase="extract"):
+            page_listings, page_stats = await self._extract_page_listings(watermark)
+        collect(page_listings, page_stats)
+        stop = should_stop(page_stats)
+        
+        # Kalan sayfalar ek sekmelerde paralel
+        next_page = 2
+        while not stop and next_page <= max_pages:
+            if time.monotonic() >= deadline:
+                logger.info(f"Tarama süre bütçesi doldu ({time_budget}s), {next_page - 1} sayfa okundu")
+                break
             
-            print(f"Oluşturulan URL: {url}", file=sys.stderr)
+            batch = list(range(next_page, min(next_page + settings.SCRAPER_PAGE_CONCURRENCY, max_pages + 1)))
+            next_page = batch[-1] + 1
+            tabs = await self._get_extra_pages(len(batch))
+            logger.debug(f"Derin tarama: {batch} sayfaları çekiliyor")
             
-            logger.info(f"Scraping başlatılıyor: {url}")
-            print(f"URL'ye gidiliyor: {url}", file=sys.stderr)
+            results = await asyncio.gather(*[
+                self._scrape_results_page(f"{url}&page={page_no}", watermark, tab)
+                for page_no, tab in zip(batch, tabs)
+            ], return_exceptions=True)
             
-            # Sayfayı yükle - daha uzun bekleme süresi
+            # Sayfa sırasıyla işle - ilk durma noktasından sonrakileri at
+            for page_no, result in zip(batch, results):
+                if isinstance(result, Exception) or result is None:
+                    logger.warning(f"Sayfa {page_no} okunamadı: {result}")
+                    stop = True
+                    break
+                page_listings, page_stats = result
+                collect(page_listings, page_stats)
+                if should_stop(page_stats):
+                    stop = True
+                    break
+        
+        return listings, newest_id
+    
+    async def _get_extra_pages(self, count: int) -> List[Page]:
+        """Derin tarama için gereken sayıda ek sekme döndür (yeniden kullanılır)"""
+        while len(self._extra_pages) < count:
+            self._extra_pages.append(await self.context.new_page())
+            BROWSER_PAGES.inc()
+        return self._extra_pages[:count]
+    
+    async def _scrape_results_page(self, url: str, watermark: Optional[int], page: Page):
+        """Tek bir sonuç sayfasını verilen sekmede yükle ve ilanları çıkar"""
+        if not await self._load_results_page(url, page):
+            return None
+        with SCAN_PHASE_SECONDS.time(phase="extract"):
+            return await self._extract_page_listings(watermark, page)
+    
+    async def _load_results_page(self, url: str, page: Page = None) -> bool:
+        """Arama sonuç sayfasını yükle, scroll et ve bot korumasını kontrol et"""
+        page = page or self.page
+        logger.info(f"Scraping başlatılıyor: {url}")
+        
+        # Sayfayı yükle - daha uzun bekleme süresi
+        with SCAN_PHASE_SECONDS.time(phase="goto"):
             try:
                 # Önce load event'ini bekle
-                await self.page.goto(url, wait_until="load", timeout=90000)
-                await asyncio.sleep(2)
+                await page.goto(url, wait_until="load", timeout=90000)
+                await self._settle(2)
                 # Sonra networkidle için bekle
-                await self.page.wait_for_load_state("networkidle", timeout=30000)
+                await page.wait_for_load_state("networkidle", timeout=30000)
             except Exception as e:
                 logger.warning(f"networkidle timeout, domcontentloaded deneniyor: {e}")
                 try:
-                    await self.page.goto(url, wait_until="domcontentloaded", timeout=90000)
+                    await page.goto(url, wait_until="domcontentloaded", timeout=90000)
                 except Exception as e2:
                     logger.error(f"Sayfa yüklenemedi: {e2}")
                     # Sayfayı tekrar yükle
-                    await self.page.reload(wait_until="load", timeout=60000)
-            
-            # Bot korumasını aşmak için daha uzun bekleme
-            await asyncio.sleep(5)
-            
-            # Lazy loading için sayfayı scroll et - tüm resimlerin yüklenmesi için
-            print("Sayfa scroll ediliyor (lazy loading için)...", file=sys.stderr)
-            await self.page.evaluate("""
-                async () => {
-                    const delay = ms => new Promise(resolve => setTimeout(resolve, ms));
-                    // Sayfanın en altına kadar scroll et
-                    const scrollHeight = document.body.scrollHeight;
-                    const viewportHeight = window.innerHeight;
-                    let currentPosition = 0;
-                    
-                    while (currentPosition < scrollHeight) {
-                        window.scrollTo(0, currentPosition);
-                        await delay(300);
-                        currentPosition += viewportHeight;
-                    }
-                    // En alta git
-                    window.scrollTo(0, scrollHeight);
-                    await delay(500);
-                    // Tekrar en başa dön
-                    window.scrollTo(0, 0);
+                    await page.reload(wait_until="load", timeout=60000)
+        
+        with SCAN_PHASE_SECONDS.time(phase="ready"):
+            loaded = await self._wait_results_ready(page)
+        SCAN_PAGES.inc(result="ok" if loaded else "failed")
+        if loaded and self.recorder:
+            self.recorder.save(url, await page.content(), kind="results")
+        return loaded
+    
+    async def _settle(self, seconds: float):
+        """Bot koruması için bekle (settle_scale ile ölçeklenir)"""
+        if self.settle_scale > 0:
+            await asyncio.sleep(seconds * self.settle_scale)
+    
+    async def _wait_results_ready(self, page: Page) -> bool:
+        """Lazy loading için scroll et, bot korumasını (503) kontrol et"""
+        # Bot korumasını aşmak için daha uzun bekleme
+        await self._settle(5)
+        
+        # Lazy loading için sayfayı scroll et - tüm resimlerin yüklenmesi için
+        await page.evaluate("""
+            async () => {
+                const delay = ms => new Promise(resolve => setTimeout(resolve, ms));
+                // Sayfanın en altına kadar scroll et
+                const scrollHeight = document.body.scrollHeight;
+                const viewportHeight = window.innerHeight;
+                let currentPosition = 0;
+                
+                while (currentPosition < scrollHeight) {
+                    window.scrollTo(0, currentPosition);
+                    await delay(300);
+                    currentPosition += viewportHeight;
                 }
-            """)
-            await asyncio.sleep(5)  # Bot koruması için daha uzun bekleme
-            
-            page_title = await self.page.title()
-            current_url = self.page.url
-            page_content = await self.page.content()
-            
-            logger.info(f"Sayfa başlığı: {page_title}")
-            logger.info(f"Mevcut URL: {current_url}")
-            logger.info(f"Sayfa içeriği uzunluğu: {len(page_content)} karakter")
-            print(f"Sayfa başlığı: {page_title}", file=sys.stderr)
-            print(f"Mevcut URL: {current_url}", file=sys.stderr)
-            print(f"Sayfa içeriği uzunluğu: {len(page_content)} karakter", file=sys.stderr)
-            
-            # 503 hatası ve bot koruması kontrolü
-            if "503" in page_title or "Backend fetch failed" in page_title or "Sonuç bulunamadı" in page_content:
-                logger.error("503 hatası: arabam.com bot koruması aktif. Daha fazla bekleme...")
-                await asyncio.sleep(5)
-                # Sayfayı yeniden yükle
-                try:
-                    await self.page.reload(wait_until="load", timeout=60000)
-                    await asyncio.sleep(3)
-                    page_content = await self.page.content()
-                    page_title = await self.page.title()
-                    if "503" in page_title or len(page_content) < 5000:
-                        logger.error("503 hatası devam ediyor, scraping iptal ediliyor")
-                        return []
-                except Exception as e:
-                    logger.error(f"Sayfa yeniden yüklenemedi: {e}")
-                    return []
-            
-            if len(page_content) < 5000:
-                logger.error("Sayfa çok kısa, hata olabilir")
-                return []
-            
-            print(f"SAYFA BAŞARIYLA YÜKLENDİ: {current_url}", file=sys.stderr)
-            
-            listings = []
-            
-            # Yöntem 1: Doğrudan ilan linklerini bul
-            # arabam.com GÜNCEL link class'ı: a.link-overlay
-            ilan_links = await self.page.query_selector_all("a.link-overlay")
-            print(f"Bulunan ilan linki sayısı (a.link-overlay): {len(ilan_links)}", file=sys.stderr)
-            
-            if len(ilan_links) == 0:
-                # Alternatif 1: /ilan/ ve /detay içeren linkler
-                ilan_links = await self.page.query_selector_all("a[href*='/ilan/'][href*='/detay']")
-                print(f"Alternatif ilan linki sayısı (/ilan/+/detay): {len(ilan_links)}", file=sys.stderr)
-            
-            if len(ilan_links) == 0:
-                # Alternatif 2: Sadece /ilan/ içeren linkler
-                ilan_links = await self.page.query_selector_all("a[href*='/ilan/']")
-                print(f"Alternatif ilan linki sayısı (/ilan/): {len(ilan_links)}", file=sys.stderr)
-            
-            # Önce sayfadaki ilan kartlarını bul
-            # arabam.com'un GÜNCEL yapısını kullan (2024)
-            # Doğru selector: table.listing-table içindeki tr.listing-list-item
-            listing_cards = await self.page.query_selector_all('table.listing-table tr.listing-list-item')
-            print(f"Listing card sayısı (table.listing-table tr.listing-list-item): {len(listing_cards)}", file=sys.stderr)
-            
-            if len(listing_cards) == 0:
-                # Alternatif 1: Sadece tr.listing-list-item
-                listing_cards = await self.page.query_selector_all('tr.listing-list-item')
-                print(f"Alternatif listing card sayısı (tr.listing-list-item): {len(listing_cards)}", file=sys.stderr)
-            
-            if len(listing_cards) == 0:
-                # Alternatif 2: Tüm table row'ları (son çare)
-                listing_cards = await self.page.query_selector_all('table.listing-table tbody tr')
-                print(f"Alternatif table row sayısı (tbody tr): {len(listing_cards)}", file=sys.stderr)
-            
-            # İlk kartın TÜM HTML'ini göster
-            if len(listing_cards) > 0:
-                first_card = listing_cards[0]
-                card_html = await first_card.inner_html()
-                print(f"=== İLK KART TÜM HTML ({len(card_html)} karakter) ===", file=sys.stderr)
-                print(card_html[:4000], file=sys.stderr)
-                print(f"=== HTML SONU ===", file=sys.stderr)
-            
-            # Önce tüm unique URL'leri ve bilgilerini topla
-            url_data = {}  # URL -> {texts: [], elements: []}
-            
-            for link in ilan_links:
-                try:
-                    href = await link.get_attribute("href")
-                    if not href or "/ilan/" not in href:
-                        continue
-                    
-                    # URL'yi düzelt
-                    if href.startswith("/"):
-                        full_url = self.base_url + href
-                    else:
-                        full_url = href
-                    
-                    # Geçersiz URL'leri atla
-                    skip_patterns = ["/satildi", "/login", "/kayit", "/filtre", "/compare", "/favori"]
-                    if any(pattern in full_url.lower() for pattern in skip_patterns):
-                        continue
-                    
-                    # URL'ye ait bilgileri topla
-                    if full_url not in url_data:
-                        url_data[full_url] = {"texts": [], "href": href}
-                    
-                    # Link metnini al
-                    link_text = await link.inner_text()
-                    if link_text and link_text.strip():
-                        url_data[full_url]["texts"].append(link_text.strip())
-                    
-                    # Parent element'i bul ve içeriğini al
-                    try:
-                        parent = await link.evaluate_handle("""
-                            (el) => {
-                                let p = el.closest('tr, [class*="listing-item"], [class*="card"], article, li');
-                                if (!p) p = el.parentElement?.parentElement?.parentElement;
-                                return p;
-                            }
-                        """)
-                        if parent:
-                            parent_elem = await parent.as_element()
-                            if parent_elem:
-                                parent_text = await parent_elem.inner_text()
-                                if parent_text:
-                                    url_data[full_url]["parent_text"] = parent_text
-                                parent_html = await parent_elem.inner_html()
-                                if parent_html:
-                                    url_data[full_url]["parent_html"] = parent_html
-                    except:
-                        pass
-                        
-                except Exception as e:
+                // En alta git
+                window.scrollTo(0, scrollHeight);
+                await delay(500);
+                // Tekrar en başa dön
+                window.scrollTo(0, 0);
+            }
+        """)
+        await self._settle(5)  # Bot koruması için daha uzun bekleme
+        
+        page_title = await page.title()
+        current_url = page.url
+        page_content = await page.content()
+        
+        logger.debug(f"Sayfa: {page_title} | {current_url} | {len(page_content)} karakter")
+        
+        # 503 hatası ve bot koruması kontrolü
+        if "503" in page_title or "Backend fetch failed" in page_title or "Sonuç bulunamadı" in page_content:
+            SCAN_BLOCKED.inc()
+            logger.warning("503 hatası: arabam.com bot koruması aktif. Daha fazla bekleme...")
+            await self._settle(5)
+            # Sayfayı yeniden yükle
+            try:
+                await page.reload(wait_until="load", timeout=60000)
+                await self._settle(3)
+                page_content = await page.content()
+                page_title = await page.title()
+                if "503" in page_title or len(page_content) < 5000:
+                    logger.error("503 hatası devam ediyor, scraping iptal ediliyor")
+                    return False
+            except Exception as e:
+                logger.error(f"Sayfa yeniden yüklenemedi: {e}")
+                return False
+        
+        if len(page_content) < 5000:
+            logger.error("Sayfa çok kısa, hata olabilir")
+            return False
+        
+        logger.debug(f"Sayfa yüklendi: {current_url}")
+        return True
+    
+    def find_known_keys(self, urls: List[str]) -> Set[Union[int, str]]:
+        """
+        Verilen URL'lerden DB'de zaten kayıtlı olanların anahtarlarını bul (bkz. listing_key)
+        
+        ID'li URL'ler tamsayı external_id indeksinden, ID'siz olanlar source_url'den sorgulanır.
+        """
+        ids, plain_urls = set(), set()
+        for url in urls:
+            key = listing_key(url)
+            (ids if isinstance(key, int) else plain_urls).add(key)
+        
+        known = set()
+        if ids:
+            known.update(e[0] for e in self.db.query(Listing.external_id).filter(
+                Listing.external_id.in_(ids)
+            ).all())
+        if plain_urls:
+            known.update(e[0] for e in self.db.query(Listing.source_url).filter(
+                Listing.source_url.in_(plain_urls)
+            ).all())
+        return known
+    
+    async def _extract_page_listings(self, watermark: Optional[int] = None, page: Page = None):
+        """
+        Yüklü sonuç sayfasından ilanları çıkar
+        
+        Args:
+            watermark: Artımlı modda en son görülen ilan ID'si. None ise tüm
+                kartlar işlenir; aksi halde bilinen ilanlar atlanır.
+            page: Okunacak sekme (varsayılan: ana sekme)
+        
+        Returns:
+            (listings, stats) - stats: {"total", "known", "newest_id"}
+        """
+        page = page or self.page
+        incremental = watermark is not None
+        stats = {"total": 0, "known": 0, "newest_id": 0}
+        listings = []
+        
+        # Yöntem 1: Doğrudan ilan linklerini bul
+        # arabam.com GÜNCEL link class'ı: a.link-overlay
+        ilan_links = await page.query_selector_all("a.link-overlay")
+        logger.debug(f"Bulunan ilan linki sayısı (a.link-overlay): {len(ilan_links)}")
+        
+        if len(ilan_links) == 0:
+            # Alternatif 1: /ilan/ ve /detay içeren linkler
+            ilan_links = await page.query_selector_all("a[href*='/ilan/'][href*='/detay']")
+            logger.debug(f"Alternatif ilan linki sayısı (/ilan/+/detay): {len(ilan_links)}")
+        
+        if len(ilan_links) == 0:
+            # Alternatif 2: Sadece /ilan/ içeren linkler
+            ilan_links = await page.query_selector_all("a[href*='/ilan/']")
+            logger.debug(f"Alternatif ilan linki sayısı (/ilan/): {len(ilan_links)}")
+        
+        # Önce sayfadaki ilan kartlarını bul
+        # arabam.com'un GÜNCEL yapısını kullan (2024)
+        # Doğru selector: table.listing-table içindeki tr.listing-list-item
+        listing_cards = await page.query_selector_all('table.listing-table tr.listing-list-item')
+        logger.debug(f"Listing card sayısı (table.listing-table tr.listing-list-item): {len(listing_cards)}")
+        
+        if len(listing_cards) == 0:
+            # Alternatif 1: Sadece tr.listing-list-item
+            listing_cards = await page.query_selector_all('tr.listing-list-item')
+            logger.debug(f"Alternatif listing card sayısı (tr.listing-list-item): {len(listing_cards)}")
+        
+        if len(listing_cards) == 0:
+            # Alternatif 2: Tüm table row'ları (son çare)
+            listing_cards = await page.query_selector_all('table.listing-table tbody tr')
+            logger.debug(f"Alternatif table row sayısı (tbody tr): {len(listing_cards)}")
+        
+        # Seçici kırılmalarını teşhis için ilk kartın HTML'i - sadece DEBUG'da ve örneklenerek
+        if listing_cards and should_sample(logger, logging.DEBUG, "scraper.first_card_html"):
+            card_html = await listing_cards[0].inner_html()
+            logger.debug(f"İlk kart HTML ({len(card_html)} karakter):\n{card_html[:4000]}")
+        
+        # Linklerin href'lerini topla (ucuz) - bilinen ilanları ağır işlemlerden önce ayıklamak için
+        link_hrefs = []
+        for link in ilan_links:
+            try:
+                href = await link.get_attribute("href")
+            except Exception:
+                href = None
+            link_hrefs.append(href)
+        
+        known_keys = set()
+        if incremental:
+            candidate_urls = [
+                self.base_url + h if h.startswith("/") else h
+                for h in link_hrefs if h and "/ilan/" in h
+            ]
+            known_keys = self.find_known_keys(candidate_urls)
+        
+        def is_known(full_url: str) -> bool:
+            if not incremental:
+                return False
+            key = listing_key(full_url)
+            if key in known_keys:
+                return True
+            return bool(isinstance(key, int) and watermark and key <= watermark)
+        
+        # Önce tüm unique URL'leri ve bilgilerini topla
+        url_data = {}  # URL -> {texts: [], elements: []}
+        
+        for link, href in zip(ilan_links, link_hrefs):
+            try:
+                if not href or "/ilan/" not in href:
                     continue
-            
-            print(f"Toplam {len(url_data)} benzersiz ilan URL'si bulundu", file=sys.stderr)
-            
-            # Listing card'lardan (table row) direkt veri çek - daha güvenilir
-            print(f"Listing card'lardan veri çekiliyor...", file=sys.stderr)
-            
-            for card in listing_cards[:25]:
-                try:
-                    # img tag'ini bul
-                    img = await card.query_selector('img.listing-image, img[class*="listing"]')
-                    if not img:
-                        img = await card.query_selector('img')
-                    
-                    if img:
-                        # Önce src, yoksa data-src, yoksa data-original kontrol et
-                        src = await img.get_attribute("src") or ""
-                        if not src or "placeholder" in src.lower() or "1x1" in src:
-                            src = await img.get_attribute("data-src") or await img.get_attribute("data-original") or ""
-                        alt = await img.get_attribute("alt") or ""
-                        
-                        # Link'i bul
-                        link = await card.query_selector('a[href*="/ilan/"]')
-                        href = await link.get_attribute("href") if link else ""
-                        
-                        if href and alt:
-                            full_url = self.base_url + href if href.startswith("/") else href
-                            
-                            # Fiyatı bul
-                            price_elem = await card.query_selector('[class*="price"], .listing-price, td:last-child')
-                            price_text = await price_elem.inner_text() if price_elem else ""
-                            price = self.parse_price(price_text) if price_text else 0
-                            
-                            # Fiyat bulunamadıysa tüm text'ten çıkar
-                            if price == 0:
-                                card_text = await card.inner_text()
-                                price = self.extract_price_from_text(card_text, "")
-                            
-                            # Şehir: Detay sayfasından çekilecek (şimdilik boş bırak)
-                            city = self.extract_city(alt)  # Başlıktan dene
-                            
-                            # Resim URL'sinin geçerli olup olmadığını kontrol et
-                            valid_image = False
-                            if src:
-                                # arbstorage, mncdn veya herhangi bir jpg/png/webp
-                                if any(kw in src.lower() for kw in ["arbstorage", "mncdn", "ilanfoto", "cdn"]):
-                                    valid_image = True
-                                elif any(ext in src.lower() for ext in [".jpg", ".jpeg", ".png", ".webp"]):
-                                    if not any(bad in src.lower() for bad in ["placeholder", "icon", "logo", "1x1", "spinner"]):
-                                        valid_image = True
-                            
-                            listing_data = {
-                                "title": alt[:200],
-                                "price": price,
-                                "source_url": full_url,
-                                "year": self.extract_year(alt),
-                                "brand": self.extract_brand(alt),
-                                "model": None,
-                                "city": city,
-                                "fuel_type": self.extract_fuel_type(alt),
-                                "transmission": self.extract_transmission(alt),
-                                "mileage": None,
-                                "description": alt,
-                                "images": [src] if valid_image else [],
-                                "damage_info": None
-                            }
-                            
-                            listings.append(listing_data)
-                            print(f"İlan eklendi: {alt[:45]} - {price} TL - {len(listing_data['images'])} resim", file=sys.stderr)
-                except Exception as e:
-                    print(f"Card parse hatası: {e}", file=sys.stderr)
+                
+                # URL'yi düzelt
+                if href.startswith("/"):
+                    full_url = self.base_url + href
+                else:
+                    full_url = href
+                
+                # Geçersiz URL'leri atla
+                skip_patterns = ["/satildi", "/login", "/kayit", "/filtre", "/compare", "/favori"]
+                if any(pattern in full_url.lower() for pattern in skip_patterns):
                     continue
-            
-            # Eğer listing_cards'dan yeterli veri gelmezse, eski yönteme devam et
-            if len(listings) < 5:
-                print(f"Card'lardan {len(listings)} ilan geldi, URL yöntemiyle devam ediliyor...", file=sys.stderr)
                 
-                # Sayfadaki tüm resimleri ve alt text'leri topla
-                all_images = {}
+                # Bilinen ilanlar için parent içeriği çekme
+                if is_known(full_url):
+                    continue
+                
+                # URL'ye ait bilgileri topla
+                if full_url not in url_data:
+                    url_data[full_url] = {"texts": [], "href": href}
+                
+                # Link metnini al
+                link_text = await link.inner_text()
+                if link_text and link_text.strip():
+                    url_data[full_url]["texts"].append(link_text.strip())
+                
+                # Parent element'i bul ve içeriğini al
                 try:
-                    img_elements = await self.page.query_selector_all('img[src*="arbstorage"]')
-                    for img in img_elements:
-                        try:
-                            src = await img.get_attribute("src") or ""
-                            alt = await img.get_attribute("alt") or ""
-                            id_match = re.search(r'/(\d{7,10})/', src)
-                            if id_match:
-                                ilan_id = id_match.group(1)
-                                if ilan_id not in all_images:
-                                    all_images[ilan_id] = {"images": [], "alt": alt}
-                                if src not in all_images[ilan_id]["images"]:
-                                    all_images[ilan_id]["images"].append(src)
-                        except:
-                            continue
+                    parent = await link.evaluate_handle("""
+                        (el) => {
+                            let p = el.closest('tr, [class*="listing-item"], [class*="card"], article, li');
+                            if (!p) p = el.parentElement?.parentElement?.parentElement;
+                            return p;
+                        }
+                    """)
+                    if parent:
+                        parent_elem = await parent.as_element()
+                        if parent_elem:
+                            parent_text = await parent_elem.inner_text()
+                            if parent_text:
+                                url_data[full_url]["parent_text"] = parent_text
+                            parent_html = await parent_elem.inner_html()
+                            if parent_html:
+                                url_data[full_url]["parent_html"] = parent_html
                 except:
                     pass
+                    
+            except Exception as e:
+                continue
+        
+        logger.debug(f"Toplam {len(url_data)} benzersiz ilan URL'si bulundu")
+        
+        # Listing card'lardan (table row) direkt veri çek - daha güvenilir
+        
+        for card in listing_cards[:self.MAX_CARDS_PER_PAGE]:
+            try:
+                # Link'i bul
+                link = await card.query_selector('a[href*="/ilan/"]')
+                href = await link.get_attribute("href") if link else ""
+                if not href:
+                    continue
+                full_url = self.base_url + href if href.startswith("/") else href
                 
-                # URL yöntemi
-                for full_url, data in list(url_data.items())[:50]:
-                    try:
-                        href = data["href"]
-                        texts = data.get("texts", [])
-                        parent_text = data.get("parent_text", "")
-                        
-                        # URL'den ilan ID'sini çıkar
-                        ilan_id_match = re.search(r'/(\d{7,10})(?:/|$|\?)', href)
-                        ilan_id = ilan_id_match.group(1) if ilan_id_match else None
-                        
-                        # Başlık ve Resim
-                        title = ""
-                        images = []
-                        
-                        if ilan_id and ilan_id in all_images:
-                            images = all_images[ilan_id]["images"][:3]
-                            title = all_images[ilan_id]["alt"]
-                        
-                        if not title or len(title) < 10:
-                            title = self.extract_title_from_url(href)
+                stats["total"] += 1
+                external_id = extract_ilan_id(full_url)
+                stats["newest_id"] = max(stats["newest_id"], external_id or 0)
+                
+                # Bilinen ilan - parse etmeden atla
+                if is_known(full_url):
+                    stats["known"] += 1
+                    continue
+                
+                # img tag'ini bul
+                img = await card.query_selector('img.listing-image, img[class*="listing"]')
+                if not img:
+                    img = await card.query_selector('img')
+                
+                if img:
+                    # Önce src, yoksa data-src, yoksa data-original kontrol et
+                    src = await img.get_attribute("src") or ""
+                    if not src or "placeholder" in src.lower() or "1x1" in src:
+                        src = await img.get_attribute("data-src") or await img.get_attribute("data-original") or ""
+                    alt = await img.get_attribute("alt") or ""
+                    
+                    if alt:
+                        # Fiyatı bul
+                        price_elem = await card.query_selector('[class*="price"], .listing-price, td:last-child')
+                        price_text = await price_elem.inner_text() if price_elem else ""
+                        price = parse_price(price_text) if price_text else 0
                         
-                        if not title or len(title) < 10:
-                            continue
+                        # Fiyat bulunamadıysa tüm text'ten çıkar
+                        if price == 0:
+                            card_text = await card.inner_text()
+                            price = extract_price_from_text(card_text, "")
                         
-                        # Fiyat
-                        price = 0.0
-                        for txt in texts:
-                            if "TL" in txt or "₺" in txt:
-                                price = self.parse_price(txt)
-                                if price > 10000:
-                                    break
+                        # Yıl/marka/yakıt/vites tek geçişte; şehir detay sayfasından da tamamlanır
+                        fields = extract_fields(alt)
                         
-                        if price == 0 and parent_text:
-                            price = self.extract_price_from_text(parent_text, "")
+                        # Resim URL'sinin geçerli olup olmadığını kontrol et
+                        valid_image = False
+                        if src:
+                            # arbstorage, mncdn veya herhangi bir jpg/png/webp
+                            if any(kw in src.lower() for kw in ["arbstorage", "mncdn", "ilanfoto", "cdn"]):
+                                valid_image = True
+                            elif any(ext in src.lower() for ext in [".jpg", ".jpeg", ".png", ".webp"]):
+                                if not any(bad in src.lower() for bad in ["placeholder", "icon", "logo", "1x1", "spinner"]):
+                                    valid_image = True
                         
                         listing_data = {
-                            "title": title[:200],
+                            "title": alt[:200],
                             "price": price,
                             "source_url": full_url,
-                            "year": self.extract_year(title),
-                            "brand": self.extract_brand(title),
-                            "model": None,
-                            "city": self.extract_city(title),
-                            "fuel_type": self.extract_fuel_type(title),
-                            "transmission": self.extract_transmission(title),
+                            "external_id": external_id,
+                            "year": fields["year"],
+                            **vehicle_catalog.identify(alt, fields["brand"]),
+                            "city": fields["city"],
+                            "fuel_type": fields["fuel_type"],
+                            "transmission": fields["transmission"],
                             "mileage": None,
-                            "description": title,
-                            "images": images[:3] if images else [],
+                            "description": alt,
+                            "images": normalize_images([src]) if valid_image else [],
                             "damage_info": None
                         }
                         
                         listings.append(listing_data)
-                        print(f"İlan eklendi: {title[:40]} - {price} TL - {len(images)} resim", file=sys.stderr)
-                        
-                    except Exception as e:
+                        log_sampled(
+                            logger, logging.DEBUG, "scraper.listing_added", "İlan eklendi: %s - %s TL - %d resim",
+                            alt[:45], price, len(listing_data["images"])
+                        )
+            except Exception as e:
+                log_sampled(logger, logging.WARNING, "scraper.card_error", "Card parse hatası: %s", e)
+                continue
+        
+        # Eğer listing_cards'dan yeterli veri gelmezse, eski yönteme devam et
+        # (artımlı modda kartların çoğu bilindiği için az ilan gelmesi normaldir)
+        if len(listings) < 5 and not (incremental and stats["known"] > 0):
+            logger.debug(f"Card'lardan {len(listings)} ilan geldi, URL yöntemiyle devam ediliyor")
+            
+            # Sayfadaki tüm resimleri ve alt text'leri topla
+            all_images = {}
+            try:
+                img_elements = await page.query_selector_all('img[src*="arbstorage"]')
+                for img in img_elements:
+                    try:
+                        src = await img.get_attribute("src") or ""
+                        alt = await img.get_attribute("alt") or ""
+                        id_match = re.search(r'/(\d{7,10})/', src)
+                        if id_match:
+                            ilan_id = id_match.group(1)
+                            if ilan_id not in all_images:
+                                all_images[ilan_id] = {"images": [], "alt": alt}
+                            if src not in all_images[ilan_id]["images"]:
+                                all_images[ilan_id]["images"].append(src)
+                    except:
                         continue
+            except:
+                pass
             
-            # TÜM ilanlar için detay sayfasından ek bilgi çek (resim, şehir, hasar, km)
-            # Hasar bilgisi (boya-değişen-tramer) tüm ilanlar için gerekli
-            listings_needing_details = [
-                l for l in listings 
-                if l.get("source_url")  # URL'si olan tüm ilanlar
-            ]
+            seen_keys = {l["external_id"] or l["source_url"] for l in listings}
             
-            if listings_needing_details:
-                print(f"{len(listings_needing_details)} ilan için detay bilgisi çekiliyor (paralel)...", file=sys.stderr)
+            # URL yöntemi
+            for full_url, data in list(url_data.items())[:self.MAX_CARDS_PER_PAGE]:
+                try:
+                    external_id = extract_ilan_id(full_url)
+                    if (external_id or full_url) in seen_keys:
+                        continue
+                    seen_keys.add(external_id or full_url)
+                    
+                    href = data["href"]
+                    texts = data.get("texts", [])
+                    parent_text = data.get("parent_text", "")
+                    
+                    # URL'den ilan ID'sini çıkar
+                    ilan_id = str(external_id) if external_id else None
+                    if external_id:
+                        stats["newest_id"] = max(stats["newest_id"], external_id)
+                    
+                    # Başlık ve Resim
+                    title = ""
+                    images = []
+                    
+                    if ilan_id and ilan_id in all_images:
+                        images = all_images[ilan_id]["images"][:3]
+                        title = all_images[ilan_id]["alt"]
+                    
+                    if not title or len(title) < 10:
+                        title = extract_title_from_url(href)
+                    
+                    if not title or len(title) < 10:
+                        continue
+                    
+                    # Fiyat
+                    price = 0.0
+                    for txt in texts:
+                        if "TL" in txt or "₺" in txt:
+                            price = parse_price(txt)
+                            if price > 10000:
+                                break
+                    
+                    if price == 0 and parent_text:
+                        price = extract_price_from_text(parent_text, "")
+                    
+                    fields = extract_fields(title)
+                    listing_data = {
+                        "title": title[:200],
+                        "price": price,
+                        "source_url": full_url,
+                        "external_id": external_id,
+                        "year": fields["year"],
+                        **vehicle_catalog.identify(title, fields["brand"]),
+                        "city": fields["city"],
+                        "fuel_type": fields["fuel_type"],
+                        "transmission": fields["transmission"],
+                        "mileage": None,
+                        "description": title,
+                        "images": normalize_images(images, limit=3),
+                        "damage_info": None
+                    }
+                    
+                    listings.append(listing_data)
+                    log_sampled(
+                        logger, logging.DEBUG, "scraper.listing_added", "İlan eklendi: %s - %s TL - %d resim",
+                        title[:40], price, len(images)
+                    )
+                    
+                except Exception as e:
+                    continue
+        
+        SCAN_CARDS.inc(stats["known"], result="known")
+        SCAN_CARDS.inc(len(listings), result="parsed")
+        logger.info(
+            f"{'Artımlı tarama' if incremental else 'Sayfa'}: {stats['total']} kart, "
+            f"{stats['known']} bilinen, {len(listings)} yeni"
+        )
+        
+        return listings, stats
+    
+    async def _enrich_with_details(self, listings: List[Dict[str, Any]]):
+        """Detay sayfalarından ek bilgi çek (resim, şehir, hasar, km)"""
+        # Hasar bilgisi (boya-değişen-tramer) tüm ilanlar için gerekli
+        listings_needing_details = [
+            l for l in listings 
+            if l.get("source_url")  # URL'si olan tüm ilanlar
+        ]
+        
+        if not listings_needing_details:
+            return
+        
+        logger.debug(f"{len(listings_needing_details)} ilan için detay bilgisi çekiliyor (paralel)")
+        
+        # Paralel olarak detay bilgilerini çek
+        tasks = [self.fetch_detail_info(l["source_url"]) for l in listings_needing_details]
+        detail_results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Sonuçları ilanlara ata
+        for i, listing in enumerate(listings_needing_details):
+            if i < len(detail_results) and isinstance(detail_results[i], dict):
+                detail = detail_results[i]
                 
-                # Paralel olarak detay bilgilerini çek
-                tasks = [self.fetch_detail_info(l["source_url"]) for l in listings_needing_details]
-                detail_results = await asyncio.gather(*tasks, return_exceptions=True)
+                # Resim yoksa detaydan al
+                if not listing.get("images") or len(listing.get("images", [])) == 0:
+                    if detail.get("images"):
+                        listing["images"] = detail["images"]
+                        log_sampled(
+                            logger, logging.DEBUG, "scraper.detail_images", "Detaydan resim eklendi: %s (%d resim)",
+                            listing["title"][:30], len(detail["images"])
+                        )
                 
-                # Sonuçları ilanlara ata
-                for i, listing in enumerate(listings_needing_details):
-                    if i < len(detail_results) and isinstance(detail_results[i], dict):
-                        detail = detail_results[i]
-                        
-                        # Resim yoksa detaydan al
-                        if not listing.get("images") or len(listing.get("images", [])) == 0:
-                            if detail.get("images"):
-                                listing["images"] = detail["images"]
-                                print(f"  + Resim eklendi: {listing['title'][:30]} ({len(detail['images'])} resim)", file=sys.stderr)
-                        
-                        # Şehir yoksa detaydan al
-                        if not listing.get("city") and detail.get("city"):
-                            listing["city"] = detail["city"]
-                        
-                        # Kilometre bilgisi
-                        if detail.get("mileage"):
-                            listing["mileage"] = detail["mileage"]
-                        
-                        # Hasar bilgisi
-                        if detail.get("damage_info"):
-                            listing["damage_info"] = detail["damage_info"]
+                # Şehir yoksa detaydan al
+                if not listing.get("city") and detail.get("city"):
+                    listing["city"] = detail["city"]
                 
-                logger.info(f"Detay bilgileri çekildi: {len(listings_needing_details)} ilan")
-            
-            logger.info(f"Toplam {len(listings)} ilan çıkarıldı")
-            return listings
-            
-        except Exception as e:
-            logger.error(f"Scraping hatası: {e}", exc_info=True)
-            return []
-    
-    def extract_title_from_url(self, url: str) -> str:
-        """URL'den araç başlığı çıkar"""
-        try:
-            # URL örneği: /ilan/galeriden-satilik-renault-symbol-1-5-dci-joy/galeriden-renault-symbol-1-5-dci-joy-2018-model-bursa/33861099
-            # Son parça: ID (33861099)
-            # Ondan önceki parça: Gerçek başlık
-            
-            parts = [p for p in url.split("/") if p and not p.isdigit()]
-            
-            # "ilan" kelimesini çıkar
-            if "ilan" in parts:
-                parts.remove("ilan")
-            
-            # Son anlamlı parçayı al (ID'den önceki)
-            if not parts:
-                return ""
-            
-            # Genelde son parça en detaylı başlık
-            title_part = parts[-1] if parts else ""
-            
-            # Kebab-case'i parçala
-            words = title_part.split("-")
-            
-            # Temizlenecek kelimeler
-            skip_words = ["galeriden", "sahibinden", "satilik", "kiralik", "takas", "model", "detay"]
-            
-            clean_words = []
-            for word in words:
-                # Şehir isimlerini atla
-                cities = ["istanbul", "ankara", "izmir", "bursa", "adana", "antalya", "konya", "gaziantep", "kayseri", "mersin", "eskisehir", "diyarbakir", "samsun", "denizli", "sanliurfa", "malatya", "trabzon", "erzurum"]
-                if word.lower() in cities:
-                    continue
-                # Yılları atla
-                if re.match(r'^(19|20)\d{2}$', word):
-                    continue
-                # Skip listesindeki kelimeleri atla
-                if word.lower() in skip_words:
-                    continue
-                # Çok kısa kelimeleri atla (1, 5 gibi motor hacmi hariç)
-                if len(word) < 2:
-                    continue
-                clean_words.append(word.capitalize())
-            
-            if clean_words:
-                # Tekrarlı kelimeleri kaldır (ardışık)
-                unique_words = []
-                for word in clean_words:
-                    if not unique_words or word.lower() != unique_words[-1].lower():
-                        unique_words.append(word)
-                return " ".join(unique_words[:7])
-            
-            return ""
-        except:
-            return ""
-    
-    def extract_price_from_text(self, text: str, html: str) -> float:
-        """Metinden fiyat çıkar"""
-        try:
-            # Önce HTML'de fiyat class'ı ara
-            price_patterns = [
-                r'class="[^"]*price[^"]*"[^>]*>([^<]+)',
-                r'class="[^"]*fiyat[^"]*"[^>]*>([^<]+)',
-                r'data-price="([\d.,]+)"',
-            ]
-            
-            for pattern in price_patterns:
-                match = re.search(pattern, html, re.IGNORECASE)
-                if match:
-                    price = self.parse_price(match.group(1))
-                    if price > 10000:  # Makul bir fiyat
-                        return price
-            
-            # Metin içinde fiyat ara
-            # Türk formatı: 1.500.000 TL veya 1,500,000 TL
-            text_patterns = [
-                r'([\d]{1,3}(?:\.[\d]{3}){2,})\s*(?:TL|₺)',  # 1.500.000 TL
-                r'([\d]{1,3}(?:,[\d]{3}){2,})\s*(?:TL|₺)',  # 1,500,000 TL
-                r'([\d]{6,})\s*(?:TL|₺)',  # 1500000 TL
-                r'(?:TL|₺)\s*([\d]{1,3}(?:\.[\d]{3}){2,})',  # TL 1.500.000
-            ]
-            
-            for pattern in text_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    price = self.parse_price(match.group(1))
-                    if price > 10000:
-                        return price
-            
-            # Son çare: Büyük sayıları ara
-            all_numbers = re.findall(r'[\d]{1,3}(?:\.[\d]{3}){1,}', text)
-            for num_str in all_numbers:
-                price = self.parse_price(num_str)
-                if 50000 < price < 50000000:  # Makul fiyat aralığı
-                    return price
-            
-            return 0.0
-        except:
-            return 0.0
+                # Kilometre bilgisi
+                if detail.get("mileage"):
+                    listing["mileage"] = detail["mileage"]
+                
+                # Hasar bilgisi
+                if detail.get("damage_info"):
+                    listing["damage_info"] = detail["damage_info"]
+        
+        logger.info(f"Detay bilgileri çekildi: {len(listings_needing_details)} ilan")
     
     async def extract_images_from_element(self, element) -> List[str]:
         """Element içinden resimleri çıkar"""
@@ -739,49 +974,6 @@ class ArabaComScraper:
         
         return images
     
-    def extract_year(self, text: str) -> int:
-        """Metinden yıl çıkar"""
-        try:
-            match = re.search(r'\b(19[89]\d|20[0-2]\d)\b', text)
-            if match:
-                year = int(match.group(1))
-                if 1980 <= year <= 2025:
-                    return year
-        except:
-            pass
-        return None
-    
-    def extract_brand(self, text: str) -> str:
-        """Metinden marka çıkar"""
-        brands = [
-            "Audi", "BMW", "Mercedes", "Volkswagen", "Ford", "Opel",
-            "Renault", "Peugeot", "Fiat", "Toyota", "Honda", "Hyundai",
-            "Volvo", "Skoda", "Seat", "Citroen", "Dacia", "Nissan",
-            "Kia", "Mazda", "Mitsubishi", "Suzuki", "Chevrolet", "Jeep"
-        ]
-        text_lower = text.lower()
-        for brand in brands:
-            if brand.lower() in text_lower:
-                return brand
-        return None
-    
-    def extract_city(self, text: str) -> str:
-        """Metinden şehir çıkar"""
-        cities = [
-            "İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Adana",
-            "Gaziantep", "Konya", "Kayseri", "Mersin", "Eskişehir", "Samsun",
-            "Tekirdağ", "Kastamonu", "Denizli", "Manisa", "Kocaeli", "Sakarya",
-            "Trabzon", "Diyarbakır", "Şanlıurfa", "Malatya", "Erzurum", "Aydın",
-            "Balıkesir", "Hatay", "Van", "Kahramanmaraş", "Ordu", "Afyonkarahisar",
-            "Muğla", "Elazığ", "Mardin", "Aksaray", "Edirne", "Çanakkale",
-            "Zonguldak", "Tokat", "Kırıkkale", "Çorum", "Sivas", "Yozgat"
-        ]
-        text_lower = text.lower()
-        for city in cities:
-            if city.lower() in text_lower:
-                return city
-        return None
-    
     async def fetch_city_from_detail(self, url: str) -> str:
         """Detay sayfasından şehir bilgisini çek - hızlı HTTP request ile"""
         import aiohttp
@@ -846,70 +1038,89 @@ class ArabaComScraper:
                 session = await self._get_http_session()
                 async with session.get(url) as response:
                     if response.status != 200:
+                        DETAIL_FETCHES.inc(result="http_error")
                         return result
                     
                     html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # 1. Resimleri çek - BeautifulSoup ile
-                    images = []
-                    
-                    # Galeri resimleri
-                    for img in soup.find_all('img'):
-                        src = img.get('data-src') or img.get('src') or img.get('data-original') or ""
-                        if not src:
-                            continue
-                        # Geçerli araç resmi mi?
-                        if any(kw in src.lower() for kw in ["arbstorage", "mncdn", "ilanfoto"]):
-                            if not any(bad in src.lower() for bad in ["logo", "icon", "placeholder", "1x1", "pixel"]):
-                                if src not in images:
-                                    images.append(src)
-                    
-                    # og:image meta tag
-                    og_image = soup.find('meta', property='og:image')
-                    if og_image and og_image.get('content'):
-                        img_url = og_image['content']
-                        if img_url not in images:
-                            images.insert(0, img_url)  # Başa ekle
-                    
-                    result["images"] = images[:5]  # İlk 5 resim
-                    
-                    # 2. Şehir bilgisi
-                    location_elem = soup.find('span', class_='product-location')
-                    if location_elem:
-                        inner_span = location_elem.find('span')
-                        if inner_span:
-                            location_text = inner_span.get_text(strip=True)
-                            if "," in location_text:
-                                result["city"] = location_text.split(",")[-1].strip()
-                            else:
-                                result["city"] = location_text
-                    
-                    # 3. Kilometre bilgisi - tablo satırlarından
-                    for row in soup.find_all('tr'):
-                        cells = row.find_all('td')
-                        if len(cells) >= 2:
-                            label = cells[0].get_text(strip=True).lower()
-                            if 'kilometre' in label:
-                                km_text = cells[1].get_text(strip=True)
-                                km_str = re.sub(r'[^\d]', '', km_text)
-                                if km_str:
-                                    try:
-                                        result["mileage"] = int(km_str)
-                                    except:
-                                        pass
-                                break
-                    
-                    # 4. Boya-Değişen ve Tramer Bilgisi
-                    damage_info = self.parse_damage_info_bs(soup)
-                    if damage_info:
-                        result["damage_info"] = damage_info
-                    
+                    if self.recorder:
+                        self.recorder.save(url, html, kind="detail")
+                    result = self.parse_detail_html(html)
+            
+            DETAIL_FETCHES.inc(result="ok")
         except Exception as e:
+            DETAIL_FETCHES.inc(result="error")
             logger.debug(f"Detay çekme hatası ({url}): {e}")
         
         return result
     
+    def parse_detail_html(self, html: str) -> Dict[str, Any]:
+        """Detay sayfası HTML'inden resim, şehir, km ve hasar bilgisini çıkar"""
+        result = {
+            "images": [],
+            "damage_info": None,
+            "mileage": None,
+            "city": None
+        }
+        soup = BeautifulSoup(html, 'lxml')
+        
+        # 1. Resimleri çek - BeautifulSoup ile
+        images = []
+        
+        # og:image meta tag başa
+        og_image = soup.find('meta', property='og:image')
+        if og_image and og_image.get('content'):
+            images = normalize_images([og_image['content']])
+        
+        # Galeri resimleri - aynı fotoğrafın boyut varyantları normalize edilince
+        # tekilleşir; 5 resim bulununca kalan <img>'ler taranmaz
+        for img in soup.find_all('img'):
+            if len(images) >= 5:
+                break
+            src = img.get('data-src') or img.get('src') or img.get('data-original') or ""
+            if not src:
+                continue
+            # Geçerli araç resmi mi?
+            if any(kw in src.lower() for kw in ["arbstorage", "mncdn", "ilanfoto"]):
+                if not any(bad in src.lower() for bad in ["logo", "icon", "placeholder", "1x1", "pixel"]):
+                    normalized = normalize_image_url(src)
+                    if normalized and normalized not in images:
+                        images.append(normalized)
+        
+        result["images"] = images  # İlk 5 resim
+        
+        # 2. Şehir bilgisi
+        location_elem = soup.find('span', class_='product-location')
+        if location_elem:
+            inner_span = location_elem.find('span')
+            if inner_span:
+                location_text = inner_span.get_text(strip=True)
+                if "," in location_text:
+                    result["city"] = location_text.split(",")[-1].strip()
+                else:
+                    result["city"] = location_text
+        
+        # 3. Kilometre bilgisi - tablo satırlarından
+        for row in soup.find_all('tr'):
+            cells = row.find_all('td')
+            if len(cells) >= 2:
+                label = cells[0].get_text(strip=True).lower()
+                if 'kilometre' in label:
+                    km_text = cells[1].get_text(strip=True)
+                    km_str = re.sub(r'[^\d]', '', km_text)
+                    if km_str:
+                        try:
+                            result["mileage"] = int(km_str)
+                        except:
+                            pass
+                    break
+        
+        # 4. Boya-Değişen ve Tramer Bilgisi
+        damage_info = self.parse_damage_info_bs(soup)
+        if damage_info:
+            result["damage_info"] = damage_info
+        
+        return result
+    
     def parse_damage_info(self, html: str) -> Dict[str, Any]:
         """HTML'den boya-değişen ve tramer bilgisini parse et (regex - eski yöntem)"""
         # BeautifulSoup versiyonu kullanılıyor, bu sadece fallback
@@ -978,7 +1189,6 @@ class ArabaComScraper:
             tramer_info = soup.find('div', class_='tramer-info')
             if tramer_info:
                 tramer_text = tramer_info.get_text(strip=True)
-                print(f"Tramer text: {tramer_text}", file=sys.stderr)
                 
                 # "Tramer tutarı Belirtilmemiş" veya "Tramer tutarı 15.000 TL"
                 if 'belirtilmemiş' in tramer_text.lower():
@@ -1014,136 +1224,66 @@ class ArabaComScraper:
                 return damage_info
                 
         except Exception as e:
-            print(f"Damage info parse hatası: {e}", file=sys.stderr)
+            log_sampled(logger, logging.WARNING, "scraper.damage_error", "Damage info parse hatası: %s", e)
         
         return None
     
-    def extract_fuel_type(self, text: str) -> str:
-        """Metinden yakıt tipi çıkar"""
-        text_lower = text.lower()
-        if any(w in text_lower for w in ["dizel", "diesel"]):
-            return "dizel"
-        elif any(w in text_lower for w in ["benzin", "petrol"]):
-            return "benzin"
-        elif any(w in text_lower for w in ["elektrik", "electric"]):
-            return "elektrik"
-        elif any(w in text_lower for w in ["hibrit", "hybrid"]):
-            return "hibrit"
-        elif any(w in text_lower for w in ["lpg"]):
-            return "lpg"
-        return None
-    
-    def extract_transmission(self, text: str) -> str:
-        """Metinden vites tipi çıkar"""
-        text_lower = text.lower()
-        if any(w in text_lower for w in ["otomatik", "automatic"]):
-            return "otomatik"
-        elif any(w in text_lower for w in ["manuel", "manual", "düz vites"]):
-            return "manuel"
-        return None
-    
-    def parse_price(self, price_text: str) -> float:
-        """Fiyat metnini sayıya çevir"""
-        try:
-            if not price_text:
-                return 0.0
-            
-            # TL, ₺ gibi sembolleri temizle
-            price_text = price_text.replace("TL", "").replace("₺", "").replace("tl", "").strip()
-            
-            # Nokta ve virgülü kontrol et
-            dots = price_text.count(".")
-            commas = price_text.count(",")
-            
-            if dots >= 2 or (dots == 1 and len(price_text.split(".")[-1]) == 3):
-                # Nokta binlik ayracı (1.500.000 veya 1.500)
-                price_text = price_text.replace(".", "")
-            elif commas >= 2 or (commas == 1 and len(price_text.split(",")[-1]) == 3):
-                # Virgül binlik ayracı (1,500,000 veya 1,500)
-                price_text = price_text.replace(",", "")
-            elif commas == 1:
-                # Virgül ondalık ayracı olabilir (1,5)
-                price_text = price_text.replace(",", ".")
-            
-            # Sadece sayıları al
-            price_text = re.sub(r'[^\d.]', '', price_text)
-            
-            if not price_text:
-                return 0.0
-            
-            return float(price_text)
-        except:
-            return 0.0
-    
     async def save_new_listings(self, listings: List[Dict[str, Any]]):
-        """Yeni ilanları veritabanına kaydet - race condition korumalı"""
+        """
+        Yeni ilanları veritabanına kaydet - race condition korumalı
+
+        Senkron Session işleri thread pool'da çalışır (run_in_db_thread); repost
+        indeksi yalnızca event loop'ta değiştirilir.
+        """
         from app.models.filter import Filter
-        from app.services.filter_matcher import FilterMatcher
+        from app.services.filter_matcher import FilterIndex
         from app.services.websocket.manager import manager
         from sqlalchemy.exc import IntegrityError
         
-        new_count = 0
-        new_listings = []
-        
-        # Önce mevcut URL'leri toplu olarak al (performans için)
-        existing_urls = set()
-        source_urls = [l.get("source_url") for l in listings if l.get("source_url")]
-        if source_urls:
-            existing = self.db.query(Listing.source_url).filter(
-                Listing.source_url.in_(source_urls)
-            ).all()
-            existing_urls = {e[0] for e in existing}
-        
-        for listing_data in listings:
-            source_url = listing_data.get("source_url")
-            if not source_url:
-                continue
-            
-            # Zaten varsa atla
-            if source_url in existing_urls:
-                continue
-            
+        save_started = time.perf_counter()
+        listings = [l for l in listings if l.get("source_url")]
+        
+        # Önce mevcut ilanları toplu olarak al (performans için)
+        existing_keys = await run_in_db_thread(self.find_known_keys, [l["source_url"] for l in listings])
+        
+        # Repost tespiti için yeni ilanların ilk resminin pHash'i (kendi aşaması olarak ölçülür)
+        phash_started = time.perf_counter()
+        await repost_detector.annotate([l for l in listings if listing_key(l["source_url"]) not in existing_keys])
+        save_started += time.perf_counter() - phash_started
+        reposts = repost_detector.batch()
+        
+        new_listings = await run_in_db_thread(self._insert_listings, listings, existing_keys)
+        for new_listing in new_listings:
+            reposts.link(new_listing)
+        new_count = len(new_listings)
+        
+        if new_count > 0 or self.newest_ids:
             try:
-                # Yeni listing oluştur
-                new_listing = Listing(
-                    source_url=source_url,
-                    title=listing_data.get("title", "")[:500],  # Max uzunluk
-                    price=listing_data.get("price", 0),
-                    year=listing_data.get("year"),
-                    brand=listing_data.get("brand"),
-                    model=listing_data.get("model"),
-                    fuel_type=listing_data.get("fuel_type"),
-                    transmission=listing_data.get("transmission"),
-                    mileage=listing_data.get("mileage"),
-                    city=listing_data.get("city"),
-                    description=listing_data.get("description"),
-                    images=listing_data.get("images", []),
-                    damage_info=listing_data.get("damage_info"),
-                    is_new=True
-                )
-                self.db.add(new_listing)
-                self.db.flush()
-                new_listings.append(new_listing)
-                new_count += 1
-                existing_urls.add(source_url)  # Listeye ekle ki tekrar eklemesin
+                await run_in_db_thread(self._commit_with_watermarks)
+                reposts.commit()
+                if new_count > 0:
+                    response_cache.bump(LISTINGS)
+                    logger.info(f"{new_count} yeni ilan kaydedildi")
             except IntegrityError:
-                # Race condition - başka bir process eklemiş
-                self.db.rollback()
-                logger.warning(f"Duplicate URL atlandı (race condition): {source_url[:50]}")
-                continue
+                await run_in_db_thread(self.db.rollback)
+                reposts.rollback()
+                new_listings, new_count = [], 0
+                logger.error("Commit sırasında IntegrityError - ilanlar kaydedilemedi")
+        
+        SCAN_PHASE_SECONDS.observe(time.perf_counter() - save_started, phase="save")
+        NEW_LISTINGS.inc(new_count, filter_id="none")
         
         if new_count > 0:
-            try:
-                self.db.commit()
-                logger.info(f"{new_count} yeni ilan kaydedildi")
-            except IntegrityError:
-                self.db.rollback()
-                logger.error("Commit sırasında IntegrityError - partial save")
-            
-            # Yeni ilanları filtrelerle eşleştir ve bildirim gönder
+            # Yeni ilanları filtrelerle eşleştir ve bildirim gönder (repost'lar bildirilmez);
+            # filtreler bir kez yüklenip marka index'ine derlenir
+            active_filters = await run_in_db_thread(
+                lambda: self.db.query(Filter).filter(Filter.is_active == True).all()
+            )
+            filter_index = FilterIndex(active_filters)
             for new_listing in new_listings:
-                all_filters = self.db.query(Filter).filter(Filter.is_active == True).all()
-                matching_filters = FilterMatcher.find_matching_filters(new_listing, all_filters)
+                if new_listing.canonical_id:
+                    continue
+                matching_filters = filter_index.find_matching_filters(new_listing)
                 
                 for filter_obj in matching_filters:
                     await manager.send_personal_message({
@@ -1162,3 +1302,65 @@ class ArabaComScraper:
                     logger.info(f"Kullanıcı {filter_obj.user_id} için yeni ilan bildirimi gönderildi: {new_listing.id}")
         
         return new_count
+    
+    def _new_listing(self, listing_data: Dict[str, Any]) -> Listing:
+        source_url = listing_data["source_url"]
+        new_listing = Listing(
+            source_url=source_url,
+            external_id=extract_ilan_id(source_url),
+            title=listing_data.get("title", "")[:500],  # Max uzunluk
+            price=listing_data.get("price", 0),
+            year=listing_data.get("year"),
+            brand=listing_data.get("brand"),
+            model=listing_data.get("model"),
+            brand_id=listing_data.get("brand_id"),
+            model_id=listing_data.get("model_id"),
+            fuel_type=listing_data.get("fuel_type"),
+            transmission=listing_data.get("transmission"),
+            mileage=listing_data.get("mileage"),
+            city=listing_data.get("city"),
+            description=listing_data.get("description"),
+            images=listing_data.get("images", []),
+            damage_info=listing_data.get("damage_info"),
+            **damage_features(listing_data.get("damage_info")),
+            image_phash=listing_data.get("image_phash"),
+            is_new=True
+        )
+        price_model.apply(new_listing)
+        return new_listing
+    
+    def _insert_listings(self, listings: List[Dict[str, Any]], existing_keys: Set[Union[int, str]]) -> List[Listing]:
+        """
+        DB'de olmayan ilanları ekle ve tek flush ile ID'lerini al (thread pool'da)
+        
+        Başka bir süreç aynı ilanı araya sokmuşsa (IntegrityError) transaction geri
+        alınır, bilinen ilanlar yeniden sorgulanır ve bir kez daha denenir.
+        """
+        from sqlalchemy.exc import IntegrityError
+        
+        for attempt in range(2):
+            new_listings = []
+            keys = set(existing_keys)
+            for listing_data in listings:
+                # Zaten varsa atla (aynı ilan farklı slug ile gelmiş olabilir)
+                key = listing_key(listing_data["source_url"])
+                if key in keys:
+                    continue
+                keys.add(key)
+                new_listings.append(self._new_listing(listing_data))
+            try:
+                self.db.add_all(new_listings)
+                self.db.flush()
+                return new_listings
+            except IntegrityError:
+                # Race condition - başka bir process eklemiş
+                self.db.rollback()
+                if attempt:
+                    raise
+                logger.warning("Duplicate ilan (race condition), bilinen ilanlar yeniden sorgulanıyor")
+                existing_keys = self.find_known_keys([l["source_url"] for l in listings])
+        return []
+    
+    def _commit_with_watermarks(self):
+        self.stage_watermarks()
+        self.db.commit()
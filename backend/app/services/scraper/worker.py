@@ -25,7 +25,7 @@ class ScraperWorker:
                     await scraper.init_browser()
                     
                     # İlanları çek
-                    listings = await scraper.scrape_listings()
+                    listings = await scraper.scrape_listings(incremental=settings.SCRAPER_INCREMENTAL)
                     
                     # Yeni ilanları kaydet
                     new_count = await scraper.save_new_listings(listings)
@@ -0,0 +1,3 @@
+from .catalog_service import VehicleCatalog, make_slug, sync_catalog, tokenize, vehicle_catalog
+
+__all__ = ["VehicleCatalog", "make_slug", "sync_catalog", "tokenize", "vehicle_catalog"]
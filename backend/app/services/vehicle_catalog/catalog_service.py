@@ -0,0 +1,327 @@
+"""
+Araç kataloğu (marka -> model -> donanım) ve başlık normalizasyonu
+
+- catalog.json başlangıçta vehicle_brands / vehicle_models tablolarına
+  senkronize edilir (eksikler eklenir) ve tamsayı ID'leriyle belleğe alınır
+- Eş anlamlılar Türkçe katlanmış kelime dizileri olarak trie'lere yerleşir:
+  marka trie'si, her marka için model trie'si, her model için donanım trie'si
+- normalize(başlık) başlığı kelimelere ayırır, her konumda en uzun eşleşmeyi
+  arar: önce marka, markadan sonraki birkaç kelimede model, kalan kısımda donanım
+- Sonuç ilanlara brand_id / model_id olarak yazılır; FilterMatcher ve
+  istatistikler metin yerine tamsayı karşılaştırır
+"""
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection
+
+from app.models.listing import Listing
+from app.models.vehicle import VehicleBrand, VehicleModel
+from app.services.scraper.extraction import fold_turkish
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json")
+
+# Model adı markadan sonraki ilk birkaç kelimede aranır ("Mercedes-Benz C 200")
+MODEL_WINDOW = 4
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Türkçe katlanmış kelimeler: "Mercedes-Benz C 200" -> ["mercedes", "benz", "c", "200"]"""
+    return _TOKEN.findall(fold_turkish(text or ""))
+
+
+def make_slug(name: str) -> str:
+    return "-".join(tokenize(name))
+
+
+def _insert(trie: Dict[str, Any], tokens: Sequence[str], value: Any):
+    node = trie
+    for token in tokens:
+        node = node.setdefault(token, {})
+    # Aynı eş anlamlı iki kez tanımlıysa ilk tanım geçerli
+    node.setdefault("", value)
+
+
+def _longest_match(trie: Dict[str, Any], tokens: Sequence[str], start: int) -> Tuple[Any, int]:
+    """tokens[start:] başında trie'deki en uzun eşleşme -> (değer, bitiş indeksi) veya (None, start)"""
+    node = trie
+    value, end = None, start
+    for index in range(start, len(tokens)):
+        node = node.get(tokens[index])
+        if node is None:
+            break
+        if "" in node:
+            value, end = node[""], index + 1
+    return value, end
+
+
+def _scan(trie: Dict[str, Any], tokens: Sequence[str], start: int = 0, stop: Optional[int] = None) -> Tuple[Any, int]:
+    """start..stop aralığında ilk (en soldaki) eşleşme"""
+    stop = len(tokens) if stop is None else min(stop, len(tokens))
+    for index in range(start, stop):
+        value, end = _longest_match(trie, tokens, index)
+        if value is not None:
+            return value, end
+    return None, start
+
+
+def load_catalog_file(path: str = CATALOG_PATH) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["brands"]
+
+
+def sync_catalog(connection: Connection, brands: List[Dict[str, Any]]) -> Dict[str, int]:
+    """catalog.json'daki eksik marka/modelleri tabloya ekle (mevcut ID'ler değişmez)"""
+    stats = {"brands": 0, "models": 0}
+    brand_ids = {slug: id_ for id_, slug in connection.execute(select(VehicleBrand.id, VehicleBrand.slug))}
+
+    for brand in brands:
+        slug = make_slug(brand["name"])
+        if slug not in brand_ids:
+            result = connection.execute(VehicleBrand.__table__.insert().values(slug=slug, name=brand["name"]))
+            brand_ids[slug] = result.inserted_primary_key[0]
+            stats["brands"] += 1
+
+    model_keys = {
+        (brand_id, slug)
+        for brand_id, slug in connection.execute(select(VehicleModel.brand_id, VehicleModel.slug))
+    }
+    for brand in brands:
+        brand_id = brand_ids[make_slug(brand["name"])]
+        for model in brand.get("models", []):
+            slug = make_slug(model["name"])
+            if (brand_id, slug) not in model_keys:
+                connection.execute(
+                    VehicleModel.__table__.insert().values(brand_id=brand_id, slug=slug, name=model["name"])
+                )
+                model_keys.add((brand_id, slug))
+                stats["models"] += 1
+
+    return stats
+
+
+class VehicleCatalog:
+    """Bellekteki katalog trie'leri ve normalizasyon"""
+
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        self.loaded = False
+        self._brand_trie: Dict[str, Any] = {}
+        # Markasız başlıklar için yalnızca tek markaya ait, ayırt edici model adları
+        self._global_model_trie: Dict[str, Any] = {}
+        self._model_tries: Dict[int, Dict[str, Any]] = {}
+        self._trim_tries: Dict[int, Dict[str, Any]] = {}
+        self._brands: Dict[int, str] = {}
+        self._models: Dict[int, Tuple[int, str]] = {}
+        self._resolve_cache: Dict[Tuple[str, str], Tuple[Optional[int], Optional[int]]] = {}
+
+    def load(self, connection: Connection):
+        """Kataloğu tabloya senkronize et ve trie'leri ID'lerle oluştur"""
+        brands = load_catalog_file(self.path)
+        stats = sync_catalog(connection, brands)
+        if stats["brands"] or stats["models"]:
+            logger.info(f"Araç kataloğu güncellendi: {stats['brands']} marka, {stats['models']} model eklendi")
+
+        brand_ids = {slug: id_ for id_, slug in connection.execute(select(VehicleBrand.id, VehicleBrand.slug))}
+        model_ids = {
+            (brand_id, slug): id_
+            for id_, brand_id, slug in connection.execute(
+                select(VehicleModel.id, VehicleModel.brand_id, VehicleModel.slug)
+            )
+        }
+
+        brand_trie: Dict[str, Any] = {}
+        model_tries: Dict[int, Dict[str, Any]] = {}
+        trim_tries: Dict[int, Dict[str, Any]] = {}
+        global_candidates: Dict[Tuple[str, ...], set] = {}
+        names: Dict[int, str] = {}
+        models: Dict[int, Tuple[int, str]] = {}
+
+        for brand in brands:
+            brand_id = brand_ids[make_slug(brand["name"])]
+            names[brand_id] = brand["name"]
+            for alias in [brand["name"], *brand.get("aliases", [])]:
+                _insert(brand_trie, tokenize(alias), brand_id)
+
+            model_trie = model_tries.setdefault(brand_id, {})
+            for model in brand.get("models", []):
+                model_id = model_ids[(brand_id, make_slug(model["name"]))]
+                models[model_id] = (brand_id, model["name"])
+                for alias in [model["name"], *model.get("aliases", [])]:
+                    tokens = tokenize(alias)
+                    _insert(model_trie, tokens, model_id)
+                    # Tek harf/sayı ("C", "3", "208") ve genel kelime ("City", "Note") model adları
+                    # marka olmadan güvenilmez (catalog.json'da "standalone": false)
+                    distinctive = len(tokens) > 1 or (len(tokens[0]) > 2 and not tokens[0].isdigit())
+                    if distinctive and model.get("standalone", True):
+                        global_candidates.setdefault(tuple(tokens), set()).add(model_id)
+
+                trim_trie = trim_tries.setdefault(model_id, {})
+                for trim in model.get("trims", []):
+                    _insert(trim_trie, tokenize(trim), trim)
+
+        global_model_trie: Dict[str, Any] = {}
+        for tokens, candidates in global_candidates.items():
+            if len(candidates) == 1:
+                _insert(global_model_trie, tokens, next(iter(candidates)))
+
+        self._brand_trie = brand_trie
+        self._model_tries = model_tries
+        self._trim_tries = trim_tries
+        self._global_model_trie = global_model_trie
+        self._brands = names
+        self._models = models
+        self._resolve_cache.clear()
+        self.loaded = True
+        logger.info(f"Araç kataloğu yüklendi: {len(names)} marka, {len(models)} model")
+
+    def ensure_loaded(self):
+        """Başlangıçta yüklenmediyse (ör. CLI/benchmark) ilk kullanımda yükle"""
+        if self.loaded:
+            return
+        from app.core.database import engine
+
+        try:
+            with engine.begin() as connection:
+                self.load(connection)
+        except Exception as e:
+            logger.warning(f"Araç kataloğu yüklenemedi, metin eşleştirmesi kullanılacak: {e}")
+            self.loaded = True
+
+    def normalize(self, text: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Başlığı katalog değerlerine çevir
+
+        Returns:
+            {"brand_id", "brand", "model_id", "model", "trim"} veya katalogda yoksa None
+        """
+        self.ensure_loaded()
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+
+        brand_id, brand_end = _scan(self._brand_trie, tokens)
+        model_id = None
+        model_end = brand_end
+
+        if brand_id is not None:
+            model_id, model_end = _scan(
+                self._model_tries.get(brand_id, {}), tokens, brand_end, brand_end + MODEL_WINDOW
+            )
+        else:
+            # Marka yazılmamış ("Passat 1.6 TDI") - ayırt edici model adından markayı bul
+            model_id, model_end = _scan(self._global_model_trie, tokens)
+            if model_id is None:
+                return None
+            brand_id = self._models[model_id][0]
+
+        trim = None
+        if model_id is not None:
+            trim, _ = _scan(self._trim_tries.get(model_id, {}), tokens, model_end)
+
+        return {
+            "brand_id": brand_id,
+            "brand": self._brands[brand_id],
+            "model_id": model_id,
+            "model": self._models[model_id][1] if model_id is not None else None,
+            "trim": trim,
+        }
+
+    def identify(
+        self,
+        text: Optional[str],
+        fallback_brand: Optional[str] = None,
+        fallback_model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        İlan kaydı için marka/model alanları (ingest sırasında kullanılır)
+
+        Katalogda bulunamayan alanlar metin tahminiyle (fallback_*) kalır, ID'leri None olur.
+        """
+        vehicle = self.normalize(text)
+        if vehicle is None:
+            return {"brand": fallback_brand, "brand_id": None, "model": fallback_model, "model_id": None}
+        return {
+            "brand": vehicle["brand"],
+            "brand_id": vehicle["brand_id"],
+            "model": vehicle["model"] or fallback_model,
+            "model_id": vehicle["model_id"],
+        }
+
+    def resolve(self, brand: Optional[str], model: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Filtre kriterindeki marka/model metnini ID'lere çevir (tam eş anlamlı eşleşmesi)
+
+        Sonuçlar önbelleklenir; filtre eşleştirme her ilan için tekrar ayrıştırmaz.
+        """
+        key = (brand or "", model or "")
+        if key in self._resolve_cache:
+            return self._resolve_cache[key]
+
+        self.ensure_loaded()
+        brand_id = model_id = None
+        brand_tokens = tokenize(brand)
+        if brand_tokens:
+            value, end = _longest_match(self._brand_trie, brand_tokens, 0)
+            if value is not None and end == len(brand_tokens):
+                brand_id = value
+
+        model_tokens = tokenize(model)
+        if model_tokens:
+            trie = self._model_tries.get(brand_id, {}) if brand_id is not None else self._global_model_trie
+            value, end = _longest_match(trie, model_tokens, 0)
+            if value is not None and end == len(model_tokens):
+                model_id = value
+                if brand_id is None:
+                    brand_id = self._models[model_id][0]
+
+        self._resolve_cache[key] = (brand_id, model_id)
+        return brand_id, model_id
+
+    def backfill_listings(self, connection: Connection, chunk_size: int = 1000) -> int:
+        """
+        brand_id'si boş ilanları başlıklarından normalize et (migration'da çalışır)
+
+        id sırasıyla parça parça okunur; bellek kullanımı sabittir.
+        """
+        self.load(connection)
+        last_id = 0
+        updated = 0
+        while True:
+            rows = connection.execute(
+                select(Listing.id, Listing.title, Listing.brand, Listing.model)
+                .where(Listing.brand_id == None, Listing.id > last_id)
+                .order_by(Listing.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            for listing_id, title, brand, model in rows:
+                vehicle = self.normalize(f"{brand or ''} {model or ''} {title or ''}")
+                if vehicle is None:
+                    continue
+                connection.execute(
+                    update(Listing).where(Listing.id == listing_id).values(
+                        brand=vehicle["brand"],
+                        brand_id=vehicle["brand_id"],
+                        # model_id atanan ilanda model metni katalogdaki adla aynı olmalı
+                        model=vehicle["model"] if vehicle["model_id"] else model,
+                        model_id=vehicle["model_id"],
+                    )
+                )
+                updated += 1
+            last_id = rows[-1][0]
+
+        return updated
+
+
+vehicle_catalog = VehicleCatalog()
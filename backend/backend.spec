@@ -15,8 +15,7 @@ a = Analysis(
         ('app', 'app'),
         # Include playwright browsers
         ('C:\\Users\\emin\\AppData\\Local\\ms-playwright', 'ms-playwright'),
-        # Include alembic migrations if any
-        # ('alembic', 'alembic'),
+        # Alembic migration'ları app/migrations altında ('app' ile birlikte paketlenir)
     ],
     hiddenimports=[
         # FastAPI and dependencies
@@ -59,6 +58,12 @@ a = Analysis(
         'sqlalchemy.orm',
         'sqlalchemy.dialects.sqlite',
         'sqlalchemy.dialects.postgresql',
+        'aiosqlite',
+        'alembic',
+        'alembic.runtime.migration',
+        'alembic.script',
+        'alembic.ddl.sqlite',
+        'alembic.ddl.postgresql',
         # Other
         'passlib',
         'passlib.handlers',
@@ -80,6 +85,9 @@ a = Analysis(
         'bs4',
         'bs4.element',
         'bs4.formatter',
+        # Pillow (resim küçültme ve pHash; fonksiyon içinde import edilir)
+        'PIL',
+        'PIL.Image',
         # Cryptography
         'cryptography',
         'cryptography.fernet',
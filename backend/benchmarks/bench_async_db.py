@@ -0,0 +1,133 @@
+"""
+Sync vs async DB erişimi altında eşzamanlı istek benchmark'ı
+
+GET /api/listings'in sorgularını (count + sayfa) C eşzamanlı "istek" ile çalıştırır:
+- sync: eski davranış, SessionLocal sorguları async handler içinde (loop bloklanır)
+- async: AsyncSession (aiosqlite) ile aynı sorgular
+
+Çıktı: saniye başına istek ve event loop gecikmesi (10ms ticker).
+
+Kullanım (backend dizininden):
+    python -m benchmarks.bench_async_db --listings 20000 --concurrency 32 --requests 400
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.listing import Listing
+
+TICK_SECONDS = 0.01
+BRANDS = ["BMW", "Audi", "Fiat", "Renault", "Toyota", "Honda", "Ford", "Opel"]
+
+
+def listing_query(brand: str):
+    return select(Listing).where(Listing.brand.ilike(f"%{brand}%"))
+
+
+def sync_request(SessionLocal, brand: str) -> int:
+    db = SessionLocal()
+    try:
+        query = listing_query(brand)
+        total = db.scalar(select(func.count()).select_from(query.subquery()))
+        db.scalars(query.order_by(Listing.scraped_at.desc()).limit(20)).all()
+        return total
+    finally:
+        db.close()
+
+
+async def async_request(AsyncSessionLocal, brand: str) -> int:
+    async with AsyncSessionLocal() as db:
+        query = listing_query(brand)
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        (await db.scalars(query.order_by(Listing.scraped_at.desc()).limit(20))).all()
+        return total
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def run(handler, concurrency: int, requests: int):
+    lags = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    remaining = iter(range(requests))
+
+    async def client():
+        for _ in remaining:
+            await handler(random.choice(BRANDS))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+    return elapsed, max(lags) if lags else elapsed * 1000
+
+
+def populate(url: str, count: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Listing, [
+        {
+            "title": f"İlan {i}",
+            "price": random.randint(200_000, 5_000_000),
+            "source_url": f"https://example.com/ilan/{i}",
+            "brand": random.choice(BRANDS),
+            "city": "İstanbul",
+        }
+        for i in range(count)
+    ])
+    db.commit()
+    db.close()
+    return engine, SessionLocal
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sync vs async DB concurrency benchmark")
+    parser.add_argument("--listings", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine, SessionLocal = populate(f"sqlite:///{path}", args.listings)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        print(f"{args.listings} ilan, {args.concurrency} eşzamanlı istemci, {args.requests} istek\n")
+
+        async def sync_handler(brand):
+            return sync_request(SessionLocal, brand)
+
+        async def async_handler(brand):
+            return await async_request(AsyncSessionLocal, brand)
+
+        for name, handler in (("sync", sync_handler), ("async", async_handler)):
+            elapsed, max_lag = await run(handler, args.concurrency, args.requests)
+            print(f"{name:<6} {args.requests / elapsed:>8.1f} istek/s  max loop gecikmesi={max_lag:>7.1f}ms")
+
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,238 @@
+"""
+Alan çıkarma (extraction) mikro benchmark'ı
+
+benchmarks/data/listing_titles.txt korpusundaki ilan başlıkları üzerinde:
+- legacy: eski scraper metotları (her çağrıda lower() + liste taraması, 5 ayrı geçiş;
+  URL başlığında şehir listesi kelime başına yeniden oluşturulur)
+- engine: extraction.extract_fields (trie'den derlenmiş tek regex, tek geçiş)
+
+Çıktı: başlık başına mikro saniye ve iki yöntemin farklı sonuç verdiği alanlar
+(Türkçe harf katlama ve kelime başı eşleşmesi kaynaklı farklar beklenir).
+
+Kullanım (backend dizininden):
+    python -m benchmarks.bench_extraction --repeat 200
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.scraper.extraction import (
+    extract_fields, extract_price_from_text, extract_title_from_url
+)
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "listing_titles.txt")
+
+
+class LegacyExtractor:
+    """Eski ArabaComScraper.extract_* metotları (karşılaştırma için birebir kopya)"""
+
+    def extract_year(self, text):
+        match = re.search(r'\b(19[89]\d|20[0-2]\d)\b', text)
+        if match:
+            year = int(match.group(1))
+            if 1980 <= year <= 2025:
+                return year
+        return None
+
+    def extract_brand(self, text):
+        brands = [
+            "Audi", "BMW", "Mercedes", "Volkswagen", "Ford", "Opel",
+            "Renault", "Peugeot", "Fiat", "Toyota", "Honda", "Hyundai",
+            "Volvo", "Skoda", "Seat", "Citroen", "Dacia", "Nissan",
+            "Kia", "Mazda", "Mitsubishi", "Suzuki", "Chevrolet", "Jeep"
+        ]
+        text_lower = text.lower()
+        for brand in brands:
+            if brand.lower() in text_lower:
+                return brand
+        return None
+
+    def extract_city(self, text):
+        cities = [
+            "İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Adana",
+            "Gaziantep", "Konya", "Kayseri", "Mersin", "Eskişehir", "Samsun",
+            "Tekirdağ", "Kastamonu", "Denizli", "Manisa", "Kocaeli", "Sakarya",
+            "Trabzon", "Diyarbakır", "Şanlıurfa", "Malatya", "Erzurum", "Aydın",
+            "Balıkesir", "Hatay", "Van", "Kahramanmaraş", "Ordu", "Afyonkarahisar",
+            "Muğla", "Elazığ", "Mardin", "Aksaray", "Edirne", "Çanakkale",
+            "Zonguldak", "Tokat", "Kırıkkale", "Çorum", "Sivas", "Yozgat"
+        ]
+        text_lower = text.lower()
+        for city in cities:
+            if city.lower() in text_lower:
+                return city
+        return None
+
+    def extract_fuel_type(self, text):
+        text_lower = text.lower()
+        if any(w in text_lower for w in ["dizel", "diesel"]):
+            return "dizel"
+        elif any(w in text_lower for w in ["benzin", "petrol"]):
+            return "benzin"
+        elif any(w in text_lower for w in ["elektrik", "electric"]):
+            return "elektrik"
+        elif any(w in text_lower for w in ["hibrit", "hybrid"]):
+            return "hibrit"
+        elif any(w in text_lower for w in ["lpg"]):
+            return "lpg"
+        return None
+
+    def extract_transmission(self, text):
+        text_lower = text.lower()
+        if any(w in text_lower for w in ["otomatik", "automatic"]):
+            return "otomatik"
+        elif any(w in text_lower for w in ["manuel", "manual", "düz vites"]):
+            return "manuel"
+        return None
+
+    def extract_title_from_url(self, url):
+        parts = [p for p in url.split("/") if p and not p.isdigit()]
+        if "ilan" in parts:
+            parts.remove("ilan")
+        if not parts:
+            return ""
+        words = parts[-1].split("-")
+        skip_words = ["galeriden", "sahibinden", "satilik", "kiralik", "takas", "model", "detay"]
+        clean_words = []
+        for word in words:
+            cities = ["istanbul", "ankara", "izmir", "bursa", "adana", "antalya", "konya", "gaziantep", "kayseri", "mersin", "eskisehir", "diyarbakir", "samsun", "denizli", "sanliurfa", "malatya", "trabzon", "erzurum"]
+            if word.lower() in cities:
+                continue
+            if re.match(r'^(19|20)\d{2}$', word):
+                continue
+            if word.lower() in skip_words:
+                continue
+            if len(word) < 2:
+                continue
+            clean_words.append(word.capitalize())
+        unique_words = []
+        for word in clean_words:
+            if not unique_words or word.lower() != unique_words[-1].lower():
+                unique_words.append(word)
+        return " ".join(unique_words[:7])
+
+    def parse_price(self, price_text):
+        try:
+            if not price_text:
+                return 0.0
+            price_text = price_text.replace("TL", "").replace("₺", "").replace("tl", "").strip()
+            dots = price_text.count(".")
+            commas = price_text.count(",")
+            if dots >= 2 or (dots == 1 and len(price_text.split(".")[-1]) == 3):
+                price_text = price_text.replace(".", "")
+            elif commas >= 2 or (commas == 1 and len(price_text.split(",")[-1]) == 3):
+                price_text = price_text.replace(",", "")
+            elif commas == 1:
+                price_text = price_text.replace(",", ".")
+            price_text = re.sub(r'[^\d.]', '', price_text)
+            if not price_text:
+                return 0.0
+            return float(price_text)
+        except:
+            return 0.0
+
+    def extract_price_from_text(self, text, html):
+        price_patterns = [
+            r'class="[^"]*price[^"]*"[^>]*>([^<]+)',
+            r'class="[^"]*fiyat[^"]*"[^>]*>([^<]+)',
+            r'data-price="([\d.,]+)"',
+        ]
+        for pattern in price_patterns:
+            match = re.search(pattern, html, re.IGNORECASE)
+            if match:
+                price = self.parse_price(match.group(1))
+                if price > 10000:
+                    return price
+        text_patterns = [
+            r'([\d]{1,3}(?:\.[\d]{3}){2,})\s*(?:TL|₺)',
+            r'([\d]{1,3}(?:,[\d]{3}){2,})\s*(?:TL|₺)',
+            r'([\d]{6,})\s*(?:TL|₺)',
+            r'(?:TL|₺)\s*([\d]{1,3}(?:\.[\d]{3}){2,})',
+        ]
+        for pattern in text_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                price = self.parse_price(match.group(1))
+                if price > 10000:
+                    return price
+        for num_str in re.findall(r'[\d]{1,3}(?:\.[\d]{3}){1,}', text):
+            price = self.parse_price(num_str)
+            if 50000 < price < 50000000:
+                return price
+        return 0.0
+
+    def fields(self, text):
+        return {
+            "year": self.extract_year(text),
+            "brand": self.extract_brand(text),
+            "city": self.extract_city(text),
+            "fuel_type": self.extract_fuel_type(text),
+            "transmission": self.extract_transmission(text),
+        }
+
+
+def load_corpus():
+    titles, urls = [], []
+    with open(CORPUS, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            (urls if line.startswith("/ilan/") else titles).append(line)
+    return titles, urls
+
+
+def timed(fn, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (repeat * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Field extraction microbenchmark")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    legacy = LegacyExtractor()
+    titles, urls = load_corpus()
+    priced = [f"{title}\n{index * 37 % 900 + 100}.500 TL" for index, title in enumerate(titles)]
+    print(f"{len(titles)} başlık, {len(urls)} URL, {args.repeat} tekrar\n")
+
+    rows = [
+        ("alanlar (5 alan)", legacy.fields, extract_fields, titles),
+        ("URL başlığı", legacy.extract_title_from_url, extract_title_from_url, urls),
+        ("fiyat (kart metni)", lambda t: legacy.extract_price_from_text(t, ""), extract_price_from_text, priced),
+    ]
+    for name, old, new, items in rows:
+        old_us = timed(old, items, args.repeat)
+        new_us = timed(new, items, args.repeat)
+        print(f"{name:<18} legacy={old_us:>7.2f}µs  engine={new_us:>7.2f}µs  hızlanma={old_us / new_us:>5.1f}x")
+
+    print("\nFarklı sonuçlar:")
+    differences = 0
+    for title in titles:
+        old, new = legacy.fields(title), extract_fields(title)
+        for key in old:
+            if old[key] != new[key]:
+                differences += 1
+                print(f"  {key:<12} legacy={old[key]!s:<10} engine={new[key]!s:<10} {title[:60]}")
+    for text in priced:
+        if legacy.extract_price_from_text(text, "") != extract_price_from_text(text, ""):
+            differences += 1
+            print(f"  price        {text[:70]!r}")
+    for url in urls:
+        if legacy.extract_title_from_url(url) != extract_title_from_url(url):
+            differences += 1
+            print(f"  url_title    {url[:70]}")
+    if not differences:
+        print("  yok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Login fırtınası sırasında event loop gecikmesi
+
+N eşzamanlı "login" (bcrypt doğrulama) çalışırken event loop'ta 10ms'lik
+bir ticker çalışır ve her tick'in ne kadar geç uyandığı ölçülür:
+- sync: eski davranış, bcrypt doğrudan async handler içinde
+- async: verify_password_async (sınırlı thread pool)
+
+Kullanım (backend dizininden):
+    python -m benchmarks.bench_login_storm --logins 40
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password, verify_password_async
+
+TICK_SECONDS = 0.01
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    """Her tick'in planlanandan ne kadar geç çalıştığını kaydet"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def sync_login(password: str, hashed: str):
+    return verify_password(password, hashed)
+
+
+async def async_login(password: str, hashed: str):
+    return await verify_password_async(password, hashed)
+
+
+async def storm(login, logins: int, password: str, hashed: str):
+    lags = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[login(password, hashed) for _ in range(logins)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+    assert all(results)
+    return elapsed, lags
+
+
+def summarize(lags: list) -> str:
+    if not lags:
+        return "tick yok"
+    ordered = sorted(lags)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"tick={len(lags):>4}  p50={statistics.median(ordered):>7.1f}ms  p99={p99:>7.1f}ms  max={ordered[-1]:>7.1f}ms"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Login storm event loop lag")
+    parser.add_argument("--logins", type=int, default=40)
+    args = parser.parse_args()
+
+    password = "benchmark-password"
+    hashed = get_password_hash(password)
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}, workers={settings.PASSWORD_HASH_WORKERS}, {args.logins} eşzamanlı login\n")
+
+    for name, login in (("sync", sync_login), ("async", async_login)):
+        elapsed, lags = await storm(login, args.logins, password, hashed)
+        print(f"{name:<6} süre={elapsed:>6.2f}s  {args.logins / elapsed:>6.1f} login/s  {summarize(lags)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
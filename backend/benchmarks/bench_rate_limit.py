@@ -0,0 +1,136 @@
+"""
+Günlük arama limiti microbenchmark'ı
+
+Aynı kullanıcı için N thread eşzamanlı arama hakkı tüketir:
+- legacy: eski okuma-değiştirme-yazma (2 commit + 2 refresh)
+- atomic: consume_search_quota (tek UPDATE ... RETURNING)
+
+Çıktı: saniye başına arama ve kaybolan sayaç artışları (yarış durumu).
+
+Kullanım (backend dizininden):
+    python -m benchmarks.bench_rate_limit --threads 8 --searches 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.user import User
+from app.services.rate_limiter import consume_search_quota
+
+
+def legacy_consume(db, user_id: int) -> bool:
+    """Eski check_rate_limit mantığı"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if user.last_reset_date < date.today():
+        user.daily_search_count = 0
+        user.last_reset_date = date.today()
+        db.commit()
+        db.refresh(user)
+    if user.daily_search_count >= user.daily_search_limit:
+        return False
+    user.daily_search_count += 1
+    db.commit()
+    db.refresh(user)
+    return True
+
+
+def atomic_consume(db, user_id: int) -> bool:
+    allowed, _, _ = consume_search_quota(db, user_id)
+    return allowed
+
+
+def run(strategy, Session, user_id: int, threads: int, searches: int):
+    allowed_total = [0]
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        db = Session()
+        allowed = 0
+        try:
+            for _ in range(searches):
+                try:
+                    if strategy(db, user_id):
+                        allowed += 1
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        errors[0] += 1
+        finally:
+            db.close()
+        with lock:
+            allowed_total[0] += allowed
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    return allowed_total[0], errors[0], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limit microbenchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--searches", type=int, default=200, help="Thread başına arama")
+    parser.add_argument("--database-url", default=None, help="Varsayılan: geçici SQLite dosyası")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    url = args.database_url
+    if not url:
+        tmp_dir = tempfile.mkdtemp(prefix="autosniper_bench_")
+        url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+    connect_args = {"check_same_thread": False, "timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, pool_size=args.threads + 2)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    total = args.threads * args.searches
+    print(f"DB: {url}")
+    print(f"{args.threads} thread x {args.searches} arama = {total} arama (tek kullanıcı)\n")
+    print(f"{'strateji':<10} {'arama/sn':>10} {'izinli':>8} {'sayaç':>8} {'kayıp':>8} {'hata':>6}")
+
+    for name, strategy in (("legacy", legacy_consume), ("atomic", atomic_consume)):
+        db = Session()
+        user = User(
+            email=f"bench-{name}-{time.time()}@example.com",
+            password_hash="x",
+            daily_search_limit=total * 2,
+            daily_search_count=0,
+            last_reset_date=date.today() - timedelta(days=1)
+        )
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        allowed, errors, elapsed = run(strategy, Session, user_id, args.threads, args.searches)
+
+        db = Session()
+        final_count = db.query(User.daily_search_count).filter(User.id == user_id).scalar()
+        db.close()
+
+        # Her izinli arama sayacı 1 artırmalıydı; fark yarış durumunda kaybolan artışlar
+        lost = allowed - final_count
+        print(f"{name:<10} {allowed / elapsed:>10.1f} {allowed:>8} {final_count:>8} {lost:>8} {errors:>6}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+İlan retention benchmark'ı
+
+M eski ilan (ve bir kısmına favori) üzerinde:
+- legacy: eski _cleanup_old_listings (tüm ID'ler belleğe, tek transaction'da IN silme)
+- chunked: RetentionService.purge_old_listings (keyset parçalar, parça başına transaction)
+
+Çıktı: toplam süre, Python bellek tepe noktası (tracemalloc) ve en uzun yazma
+transaction'ı (tablonun kilitli kaldığı süre).
+
+Kullanım (backend dizininden):
+    python -m benchmarks.bench_retention --listings 100000 --chunk-size 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app.core.database import Base, SessionLocal, async_engine, engine
+from app.models.favorite import Favorite
+from app.models.listing import Listing
+from app.models.user import User
+from app.services.bulk_delete import BulkDeleteService
+from app.services.retention import RetentionService
+
+
+class TransactionTimer:
+    """Engine üzerindeki en uzun transaction süresini ölç (begin -> commit/rollback)"""
+
+    def __init__(self, target):
+        self.longest = 0.0
+        self._started = {}
+        event.listen(target, "begin", self._begin)
+        event.listen(target, "commit", self._end)
+        event.listen(target, "rollback", self._end)
+
+    def _begin(self, conn):
+        self._started[id(conn)] = time.perf_counter()
+
+    def _end(self, conn):
+        started = self._started.pop(id(conn), None)
+        if started is not None:
+            self.longest = max(self.longest, time.perf_counter() - started)
+
+
+def seed(count: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    old = datetime.utcnow() - timedelta(days=60)
+    batch = 20000
+    for start in range(0, count, batch):
+        db.bulk_insert_mappings(Listing, [
+            {"title": f"İlan {i}", "price": 500_000, "source_url": f"https://example.com/{i}", "scraped_at": old}
+            for i in range(start, min(count, start + batch))
+        ])
+        db.commit()
+    db.bulk_insert_mappings(Favorite, [
+        {"user_id": user.id, "listing_id": listing_id} for listing_id in range(1, count + 1, 50)
+    ])
+    db.commit()
+    db.close()
+
+
+def legacy_cleanup():
+    """Eski mantık: tüm ID'ler tek listede, tek transaction"""
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        old_ids = [row[0] for row in db.query(Listing.id).filter(Listing.scraped_at < cutoff).all()]
+        db.query(Favorite).filter(Favorite.listing_id.in_(old_ids)).delete(synchronize_session=False)
+        deleted = db.query(Listing).filter(Listing.id.in_(old_ids)).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+def measure(name: str, fn, timer: TransactionTimer):
+    timer.longest = 0.0
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        deleted = fn()
+        error = ""
+    except Exception as e:
+        deleted, error = 0, f"  HATA: {str(e).splitlines()[0][:60]}"
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<8} silinen={deleted:>7}  süre={elapsed:>6.2f}s  bellek tepe={peak / 1024 / 1024:>6.1f}MB  "
+        f"en uzun transaction={timer.longest * 1000:>8.1f}ms{error}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listing retention benchmark")
+    parser.add_argument("--listings", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    sync_timer = TransactionTimer(engine)
+    async_timer = TransactionTimer(async_engine.sync_engine)
+    service = RetentionService(retention_days=30, deleter=BulkDeleteService(args.chunk_size))
+
+    print(f"{args.listings} eski ilan, parça boyutu {args.chunk_size}\n")
+
+    seed(args.listings)
+    measure("legacy", legacy_cleanup, sync_timer)
+
+    seed(args.listings)
+    measure(
+        "chunked",
+        lambda: asyncio.run(service.purge_old_listings())["listings"],
+        async_timer
+    )
+
+
+if __name__ == "__main__":
+    main()
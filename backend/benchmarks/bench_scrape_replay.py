@@ -0,0 +1,256 @@
+"""
+Kayıttan (replay) tarama benchmark'ı
+
+arabam.com'a gitmeden scraper performansını izlemek için. Kayıt ReplayServer
+ile yerel aiohttp stub'dan, isteğe bağlı gecikme enjeksiyonu ile sunulur:
+- parse: parse_detail_html ile detay sayfası ayrıştırma (ağsız; sayfa/s, MB/s)
+- detail: fetch_detail_info ile stub'dan paralel detay çekme (istek/s)
+- scan: scrape_listings uçtan uca (Playwright + stub, bekleme süreleri 0);
+  tarama/s ve aşama süreleri (autosniper_scan_phase_seconds). Chromium kurulu
+  değilse atlanır.
+
+Her bölüm için tracemalloc ile ayrı bir geçişte Python tarafı bellek tepe
+değeri de raporlanır (tarayıcı süreçlerinin belleği dahil değildir).
+
+--recording verilmezse benchmarks/data/listing_titles.txt başlıklarından
+sentetik bir kayıt (sonuç sayfaları + detay sayfaları) geçici dizine üretilir.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.bench_scrape_replay --pages 3 --cards 20 --latency-ms 20
+    python -m benchmarks.bench_scrape_replay --recording recordings/bmw --scans 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.metrics import SCAN_PHASE_SECONDS
+from app.services.scraper.replay import ReplayServer, ScrapeRecorder, load_manifest
+from app.services.scraper.scraper import ArabaComScraper
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "listing_titles.txt")
+SITE = "https://www.arabam.com"
+SEARCH_PATH = "/ikinci-el?sort=1"
+PHASES = ["goto", "ready", "extract", "detail", "save"]
+DAMAGE_PARTS = ["Kaput", "Tavan", "Sol Ön Çamurluk", "Sağ Ön Kapı", "Bagaj Kapağı", "Sol Arka Kapı"]
+DAMAGE_STATES = ["original", "original", "original", "painted", "localpainted", "changed"]
+
+
+def load_titles():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [
+            line.strip() for line in f
+            if line.strip() and not line.startswith("#") and not line.startswith("/ilan/")
+        ]
+
+
+def slugify(title: str) -> str:
+    table = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+    return "-".join("".join(c for c in word if c.isalnum()) for word in title.translate(table).lower().split())
+
+
+def results_page(cards: list) -> str:
+    rows = "\n".join(
+        f'<tr class="listing-list-item"><td>'
+        f'<a class="link-overlay" href="{href}"></a>'
+        f'<img class="listing-image" src="{image}" alt="{title}"></td>'
+        f'<td>{title}</td><td class="listing-price">{price:,} TL</td></tr>'.replace(",", ".")
+        for href, image, title, price in cards
+    )
+    return (
+        "<html><head><title>İkinci El Araba</title></head><body>"
+        f'<table class="listing-table"><tbody>\n{rows}\n</tbody></table>'
+        + "<footer>" + "<p>arabam.com</p>" * 200 + "</footer></body></html>"
+    )
+
+
+def detail_page(listing_id: int, title: str, image: str, padding: int) -> str:
+    damage = [
+        {"Name": part, "ValueText": random.choice(DAMAGE_STATES)} for part in DAMAGE_PARTS
+    ]
+    gallery = "".join(f'<img data-src="{image.replace("_240x180", f"_{n}")}">' for n in range(6))
+    specs = "".join(f"<tr><td>Özellik {n}</td><td>Değer {n}</td></tr>" for n in range(padding))
+    return (
+        f'<html><head><meta property="og:image" content="{image}"><title>{title}</title></head><body>'
+        f'<span class="product-location"><span>Kadıköy, İstanbul</span></span>{gallery}'
+        f"<table><tr><td>Kilometre</td><td>{random.randint(5, 250)}.000 km</td></tr>{specs}</table>"
+        f"<script>window.damage = {json.dumps(damage, ensure_ascii=False)};</script>"
+        f'<div class="tramer-info">Tramer tutarı {random.randint(0, 40)}.500 TL</div>'
+        "</body></html>"
+    )
+
+
+def build_synthetic_recording(
+    directory: str,
+    pages: int,
+    cards_per_page: int,
+    detail_padding: int = 300,
+    search_urls: list = None
+) -> int:
+    """
+    Korpus başlıklarından sentetik bir kayıt üret; ilan sayısını döndür
+
+    search_urls: kaydedilecek arama URL'leri (build_search_url çıktısı, SITE ile);
+    verilmezse kriterisiz arama. Her arama kendi ilan ID aralığını alır.
+    """
+    random.seed(42)
+    titles = load_titles()
+    search_urls = search_urls or [SITE + SEARCH_PATH]
+    recorder = ScrapeRecorder(directory, SITE)
+    listing_id = 30000000 + len(search_urls) * pages * cards_per_page
+    for search_url in search_urls:
+        for page_no in range(1, pages + 1):
+            cards = []
+            for _ in range(cards_per_page):
+                title = random.choice(titles)
+                href = f"/ilan/galeriden-satilik-{slugify(title)}/{listing_id}"
+                image = f"https://arbstorage.mncdn.com/ilanfotograflari/2026/10/19/{listing_id}/x_240x180.jpg"
+                cards.append((href, image, title, random.randint(300, 4000) * 1000))
+                recorder.save(SITE + href, detail_page(listing_id, title, image, detail_padding), kind="detail")
+                listing_id -= 1
+            url = search_url + (f"&page={page_no}" if page_no > 1 else "")
+            recorder.save(url, results_page(cards), kind="results")
+    recorder.close()
+    return len(search_urls) * pages * cards_per_page
+
+
+def detail_urls(recording: str, base_url: str) -> list:
+    entries = load_manifest(recording)["entries"]
+    return [base_url + key for key, entry in entries.items() if entry["kind"] == "detail"]
+
+
+def detail_bodies(recording: str) -> list:
+    entries = load_manifest(recording)["entries"]
+    bodies = []
+    for entry in entries.values():
+        if entry["kind"] == "detail":
+            with open(os.path.join(recording, "html", entry["file"]), encoding="utf-8") as f:
+                bodies.append(f.read())
+    return bodies
+
+
+def bench_parse(recording: str, repeat: int) -> dict:
+    scraper = ArabaComScraper(None)
+    bodies = detail_bodies(recording)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in bodies:
+            scraper.parse_detail_html(html)
+    elapsed = time.perf_counter() - start
+    pages = len(bodies) * repeat
+    megabytes = sum(len(b.encode("utf-8")) for b in bodies) * repeat / 1e6
+    return {"pages": pages, "pages_per_s": pages / elapsed, "mb_per_s": megabytes / elapsed}
+
+
+async def bench_detail(recording: str, latency_ms: float, jitter_ms: float) -> dict:
+    async with ReplayServer(recording, latency_ms, jitter_ms) as server:
+        scraper = ArabaComScraper(None, base_url=server.base_url)
+        urls = detail_urls(recording, server.base_url)
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[scraper.fetch_detail_info(url) for url in urls])
+            elapsed = time.perf_counter() - start
+        finally:
+            await scraper.close_http_session()
+    complete = sum(1 for r in results if r["mileage"] is not None)
+    return {"requests": len(urls), "requests_per_s": len(urls) / elapsed, "complete": complete}
+
+
+async def bench_scan(recording: str, scans: int, pages: int, latency_ms: float, jitter_ms: float) -> dict:
+    async with ReplayServer(recording, latency_ms, jitter_ms) as server:
+        scraper = ArabaComScraper(None, base_url=server.base_url, settle_scale=0)
+        try:
+            await scraper.init_browser()
+        except Exception as e:
+            return {"skipped": f"tarayıcı başlatılamadı ({str(e).splitlines()[0]})"}
+        try:
+            await server.attach(scraper)
+            before = {phase: SCAN_PHASE_SECONDS.stats(phase=phase) for phase in PHASES}
+            listings = 0
+            start = time.perf_counter()
+            for _ in range(scans):
+                listings += len(await scraper.scrape_listings(max_pages=pages))
+            elapsed = time.perf_counter() - start
+        finally:
+            await scraper.close_browser()
+    phases = {}
+    for phase in PHASES:
+        count, total = SCAN_PHASE_SECONDS.stats(phase=phase)
+        count, total = count - before[phase][0], total - before[phase][1]
+        if count:
+            phases[phase] = (count, total / count)
+    return {
+        "scans": scans,
+        "scans_per_s": scans / elapsed,
+        "listings_per_scan": listings / scans,
+        "phases": phases,
+    }
+
+
+def peak_memory(fn) -> float:
+    """fn'i tracemalloc altında bir kez çalıştır, Python tarafı tepe belleği (MB)"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay scrape benchmark")
+    parser.add_argument("--recording", help="scrape_replay.py record ile alınmış kayıt dizini")
+    parser.add_argument("--pages", type=int, default=3, help="Sentetik kayıtta / taramada sonuç sayfası")
+    parser.add_argument("--cards", type=int, default=20, help="Sentetik kayıtta sayfa başına ilan")
+    parser.add_argument("--repeat", type=int, default=5, help="parse bölümünde tekrar")
+    parser.add_argument("--scans", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--skip-scan", action="store_true", help="Playwright'lı uçtan uca bölümü atla")
+    args = parser.parse_args()
+
+    recording = args.recording
+    if not recording:
+        recording = tempfile.mkdtemp(prefix="autosniper_replay_")
+        count = build_synthetic_recording(recording, args.pages, args.cards)
+        print(f"Sentetik kayıt: {recording} ({args.pages} sayfa, {count} ilan)")
+    print(f"Gecikme: {args.latency_ms}ms + [0, {args.jitter_ms}]ms\n")
+
+    parse = bench_parse(recording, args.repeat)
+    parse_mem = peak_memory(lambda: bench_parse(recording, 1))
+    print(
+        f"parse   {parse['pages']:>6} sayfa  {parse['pages_per_s']:>8.1f} sayfa/s  "
+        f"{parse['mb_per_s']:>6.1f} MB/s  tepe bellek={parse_mem:.1f}MB"
+    )
+
+    detail = asyncio.run(bench_detail(recording, args.latency_ms, args.jitter_ms))
+    detail_mem = peak_memory(lambda: asyncio.run(bench_detail(recording, args.latency_ms, args.jitter_ms)))
+    print(
+        f"detail  {detail['requests']:>6} istek  {detail['requests_per_s']:>8.1f} istek/s  "
+        f"eksiksiz={detail['complete']}  tepe bellek={detail_mem:.1f}MB"
+    )
+
+    if args.skip_scan:
+        return
+    scan = asyncio.run(bench_scan(recording, args.scans, args.pages, args.latency_ms, args.jitter_ms))
+    if "skipped" in scan:
+        print(f"scan    atlandı: {scan['skipped']}")
+        return
+    scan_mem = peak_memory(lambda: asyncio.run(bench_scan(recording, 1, args.pages, args.latency_ms, args.jitter_ms)))
+    print(
+        f"scan    {scan['scans']:>6} tarama {scan['scans_per_s']:>8.2f} tarama/s  "
+        f"ilan/tarama={scan['listings_per_scan']:.0f}  tepe bellek={scan_mem:.1f}MB"
+    )
+    for phase, (count, mean) in scan["phases"].items():
+        print(f"  {phase:<8} {count:>4} ölçüm  ortalama={mean * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
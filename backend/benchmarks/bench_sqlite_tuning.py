@@ -0,0 +1,140 @@
+"""
+SQLite okuma/yazma eşzamanlılık benchmark'ı
+
+Scheduler'ı taklit eden yazar thread'ler ilan eklerken API'yi taklit eden
+okuyucu thread'ler sayfa sorgusu yapar:
+- default: eski engine (rollback journal, PRAGMA yok)
+- tuned: database.apply_sqlite_pragmas (WAL, synchronous=NORMAL, busy_timeout, mmap, cache)
+
+Çıktı: saniye başına okuma/yazma, en yavaş okuma ve "database is locked" hataları.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.bench_sqlite_tuning --listings 100000 --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, apply_sqlite_pragmas
+from app.models.listing import Listing
+
+
+BRANDS = ["BMW", "Audi", "Fiat", "Renault", "Toyota", "Honda", "Ford", "Opel"]
+
+
+def make_engine(path: str, tuned: bool, listings: int):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 1}
+    )
+    if tuned:
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+
+    db = sessionmaker(bind=engine)()
+    db.bulk_insert_mappings(Listing, [
+        {
+            "title": f"İlan {i}",
+            "price": random.randint(200_000, 5_000_000),
+            "source_url": f"https://example.com/ilan/seed-{i}",
+            "brand": random.choice(BRANDS),
+        }
+        for i in range(listings)
+    ])
+    db.commit()
+    db.close()
+    return engine
+
+
+def run(engine, readers: int, writers: int, seconds: float) -> dict:
+    SessionLocal = sessionmaker(bind=engine)
+    stats = {"reads": 0, "writes": 0, "locked": 0, "max_read_ms": 0.0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader():
+        while time.perf_counter() < deadline:
+            db = SessionLocal()
+            start = time.perf_counter()
+            try:
+                # /statistics benzeri tam tablo taraması - okuma kilidi uzun tutulur
+                db.execute(
+                    select(Listing.brand, func.count(Listing.id), func.avg(Listing.price))
+                    .group_by(Listing.brand)
+                ).all()
+                db.scalars(select(Listing).order_by(Listing.id.desc()).limit(20)).all()
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    stats["reads"] += 1
+                    stats["max_read_ms"] = max(stats["max_read_ms"], elapsed)
+            except OperationalError:
+                with lock:
+                    stats["locked"] += 1
+            finally:
+                db.close()
+
+    def writer(worker: int):
+        seq = 0
+        while time.perf_counter() < deadline:
+            db = SessionLocal()
+            try:
+                for _ in range(20):
+                    seq += 1
+                    db.add(Listing(
+                        title=f"İlan {worker}-{seq}",
+                        price=random.randint(200_000, 5_000_000),
+                        source_url=f"https://example.com/ilan/{worker}-{seq}-{time.time_ns()}",
+                        brand=random.choice(BRANDS)
+                    ))
+                db.commit()
+                with lock:
+                    stats["writes"] += 1
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    stats["locked"] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite read/write concurrency benchmark")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--listings", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{args.listings} ilan, {args.readers} okuyucu, {args.writers} yazar (20 ilanlık commit), {args.seconds}s\n")
+    for name, tuned in (("default", False), ("tuned", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = make_engine(os.path.join(tmp, "bench.db"), tuned, args.listings)
+            stats = run(engine, args.readers, args.writers, args.seconds)
+            engine.dispose()
+        print(
+            f"{name:<8} okuma/s={stats['reads'] / args.seconds:>8.1f}  "
+            f"yazma/s={stats['writes'] / args.seconds:>7.1f}  "
+            f"max okuma={stats['max_read_ms']:>7.1f}ms  locked={stats['locked']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Uçtan uca yük testi: API + WebSocket + scheduler
+
+Backend ayrı bir uvicorn sürecinde, verilen veritabanına karşı çalışır; scheduler
+otomatik taramalı filtreleri canlı site yerine yerel replay stub'ından
+(SCRAPER_BASE_URL) tarar. Sürücü asyncio + aiohttp ile:
+- --concurrency kadar sanal kullanıcı, süre boyunca ağırlıklı karışık istek atar:
+  /api/listings (rastgele sayfa/marka/şehir/fiyat), /api/listings/statistics,
+  /api/favorites (liste + ekle/çıkar), /api/filters, /api/filters/scheduler/all-status.
+  Tarayıcılar gibi ETag saklayıp If-None-Match gönderir (304 oranı ayrıca raporlanır).
+- --ws-clients kadar /api/ws bağlantısı açık tutar (bağlantı mesajına kadar geçen süre
+  ve gelen bildirim sayısı)
+- /metrics'ten test öncesi/sonrası farkla tarama sayfaları, yeni ilanlar ve tarama
+  aşama süreleri
+
+Çıktı endpoint başına istek, hata, istek/s ve p50/p95/p99 (ms) tablosudur;
+--json-out ile SQLite ve PostgreSQL koşuları karşılaştırılabilir. Kullanıcı
+token'ları bcrypt login yerine doğrudan create_access_token ile üretilir (login
+yükü bench_login_storm'un konusu). Scheduler taramaları Playwright/Chromium
+gerektirir; kurulu değilse taramalar hata verir ve scheduler bölümü boş kalır.
+
+Kullanım (backend dizininden):
+    # Geçici SQLite, küçük veri ile
+    python -m benchmarks.load_test --seed --users 100 --filters 1000 --listings 50000 --duration 30
+
+    # Yerel PostgreSQL, tam boyut (veri bir kez üretilir)
+    python -m benchmarks.seed_load_data --database-url postgresql://u:p@localhost/autosniper_load
+    python -m benchmarks.load_test --database-url postgresql://u:p@localhost/autosniper_load \\
+        --concurrency 100 --ws-clients 500 --duration 120 --json-out pg.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import aiohttp
+
+METRIC_LINE = re.compile(r'^([a-z_]+)(\{[^}]*\})? (\S+)$')
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Sıralı listede nearest-rank yüzdelik"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def parse_metrics(text: str) -> dict:
+    values = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            values[match.group(1) + (match.group(2) or "")] = float(match.group(3))
+    return values
+
+
+class Stats:
+    """Endpoint başına gecikme ve sonuç sayaçları"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.not_modified = defaultdict(int)
+
+    def record(self, name: str, seconds: float, status: int):
+        self.latencies[name].append(seconds * 1000)
+        if status == 304:
+            self.not_modified[name] += 1
+        elif status >= 400:
+            self.errors[name] += 1
+
+    def summary(self, duration: float) -> dict:
+        rows = {}
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            rows[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "not_modified": self.not_modified[name],
+                "rps": len(values) / duration,
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+            }
+        return rows
+
+
+class VirtualUser:
+    """Bir kullanıcı oturumu: token + ETag önbelleği"""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, token: str, stats: Stats, fixture: dict):
+        self.session = session
+        self.base_url = base_url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.stats = stats
+        self.fixture = fixture
+        self.etags = {}
+
+    async def request(self, name: str, method: str, path: str, params: dict = None):
+        headers = dict(self.headers)
+        cache_key = (path, tuple(sorted((params or {}).items())))
+        if method == "GET" and cache_key in self.etags:
+            headers["If-None-Match"] = self.etags[cache_key]
+        started = time.perf_counter()
+        status = 599
+        try:
+            async with self.session.request(method, self.base_url + path, params=params, headers=headers) as response:
+                await response.read()
+                status = response.status
+                if method == "GET" and response.headers.get("ETag"):
+                    self.etags[cache_key] = response.headers["ETag"]
+        except aiohttp.ClientError:
+            pass
+        self.stats.record(name, time.perf_counter() - started, status)
+
+    async def listings(self):
+        params = {"page": random.randint(1, 5), "page_size": 20}
+        if random.random() < 0.4:
+            params["brand"] = random.choice(self.fixture["brands"])
+        if random.random() < 0.2:
+            params["city"] = random.choice(self.fixture["cities"])
+        if random.random() < 0.3:
+            params["max_price"] = random.randrange(500_000, 3_000_000, 250_000)
+        await self.request("listings", "GET", "/api/listings", params)
+
+    async def statistics(self):
+        await self.request("statistics", "GET", "/api/listings/statistics")
+
+    async def favorites(self):
+        await self.request("favorites", "GET", "/api/favorites")
+
+    async def favorite_toggle(self):
+        listing_id = random.randint(*self.fixture["listing_ids"])
+        await self.request("favorites_add", "POST", f"/api/favorites/{listing_id}")
+        await self.request("favorites_remove", "DELETE", f"/api/favorites/{listing_id}")
+
+    async def filters(self):
+        await self.request("filters", "GET", "/api/filters")
+
+    async def scheduler_status(self):
+        await self.request("scheduler_status", "GET", "/api/filters/scheduler/all-status")
+
+
+# (ağırlık, senaryo) - dashboard ağırlıklı okuma trafiği
+SCENARIOS = [
+    (35, VirtualUser.listings),
+    (15, VirtualUser.statistics),
+    (15, VirtualUser.favorites),
+    (5, VirtualUser.favorite_toggle),
+    (20, VirtualUser.filters),
+    (10, VirtualUser.scheduler_status),
+]
+
+
+async def http_worker(users: list, deadline: float, think_ms: float):
+    weights = [weight for weight, _ in SCENARIOS]
+    scenarios = [scenario for _, scenario in SCENARIOS]
+    while time.perf_counter() < deadline:
+        user = random.choice(users)
+        await random.choices(scenarios, weights, k=1)[0](user)
+        if think_ms:
+            await asyncio.sleep(random.uniform(0, think_ms) / 1000)
+
+
+async def ws_client(session: aiohttp.ClientSession, ws_url: str, token: str, stop: asyncio.Event, result: dict):
+    started = time.perf_counter()
+    try:
+        async with session.ws_connect(f"{ws_url}?token={token}", heartbeat=30) as ws:
+            first = await ws.receive_json(timeout=30)
+            if first.get("type") == "connection":
+                result["connect_ms"].append((time.perf_counter() - started) * 1000)
+            while not stop.is_set():
+                try:
+                    message = await ws.receive(timeout=1)
+                except asyncio.TimeoutError:
+                    continue
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    result["dropped"] += 1
+                    return
+                result["messages"] += 1
+    except Exception:
+        result["failed"] += 1
+
+
+def prepare(args) -> dict:
+    """Veritabanından sürücü girdileri: kullanıcılar, ilan ID aralığı, otomatik taramalı filtre URL'leri"""
+    from sqlalchemy import func, select
+
+    from app.core.database import engine
+    from app.core.security import create_access_token
+    from app.models.filter import Filter
+    from app.models.listing import Listing
+    from app.models.user import User
+    from app.services.scraper.scraper import ArabaComScraper
+    from benchmarks.bench_scrape_replay import SITE
+
+    with engine.connect() as conn:
+        user_ids = [row[0] for row in conn.execute(select(User.id).where(User.is_active.is_(True)))]
+        listing_ids = conn.execute(select(func.min(Listing.id), func.max(Listing.id))).one()
+        brands = [row[0] for row in conn.execute(select(Listing.brand).distinct().where(Listing.brand.isnot(None)).limit(50))]
+        cities = [row[0] for row in conn.execute(select(Listing.city).distinct().where(Listing.city.isnot(None)).limit(50))]
+        criteria = [row[0] for row in conn.execute(select(Filter.criteria).where(Filter.auto_scan_enabled.is_(True)))]
+    engine.dispose()
+    if not user_ids or listing_ids[0] is None:
+        raise SystemExit("Veritabanında kullanıcı/ilan yok; --seed ile ya da seed_load_data ile veri üretin")
+
+    url_builder = ArabaComScraper(None, base_url=SITE)
+    search_urls = sorted({url for c in criteria for url in url_builder.build_search_urls(c or {})})
+    return {
+        "tokens": [create_access_token({"sub": str(user_id)}) for user_id in user_ids[:args.concurrency * 10]],
+        "listing_ids": tuple(listing_ids),
+        "brands": brands or ["BMW"],
+        "cities": cities or ["İstanbul"],
+        "search_urls": search_urls,
+    }
+
+
+async def wait_healthy(session: aiohttp.ClientSession, base_url: str, server: subprocess.Popen, timeout: float = 120):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Backend süreci başlamadan kapandı (çıkış kodu {server.returncode})")
+        try:
+            async with session.get(base_url + "/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit("Backend /health zaman aşımı")
+
+
+async def fetch_metrics(session: aiohttp.ClientSession, base_url: str, token: str) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        async with session.get(base_url + "/metrics", headers=headers) as response:
+            if response.status != 200:
+                return {}
+            return parse_metrics(await response.text())
+    except aiohttp.ClientError:
+        return {}
+
+
+def scheduler_report(before: dict, after: dict) -> dict:
+    def delta(prefix: str) -> float:
+        return sum(value - before.get(key, 0) for key, value in after.items() if key.startswith(prefix))
+
+    phases = {}
+    for phase in ["goto", "ready", "extract", "detail", "save"]:
+        label = f'{{phase="{phase}"}}'
+        count = after.get(f"autosniper_scan_phase_seconds_count{label}", 0) - before.get(f"autosniper_scan_phase_seconds_count{label}", 0)
+        total = after.get(f"autosniper_scan_phase_seconds_sum{label}", 0) - before.get(f"autosniper_scan_phase_seconds_sum{label}", 0)
+        if count:
+            phases[phase] = {"count": count, "mean_ms": total / count * 1000}
+    return {
+        "pages": delta("autosniper_scan_pages_total"),
+        "new_listings": delta("autosniper_new_listings_total"),
+        "detail_fetches": delta("autosniper_detail_fetches_total"),
+        "queue_overdue": after.get("autosniper_scan_queue_overdue", 0),
+        "phases": phases,
+    }
+
+
+async def run(args, fixture: dict, database_url: str) -> dict:
+    from app.core.config import settings
+    from app.services.scraper.replay import ReplayServer
+    from benchmarks.bench_scrape_replay import build_synthetic_recording
+
+    workdir = tempfile.mkdtemp(prefix="autosniper_load_")
+    recording = os.path.join(workdir, "recording")
+    listings = build_synthetic_recording(
+        recording, args.pages, args.cards, search_urls=fixture["search_urls"] or None
+    )
+    print(f"Replay kaydı: {len(fixture['search_urls'])} arama, {listings} ilan")
+
+    async with ReplayServer(recording, args.latency_ms, args.jitter_ms) as replay:
+        log_path = os.path.join(workdir, "backend.log")
+        env = dict(os.environ, DATABASE_URL=database_url, SCRAPER_BASE_URL=replay.base_url, LOG_LEVEL=args.log_level)
+        with open(log_path, "w") as log:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                 "--port", str(args.port), "--log-level", "warning", "--no-access-log"],
+                cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+        base_url = f"http://127.0.0.1:{args.port}"
+        print(f"Backend: {base_url} (log: {log_path})")
+        try:
+            connector = aiohttp.TCPConnector(limit=0)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                await wait_healthy(session, base_url, server)
+                metrics_before = await fetch_metrics(session, base_url, settings.METRICS_TOKEN)
+
+                stats = Stats()
+                users = [VirtualUser(session, base_url, token, stats, fixture) for token in fixture["tokens"]]
+                ws_result = {"connect_ms": [], "messages": 0, "failed": 0, "dropped": 0}
+                stop = asyncio.Event()
+                ws_url = base_url.replace("http://", "ws://") + "/api/ws"
+                ws_tasks = [
+                    asyncio.create_task(ws_client(session, ws_url, random.choice(fixture["tokens"]), stop, ws_result))
+                    for _ in range(args.ws_clients)
+                ]
+
+                print(f"{args.duration}s yük: {args.concurrency} sanal kullanıcı, {args.ws_clients} WebSocket\n")
+                started = time.perf_counter()
+                deadline = started + args.duration
+                await asyncio.gather(*[http_worker(users, deadline, args.think_ms) for _ in range(args.concurrency)])
+                elapsed = time.perf_counter() - started
+                stop.set()
+                await asyncio.gather(*ws_tasks)
+
+                metrics_after = await fetch_metrics(session, base_url, settings.METRICS_TOKEN)
+        finally:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        replay_counts = {"hits": replay.hits, "misses": replay.misses}
+
+    connect_ms = sorted(ws_result["connect_ms"])
+    return {
+        "database": database_url.split("://")[0],
+        "duration": elapsed,
+        "endpoints": stats.summary(elapsed),
+        "websocket": {
+            "clients": args.ws_clients,
+            "connected": len(connect_ms),
+            "failed": ws_result["failed"],
+            "dropped": ws_result["dropped"],
+            "messages": ws_result["messages"],
+            "connect_p50": percentile(connect_ms, 0.50),
+            "connect_p95": percentile(connect_ms, 0.95),
+            "connect_p99": percentile(connect_ms, 0.99),
+        },
+        "scheduler": scheduler_report(metrics_before, metrics_after) if metrics_after else {},
+        "replay": replay_counts,
+    }
+
+
+def print_report(report: dict):
+    print(f"{'endpoint':<18} {'istek':>7} {'hata':>6} {'304':>6} {'istek/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, row in report["endpoints"].items():
+        print(
+            f"{name:<18} {row['requests']:>7} {row['errors']:>6} {row['not_modified']:>6} {row['rps']:>8.1f} "
+            f"{row['p50']:>7.1f}ms {row['p95']:>7.1f}ms {row['p99']:>7.1f}ms"
+        )
+    ws = report["websocket"]
+    print(
+        f"\nWebSocket: {ws['connected']}/{ws['clients']} bağlandı, {ws['failed']} başarısız, "
+        f"{ws['dropped']} koptu, {ws['messages']} mesaj; bağlantı p50={ws['connect_p50']:.1f}ms "
+        f"p95={ws['connect_p95']:.1f}ms p99={ws['connect_p99']:.1f}ms"
+    )
+    scheduler = report["scheduler"]
+    if scheduler:
+        print(
+            f"Scheduler: {scheduler['pages']:.0f} sonuç sayfası, {scheduler['detail_fetches']:.0f} detay, "
+            f"{scheduler['new_listings']:.0f} yeni ilan, kuyrukta gecikmiş {scheduler['queue_overdue']:.0f}"
+        )
+        for phase, row in scheduler["phases"].items():
+            print(f"  {phase:<8} {row['count']:>5.0f} ölçüm  ortalama={row['mean_ms']:>8.1f}ms")
+    print(f"Replay stub: {report['replay']['hits']} istek kayıttan, {report['replay']['misses']} kayıtta yok")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="API + WebSocket + scheduler yük testi")
+    parser.add_argument("--database-url", help="Hedef veritabanı (verilmezse geçici SQLite, --seed zorunlu olur)")
+    parser.add_argument("--seed", action="store_true", help="Önce seed_load_data ile veri üret")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--filters", type=int, default=10000)
+    parser.add_argument("--listings", type=int, default=1000000)
+    parser.add_argument("--favorites", type=int, default=20000)
+    parser.add_argument("--autoscan", type=int, default=20, help="Otomatik taramalı filtre sayısı (seed)")
+    parser.add_argument("--duration", type=float, default=60, help="Yük süresi (saniye)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Eşzamanlı sanal kullanıcı")
+    parser.add_argument("--think-ms", type=float, default=0, help="İstekler arası rastgele bekleme üst sınırı")
+    parser.add_argument("--ws-clients", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--pages", type=int, default=2, help="Replay kaydında arama başına sonuç sayfası")
+    parser.add_argument("--cards", type=int, default=20, help="Replay kaydında sayfa başına ilan")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--log-level", default="WARNING", help="Backend LOG_LEVEL")
+    parser.add_argument("--json-out", help="Raporu JSON olarak da yaz")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='autosniper_load_db_'), 'load.db')}"
+        args.seed = True
+    if args.seed:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.seed_load_data", "--database-url", database_url,
+             "--users", str(args.users), "--filters", str(args.filters), "--listings", str(args.listings),
+             "--favorites", str(args.favorites), "--autoscan", str(args.autoscan)],
+            cwd=BACKEND_DIR, check=True,
+        )
+
+    # Engine import sırasında kurulduğu için app modülleri bundan sonra yüklenir
+    os.environ["DATABASE_URL"] = database_url
+    fixture = prepare(args)
+    report = asyncio.run(run(args, fixture, database_url))
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Yük testi için sentetik veri üretici
+
+Boş bir veritabanına (şema Alembic ile oluşturulur) gerçekçi dağılımda:
+- kullanıcılar (hepsi aynı şifre: loadtest123; bcrypt hash bir kez hesaplanır)
+- filtreler: katalogdaki marka/modellerden rastgele kriter alt kümeleri
+  (tek/çoklu marka, model, yıl, fiyat, tek/çoklu şehir, km, hasar, yakıt,
+  vites); --autoscan kadarı otomatik taramalı ve hemen zamanı gelmiş
+  (next_scan_at = şimdi)
+- ilanlar: benchmarks/data/listing_titles.txt başlıklarından; alanlar ingest ile
+  aynı yoldan (extract_fields + vehicle_catalog.identify) çıkarılır, scraped_at
+  son 30 güne yayılır, ~%30'u bir filtreye/kullanıcıya bağlıdır
+- favoriler: kullanıcı başına rastgele ilanlar
+
+Eklemeler Core executemany ile parça parça yapılır (1M ilan dakikalar sürer).
+benchmarks/load_test.py --seed bunu alt süreç olarak çağırır.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.seed_load_data --database-url sqlite:////tmp/load.db
+    python -m benchmarks.seed_load_data --database-url postgresql://u:p@localhost/autosniper_load \\
+        --users 1000 --filters 10000 --listings 1000000 --favorites 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "loadtest123"
+CITIES = [
+    "İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Kocaeli", "Konya",
+    "Adana", "Gaziantep", "Kayseri", "Eskişehir", "Samsun", "Denizli", "Mersin",
+]
+FUEL_TYPES = ["Benzin", "Dizel", "Hibrit", "Elektrik", "LPG"]
+TRANSMISSIONS = ["Manuel", "Otomatik", "Yarı Otomatik"]
+SCAN_INTERVALS = [15, 30, 60, 120, 360]
+
+
+def random_criteria(rng: random.Random, brands: list) -> dict:
+    """Gerçek kullanıcı filtrelerine benzer kriter alt kümesi"""
+    brand = rng.choice(brands)
+    criteria = {"brand": brand["name"]}
+    if rng.random() < 0.05:
+        # Çok markalı filtre (model yok)
+        criteria["brand"] = [b["name"] for b in rng.sample(brands, 2)]
+    elif brand["models"] and rng.random() < 0.6:
+        criteria["model"] = rng.choice(brand["models"])["name"]
+    if rng.random() < 0.5:
+        min_year = rng.randint(2005, 2021)
+        criteria["min_year"] = min_year
+        if rng.random() < 0.4:
+            criteria["max_year"] = rng.randint(min_year, 2025)
+    if rng.random() < 0.7:
+        max_price = rng.randrange(400_000, 4_000_000, 50_000)
+        criteria["max_price"] = max_price
+        if rng.random() < 0.5:
+            criteria["min_price"] = max_price // 2
+    if rng.random() < 0.3:
+        # Şehirli filtrelerin ~%30'u çok şehirli
+        criteria["city"] = rng.sample(CITIES, 2) if rng.random() < 0.3 else rng.choice(CITIES)
+    if rng.random() < 0.2:
+        criteria["max_mileage"] = rng.randrange(50_000, 250_000, 10_000)
+    if rng.random() < 0.15:
+        criteria["max_changed_parts"] = rng.choice([0, 0, 1, 2])
+    if rng.random() < 0.1:
+        criteria["max_tramer"] = rng.randrange(0, 50_000, 5_000)
+    if rng.random() < 0.2:
+        criteria["fuel_type"] = rng.choice(FUEL_TYPES).lower()
+    if rng.random() < 0.2:
+        criteria["transmission"] = rng.choice(TRANSMISSIONS[:2]).lower()
+    return criteria
+
+
+def listing_templates(titles: list) -> list:
+    """Başlık başına ingest'teki alan çıkarımı (bir kez; ilanlar bunlardan türetilir)"""
+    from app.services.scraper.extraction import extract_fields
+    from app.services.vehicle_catalog import vehicle_catalog
+
+    vehicle_catalog.ensure_loaded()
+    templates = []
+    for title in titles:
+        fields = extract_fields(title)
+        vehicle = vehicle_catalog.identify(title, fields.get("brand"), fields.get("model"))
+        templates.append({
+            "title": title,
+            "year": fields.get("year"),
+            "fuel_type": fields.get("fuel_type"),
+            "transmission": fields.get("transmission"),
+            "city": fields.get("city"),
+            **vehicle,
+        })
+    return templates
+
+
+def insert_chunked(conn, table, rows, chunk_size: int):
+    for start in range(0, len(rows), chunk_size):
+        conn.execute(table.insert(), rows[start:start + chunk_size])
+
+
+def seed(args) -> dict:
+    from sqlalchemy import func, select
+
+    from app.core.database import engine
+    from app.core.migrations import upgrade_schema
+    from app.core.security import get_password_hash
+    from app.models.favorite import Favorite
+    from app.models.filter import Filter
+    from app.models.listing import Listing
+    from app.models.user import User
+    from app.services.vehicle_catalog.catalog_service import load_catalog_file
+    from benchmarks.bench_scrape_replay import load_titles, slugify
+
+    upgrade_schema()
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Listing.__table__)).scalar():
+            raise SystemExit("Veritabanı boş değil; yük verisi boş bir veritabanına üretilmeli")
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    timings = {}
+
+    started = time.perf_counter()
+    password_hash = get_password_hash(PASSWORD)
+    users = [
+        {
+            "email": f"load{n}@example.com",
+            "password_hash": password_hash,
+            "is_active": True,
+            "subscription_tier": rng.choice(["free", "basic", "pro"]),
+            "max_filters": 50,
+            "daily_search_limit": 10_000,
+        }
+        for n in range(args.users)
+    ]
+    with engine.begin() as conn:
+        insert_chunked(conn, User.__table__, users, args.chunk_size)
+        user_ids = [row[0] for row in conn.execute(select(User.id).order_by(User.id))]
+    timings["users"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    brands = load_catalog_file()
+    filters = []
+    for n in range(args.filters):
+        autoscan = n < args.autoscan
+        filters.append({
+            "user_id": rng.choice(user_ids),
+            "name": f"Yük filtresi {n}",
+            "criteria": random_criteria(rng, brands),
+            "is_active": True,
+            "auto_scan_enabled": autoscan,
+            "adaptive_scan_enabled": False,
+            "scan_interval": rng.choice(SCAN_INTERVALS),
+            "next_scan_at": now if autoscan else None,
+            "total_scans": 0,
+            "new_listings_found": 0,
+        })
+    with engine.begin() as conn:
+        insert_chunked(conn, Filter.__table__, filters, args.chunk_size)
+        filter_owners = [tuple(row) for row in conn.execute(select(Filter.id, Filter.user_id))]
+    timings["filters"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    templates = listing_templates(load_titles())
+    window = int(timedelta(days=30).total_seconds())
+    first_external_id = 20_000_000
+    for start in range(0, args.listings, args.chunk_size):
+        rows = []
+        for n in range(start, min(start + args.chunk_size, args.listings)):
+            template = rng.choice(templates)
+            external_id = first_external_id + n
+            owner = rng.choice(filter_owners) if filter_owners and rng.random() < 0.3 else (None, None)
+            rows.append({
+                **template,
+                "year": template["year"] or rng.randint(2005, 2024),
+                "city": template["city"] or rng.choice(CITIES),
+                "price": float(rng.randrange(250_000, 5_000_000, 5_000)),
+                "mileage": rng.randint(0, 300) * 1000,
+                "changed_part_count": rng.choice([0, 0, 0, 1, 2]),
+                "painted_part_count": rng.choice([0, 0, 1, 2, 3, 4]),
+                "tramer_amount": rng.choice([0, 0, rng.randrange(1_000, 80_000, 500)]),
+                "source_url": f"https://www.arabam.com/ilan/galeriden-satilik-{slugify(template['title'])}/{external_id}",
+                "external_id": external_id,
+                "images": [],
+                "is_new": rng.random() < 0.2,
+                "scraped_at": now - timedelta(seconds=rng.randrange(window)),
+                "filter_id": owner[0],
+                "user_id": owner[1],
+            })
+        with engine.begin() as conn:
+            conn.execute(Listing.__table__.insert(), rows)
+        done = start + len(rows)
+        if done % (args.chunk_size * 50) == 0 or done == args.listings:
+            print(f"  ilanlar: {done}/{args.listings} ({time.perf_counter() - started:.0f}s)")
+    timings["listings"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        first_id, last_id = conn.execute(select(func.min(Listing.id), func.max(Listing.id))).one()
+    pairs = set()
+    if first_id is not None:
+        target = min(args.favorites, len(user_ids) * (last_id - first_id + 1))
+        while len(pairs) < target:
+            pairs.add((rng.choice(user_ids), rng.randint(first_id, last_id)))
+    favorites = [
+        {"user_id": user_id, "listing_id": listing_id, "price_history": []}
+        for user_id, listing_id in sorted(pairs)
+    ]
+    with engine.begin() as conn:
+        insert_chunked(conn, Favorite.__table__, favorites, args.chunk_size)
+    timings["favorites"] = time.perf_counter() - started
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Yük testi verisi üret")
+    parser.add_argument("--database-url", required=True, help="Hedef veritabanı (boş olmalı)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--filters", type=int, default=10000)
+    parser.add_argument("--listings", type=int, default=1000000)
+    parser.add_argument("--favorites", type=int, default=20000)
+    parser.add_argument("--autoscan", type=int, default=20, help="Otomatik taramalı (hemen zamanı gelmiş) filtre sayısı")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Engine import sırasında kurulduğu için app modülleri bundan sonra yüklenir
+    os.environ["DATABASE_URL"] = args.database_url
+    started = time.perf_counter()
+    timings = seed(args)
+    for name, seconds in timings.items():
+        print(f"{name:<10} {getattr(args, name):>9} satır  {seconds:>7.1f}s")
+    print(f"Toplam: {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+İlanları analiz için dışa aktarma scripti
+
+Kullanım:
+    python export_listings.py --format csv -o ilanlar.csv
+    python export_listings.py --format ndjson --brand BMW --min-price 500000 -o bmw.ndjson
+    python export_listings.py --format parquet --source filtered -o ilanlar.parquet
+
+GET /api/listings/export ile aynı servisi kullanır: ilanlar sunucu tarafı
+cursor ile parça parça okunur, bellek kullanımı ilan sayısından bağımsızdır.
+Çıktı dosyası verilmezse stdout'a yazılır.
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Backend klasörünü path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import async_engine
+from app.services.export import EXPORT_FORMATS, ExportFormatError, build_listing_criteria, get_encoder, stream_listings
+
+
+def parse_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "evet", "yes")
+
+
+async def export(args) -> int:
+    encoder = get_encoder(args.format)
+    criteria = build_listing_criteria(
+        source=args.source,
+        brand=args.brand,
+        city=args.city,
+        min_price=args.min_price,
+        max_price=args.max_price,
+        is_new=args.is_new,
+        min_discount=args.min_discount,
+        min_mileage=args.min_mileage,
+        max_mileage=args.max_mileage,
+        max_changed_parts=args.max_changed_parts,
+        max_painted_parts=args.max_painted_parts,
+        max_tramer=args.max_tramer
+    )
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        async for data in stream_listings(criteria, encoder, args.chunk_size):
+            output.write(data)
+            written += len(data)
+    finally:
+        if args.output:
+            output.close()
+        await async_engine.dispose()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İlanları CSV/NDJSON/Parquet olarak dışa aktar")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+    parser.add_argument("-o", "--output", help="Çıktı dosyası (varsayılan: stdout)")
+    parser.add_argument("--source", choices=["all", "quick", "filtered"])
+    parser.add_argument("--brand")
+    parser.add_argument("--city")
+    parser.add_argument("--min-price", type=float)
+    parser.add_argument("--max-price", type=float)
+    parser.add_argument("--is-new", type=parse_bool)
+    parser.add_argument("--min-discount", type=float, help="Piyasanın en az yüzde kaç altındaki ilanlar")
+    parser.add_argument("--min-mileage", type=int)
+    parser.add_argument("--max-mileage", type=int)
+    parser.add_argument("--max-changed-parts", type=int, help="En fazla değişen parça")
+    parser.add_argument("--max-painted-parts", type=int, help="En fazla boyalı (lokal dahil) parça")
+    parser.add_argument("--max-tramer", type=int, help="En fazla tramer tutarı (TL)")
+    parser.add_argument("--chunk-size", type=int, help="Cursor'dan parça başına okunan ilan")
+    args = parser.parse_args()
+
+    try:
+        written = asyncio.run(export(args))
+    except ExportFormatError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.output:
+        print(f"✅ {args.output} yazıldı ({written / 1024:.1f} KB)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
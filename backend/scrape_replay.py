@@ -0,0 +1,88 @@
+"""
+Tarama kayıt / replay scripti
+
+Kullanım:
+    # Gerçek bir taramayı kaydet (sonuç sayfaları + detay HTML'leri + HAR)
+    python scrape_replay.py record -o recordings/bmw --criteria '{"brand": "BMW"}' --pages 3
+
+    # Kaydı yerel stub sunucudan sun (gecikme enjeksiyonu ile)
+    python scrape_replay.py serve recordings/bmw --port 8765 --latency-ms 150 --jitter-ms 100
+
+serve çalışırken backend SCRAPER_BASE_URL=http://127.0.0.1:8765 ile başlatılırsa
+scheduler ve manuel taramalar canlı site yerine kayıttan beslenir.
+Benchmark için: python -m benchmarks.bench_scrape_replay --recording recordings/bmw
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import os
+
+# Backend klasörünü path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.scraper.replay import ReplayServer, ScrapeRecorder
+from app.services.scraper.scraper import ArabaComScraper
+
+
+async def record(args) -> int:
+    criteria = json.loads(args.criteria) if args.criteria else None
+    recorder = ScrapeRecorder(args.output, settings.SCRAPER_BASE_URL)
+    db = SessionLocal()
+    scraper = ArabaComScraper(db, recorder=recorder)
+    try:
+        await scraper.init_browser()
+        listings = await scraper.scrape_listings(criteria, incremental=False, max_pages=args.pages)
+    finally:
+        await scraper.close_browser()
+        recorder.close()
+        db.close()
+
+    print(f"✅ {len(recorder.entries)} sayfa kaydedildi ({len(listings)} ilan): {args.output}")
+    return 0
+
+
+async def serve(args) -> int:
+    server = ReplayServer(args.recording, args.latency_ms, args.jitter_ms, args.host, args.port)
+    await server.start()
+    print(f"Replay sunucusu: {server.base_url} ({len(server.entries)} sayfa)")
+    print(f"Backend'i SCRAPER_BASE_URL={server.base_url} ile başlatın. Durdurmak için Ctrl+C")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.stop()
+        print(f"İstekler: {server.hits} kayıttan, {server.misses} kayıtta yok")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tarama kayıt / replay")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Canlı bir taramayı kaydet")
+    record_parser.add_argument("-o", "--output", required=True, help="Kayıt dizini")
+    record_parser.add_argument("--criteria", help="Filtre kriterleri (JSON)")
+    record_parser.add_argument("--pages", type=int, default=1, help="Kaydedilecek sonuç sayfası")
+
+    serve_parser = commands.add_parser("serve", help="Kaydı stub sunucudan sun")
+    serve_parser.add_argument("recording", help="Kayıt dizini")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency-ms", type=float, default=0, help="Her yanıta eklenen gecikme")
+    serve_parser.add_argument("--jitter-ms", type=float, default=0, help="Gecikmeye eklenen rastgele üst sınır")
+
+    args = parser.parse_args()
+    try:
+        return asyncio.run(record(args) if args.command == "record" else serve(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
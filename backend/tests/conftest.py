@@ -0,0 +1,57 @@
+"""
+Test ortamı: geçici SQLite veritabanı, migration'larla kurulur
+
+DATABASE_URL app modülleri import edilmeden önce ayarlanmalıdır (engine
+import anında oluşturulur).
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="autosniper_test_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.database import async_engine, engine  # noqa: E402
+from app.core.migrations import upgrade_schema  # noqa: E402
+from app.services.dedupe import repost_detector  # noqa: E402
+
+# Her testten önce boşaltılan tablolar (katalog tabloları migration verisidir, korunur)
+DATA_TABLES = [
+    "favorites", "notifications", "licenses", "listings", "filters",
+    "scan_watermarks", "price_stats", "users",
+]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    upgrade_schema()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clean_db(schema):
+    with engine.begin() as connection:
+        for table in DATA_TABLES:
+            connection.execute(text(f"DELETE FROM {table}"))
+        # Süreç başına indeks: testler arasında taşınmasın
+        repost_detector.load(connection)
+    yield
+
+
+@pytest.fixture
+def run():
+    """Coroutine'i yeni event loop'ta çalıştır; async havuz loop'a bağlı olduğundan sonra boşaltılır"""
+    def runner(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return runner
@@ -0,0 +1,88 @@
+import asyncio
+
+from fastapi import Response
+
+from app.api import listings as listings_api
+from app.core.database import SessionLocal
+from app.models.favorite import Favorite
+from app.models.listing import Listing
+from app.models.user import User
+from app.services.bulk_delete import BulkDeleteService
+from app.services.jobs import job_manager
+
+
+def seed(count, filter_id=None):
+    db = SessionLocal()
+    try:
+        user = User(email=f"u{filter_id}@test.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        for i in range(count):
+            listing = Listing(
+                source_url=f"https://www.arabam.com/ilan/bmw/{(filter_id or 0) * 100 + i}",
+                title="BMW", price=1_000_000, filter_id=filter_id, is_new=True,
+            )
+            db.add(listing)
+            db.flush()
+            db.add(Favorite(user_id=user.id, listing_id=listing.id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def counts():
+    db = SessionLocal()
+    try:
+        return db.query(Listing).count(), db.query(Favorite).count()
+    finally:
+        db.close()
+
+
+def test_delete_listings_runs_in_chunks(run):
+    seed(5)
+    progress = []
+
+    async def report(processed, total):
+        progress.append((processed, total))
+
+    stats = run(BulkDeleteService(chunk_size=2).delete_listings(on_progress=report, total=5))
+
+    assert stats == {"listings": 5, "favorites": 5, "chunks": 3}
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+    assert counts() == (0, 0)
+
+
+def test_delete_listings_respects_criteria(run):
+    seed(3)
+    seed(2, filter_id=1)
+
+    stats = run(BulkDeleteService(chunk_size=2).delete_listings(Listing.filter_id != None))  # noqa: E711
+
+    assert stats["listings"] == 2
+    assert counts() == (3, 3)
+
+
+def test_background_delete_is_not_shared_between_users(run, monkeypatch):
+    release = asyncio.Event()
+
+    async def blocked_delete(*criteria, **kwargs):
+        await release.wait()
+        return {"listings": 0, "favorites": 0, "chunks": 0}
+
+    monkeypatch.setattr(listings_api.settings, "BULK_DELETE_SYNC_LIMIT", -1)
+    monkeypatch.setattr(listings_api.bulk_delete_service, "delete_listings", blocked_delete)
+
+    async def main():
+        first = await listings_api.delete_all_listings(Response(), source=None, current_user=User(id=1))
+        again = await listings_api.delete_all_listings(Response(), source=None, current_user=User(id=1))
+        other = await listings_api.delete_all_listings(Response(), source=None, current_user=User(id=2))
+        release.set()
+        await job_manager.get(first["job_id"]).task
+        await job_manager.get(other["job_id"]).task
+        return first, again, other
+
+    first, again, other = run(main())
+    # Aynı kullanıcının tekrar tıklaması işe bağlanır; başka kullanıcı kendi işini alır
+    assert again["job_id"] == first["job_id"]
+    assert other["job_id"] != first["job_id"]
+    assert job_manager.get(other["job_id"]).user_id == 2
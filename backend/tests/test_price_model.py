@@ -0,0 +1,38 @@
+from app.core.database import SessionLocal
+from app.models.listing import Listing
+from app.models.price_stat import PriceStat
+from app.models.vehicle import VehicleModel
+from app.services.pricing import PriceModel
+
+
+def seed_bucket(count):
+    db = SessionLocal()
+    try:
+        vehicle = db.query(VehicleModel).first()
+        for i in range(count):
+            db.add(Listing(
+                source_url=f"https://www.arabam.com/ilan/bmw/{i}",
+                title="BMW 320i", price=1_000_000 + i * 10_000, year=2019, mileage=80_000 + i * 1_000,
+                brand_id=vehicle.brand_id, model_id=vehicle.id, is_new=True,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_bootstrap_builds_empty_table_and_scores_existing_listings():
+    seed_bucket(10)
+    model = PriceModel()
+
+    buckets, scored = model.bootstrap()
+
+    assert (buckets, scored) == (1, 10)
+    db = SessionLocal()
+    try:
+        assert db.query(PriceStat).count() == 1
+        assert db.query(Listing).filter(Listing.market_price == None).count() == 0  # noqa: E711
+    finally:
+        db.close()
+
+    # Tablo doluysa sonraki açılışlarda tekrar kurulmaz
+    assert PriceModel().bootstrap() == (0, 0)
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from app.core.database import SessionLocal
+from app.models.listing import Listing
+from app.services.bulk_delete import bulk_delete_service
+from app.services.dedupe import repost_detector
+from app.services.dedupe.repost_detector import _Entry
+
+PHASH = 0x0F0F_1234_ABCD_5678
+
+
+def make_listing(db, external_id, **overrides):
+    values = dict(
+        source_url=f"https://www.arabam.com/ilan/bmw-320i/{external_id}",
+        external_id=external_id,
+        title="BMW 320i M Sport",
+        price=1_500_000,
+        year=2019,
+        brand="BMW",
+        model="320i",
+        mileage=85_000,
+        city="İstanbul",
+        image_phash=PHASH,
+        is_new=True,
+    )
+    values.update(overrides)
+    listing = Listing(**values)
+    db.add(listing)
+    db.flush()
+    return listing
+
+
+def ingest(db, external_id, **overrides):
+    """Scheduler'daki gibi: flush -> link -> commit -> batch commit"""
+    batch = repost_detector.batch()
+    listing = make_listing(db, external_id, **overrides)
+    canonical_id = batch.link(listing)
+    db.commit()
+    batch.commit()
+    return listing, canonical_id
+
+
+def test_repost_linked_to_original():
+    db = SessionLocal()
+    try:
+        original, canonical_id = ingest(db, 1001)
+        assert canonical_id is None
+        _, canonical_id = ingest(db, 1002, price=1_450_000)
+        assert canonical_id == original.id
+    finally:
+        db.close()
+
+
+def test_deleted_listing_is_not_canonical(run):
+    db = SessionLocal()
+    try:
+        original, _ = ingest(db, 1001)
+        run(bulk_delete_service.delete_listings(Listing.id == original.id))
+
+        # Aynı araç yeniden geldiğinde silinmiş satıra bağlanmaz, bildirimi bastırılmaz
+        _, canonical_id = ingest(db, 1002)
+        assert canonical_id is None
+    finally:
+        db.close()
+
+
+def test_repost_of_deleted_root_links_to_surviving_copy(run):
+    db = SessionLocal()
+    try:
+        original, _ = ingest(db, 1001)
+        repost, canonical_id = ingest(db, 1002)
+        assert canonical_id == original.id
+        run(bulk_delete_service.delete_listings(Listing.id == original.id))
+
+        _, canonical_id = ingest(db, 1003)
+        assert canonical_id == repost.id
+    finally:
+        db.close()
+
+
+def test_entries_outside_window_are_evicted():
+    old = _Entry(1, 1001, datetime.utcnow() - timedelta(days=400), None, PHASH, "BMW 320i", "BMW", "320i",
+                 None, None, 2019, 1_500_000, 85_000, "istanbul")
+    repost_detector.add(old)
+    assert repost_detector.evict_expired() == 1
+
+    fresh = _Entry(2, 1002, datetime.utcnow(), None, PHASH, "BMW 320i", "BMW", "320i",
+                   None, None, 2019, 1_500_000, 85_000, "istanbul")
+    assert repost_detector.find_canonical(fresh) is None
+
+
+def test_recycled_id_is_not_treated_as_self():
+    # Silinen satırın id'si yeni ilana verilmiş: farklı ilan kimliği, aynı id
+    stale = _Entry(7, 1001, datetime.utcnow(), None, PHASH, "BMW 320i", "BMW", "320i",
+                   None, None, 2019, 1_500_000, 85_000, "istanbul")
+    repost_detector.add(stale)
+    recycled = _Entry(7, 1002, datetime.utcnow(), None, PHASH, "BMW 320i", "BMW", "320i",
+                      None, None, 2019, 1_500_000, 85_000, "istanbul")
+    same = _Entry(8, 1001, datetime.utcnow(), None, PHASH, "BMW 320i", "BMW", "320i",
+                  None, None, 2019, 1_500_000, 85_000, "istanbul")
+    assert repost_detector.find_canonical(recycled) == 7
+    assert repost_detector.find_canonical(same) is None
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.retention.retention_service import LISTING_COLUMNS, ListingArchiveWriter
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def row(listing_id, **values):
+    data = {key: None for key in LISTING_COLUMNS}
+    data.update(id=listing_id, source_url=f"https://x/ilan/{listing_id}", title="t", price=100000.0,
+                is_new=True, scraped_at=datetime(2025, 1, 1))
+    data.update(values)
+    return data
+
+
+def test_parquet_archive_accepts_values_after_all_null_chunk(tmp_path):
+    writer = ListingArchiveWriter(str(tmp_path), "parquet")
+    # İlk parçada market_price / damage_info / image_phash tamamen NULL
+    writer.write([row(1), row(2)])
+    writer.write([row(3, market_price=95000.0, deal_score=0.05, image_phash=-123,
+                      damage_info={"changed": ["kaput"]}, images=["a.jpg"])])
+    writer.close()
+
+    table = pq.read_table(writer.path)
+    assert table.num_rows == 3
+    assert table.column("market_price").to_pylist() == [None, None, 95000.0]
+    assert table.column("image_phash").to_pylist() == [None, None, -123]
+    assert table.column("damage_info").to_pylist()[2] == '{"changed": ["kaput"]}'
+
+
+def test_empty_archive_is_removed(tmp_path):
+    writer = ListingArchiveWriter(str(tmp_path), "parquet")
+    writer.close()
+    assert not list(tmp_path.iterdir())
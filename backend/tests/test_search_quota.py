@@ -0,0 +1,86 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import quick_search as quick_search_api
+from app.api.dependencies import consume_search_quota
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.models.user import User
+from app.services.jobs import job_manager
+
+
+def make_user(limit, count=0):
+    db = SessionLocal()
+    try:
+        user = User(
+            email="quota@test.com", password_hash="x",
+            daily_search_limit=limit, daily_search_count=count, last_reset_date=date.today(),
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def search_count(user_id):
+    db = SessionLocal()
+    try:
+        return db.get(User, user_id).daily_search_count
+    finally:
+        db.close()
+
+
+def test_quota_exhaustion_reports_database_values(run):
+    user_id = make_user(limit=2)
+
+    async def main():
+        # Önbellekteki kullanıcı nesnesi gibi: sayaç değerleri eski
+        stale_user = User(id=user_id, email="quota@test.com", daily_search_count=0, daily_search_limit=5)
+        async with AsyncSessionLocal() as db:
+            await consume_search_quota(stale_user, db)
+            await consume_search_quota(User(id=user_id, email="quota@test.com"), db)
+            with pytest.raises(HTTPException) as exc:
+                await consume_search_quota(stale_user, db)
+        return exc.value
+
+    error = run(main())
+    assert error.status_code == 429
+    assert error.detail["current"] == 2
+    assert error.detail["limit"] == 2
+    assert search_count(user_id) == 2
+
+
+def test_concurrent_quick_search_starts_one_job_and_charges_once(run, monkeypatch):
+    user_id = make_user(limit=1)
+    release = asyncio.Event()
+
+    async def blocked_search(job):
+        await release.wait()
+        return {}
+
+    async def slow_quota(current_user, db):
+        # Kota UPDATE'i beklerken diğer istekler araya girebilsin
+        await asyncio.sleep(0.05)
+        await consume_search_quota(current_user, db)
+
+    monkeypatch.setattr(quick_search_api, "_run_quick_search", blocked_search)
+    monkeypatch.setattr(quick_search_api, "consume_search_quota", slow_quota)
+
+    async def request():
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
+            return await quick_search_api.quick_search(current_user=user, db=db)
+
+    async def main():
+        responses = await asyncio.gather(request(), request(), request())
+        release.set()
+        await job_manager.get(responses[0]["job_id"]).task
+        return responses
+
+    responses = run(main())
+    # Limit 1 olsa da tekrar tıklamalar 429 almaz, aynı işe bağlanır
+    assert len({r["job_id"] for r in responses}) == 1
+    assert search_count(user_id) == 1
@@ -1,4 +1,5 @@
 import { Link } from 'react-router-dom'
+import { listingImageUrl } from '../services/api'
 import { useCompareStore } from '../store/compareStore'
 import './Compare.css'
 
@@ -85,7 +86,7 @@ const Compare = () => {
               </button>
               <div className="compare-image">
                 {listing.images && listing.images.length > 0 ? (
-                  <img src={listing.images[0]} alt={listing.title} />
+                  <img src={listingImageUrl(listing.id)} alt={listing.title} loading="lazy" decoding="async" />
                 ) : (
                   <div className="no-image">📷</div>
                 )}
@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
-import api from '../services/api'
+import api, { listingImageUrl, waitForJob } from '../services/api'
 import { useAuthStore } from '../store/authStore'
 import toast from 'react-hot-toast'
 import UsageStats from '../components/UsageStats'
@@ -113,16 +113,17 @@ const Dashboard = () => {
 
     try {
       const response = await api.post('/api/quick-search', {})
+      const result = await waitForJob(response.data.job_id)
       toast.dismiss('quick-search')
-      if (response.data.success) {
-        toast.success(response.data.message || 'Tarama tamamlandı!', { duration: 5000 });
+      if (result?.success) {
+        toast.success(result.message || 'Tarama tamamlandı!', { duration: 5000 });
       } else {
-        toast.error(response.data.message || 'Tarama başarısız');
+        toast.error(result?.message || 'Tarama başarısız');
       }
       navigate('/listings')
     } catch (error: any) {
       toast.dismiss('quick-search')
-      toast.error(error.response?.data?.detail || 'Tarama başarısız')
+      toast.error(error.response?.data?.detail || error.message || 'Tarama başarısız')
     } finally {
       setQuickSearching(false)
     }
@@ -281,7 +282,7 @@ const Dashboard = () => {
                 <div className="recent-image">
                   {listing.images && listing.images.length > 0 ? (
                     <img
-                      src={listing.images[0]}
+                      src={listingImageUrl(listing.id)}
                       alt={listing.title}
                       loading="lazy"
                       decoding="async"
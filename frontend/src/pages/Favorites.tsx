@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
-import api from '../services/api'
+import api, { listingImageUrl } from '../services/api'
 import toast from 'react-hot-toast'
 import './Favorites.css'
 
@@ -111,7 +111,7 @@ const Favorites = () => {
                 <div className="card-image">
                   {listing.images && listing.images.length > 0 ? (
                     <img 
-                      src={listing.images[0]} 
+                      src={listingImageUrl(listing.id)}
                       alt={listing.title}
                       loading="lazy"
                       decoding="async"
@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react'
-import api from '../services/api'
+import api, { waitForJob } from '../services/api'
 import toast from 'react-hot-toast'
 import './Filters.css'
 
@@ -117,12 +117,13 @@ const Filters = () => {
     
     try {
       const response = await api.post(`/api/filters/${filter.id}/search`)
+      const result = await waitForJob(response.data.job_id)
       toast.success(
-        `${response.data.total_found} ilan bulundu, ${response.data.new_saved} yeni ilan kaydedildi!`,
+        `${result.total_found} ilan bulundu, ${result.new_saved} yeni ilan kaydedildi!`,
         { id: 'search' }
       )
     } catch (error: any) {
-      toast.error(error.response?.data?.detail || 'Arama sırasında hata oluştu', { id: 'search' })
+      toast.error(error.response?.data?.detail || error.message || 'Arama sırasında hata oluştu', { id: 'search' })
     } finally {
       setSearching(null)
     }
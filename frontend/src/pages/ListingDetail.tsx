@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { useParams, Link } from 'react-router-dom'
-import api from '../services/api'
+import api, { listingImageUrl } from '../services/api'
 import toast from 'react-hot-toast'
 import CarDamageDiagram from '../components/CarDamageDiagram'
 import './ListingDetail.css'
@@ -124,7 +124,7 @@ const ListingDetail = () => {
             {listing.is_new && <span className="new-badge">YENİ</span>}
             {listing.images && listing.images.length > 0 ? (
               <img
-                src={listing.images[activeImageIndex]}
+                src={listingImageUrl(listing.id, 'medium', activeImageIndex)}
                 alt={listing.title}
                 className="main-image"
                 onError={(e) => {
@@ -138,13 +138,13 @@ const ListingDetail = () => {
             )}
             {listing.images && listing.images.length > 1 && (
               <div className="mini-thumbnails">
-                {listing.images.slice(0, 4).map((img, idx) => (
+                {listing.images.slice(0, 4).map((_, idx) => (
                   <button
                     key={idx}
                     className={`mini-thumb ${idx === activeImageIndex ? 'active' : ''}`}
                     onClick={() => setActiveImageIndex(idx)}
                   >
-                    <img src={img} alt="" />
+                    <img src={listingImageUrl(listing.id, 'thumb', idx)} alt="" loading="lazy" />
                   </button>
                 ))}
               </div>
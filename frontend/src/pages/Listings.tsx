@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
-import api from '../services/api'
+import api, { listingImageUrl, waitForJob } from '../services/api'
 import toast from 'react-hot-toast'
 import { useCompareStore } from '../store/compareStore'
 import './Listings.css'
@@ -17,6 +17,8 @@ interface Listing {
   images: string[] | null
   source_url: string
   is_new: boolean
+  market_price: number | null
+  deal_score: number | null
 }
 
 type SourceTab = 'all' | 'quick' | 'filtered'
@@ -35,7 +37,8 @@ const Listings = () => {
     brand: '',
     city: '',
     minPrice: '',
-    maxPrice: ''
+    maxPrice: '',
+    minDiscount: ''
   })
 
   useEffect(() => {
@@ -57,6 +60,7 @@ const Listings = () => {
       if (filters.city) params.append('city', filters.city)
       if (filters.minPrice) params.append('min_price', filters.minPrice)
       if (filters.maxPrice) params.append('max_price', filters.maxPrice)
+      if (filters.minDiscount) params.append('min_discount', filters.minDiscount)
 
       const response = await api.get(`/api/listings?${params}`)
       setListings(response.data.items || [])
@@ -146,7 +150,12 @@ const Listings = () => {
     if (!confirm(`${label} sekmesindeki ${count} ilanı silmek istediğinize emin misiniz? Bu işlem geri alınamaz!`)) return
     
     try {
-      await api.delete(`/api/listings?source=${activeTab}`)
+      const response = await api.delete(`/api/listings?source=${activeTab}`)
+      // Çok sayıda ilan arka plan işinde parça parça silinir
+      if (response.data.job_id) {
+        toast(`${response.data.count} ilan siliniyor...`)
+        await waitForJob(response.data.job_id)
+      }
       toast.success(`${label} ilanları silindi`)
       loadListings()
       loadTabCounts()
@@ -253,6 +262,14 @@ const Listings = () => {
           value={filters.maxPrice}
           onChange={(e) => setFilters({...filters, maxPrice: e.target.value})}
         />
+        <input
+          type="number"
+          placeholder="Piyasa Altı %"
+          min="0"
+          max="100"
+          value={filters.minDiscount}
+          onChange={(e) => setFilters({...filters, minDiscount: e.target.value})}
+        />
         <button type="submit" className="btn btn-secondary">
           Filtrele
         </button>
@@ -318,7 +335,7 @@ const Listings = () => {
                   <div className="card-image">
                     {listing.images && listing.images.length > 0 ? (
                       <img 
-                        src={listing.images[0]} 
+                        src={listingImageUrl(listing.id)}
                         alt={listing.title}
                         loading="lazy"
                         decoding="async"
@@ -336,6 +353,11 @@ const Listings = () => {
                   <div className="card-content">
                     <h3 className="card-title">{listing.title}</h3>
                     <p className="card-price">{formatPrice(listing.price)}</p>
+                    {listing.deal_score !== null && listing.deal_score >= 0.05 && listing.market_price && (
+                      <p className="card-deal" title={`Tahmini piyasa fiyatı: ${formatPrice(listing.market_price)}`}>
+                        🔥 Piyasanın %{Math.round(listing.deal_score * 100)} altında
+                      </p>
+                    )}
                     
                     <div className="card-details">
                       {listing.year && <span>📅 {listing.year}</span>}
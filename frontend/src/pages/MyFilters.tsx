@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
-import api from '../services/api'
+import api, { waitForJob } from '../services/api'
 import toast from 'react-hot-toast'
 import './MyFilters.css'
 
@@ -46,6 +46,10 @@ const MyFilters = () => {
     maxPrice: '',
     minMileage: '',
     maxMileage: '',
+    minDiscount: '',
+    maxChangedParts: '',
+    maxPaintedParts: '',
+    maxTramer: '',
     city: '',
     fuelType: '',
     transmission: '',
@@ -95,7 +99,16 @@ const MyFilters = () => {
     if (formData.maxPrice) criteria.max_price = parseFloat(formData.maxPrice)
     if (formData.minMileage) criteria.min_mileage = parseInt(formData.minMileage)
     if (formData.maxMileage) criteria.max_mileage = parseInt(formData.maxMileage)
+    if (formData.minDiscount) criteria.min_discount = parseFloat(formData.minDiscount)
+    if (formData.maxChangedParts) criteria.max_changed_parts = parseInt(formData.maxChangedParts)
+    if (formData.maxPaintedParts) criteria.max_painted_parts = parseInt(formData.maxPaintedParts)
+    if (formData.maxTramer) criteria.max_tramer = parseInt(formData.maxTramer)
     if (formData.city) criteria.city = formData.city
+    // Çoklu marka/şehir (formda tek seçim var) değiştirilmediyse korunur
+    if (editingFilter) {
+      if (!formData.brand && Array.isArray(editingFilter.criteria.brand)) criteria.brand = editingFilter.criteria.brand
+      if (!formData.city && Array.isArray(editingFilter.criteria.city)) criteria.city = editingFilter.criteria.city
+    }
     if (formData.fuelType) criteria.fuel_type = formData.fuelType
     if (formData.transmission) criteria.transmission = formData.transmission
 
@@ -134,7 +147,7 @@ const MyFilters = () => {
     setEditingFilter(filter)
     setFormData({
       name: filter.name,
-      brand: filter.criteria.brand || '',
+      brand: Array.isArray(filter.criteria.brand) ? '' : filter.criteria.brand || '',
       model: filter.criteria.model || '',
       minYear: filter.criteria.min_year?.toString() || '',
       maxYear: filter.criteria.max_year?.toString() || '',
@@ -142,7 +155,11 @@ const MyFilters = () => {
       maxPrice: filter.criteria.max_price?.toString() || '',
       minMileage: filter.criteria.min_mileage?.toString() || '',
       maxMileage: filter.criteria.max_mileage?.toString() || '',
-      city: filter.criteria.city || '',
+      minDiscount: filter.criteria.min_discount?.toString() || '',
+      maxChangedParts: filter.criteria.max_changed_parts?.toString() || '',
+      maxPaintedParts: filter.criteria.max_painted_parts?.toString() || '',
+      maxTramer: filter.criteria.max_tramer?.toString() || '',
+      city: Array.isArray(filter.criteria.city) ? '' : filter.criteria.city || '',
       fuelType: filter.criteria.fuel_type || '',
       transmission: filter.criteria.transmission || '',
       is_active: filter.is_active,
@@ -169,6 +186,10 @@ const MyFilters = () => {
       maxPrice: '',
       minMileage: '',
       maxMileage: '',
+      minDiscount: '',
+      maxChangedParts: '',
+      maxPaintedParts: '',
+      maxTramer: '',
       city: '',
       fuelType: '',
       transmission: '',
@@ -247,13 +268,14 @@ const MyFilters = () => {
     
     try {
       const response = await api.post(`/api/filters/${filter.id}/search`)
+      const result = await waitForJob(response.data.job_id)
       toast.success(
-        `${response.data.total_found || 0} ilan bulundu, ${response.data.new_saved || 0} yeni kaydedildi!`,
+        `${result.total_found || 0} ilan bulundu, ${result.new_saved || 0} yeni kaydedildi!`,
         { id: 'search', duration: 5000 }
       )
       navigate('/listings')
     } catch (error: any) {
-      toast.error(error.response?.data?.detail || 'Arama sırasında hata oluştu', { id: 'search' })
+      toast.error(error.response?.data?.detail || error.message || 'Arama sırasında hata oluştu', { id: 'search' })
     } finally {
       setSearching(null)
     }
@@ -269,6 +291,10 @@ const MyFilters = () => {
       max_price: 'Max Fiyat',
       min_mileage: 'Min KM',
       max_mileage: 'Max KM',
+      min_discount: 'Piyasa Altı %',
+      max_changed_parts: 'Max Değişen',
+      max_painted_parts: 'Max Boyalı',
+      max_tramer: 'Max Tramer',
       city: 'Şehir',
       fuel_type: 'Yakıt',
       transmission: 'Vites'
@@ -401,6 +427,47 @@ const MyFilters = () => {
                   placeholder="150000"
                 />
               </div>
+              <div className="form-group">
+                <label>Piyasanın En Az % Altında</label>
+                <input
+                  type="number"
+                  min="0"
+                  max="100"
+                  value={formData.minDiscount}
+                  onChange={(e) => setFormData({ ...formData, minDiscount: e.target.value })}
+                  placeholder="15"
+                />
+              </div>
+              <div className="form-group">
+                <label>Max Değişen Parça</label>
+                <input
+                  type="number"
+                  min="0"
+                  value={formData.maxChangedParts}
+                  onChange={(e) => setFormData({ ...formData, maxChangedParts: e.target.value })}
+                  placeholder="0"
+                />
+              </div>
+              <div className="form-group">
+                <label>Max Boyalı Parça</label>
+                <input
+                  type="number"
+                  min="0"
+                  value={formData.maxPaintedParts}
+                  onChange={(e) => setFormData({ ...formData, maxPaintedParts: e.target.value })}
+                  placeholder="2"
+                />
+              </div>
+              <div className="form-group">
+                <label>Max Tramer (TL)</label>
+                <input
+                  type="number"
+                  min="0"
+                  value={formData.maxTramer}
+                  onChange={(e) => setFormData({ ...formData, maxTramer: e.target.value })}
+                  placeholder="20000"
+                />
+              </div>
               <div className="form-group">
                 <label>Şehir</label>
                 <select
@@ -531,7 +598,7 @@ const MyFilters = () => {
               <div className="filter-criteria">
                 {Object.entries(filter.criteria).map(([key, value]) => (
                   <span key={key} className="criteria-tag">
-                    <strong>{formatCriteriaLabel(key)}:</strong> {String(value)}
+                    <strong>{formatCriteriaLabel(key)}:</strong> {Array.isArray(value) ? value.join(', ') : String(value)}
                   </span>
                 ))}
               </div>
@@ -33,3 +33,23 @@ api.interceptors.response.use(
 
 export default api
 
+
+// İlan resmi - backend proxy'si küçültülmüş ve önbellekli halini sunar
+export const listingImageUrl = (listingId: number, size: 'thumb' | 'medium' = 'thumb', index = 0): string =>
+  `${API_BASE_URL}/api/images/${listingId}?size=${size}&index=${index}`
+
+
+// Arka plan işini (quick-search, filtre araması) tamamlanana kadar takip et
+export const waitForJob = async (jobId: string, intervalMs = 2000): Promise<any> => {
+  while (true) {
+    const response = await api.get(`/api/jobs/${jobId}`)
+    const job = response.data
+    if (job.status === 'completed') {
+      return job.result
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'İş başarısız')
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs))
+  }
+}